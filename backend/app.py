@@ -1,5 +1,4 @@
 import os
-import hashlib
 import secrets
 from datetime import datetime, timedelta
 from flask import Flask, jsonify, request
@@ -13,6 +12,19 @@ from routes.task import tasks_bp
 from routes.subtask import subtask_bp
 from routes.dashboard import dashboard_bp
 from services.notification_service import notification_service
+from services.user_lookup_service import user_lookup_service, normalize_email
+from services.user_directory import user_directory
+from services.password_service import password_service, PasswordPoolBusyError
+from password_utils import hash_password, verify_password
+from logging_utils import configure_logging, get_logger
+import metrics
+import firestore_accounting
+import profiling
+import json_provider
+import http_cache
+import compression
+
+logger = get_logger(__name__)
 
 def validate_password(password):
     """Validate password requirements"""
@@ -41,41 +53,30 @@ def validate_password(password):
     
     return None
 
-def hash_password(password):
-    """Hash password using SHA-256 with salt"""
-    salt = os.urandom(32)  # Generate random salt
-    password_hash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, 100000)
-    return (salt + password_hash).hex()  # Convert to hex string
-
-def verify_password(stored_password, provided_password):
-    """Verify a password against its hash"""
-    try:
-        # Convert hex string back to bytes
-        stored_password_bytes = bytes.fromhex(stored_password)
-        salt = stored_password_bytes[:32]  # First 32 bytes are salt
-        stored_hash = stored_password_bytes[32:]  # Rest is hash
-        
-        # Hash the provided password with the same salt
-        provided_hash = hashlib.pbkdf2_hmac('sha256', provided_password.encode('utf-8'), salt, 100000)
-        
-        # Compare hashes
-        return stored_hash == provided_hash
-    except Exception:
-        return False
-
 def create_app() -> Flask:
     
     load_dotenv()
     
     app = Flask(__name__)
+    # orjson-backed jsonify; Firestore timestamps serialize as ISO 8601
+    json_provider.init_app(app)
 
     CORS(app, resources={r"/*": {"origins": ["http://localhost:8080", "http://localhost:8081", "http://127.0.0.1:8080", "http://127.0.0.1:8081"]}}, supports_credentials=True)
     get_firebase_app()
     
-    # Log all incoming requests
-    @app.before_request
-    def log_request():
-        print(f"\n🌐 {request.method} {request.path}")
+    # Structured request logging + per-route latency metrics (GET /metrics)
+    configure_logging()
+    metrics.init_app(app)
+    # Password pool queue depth / hash latency as password_pool_* gauges
+    metrics.request_metrics.add_gauges('password_pool', password_service.get_stats)
+    # Firestore reads/writes per request (X-Firestore-Usage header, budgets)
+    firestore_accounting.init_app(app)
+    # Opt-in cProfile dumps for slow / selected requests (see profiling.py)
+    profiling.init_app(app)
+    # gzip/brotli; registered before http_cache so it runs after the ETag is set
+    compression.init_app(app)
+    # ETag / If-None-Match -> 304 on JSON GETs (see http_cache.py)
+    http_cache.init_app(app)
 
     # Register blueprints here
     # =============== Project routes ===============
@@ -95,6 +96,13 @@ def create_app() -> Flask:
     def health():
         return jsonify({"status": "ok"}), 200
 
+    def password_pool_busy(error):
+        """503 response when the password worker pool is saturated"""
+        response = jsonify({"ok": False, "error": str(error)})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(error.retry_after)
+        return response
+
     # User Routes 
     @app.route("/login", methods=["POST"])
     def login():
@@ -106,19 +114,10 @@ def create_app() -> Flask:
             return jsonify({"ok": False, "error": "email and password are required"}), 400
 
         try:
-            # Get Firestore client
-            db = get_firestore_client()
-            
-            users_ref = db.collection('Users')
-            all_docs = users_ref.stream()
-            docs = []
-            
-            for doc in all_docs:
-                user_data = doc.to_dict()
-                if user_data.get('email', '').lower() == email.lower():
-                    docs.append(doc)
-                    break
-            
+            # Indexed lookup on email_lower (cached email -> user ID)
+            user_doc = user_lookup_service.find_user_by_email(email)
+            docs = [user_doc] if user_doc else []
+
             for doc in docs:
                 user_data = doc.to_dict()
                 stored_password = user_data.get('password', '')
@@ -126,7 +125,7 @@ def create_app() -> Flask:
                 # Check if password is hashed (new users) or plain text (old users)
                 if len(stored_password) > 32 and ':' not in stored_password:
                     # New hashed password
-                    if verify_password(stored_password, password):
+                    if password_service.verify(stored_password, password):
                         return jsonify({
                             "ok": True,
                             "message": "Login successful",
@@ -159,6 +158,8 @@ def create_app() -> Flask:
             
             return jsonify({"ok": False, "error": "Invalid email or password"}), 401
             
+        except PasswordPoolBusyError as e:
+            return password_pool_busy(e)
         except Exception as e:
             return jsonify({"ok": False, "error": f"Database error: {str(e)}"}), 500
 
@@ -211,18 +212,17 @@ def create_app() -> Flask:
             
             # Check if user already exists
             users_ref = db.collection('Users')
-            existing_users = users_ref.where('email', '==', email.lower().strip()).stream()
-            
-            if list(existing_users):
+            if user_lookup_service.find_user_by_email(email):
                 return jsonify({"ok": False, "error": "Email already exists"}), 409
             
             # Hash the password
-            hashed_password = hash_password(password)
+            hashed_password = password_service.hash(password)
             
             # Create user document
             user_data = {
                 'division_name': division_name.strip(),
                 'email': email.lower().strip(),
+                'email_lower': normalize_email(email),
                 'name': name.strip(),
                 'password': hashed_password,  # Already a hex string
                 'role_name': role.capitalize(),
@@ -232,7 +232,9 @@ def create_app() -> Flask:
             # Add user to Firestore
             doc_ref = users_ref.add(user_data)
             user_id = doc_ref[1].id  # Get the document ID
-            
+            user_lookup_service.remember(email, user_id)
+            user_directory.invalidate()
+
             return jsonify({
                 "ok": True,
                 "message": "Registration successful",
@@ -246,6 +248,8 @@ def create_app() -> Flask:
                 }
             }), 201
             
+        except PasswordPoolBusyError as e:
+            return password_pool_busy(e)
         except Exception as e:
             return jsonify({"ok": False, "error": f"Database error: {str(e)}"}), 500
 
@@ -269,14 +273,8 @@ def create_app() -> Flask:
             users_ref = db.collection('Users')
 
             # Find user by email
-            users = users_ref.where('email', '==', email.lower().strip()).stream()
-            user_doc = None
-            user_id = None
-
-            for doc in users:
-                user_doc = doc
-                user_id = doc.id
-                break
+            user_doc = user_lookup_service.find_user_by_email(email)
+            user_id = user_doc.id if user_doc else None
 
             if not user_doc:
                 return jsonify({
@@ -285,7 +283,7 @@ def create_app() -> Flask:
                 }), 404
             
             # Hash the new password
-            hashed_password = hash_password(new_password)
+            hashed_password = password_service.hash(new_password)
 
             # Update user's password
             users_ref.document(user_id).update({
@@ -297,8 +295,10 @@ def create_app() -> Flask:
                 "message": "Password reset successful"
             }), 200
             
+        except PasswordPoolBusyError as e:
+            return password_pool_busy(e)
         except Exception as e:
-            print(f"Reset password error: {str(e)}")
+            logger.error("Reset password error: %s", e)
             return jsonify({"ok": False, "error": "Failed to reset password"}), 500
         
     # =============== NOTIFICATION ROUTES ===============
@@ -322,7 +322,7 @@ def create_app() -> Flask:
             }), 200
             
         except Exception as e:
-            print(f"Error getting notifications: {str(e)}")
+            logger.error("Error getting notifications: %s", e)
             return jsonify({"ok": False, "error": str(e)}), 500
     
     @app.route("/api/notifications/<notification_id>/read", methods=["PUT"])
@@ -337,7 +337,7 @@ def create_app() -> Flask:
                 return jsonify({"ok": False, "error": "Notification not found"}), 404
                 
         except Exception as e:
-            print(f"Error marking notification as read: {str(e)}")
+            logger.error("Error marking notification as read: %s", e)
             return jsonify({"ok": False, "error": str(e)}), 500
     
     @app.route("/api/notifications/<user_id>/mark-all-read", methods=["PUT"])
@@ -352,7 +352,7 @@ def create_app() -> Flask:
             }), 200
             
         except Exception as e:
-            print(f"Error marking all notifications as read: {str(e)}")
+            logger.error("Error marking all notifications as read: %s", e)
             return jsonify({"ok": False, "error": str(e)}), 500
     
     @app.route("/api/notifications/<notification_id>", methods=["DELETE"])
@@ -367,7 +367,7 @@ def create_app() -> Flask:
                 return jsonify({"ok": False, "error": "Notification not found"}), 404
                 
         except Exception as e:
-            print(f"Error deleting notification: {str(e)}")
+            logger.error("Error deleting notification: %s", e)
             return jsonify({"ok": False, "error": str(e)}), 500
     
     @app.route("/api/notifications/check-deadlines", methods=["POST"])
@@ -382,7 +382,7 @@ def create_app() -> Flask:
             }), 200
             
         except Exception as e:
-            print(f"Error checking deadlines: {str(e)}")
+            logger.error("Error checking deadlines: %s", e)
             return jsonify({"ok": False, "error": str(e)}), 500
 
     return app
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+One-off data backfills for fields that newer code relies on
+Safe to re-run: documents that are already up to date are skipped
+"""
+
+import sys
+import os
+import argparse
+
+# Add current directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Initialize Firebase first
+from firebase_utils import get_firebase_app
+get_firebase_app()  # Initialize Firebase
+
+from services.user_lookup_service import user_lookup_service
+from services.task_field_service import task_field_service
+from services.user_task_index import user_task_index
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill derived Firestore fields')
+    parser.add_argument('--email-lower', action='store_true', help='Write normalized email_lower on Users (otherwise the first login lookup that misses runs it)')
+    parser.add_argument('--is-deleted', action='store_true', help='Write is_deleted=False on Tasks missing it (needed by server-side task filters)')
+    parser.add_argument('--task-status', action='store_true', help='Write canonical task_status on Tasks (needed by status filters)')
+    parser.add_argument('--user-task-index', action='store_true', help='Build UserTasks/{uid}/items from Tasks (needed by USER_TASK_INDEX_READS)')
+    parser.add_argument('--batch-size', type=int, default=400, help='Writes per Firestore batch (max 500)')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
+
+    args = parser.parse_args()
+    batch_size = max(1, min(args.batch_size, 500))
+
+    if not (args.email_lower or args.is_deleted or args.task_status or args.user_task_index):
+        parser.print_help()
+        sys.exit(1)
+
+    try:
+        if args.email_lower:
+            print("🔄 Backfilling Users.email_lower...")
+            count = user_lookup_service.backfill_email_lower(batch_size=batch_size)
+            print(f"📊 Users updated: {count}")
+
+        if args.is_deleted or args.task_status:
+            print("🔄 Backfilling Tasks.is_deleted / task_status...")
+            count = task_field_service.backfill_task_fields(
+                is_deleted=args.is_deleted, task_status=args.task_status, batch_size=batch_size
+            )
+            print(f"📊 Tasks updated: {count}")
+
+        if args.user_task_index:
+            print("🔄 Building UserTasks index...")
+            count = user_task_index.rebuild(batch_size=batch_size)
+            print(f"📊 Index entries written: {count}")
+
+    except Exception as e:
+        print(f"❌ Backfill failed: {e}")
+        if args.verbose:
+            import traceback
+            traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Negotiated response compression (brotli / gzip).
+
+init_app(app) compresses responses whose type is in COMPRESS_MIMETYPES (JSON,
+CSV/text and the PDF/XLSX exports) and whose body is at least
+COMPRESS_MIN_SIZE bytes, using the best encoding the client accepts. Brotli
+is used only when the optional `brotli` package is installed.
+
+Configuration (app.config, defaults from the environment):
+    COMPRESS_RESPONSES   1 = on (default), 0 = off (e.g. when a proxy compresses)
+    COMPRESS_MIN_SIZE    smallest body worth compressing, in bytes (default 1024)
+    COMPRESS_LEVEL       gzip level 1-9 (default 6)
+    COMPRESS_BR_LEVEL    brotli quality 0-11 (default 4)
+
+Streamed responses (?stream=) are sent as-is. A strong ETag becomes weak on a
+compressed response, since the bytes differ from the uncompressed variant.
+"""
+import gzip
+import os
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+DEFAULT_MIMETYPES = frozenset({
+    'application/json',
+    'application/x-ndjson',
+    'text/csv',
+    'text/plain',
+    'text/html',
+    'application/pdf',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+})
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def available_encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def compress(data, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(data, quality=config['COMPRESS_BR_LEVEL'])
+    return gzip.compress(data, compresslevel=config['COMPRESS_LEVEL'], mtime=0)
+
+
+def init_app(app):
+    """Register the compression after_request hook"""
+    app.config.setdefault('COMPRESS_RESPONSES', os.getenv('COMPRESS_RESPONSES', '1') != '0')
+    app.config.setdefault('COMPRESS_MIN_SIZE', _env_int('COMPRESS_MIN_SIZE', 1024))
+    app.config.setdefault('COMPRESS_LEVEL', _env_int('COMPRESS_LEVEL', 6))
+    app.config.setdefault('COMPRESS_BR_LEVEL', _env_int('COMPRESS_BR_LEVEL', 4))
+    app.config.setdefault('COMPRESS_MIMETYPES', DEFAULT_MIMETYPES)
+
+    @app.after_request
+    def compress_response(response):
+        config = app.config
+        if not config['COMPRESS_RESPONSES'] or response.mimetype not in config['COMPRESS_MIMETYPES']:
+            return response
+        response.vary.add('Accept-Encoding')
+
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return response
+        if 'Content-Encoding' in response.headers:
+            return response
+        # Generator-backed streams stay streamed; send_file bodies (exports) are in memory
+        if response.is_streamed and not response.direct_passthrough:
+            return response
+
+        encoding = request.accept_encodings.best_match(available_encodings())
+        if encoding is None:
+            return response
+        if response.content_length is not None and response.content_length < config['COMPRESS_MIN_SIZE']:
+            return response
+
+        response.direct_passthrough = False
+        data = response.get_data()
+        if len(data) < config['COMPRESS_MIN_SIZE']:
+            return response
+
+        compressed = compress(data, encoding, config)
+        if len(compressed) >= len(data):
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -37,3 +37,114 @@ def get_firestore_client() -> firestore.Client:
     return firestore.client()
 
 
+
+# ====== REQUEST-SCOPED DOCUMENT CACHE ======
+# Identity map stored on flask.g: each document is read at most once per
+# request. Writes made through the helpers below drop the cached snapshot so
+# a later read in the same request sees the new data. Outside a request
+# (scripts, scheduler) every call goes straight to Firestore.
+
+def _request_doc_cache() -> Optional[dict]:
+    try:
+        from flask import g, has_app_context
+    except ImportError:
+        return None
+    if not has_app_context():
+        return None
+    cache = g.get('_firestore_doc_cache')
+    if cache is None:
+        cache = {}
+        g._firestore_doc_cache = cache
+    return cache
+
+
+def get_document(doc_ref):
+    """Return doc_ref's snapshot, fetching it at most once per request."""
+    cache = _request_doc_cache()
+    if cache is None:
+        return doc_ref.get()
+    snapshot = cache.get(doc_ref.path)
+    if snapshot is None:
+        snapshot = doc_ref.get()
+        cache[doc_ref.path] = snapshot
+    return snapshot
+
+
+def cache_document(snapshot) -> None:
+    """Seed the request cache with a snapshot obtained elsewhere (e.g. a query)."""
+    cache = _request_doc_cache()
+    if cache is not None and snapshot is not None:
+        cache[snapshot.reference.path] = snapshot
+
+
+def invalidate_document(doc_ref) -> None:
+    cache = _request_doc_cache()
+    if cache is not None:
+        cache.pop(doc_ref.path, None)
+
+
+def update_document(doc_ref, data):
+    result = doc_ref.update(data)
+    invalidate_document(doc_ref)
+    return result
+
+
+def set_document(doc_ref, data, merge: bool = False):
+    result = doc_ref.set(data, merge=merge)
+    invalidate_document(doc_ref)
+    return result
+
+
+def delete_document(doc_ref):
+    result = doc_ref.delete()
+    invalidate_document(doc_ref)
+    return result
+
+
+# ====== BATCHED READS ======
+
+def get_documents(db, collection: str, ids, chunk_size: int = 100) -> dict:
+    """
+    Fetch many documents from one collection with db.get_all() instead of
+    one document(id).get() round trip per ID.
+
+    Returns {doc_id: data} for the documents that exist. Blank and duplicate
+    IDs are ignored; large lists are split into chunks of chunk_size.
+    Snapshots already cached for this request are reused and new ones are
+    added to the cache.
+    """
+    unique_ids = []
+    seen = set()
+    for doc_id in ids or []:
+        if doc_id is None:
+            continue
+        doc_id = str(doc_id).strip()
+        if not doc_id or doc_id in seen:
+            continue
+        seen.add(doc_id)
+        unique_ids.append(doc_id)
+
+    results = {}
+    if not unique_ids:
+        return results
+
+    collection_ref = db.collection(collection)
+    cache = _request_doc_cache()
+    to_fetch = []
+    for doc_id in unique_ids:
+        doc_ref = collection_ref.document(doc_id)
+        snapshot = cache.get(doc_ref.path) if cache is not None else None
+        if snapshot is None:
+            to_fetch.append(doc_ref)
+        elif snapshot.exists:
+            results[doc_id] = snapshot.to_dict() or {}
+
+    chunk_size = max(1, chunk_size)
+    for start in range(0, len(to_fetch), chunk_size):
+        for snapshot in db.get_all(to_fetch[start:start + chunk_size]):
+            if cache is not None:
+                cache[snapshot.reference.path] = snapshot
+            if snapshot.exists:
+                results[snapshot.id] = snapshot.to_dict() or {}
+
+    return results
@@ -0,0 +1,289 @@
+"""
+Firestore read/write/RPC accounting per request.
+
+install() wraps the Firestore GAPIC client methods once per process so every
+document read, document write and RPC made while handling a request is
+counted on flask.g. init_app() then:
+
+  - reports the counts in an `X-Firestore-Usage` response header
+  - logs a warning when a route exceeds its read/write budget
+
+Streamed responses (e.g. `?stream=ndjson` exports) read Firestore while the
+body is sent, after the headers: they get no header, and their budget is
+checked when the response is closed.
+
+Budgets default to FIRESTORE_READ_BUDGET / FIRESTORE_WRITE_BUDGET and can be
+set per route with the @firestore_budget decorator:
+
+    @tasks_bp.route('/api/tasks/<task_id>', methods=['GET'])
+    @firestore_budget(reads=5)
+    def get_task(task_id): ...
+
+Outside a request (scripts, scheduler, listeners) nothing is counted.
+"""
+import functools
+import inspect
+import os
+import threading
+
+from logging_utils import get_logger
+
+logger = get_logger('firestore')
+
+USAGE_HEADER = 'X-Firestore-Usage'
+
+_install_lock = threading.Lock()
+_installed = False
+
+
+# ====== REQUEST COUNTERS ======
+class FirestoreUsage:
+    __slots__ = ('reads', 'writes', 'rpcs', 'budget_exceeded')
+
+    def __init__(self):
+        self.reads = 0
+        self.writes = 0
+        self.rpcs = 0
+        self.budget_exceeded = False
+
+    def as_dict(self):
+        return {'reads': self.reads, 'writes': self.writes, 'rpcs': self.rpcs}
+
+    def header_value(self):
+        return f"reads={self.reads}; writes={self.writes}; rpcs={self.rpcs}"
+
+
+def get_request_usage(create=False):
+    """Return the FirestoreUsage for the current request (None outside a request)"""
+    try:
+        from flask import g, has_app_context
+    except ImportError:
+        return None
+    if not has_app_context():
+        return None
+    usage = g.get('_firestore_usage')
+    if usage is None and create:
+        usage = FirestoreUsage()
+        g._firestore_usage = usage
+    return usage
+
+
+def _count(reads=0, writes=0, rpcs=0):
+    usage = get_request_usage(create=True)
+    if usage is not None:
+        usage.reads += reads
+        usage.writes += writes
+        usage.rpcs += rpcs
+
+
+# ====== GAPIC WRAPPERS ======
+def _request_field(args, kwargs, name):
+    request = kwargs.get('request', args[0] if args else None)
+    if request is None:
+        return kwargs.get(name)
+    if isinstance(request, dict):
+        return request.get(name)
+    return getattr(request, name, None)
+
+
+class _CountingStream:
+    """Wrap a server-streaming response iterator and count returned documents"""
+
+    def __init__(self, stream, count_response):
+        self._stream = stream
+        self._count_response = count_response
+        self._seen = 0
+        self._done = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            response = next(self._stream)
+        except StopIteration:
+            if not self._done and self._seen == 0:
+                # An empty query result is still billed as one read
+                _count(reads=1)
+            self._done = True
+            raise
+        if self._count_response(response):
+            self._seen += 1
+            _count(reads=1)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _has_document(response):
+    try:
+        return bool(response._pb.HasField('document'))
+    except Exception:
+        return getattr(response, 'document', None) is not None
+
+
+def _wrap_get_document(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        _count(reads=1, rpcs=1)
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _wrap_batch_get_documents(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        # Every requested document is billed, found or not
+        documents = _request_field(args, kwargs, 'documents') or []
+        _count(reads=len(documents), rpcs=1)
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _wrap_run_query(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        _count(rpcs=1)
+        return _CountingStream(method(self, *args, **kwargs), _has_document)
+    return wrapper
+
+
+def _wrap_aggregation(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        _count(reads=1, rpcs=1)
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _wrap_writes(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        writes = _request_field(args, kwargs, 'writes') or []
+        _count(writes=len(writes), rpcs=1)
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _wrap_rpc(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        _count(rpcs=1)
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+_WRAPPERS = {
+    'get_document': _wrap_get_document,
+    'batch_get_documents': _wrap_batch_get_documents,
+    'run_query': _wrap_run_query,
+    'run_aggregation_query': _wrap_aggregation,
+    'commit': _wrap_writes,
+    'batch_write': _wrap_writes,
+    'list_documents': _wrap_rpc,
+    'list_collection_ids': _wrap_rpc,
+    'partition_query': _wrap_rpc,
+    'begin_transaction': _wrap_rpc,
+    'rollback': _wrap_rpc,
+}
+
+
+def instrument_class(client_class):
+    """Wrap the counted methods of a GAPIC client class (idempotent)"""
+    if getattr(client_class, '_firestore_accounting', False):
+        return client_class
+    for name, wrap in _WRAPPERS.items():
+        method = getattr(client_class, name, None)
+        if method is not None:
+            setattr(client_class, name, wrap(method))
+    client_class._firestore_accounting = True
+    return client_class
+
+
+def install():
+    """Instrument the Firestore GAPIC client once per process"""
+    global _installed
+    if _installed:
+        return
+    with _install_lock:
+        if _installed:
+            return
+        try:
+            from google.cloud.firestore_v1.services.firestore.client import FirestoreClient
+            instrument_class(FirestoreClient)
+        except Exception as e:
+            logger.warning("⚠️ Firestore accounting unavailable: %s", e)
+        _installed = True
+
+
+def streams_body(response):
+    """True when the body is produced by a generator while it is sent (stream_with_context)"""
+    return inspect.isgenerator(response.response)
+
+
+# ====== BUDGETS ======
+def firestore_budget(reads=None, writes=None):
+    """Set a per-route Firestore read/write budget on a view function"""
+    def decorator(view):
+        view._firestore_budget = (reads, writes)
+        return view
+    return decorator
+
+
+def _default_budget():
+    return (
+        int(os.getenv('FIRESTORE_READ_BUDGET', 200)),
+        int(os.getenv('FIRESTORE_WRITE_BUDGET', 100)),
+    )
+
+
+def check_budget(view, usage):
+    """Return the list of exceeded budgets, e.g. ['reads 250 > 200']"""
+    default_reads, default_writes = _default_budget()
+    reads_budget, writes_budget = getattr(view, '_firestore_budget', (None, None))
+    reads_budget = default_reads if reads_budget is None else reads_budget
+    writes_budget = default_writes if writes_budget is None else writes_budget
+
+    exceeded = []
+    if reads_budget and usage.reads > reads_budget:
+        exceeded.append(f"reads {usage.reads} > {reads_budget}")
+    if writes_budget and usage.writes > writes_budget:
+        exceeded.append(f"writes {usage.writes} > {writes_budget}")
+    return exceeded
+
+
+def init_app(app):
+    """Report Firestore usage on every response and log budget overruns"""
+    install()
+
+    @app.after_request
+    def report_firestore_usage(response):
+        from flask import request
+        usage = get_request_usage(create=True)
+        if usage is None:
+            return response
+
+        view = app.view_functions.get(request.endpoint)
+        method = request.method
+        route = request.url_rule.rule if request.url_rule is not None else request.path
+
+        def enforce_budget():
+            exceeded = check_budget(view, usage)
+            if exceeded:
+                logger.warning(
+                    "⚠️ Firestore budget exceeded on %s %s: %s", method, route, ', '.join(exceeded),
+                    extra={'route': route, 'method': method, **usage.as_dict()},
+                )
+                usage.budget_exceeded = True
+
+        if streams_body(response):
+            # The body has not been generated yet: count its reads once it is sent
+            response.call_on_close(enforce_budget)
+            return response
+
+        response.headers[USAGE_HEADER] = usage.header_value()
+        enforce_budget()
+        return response
+
+    return app
@@ -0,0 +1,36 @@
+"""
+Gunicorn configuration for the backend API.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Configuration (environment):
+    PORT                  port to bind (default 8000)
+    GUNICORN_WORKERS      worker processes (default 2 x CPU + 1)
+    GUNICORN_THREADS      threads per worker (default 4, uses the gthread worker when > 1)
+    GUNICORN_TIMEOUT      worker timeout in seconds (default 60)
+    GUNICORN_PRELOAD      1 = import the app once in the master before forking (default)
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+
+# Import the app (blueprints, config) once in the master; workers inherit it
+# copy-on-write. Network clients are only opened after fork (see post_fork).
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') != '0'
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    """Open per-worker connections and prime caches before serving traffic"""
+    from wsgi import warm_up
+    warm_up()
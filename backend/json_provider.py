@@ -0,0 +1,101 @@
+"""
+Flask JSON provider for API responses.
+
+Uses orjson when it is installed (several times faster than the stdlib
+encoder on large task/project lists) and falls back to Flask's default
+provider otherwise. Either way, datetimes are encoded as ISO 8601 strings:
+Firestore timestamps (DatetimeWithNanoseconds), datetime and date values can
+be passed to jsonify() as-is, without converting each field first.
+
+    from json_provider import init_app
+    init_app(app)
+"""
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is missing
+    orjson = None
+
+
+def _default(obj):
+    """Encode values neither encoder handles natively"""
+    # Firestore's DatetimeWithNanoseconds is a datetime subclass; orjson only
+    # encodes exact datetime instances natively
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    # Firestore DocumentReference / GeoPoint
+    if hasattr(obj, 'path') and hasattr(obj, 'parent'):
+        return obj.path
+    if hasattr(obj, 'latitude') and hasattr(obj, 'longitude'):
+        return {'latitude': obj.latitude, 'longitude': obj.longitude}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's default provider with ISO 8601 datetimes instead of HTTP dates"""
+
+    default = staticmethod(_default)
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """orjson-backed provider; unusual json.dumps kwargs fall back to the stdlib"""
+
+    def _options(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _encode(self, obj, **kwargs):
+        indent = kwargs.pop('indent', None)
+        kwargs.pop('separators', None)
+        kwargs.pop('sort_keys', None)
+        kwargs.pop('default', None)
+        if kwargs or indent not in (None, 2):
+            return None
+        return orjson.dumps(obj, default=_default, option=self._options(indent=bool(indent)))
+
+    def dumps(self, obj, **kwargs):
+        encoded = self._encode(obj, **kwargs)
+        if encoded is None:
+            return super().dumps(obj, **kwargs)
+        return encoded.decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=_default, option=self._options(indent=pretty))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+def get_provider_class():
+    return OrjsonProvider if orjson is not None else StdlibJSONProvider
+
+
+def init_app(app):
+    """Install the fastest available JSON provider on the app"""
+    provider_class = get_provider_class()
+    app.json_provider_class = provider_class
+    app.json = provider_class(app)
+    return app.json
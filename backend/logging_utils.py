@@ -0,0 +1,148 @@
+"""
+Structured, leveled, sampled logging for the backend.
+
+Records are handed to a QueueHandler and written by a background
+QueueListener thread, so request threads never block on stdout.
+
+    from logging_utils import get_logger
+    logger = get_logger(__name__)
+    logger.info("Task created", extra={'task_id': task_id})
+
+Configuration (environment):
+    LOG_LEVEL        DEBUG / INFO / WARNING / ERROR (default INFO)
+    LOG_FORMAT       json (default) or text
+    LOG_SAMPLE_RATE  fraction of DEBUG/INFO records kept, 0.0-1.0 (default 1.0);
+                     WARNING and above are always kept
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+
+ROOT_LOGGER = 'backend'
+
+# Attributes every LogRecord has; anything else came from `extra=`
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_lock = threading.Lock()
+_queue = None
+_listener = None
+_output_handler = None
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of records below WARNING; never drop warnings or errors"""
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = max(0.0, min(1.0, float(rate)))
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra=` fields are included as top-level keys"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _build_formatter(fmt):
+    if fmt == 'text':
+        return logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
+    return JsonFormatter()
+
+
+def _start_listener():
+    """(Re)start the background writer; called at configure time and in forked children"""
+    global _listener
+    _listener = logging.handlers.QueueListener(_queue, _output_handler, respect_handler_level=False)
+    _listener.start()
+
+
+def _stop_listener():
+    if _listener is not None:
+        try:
+            _listener.stop()
+        except Exception:
+            pass
+
+
+def configure_logging(level=None, fmt=None, sample_rate=None, stream=None):
+    """
+    Attach the queue handler to the 'backend' logger (idempotent).
+    Arguments override the LOG_* environment variables.
+    """
+    global _queue, _output_handler
+
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    fmt = (fmt or os.getenv('LOG_FORMAT', 'json')).lower()
+    if sample_rate is None:
+        sample_rate = float(os.getenv('LOG_SAMPLE_RATE', 1.0))
+
+    with _lock:
+        logger = logging.getLogger(ROOT_LOGGER)
+        logger.setLevel(level)
+        logger.propagate = False
+
+        if _queue is not None:
+            # Already configured: only adjust level, format, sampling and stream
+            _output_handler.setFormatter(_build_formatter(fmt))
+            if stream is not None:
+                _output_handler.setStream(stream)
+            for handler in logger.handlers:
+                for log_filter in handler.filters:
+                    if isinstance(log_filter, SamplingFilter):
+                        log_filter.rate = max(0.0, min(1.0, float(sample_rate)))
+            return logger
+
+        _queue = queue.SimpleQueue()
+        _output_handler = logging.StreamHandler(stream or sys.stdout)
+        _output_handler.setFormatter(_build_formatter(fmt))
+
+        queue_handler = logging.handlers.QueueHandler(_queue)
+        queue_handler.addFilter(SamplingFilter(sample_rate))
+        logger.addHandler(queue_handler)
+
+        _start_listener()
+        atexit.register(_stop_listener)
+        if hasattr(os, 'register_at_fork'):
+            # The listener thread does not survive fork (gunicorn preload)
+            os.register_at_fork(after_in_child=_start_listener)
+        return logger
+
+
+def flush_logging():
+    """Drain queued records (used by tests and at shutdown)"""
+    with _lock:
+        if _listener is None:
+            return
+        _stop_listener()
+        _start_listener()
+
+
+def get_logger(name):
+    """Return a child of the 'backend' logger, e.g. get_logger('routes.task')"""
+    if name == ROOT_LOGGER or name.startswith(ROOT_LOGGER + '.'):
+        return logging.getLogger(name)
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
@@ -0,0 +1,276 @@
+"""
+In-process request metrics: per-blueprint and per-route request counts,
+latency histograms, error rates and Firestore usage, exposed on GET /metrics.
+
+    GET /metrics               Prometheus text format
+    GET /metrics?format=json   JSON summary with estimated p50/p95/p99, hottest routes first
+
+Metrics are per process: under gunicorn each worker reports its own counters
+(the JSON summary includes the worker pid).
+
+Other components publish gauges with add_gauges(name, collect); collect()
+returns a (possibly nested) dict of numbers, e.g. the password pool's
+queue depth and hash latency as password_pool_* gauges.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, jsonify, request, Response
+
+from logging_utils import get_logger
+from firestore_accounting import get_request_usage, streams_body
+
+logger = get_logger('http')
+
+# Histogram upper bounds in milliseconds (the last bucket is +Inf)
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class RouteStats:
+    __slots__ = ('count', 'errors', 'client_errors', 'sum_ms', 'max_ms', 'buckets',
+                 'reads', 'writes', 'rpcs', 'over_budget')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0          # 5xx
+        self.client_errors = 0   # 4xx
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        # Firestore usage (see firestore_accounting.py)
+        self.reads = 0
+        self.writes = 0
+        self.rpcs = 0
+        self.over_budget = 0
+
+    def observe(self, status_code, duration_ms, firestore=None):
+        self.count += 1
+        if status_code >= 500:
+            self.errors += 1
+        elif status_code >= 400:
+            self.client_errors += 1
+        self.sum_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+        if firestore is not None:
+            self.reads += firestore.reads
+            self.writes += firestore.writes
+            self.rpcs += firestore.rpcs
+            self.over_budget += 1 if firestore.budget_exceeded else 0
+
+    def merge(self, other):
+        self.count += other.count
+        self.errors += other.errors
+        self.client_errors += other.client_errors
+        self.sum_ms += other.sum_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.reads += other.reads
+        self.writes += other.writes
+        self.rpcs += other.rpcs
+        self.over_budget += other.over_budget
+
+    def percentile(self, q):
+        """Estimate a latency percentile (ms) from the histogram"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target:
+                if index < len(LATENCY_BUCKETS_MS):
+                    return float(LATENCY_BUCKETS_MS[index])
+                return round(self.max_ms, 1)
+        return round(self.max_ms, 1)
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'client_errors': self.client_errors,
+            'error_rate': round(self.errors / self.count, 4) if self.count else 0.0,
+            'avg_ms': round(self.sum_ms / self.count, 1) if self.count else 0.0,
+            'p50_ms': self.percentile(0.50),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': round(self.max_ms, 1),
+            'firestore_reads': self.reads,
+            'firestore_writes': self.writes,
+            'firestore_rpcs': self.rpcs,
+            'avg_reads': round(self.reads / self.count, 1) if self.count else 0.0,
+            'over_budget': self.over_budget,
+        }
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}   # {(blueprint, method, rule): RouteStats}
+        self._started_at = time.time()
+        self._gauges = {}   # {name: callable returning a dict of numbers}
+
+    def add_gauges(self, name, collect):
+        """Publish collect() under `name` in the JSON summary and as Prometheus gauges"""
+        with self._lock:
+            self._gauges[name] = collect
+
+    def _collect_gauges(self):
+        with self._lock:
+            sources = list(self._gauges.items())
+        collected = {}
+        for name, collect in sources:
+            try:
+                collected[name] = collect()
+            except Exception as e:
+                logger.warning("⚠️ Failed to collect %s metrics: %s", name, e)
+        return collected
+
+    def record(self, blueprint, method, rule, status_code, duration_ms, firestore=None):
+        key = (blueprint or 'app', method, rule)
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = RouteStats()
+            stats.observe(status_code, duration_ms, firestore)
+
+    def reset(self):
+        with self._lock:
+            self._routes = {}
+            self._started_at = time.time()
+
+    def _copy(self):
+        with self._lock:
+            copied = {}
+            for key, stats in self._routes.items():
+                clone = RouteStats()
+                clone.merge(stats)
+                copied[key] = clone
+            return copied
+
+    # ===================== EXPORT =====================
+    def snapshot(self):
+        """JSON-friendly summary, routes sorted by total time spent (hottest first)"""
+        routes = self._copy()
+        blueprints = {}
+        for (blueprint, _, _), stats in routes.items():
+            blueprints.setdefault(blueprint, RouteStats()).merge(stats)
+
+        ordered = sorted(routes.items(), key=lambda item: item[1].sum_ms, reverse=True)
+        return {
+            'pid': os.getpid(),
+            'uptime_seconds': round(time.time() - self._started_at, 1),
+            'blueprints': {name: stats.summary() for name, stats in sorted(blueprints.items())},
+            'routes': [
+                dict(blueprint=blueprint, method=method, route=rule, **stats.summary())
+                for (blueprint, method, rule), stats in ordered
+            ],
+            **self._collect_gauges(),
+        }
+
+    def render_prometheus(self):
+        """Prometheus text exposition format"""
+        lines = [
+            '# HELP http_requests_total Requests handled, by route and status class',
+            '# TYPE http_requests_total counter',
+        ]
+        routes = sorted(self._copy().items())
+        for (blueprint, method, rule), stats in routes:
+            labels = f'blueprint="{blueprint}",method="{method}",route="{rule}"'
+            ok = stats.count - stats.errors - stats.client_errors
+            lines.append(f'http_requests_total{{{labels},status="2xx"}} {ok}')
+            lines.append(f'http_requests_total{{{labels},status="4xx"}} {stats.client_errors}')
+            lines.append(f'http_requests_total{{{labels},status="5xx"}} {stats.errors}')
+
+        lines += [
+            '# HELP http_request_duration_ms Request latency in milliseconds',
+            '# TYPE http_request_duration_ms histogram',
+        ]
+        for (blueprint, method, rule), stats in routes:
+            labels = f'blueprint="{blueprint}",method="{method}",route="{rule}"'
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS_MS + ('+Inf',), stats.buckets):
+                cumulative += bucket_count
+                lines.append(f'http_request_duration_ms_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_ms_sum{{{labels}}} {stats.sum_ms:.3f}')
+            lines.append(f'http_request_duration_ms_count{{{labels}}} {stats.count}')
+
+        for name, attr, help_text in (
+            ('firestore_document_reads_total', 'reads', 'Firestore documents read'),
+            ('firestore_document_writes_total', 'writes', 'Firestore documents written'),
+            ('firestore_rpcs_total', 'rpcs', 'Firestore RPCs issued'),
+            ('firestore_budget_exceeded_total', 'over_budget', 'Requests over their Firestore budget'),
+        ):
+            lines += [f'# HELP {name} {help_text}, by route', f'# TYPE {name} counter']
+            for (blueprint, method, rule), stats in routes:
+                labels = f'blueprint="{blueprint}",method="{method}",route="{rule}"'
+                lines.append(f'{name}{{{labels}}} {getattr(stats, attr)}')
+
+        for name, values in sorted(self._collect_gauges().items()):
+            for key, value in _flatten(values, name):
+                lines += [f'# TYPE {key} gauge', f'{key} {value}']
+        return '\n'.join(lines) + '\n'
+
+
+def _flatten(values, prefix):
+    """(name, value) pairs for the numeric leaves of a nested dict"""
+    for key, value in sorted(values.items()):
+        name = f'{prefix}_{key}'
+        if isinstance(value, dict):
+            yield from _flatten(value, name)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+
+# Create singleton instance
+request_metrics = RequestMetrics()
+
+
+def init_app(app, metrics=None):
+    """Time every request, log it, and register GET /metrics"""
+    metrics = metrics or request_metrics
+
+    @app.before_request
+    def start_request_timer():
+        g._request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('_request_started', None)
+        if started is None:
+            return response
+        blueprint, method, path = request.blueprint, request.method, request.path
+        rule = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+        firestore = get_request_usage()
+
+        def record():
+            duration_ms = (time.perf_counter() - started) * 1000
+            metrics.record(blueprint, method, rule, response.status_code, duration_ms, firestore)
+            logger.info(
+                "%s %s %s %.1fms", method, path, response.status_code, duration_ms,
+                extra={
+                    'method': method,
+                    'path': path,
+                    'route': rule,
+                    'status': response.status_code,
+                    'duration_ms': round(duration_ms, 1),
+                    **(firestore.as_dict() if firestore is not None else {}),
+                },
+            )
+
+        if streams_body(response):
+            # Time the whole body and count the Firestore reads made while sending it
+            response.call_on_close(record)
+        else:
+            record()
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics_endpoint():
+        if request.args.get('format') == 'json':
+            return jsonify(metrics.snapshot()), 200
+        return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+    return metrics
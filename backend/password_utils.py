@@ -0,0 +1,34 @@
+"""
+Password hashing utilities.
+Pure PBKDF2 functions kept free of Flask/Firestore imports so they can run
+inside the password worker processes (see services/password_service.py).
+"""
+import os
+import hashlib
+
+PBKDF2_ITERATIONS = 100000
+SALT_BYTES = 32
+
+
+def hash_password(password):
+    """Hash password using SHA-256 with salt"""
+    salt = os.urandom(SALT_BYTES)  # Generate random salt
+    password_hash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, PBKDF2_ITERATIONS)
+    return (salt + password_hash).hex()  # Convert to hex string
+
+
+def verify_password(stored_password, provided_password):
+    """Verify a password against its hash"""
+    try:
+        # Convert hex string back to bytes
+        stored_password_bytes = bytes.fromhex(stored_password)
+        salt = stored_password_bytes[:SALT_BYTES]  # First 32 bytes are salt
+        stored_hash = stored_password_bytes[SALT_BYTES:]  # Rest is hash
+
+        # Hash the provided password with the same salt
+        provided_hash = hashlib.pbkdf2_hmac('sha256', provided_password.encode('utf-8'), salt, PBKDF2_ITERATIONS)
+
+        # Compare hashes
+        return stored_hash == provided_hash
+    except Exception:
+        return False
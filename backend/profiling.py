@@ -0,0 +1,187 @@
+"""
+Opt-in per-request profiler.
+
+A request is profiled with cProfile when:
+  - PROFILE_REQUESTS=1 (every request; only those slower than PROFILE_SLOW_MS are kept), or
+  - its endpoint is listed in PROFILE_ENDPOINTS (always kept), or
+  - it carries `X-Profile: 1` and `X-Profile-Token: <PROFILE_ADMIN_TOKEN>` (always kept).
+
+Kept profiles are written as pstats files to PROFILE_DIR (newest PROFILE_KEEP
+are retained) and can be fetched with the admin token:
+
+    GET /api/admin/profiles                  list recent profiles
+    GET /api/admin/profiles/<name>           download the .pstats file
+    GET /api/admin/profiles/<name>?format=text   top functions by cumulative time
+
+Open a downloaded file with `python -m pstats <file>` or snakeviz.
+"""
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import re
+import time
+from datetime import datetime
+
+from flask import g, jsonify, request, send_from_directory
+
+from logging_utils import get_logger
+
+logger = get_logger('profiling')
+
+PROFILE_HEADER = 'X-Profile'
+TOKEN_HEADER = 'X-Profile-Token'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+_SAFE_NAME = re.compile(r'[^A-Za-z0-9_.-]+')
+
+
+class ProfilerConfig:
+    def __init__(self, enabled=None, slow_ms=None, endpoints=None, admin_token=None,
+                 directory=None, keep=None):
+        self.enabled = enabled if enabled is not None else os.getenv('PROFILE_REQUESTS', '0') == '1'
+        self.slow_ms = float(slow_ms if slow_ms is not None else os.getenv('PROFILE_SLOW_MS', 500))
+        if endpoints is None:
+            endpoints = [e.strip() for e in os.getenv('PROFILE_ENDPOINTS', '').split(',') if e.strip()]
+        self.endpoints = set(endpoints)
+        self.admin_token = admin_token if admin_token is not None else os.getenv('PROFILE_ADMIN_TOKEN', '')
+        self.directory = directory or os.getenv(
+            'PROFILE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+        )
+        self.keep = int(keep if keep is not None else os.getenv('PROFILE_KEEP', 50))
+
+
+def _token_ok(config, token):
+    return bool(config.admin_token) and bool(token) and hmac.compare_digest(token, config.admin_token)
+
+
+def _profile_name(started_at, duration_ms):
+    endpoint = _SAFE_NAME.sub('_', request.endpoint or 'unmatched')
+    stamp = datetime.fromtimestamp(started_at).strftime('%Y%m%d-%H%M%S-%f')
+    return f"{stamp}_{request.method}_{endpoint}_{int(duration_ms)}ms_{os.getpid()}.pstats"
+
+
+def _prune(config):
+    try:
+        files = sorted(f for f in os.listdir(config.directory) if f.endswith('.pstats'))
+    except FileNotFoundError:
+        return
+    for name in files[:-config.keep] if config.keep > 0 else []:
+        try:
+            os.remove(os.path.join(config.directory, name))
+        except OSError:
+            pass
+
+
+def list_profiles(config):
+    """Recent profiles, newest first"""
+    try:
+        names = [f for f in os.listdir(config.directory) if f.endswith('.pstats')]
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for name in sorted(names, reverse=True):
+        path = os.path.join(config.directory, name)
+        parts = name[:-len('.pstats')].split('_')
+        profiles.append({
+            'name': name,
+            'size_bytes': os.path.getsize(path),
+            'created_at': datetime.fromtimestamp(os.path.getmtime(path)).isoformat(),
+            'method': parts[1] if len(parts) > 4 else None,
+            'endpoint': '_'.join(parts[2:-2]) if len(parts) > 4 else None,
+            'duration_ms': int(parts[-2][:-2]) if len(parts) > 4 and parts[-2].endswith('ms') else None,
+        })
+    return profiles
+
+
+def render_profile(path, limit=40):
+    """Top functions by cumulative time as text"""
+    out = io.StringIO()
+    stats = pstats.Stats(path, stream=out)
+    stats.sort_stats('cumulative').print_stats(limit)
+    return out.getvalue()
+
+
+def init_app(app, config=None):
+    """Register the profiling hooks and the admin endpoints"""
+    config = config or ProfilerConfig()
+
+    @app.before_request
+    def start_profiler():
+        forced = request.headers.get(PROFILE_HEADER) == '1' and _token_ok(config, request.headers.get(TOKEN_HEADER))
+        selected = request.endpoint in config.endpoints
+        if not (config.enabled or forced or selected):
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this interpreter
+            return
+        g._profiler = (profiler, time.time(), time.perf_counter(), forced or selected)
+
+    def _stop_profiler():
+        state = g.pop('_profiler', None)
+        if state is None:
+            return None
+        profiler, started_at, started, always_keep = state
+        profiler.disable()
+        return profiler, started_at, (time.perf_counter() - started) * 1000, always_keep
+
+    @app.after_request
+    def save_profile(response):
+        stopped = _stop_profiler()
+        if stopped is None:
+            return response
+        profiler, started_at, duration_ms, always_keep = stopped
+        if not always_keep and duration_ms < config.slow_ms:
+            return response
+        try:
+            os.makedirs(config.directory, exist_ok=True)
+            name = _profile_name(started_at, duration_ms)
+            profiler.dump_stats(os.path.join(config.directory, name))
+            _prune(config)
+            response.headers[PROFILE_ID_HEADER] = name
+            logger.info("🧪 Saved profile %s", name, extra={'profile': name, 'duration_ms': round(duration_ms, 1)})
+        except Exception as e:
+            logger.warning("⚠️ Failed to save profile: %s", e)
+        return response
+
+    @app.teardown_request
+    def discard_profiler(exc):
+        # Unhandled errors skip after_request; never leave a profiler running
+        _stop_profiler()
+
+    def _require_token():
+        if not _token_ok(config, request.headers.get(TOKEN_HEADER)):
+            return jsonify({'error': 'Profiler admin token required'}), 403
+        return None
+
+    @app.route('/api/admin/profiles', methods=['GET'])
+    def get_profiles():
+        denied = _require_token()
+        if denied:
+            return denied
+        return jsonify({'profiles': list_profiles(config)}), 200
+
+    @app.route('/api/admin/profiles/<name>', methods=['GET'])
+    def get_profile(name):
+        denied = _require_token()
+        if denied:
+            return denied
+        if name != os.path.basename(name) or not name.endswith('.pstats'):
+            return jsonify({'error': 'Invalid profile name'}), 400
+        path = os.path.join(config.directory, name)
+        if not os.path.exists(path):
+            return jsonify({'error': 'Profile not found'}), 404
+        try:
+            if request.args.get('format') == 'text':
+                limit = request.args.get('limit', 40, type=int)
+                return render_profile(path, limit), 200, {'Content-Type': 'text/plain; charset=utf-8'}
+            return send_from_directory(config.directory, name, as_attachment=True)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    return config
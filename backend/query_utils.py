@@ -0,0 +1,409 @@
+"""
+Helpers for list endpoints: cursor pagination and field projection over
+Firestore queries.
+
+Pagination is opt-in per request. Without `limit`/`cursor` query parameters
+an endpoint keeps returning its legacy JSON array; with them it returns
+
+    {"items": [...], "next_cursor": "<opaque>" | null}
+
+Pages are ordered by document ID, so the cursor is simply the last document
+ID of the page (base64-encoded) and the next page starts after it with
+Firestore `start_after`. Equality filters combined with a document-ID order
+need no composite index.
+
+Projection is opt-in too: `?fields=task_name,end_date` (or a preset such as
+`?fields=summary`) maps to Firestore `select()`, so large arrays like
+status_log, status_history and attachments are neither transferred nor decoded.
+The document ID is always returned.
+
+Streaming is opt-in with `?stream=ndjson` (one JSON document per line) or
+`?stream=json` (a chunked JSON array): documents are encoded as Firestore
+yields them, so memory stays flat and the first byte arrives early.
+
+"Assigned to me OR owned by me" style lookups go through stream_any_of /
+fetch_page_any_of: one Firestore OR query where the backend accepts it,
+otherwise one query per filter run concurrently on a shared thread pool and
+merged as results arrive. FIRESTORE_OR_QUERIES=0 forces the concurrent path.
+"""
+import base64
+import binascii
+import contextvars
+import heapq
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Response, current_app, stream_with_context
+from google.api_core import exceptions as google_exceptions
+from google.cloud.firestore_v1.field_path import FieldPath
+
+try:
+    from google.cloud.firestore_v1.base_query import FieldFilter, Or
+except ImportError:  # client too old for composite (OR) filters
+    FieldFilter = Or = None
+
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+
+# Default projections for list views (what the task/project tables render)
+TASK_SUMMARY_FIELDS = (
+    'task_name', 'task_status', 'priority_level', 'start_date', 'end_date',
+    'owner', 'assigned_to', 'proj_ID', 'proj_name', 'is_deleted', 'hasSubtasks',
+)
+PROJECT_SUMMARY_FIELDS = (
+    'proj_name', 'proj_status', 'start_date', 'end_date', 'owner',
+    'division_name', 'collaborators',
+)
+TASK_FIELD_PRESETS = {'summary': TASK_SUMMARY_FIELDS}
+PROJECT_FIELD_PRESETS = {'summary': PROJECT_SUMMARY_FIELDS}
+
+_FIELD_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$')
+
+QUERY_THREADS = int(os.getenv('FIRESTORE_QUERY_THREADS', 8))
+
+
+# ====== CURSORS ======
+def encode_cursor(doc_id):
+    return base64.urlsafe_b64encode(str(doc_id).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the document ID a cursor points at; ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        doc_id = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError('Invalid cursor')
+    if not doc_id or '/' in doc_id:
+        raise ValueError('Invalid cursor')
+    return doc_id
+
+
+def get_page_args(args):
+    """
+    Read `limit` and `cursor` from request args.
+
+    Returns (limit, cursor) when the caller asked for a page, or None when
+    neither parameter is present (legacy, unpaginated response).
+    Raises ValueError for an invalid limit or cursor.
+    """
+    if 'limit' not in args and 'cursor' not in args:
+        return None
+
+    raw_limit = args.get('limit')
+    if raw_limit in (None, ''):
+        limit = DEFAULT_PAGE_SIZE
+    else:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            raise ValueError('limit must be a positive integer')
+        if limit < 1:
+            raise ValueError('limit must be a positive integer')
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    cursor = args.get('cursor') or None
+    if cursor is not None:
+        decode_cursor(cursor)
+    return limit, cursor
+
+
+def page_response(items, next_cursor):
+    return {'items': items, 'next_cursor': next_cursor}
+
+
+# ====== FIELD PROJECTION ======
+def get_fields_arg(args, name='fields', presets=None, required=()):
+    """
+    Read a comma-separated field list (or preset name) from request args.
+
+    Returns the list of fields to select, always including `required`
+    (fields the endpoint itself filters on), or None for full documents.
+    Raises ValueError for invalid field names.
+    """
+    raw = args.get(name)
+    if raw is None or raw.strip() in ('', '*'):
+        return None
+
+    fields = []
+    for token in (part.strip() for part in raw.split(',')):
+        if not token or token == 'id':
+            continue
+        if presets and token in presets:
+            fields.extend(presets[token])
+        elif _FIELD_NAME.match(token):
+            fields.append(token)
+        else:
+            raise ValueError(f'Invalid field name: {token}')
+
+    fields.extend(required)
+    return list(dict.fromkeys(fields))
+
+
+def apply_projection(query, fields):
+    """query.select(fields) when a projection was requested"""
+    if fields is None:
+        return query
+    return query.select(fields)
+
+
+# ====== FIRESTORE PAGING ======
+def stream_by_id(query, start_after=None, batch_size=100):
+    """Yield a query's documents in document-ID order, batch_size per RPC"""
+    last_id = start_after
+    while True:
+        batch_query = query.order_by(FieldPath.document_id())
+        if last_id is not None:
+            batch_query = batch_query.start_after({FieldPath.document_id(): last_id})
+        docs = list(batch_query.limit(batch_size).stream())
+        yield from docs
+        if len(docs) < batch_size:
+            return
+        last_id = docs[-1].id
+
+
+def stream_by_field(query, field, batch_size=100):
+    """
+    Yield a query's documents ordered by `field` (e.g. a range-filtered
+    date), batch_size per RPC; each batch starts after the last document
+    of the previous one, so no offset is ever re-read.
+    """
+    last_doc = None
+    while True:
+        batch_query = query.order_by(field)
+        if last_doc is not None:
+            batch_query = batch_query.start_after(last_doc)
+        docs = list(batch_query.limit(batch_size).stream())
+        yield from docs
+        if len(docs) < batch_size:
+            return
+        last_doc = docs[-1]
+
+
+def fetch_page(queries, limit, cursor=None, include=None):
+    """
+    One page of documents from one or more queries (e.g. "assigned to me"
+    and "owned by me"), merged in document-ID order without duplicates.
+
+    include(doc) can drop documents that cannot be filtered server-side;
+    pages are still filled up to `limit` when more documents exist.
+
+    Returns (docs, next_cursor); next_cursor is None on the last page.
+    """
+    if not isinstance(queries, (list, tuple)):
+        queries = [queries]
+    start_after = decode_cursor(cursor) if cursor else None
+    batch_size = limit + 1
+
+    streams = [stream_by_id(query, start_after, batch_size) for query in queries]
+    merged = heapq.merge(*streams, key=lambda doc: doc.id) if len(streams) > 1 else streams[0]
+
+    page = []
+    previous_id = None
+    for doc in merged:
+        if doc.id == previous_id:
+            continue
+        previous_id = doc.id
+        if include is not None and not include(doc):
+            continue
+        if len(page) == limit:
+            return page, encode_cursor(page[-1].id)
+        page.append(doc)
+    return page, None
+
+
+def slice_page(items_by_id, limit, cursor=None):
+    """
+    Page an in-memory {doc_id: data} mapping (e.g. the user directory) with
+    the same cursor format as fetch_page.
+
+    Returns ([(doc_id, data), ...], next_cursor)
+    """
+    start_after = decode_cursor(cursor) if cursor else None
+    ids = sorted(doc_id for doc_id in items_by_id if start_after is None or doc_id > start_after)
+    page_ids = ids[:limit]
+    next_cursor = encode_cursor(page_ids[-1]) if len(ids) > limit else None
+    return [(doc_id, items_by_id[doc_id]) for doc_id in page_ids], next_cursor
+
+
+# ====== OR QUERIES ======
+# Flipped off for the process once the backend rejects an OR query
+_or_queries = {'enabled': os.getenv('FIRESTORE_OR_QUERIES', '1') != '0' and Or is not None}
+_executor = None
+_executor_lock = threading.Lock()
+
+# Errors meaning "this backend cannot run the OR query" (not transient). A missing
+# client capability is caught at import time; TypeErrors are bugs and propagate.
+_OR_UNSUPPORTED = (google_exceptions.InvalidArgument, google_exceptions.FailedPrecondition)
+
+
+def _reset_executor():
+    global _executor
+    _executor = None
+
+
+if hasattr(os, 'register_at_fork'):
+    # Pool threads do not survive a fork (gunicorn preload)
+    os.register_at_fork(after_in_child=_reset_executor)
+
+
+def get_query_executor():
+    """Shared thread pool for running independent Firestore queries concurrently"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=QUERY_THREADS, thread_name_prefix='firestore-query')
+    return _executor
+
+
+def or_queries_enabled():
+    return _or_queries['enabled']
+
+
+def any_of_query(query, filters):
+    """query restricted to documents matching any (field, op, value) filter"""
+    return query.where(filter=Or([FieldFilter(field, op, value) for field, op, value in filters]))
+
+
+def _disable_or_queries(error):
+    if isinstance(error, _OR_UNSUPPORTED) and _or_queries['enabled']:
+        _or_queries['enabled'] = False
+        logger.warning("⚠️ Firestore OR queries unavailable, using concurrent queries: %s", error)
+    else:
+        logger.warning("⚠️ OR query failed, retrying as concurrent queries: %s", error)
+
+
+def stream_concurrently(queries):
+    """
+    Run queries concurrently on the shared pool and yield their documents as
+    they arrive, without duplicates. Latency is the slowest query, not the sum.
+    Workers run in a copy of the caller's context, so request-scoped state
+    (Firestore accounting, the document cache) still applies.
+    """
+    if len(queries) == 1:
+        yield from queries[0].stream()
+        return
+
+    results = queue.Queue()
+    done = object()
+
+    def run(query):
+        try:
+            for doc in query.stream():
+                results.put(doc)
+        except Exception as e:
+            results.put(e)
+        finally:
+            results.put(done)
+
+    executor = get_query_executor()
+    for query in queries:
+        executor.submit(contextvars.copy_context().run, run, query)
+
+    seen_ids = set()
+    remaining = len(queries)
+    while remaining:
+        item = results.get()
+        if item is done:
+            remaining -= 1
+        elif isinstance(item, Exception):
+            raise item
+        elif item.id not in seen_ids:
+            seen_ids.add(item.id)
+            yield item
+
+
+def stream_any_of(query, filters):
+    """
+    Documents of `query` matching any of the (field, op, value) filters,
+    de-duplicated: a single OR query, or concurrent per-filter queries.
+    """
+    if or_queries_enabled():
+        try:
+            stream = iter(any_of_query(query, filters).stream())
+            first = next(stream, None)
+        except TypeError:
+            raise
+        except Exception as e:
+            # Nothing yielded yet, so falling back cannot duplicate documents
+            _disable_or_queries(e)
+        else:
+            if first is not None:
+                yield first
+                yield from stream
+            return
+
+    yield from stream_concurrently([query.where(*f) for f in filters])
+
+
+def fetch_page_any_of(query, filters, limit, cursor=None, include=None):
+    """fetch_page over documents matching any of the filters (see stream_any_of)"""
+    if or_queries_enabled():
+        try:
+            return fetch_page(any_of_query(query, filters), limit, cursor, include=include)
+        except TypeError:
+            raise
+        except Exception as e:
+            _disable_or_queries(e)
+    return fetch_page([query.where(*f) for f in filters], limit, cursor, include=include)
+
+
+# ====== STREAMING RESPONSES ======
+def get_stream_format(args):
+    """'ndjson' / 'json' when ?stream= asks for a streamed response, else None"""
+    fmt = (args.get('stream') or '').strip().lower()
+    if fmt in ('', '0', 'false'):
+        return None
+    if fmt in ('1', 'true'):
+        return 'ndjson'
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"stream must be one of: {', '.join(STREAM_FORMATS)}")
+    return fmt
+
+
+def _encode_stream(items, fmt):
+    dumps = current_app.json.dumps
+    first = True
+    try:
+        if fmt == 'json':
+            yield '['
+        for item in items:
+            if fmt == 'ndjson':
+                yield dumps(item) + '\n'
+            else:
+                yield ('' if first else ',') + dumps(item)
+            first = False
+        if fmt == 'json':
+            yield ']'
+    except Exception as e:
+        # Headers are already sent: NDJSON clients get a final error line,
+        # a JSON array is left unterminated so the client sees a parse error
+        logger.exception("Error while streaming response: %s", e)
+        if fmt == 'ndjson':
+            yield dumps({'error': str(e)}) + '\n'
+
+
+def stream_json_response(items, fmt):
+    """
+    Stream an iterable of JSON-serialisable dicts as NDJSON or a JSON array.
+
+    The iterable is consumed while the response is sent (inside the request
+    context), so Firestore reads made by it happen after after_request hooks;
+    firestore_accounting and metrics count them when the response is closed.
+    """
+    response = Response(stream_with_context(_encode_stream(items, fmt)), mimetype=STREAM_FORMATS[fmt])
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
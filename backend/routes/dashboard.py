@@ -1,9 +1,10 @@
 from flask import Blueprint, jsonify, request
-from firebase_utils import get_firestore_client
+from firebase_utils import get_firestore_client, get_documents
+from services.user_directory import user_directory
 from firebase_admin import firestore
 from datetime import datetime, timedelta, date
 import calendar
-import traceback
+from logging_utils import get_logger
 
 WEEKDAY_MAP = {
     'mon': 0,
@@ -221,6 +222,7 @@ def compute_effective_due_date(task_data, current_date):
 
 
 dashboard_bp = Blueprint('dashboard', __name__)
+logger = get_logger(__name__)
 
 # =============== DEBUG ENDPOINT TO CHECK DATA ===============
 @dashboard_bp.route('/api/dashboard/debug/user/<user_id>', methods=['GET'])
@@ -304,43 +306,29 @@ def debug_user_data(user_id):
         }), 200
         
     except Exception as e:
-        print(f"Debug error: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Debug error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # =============== HELPER FUNCTION TO GET USER INFO ===============
 def get_user_info(user_id):
     """Get user information by user ID"""
     try:
-        db = get_firestore_client()
-        user_ref = db.collection('Users').document(user_id)
-        user_doc = user_ref.get()
-        
-        if not user_doc.exists:
-            return None
-        
-        return user_doc.to_dict()
+        return user_directory.get_user(user_id)
     except Exception as e:
-        print(f"Error getting user info: {str(e)}")
+        logger.error("Error getting user info: %s", e)
         return None
 
 # =============== HELPER FUNCTION TO GET DEPARTMENT STAFF ===============
 def get_department_staff(division_name, manager_role_num):
     """Get all staff in the same department with role_num >= manager's role_num (subordinates and self)"""
     try:
-        db = get_firestore_client()
-        users_ref = db.collection('Users')
-        
-        # Get ALL users in same division first
-        users_query = users_ref.where('division_name', '==', division_name)
-        users = users_query.stream()
+        # Get ALL users in same division first (from the in-memory directory)
+        users = user_directory.get_users_by_division(division_name)
         
         staff_ids = []
         staff_info = {}
         
-        for user in users:
-            user_data = user.to_dict()
-            user_id = user.id
+        for user_id, user_data in users.items():
             user_role_num = user_data.get('role_num', 999)
             
             # Convert string role_num to int if needed
@@ -356,16 +344,15 @@ def get_department_staff(division_name, manager_role_num):
                     'role_name': user_data.get('role_name', 'Unknown'),
                     'role_num': user_role_num
                 }
-                print(f"  - Included: {user_data.get('name')} (ID: {user_id}, Role: {user_data.get('role_name')}, role_num: {user_role_num})")
+                logger.debug("  - Included: %s (ID: %s, Role: %s, role_num: %s)", user_data.get('name'), user_id, user_data.get('role_name'), user_role_num)
             else:
-                print(f"  - Excluded (superior): {user_data.get('name')} (ID: {user_id}, Role: {user_data.get('role_name')}, role_num: {user_role_num})")
+                logger.debug("  - Excluded (superior): %s (ID: %s, Role: %s, role_num: %s)", user_data.get('name'), user_id, user_data.get('role_name'), user_role_num)
         
-        print(f"Found {len(staff_ids)} staff members (role_num >= {manager_role_num}) in '{division_name}' division")
+        logger.debug("Found %s staff members (role_num >= %s) in '%s' division", len(staff_ids), manager_role_num, division_name)
         return staff_ids, staff_info
         
     except Exception as e:
-        print(f"Error getting department staff: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error getting department staff: %s", e)
         return [], {}
 
 # =============== MANAGERS: COUNT TOTAL NUMBER OF TASKS OF TEAM ===============
@@ -398,7 +385,7 @@ def get_team_total_count_tasks(user_id):
         # Get all staff in the department (subordinates and self only)
         staff_ids, staff_info = get_department_staff(division_name, manager_role_num)
         
-        print(f"Manager {user_id} querying tasks for {len(staff_ids)} staff members: {staff_ids}")
+        logger.debug("Manager %s querying tasks for %s staff members: %s", user_id, len(staff_ids), staff_ids)
         
         if not staff_ids:
             return jsonify({'total_tasks': 0, 'staff_count': 0}), 200
@@ -413,10 +400,10 @@ def get_team_total_count_tasks(user_id):
             tasks_query = tasks_ref.where('assigned_to', 'array_contains', staff_id)
             tasks = tasks_query.stream()
             count = sum(1 for _ in tasks)
-            print(f"  Staff {staff_id} ({staff_info.get(staff_id, {}).get('name', 'Unknown')}): {count} tasks")
+            logger.debug("  Staff %s (%s): %s tasks", staff_id, staff_info.get(staff_id, {}).get('name', 'Unknown'), count)
             total_count += count
         
-        print(f"Total tasks found: {total_count}")
+        logger.debug("Total tasks found: %s", total_count)
         
         return jsonify({
             'total_tasks': total_count,
@@ -425,8 +412,7 @@ def get_team_total_count_tasks(user_id):
         }), 200
         
     except Exception as e:
-        print(f"Error getting total tasks: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error getting total tasks: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # =============== MANAGERS: COUNT TASKS BY STATUS ===============
@@ -484,8 +470,7 @@ def get_team_task_count_by_status(user_id):
         }), 200
         
     except Exception as e:
-        print(f"Error getting tasks by status: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error getting tasks by status: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # =============== MANAGERS: COUNT AND NAME OF TASKS BY STAFF MEMBER ===============
@@ -541,8 +526,8 @@ def get_team_task_count_by_staff(user_id):
                     'task_status': task_data.get('task_status', 'Unknown'),
                     'task_priority': task_data.get('task_priority', 'N/A'),
                     'proj_name': task_data.get('proj_name', ''),
-                    'start_date': task_data.get('start_date').isoformat() if task_data.get('start_date') else None,
-                    'end_date': task_data.get('end_date').isoformat() if task_data.get('end_date') else None
+                    'start_date': task_data.get('start_date') or None,
+                    'end_date': task_data.get('end_date') or None
                 })
             
             staff_task_data.append({
@@ -563,8 +548,7 @@ def get_team_task_count_by_staff(user_id):
         }), 200
         
     except Exception as e:
-        print(f"Error getting tasks by staff: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error getting tasks by staff: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # =============== MANAGERS: COUNT TASKS BY ITS DIFF PRIORITY ===============
@@ -652,8 +636,7 @@ def get_manager_tasks_by_priority(user_id):
         }), 200
         
     except Exception as e:
-        print(f"Error getting tasks by priority: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error getting tasks by priority: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # =============== MANAGERS: PENDING TASKS BY AGE (DEDUPLICATED WITH COMBINED ASSIGNEES) ===============
@@ -817,8 +800,7 @@ def get_manager_pending_tasks_by_age(user_id):
         }), 200
         
     except Exception as e:
-        print(f"Error getting pending tasks by age: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error getting pending tasks by age: %s", e)
         return jsonify({'error': str(e)}), 500
     
 # =============== MANAGERS: VIEW ALL DEPT STAFF'S TASKS IN A GANTT CHART ===============
@@ -877,7 +859,17 @@ def get_dept_staff_task_timeline(user_id):
             # Query tasks where this staff member is assigned
             tasks_ref = db.collection('Tasks')
             tasks_query = tasks_ref.where('assigned_to', 'array_contains', staff_id)
-            tasks_docs = tasks_query.stream()
+            tasks_docs = list(tasks_query.stream())
+
+            # Resolve project names with one batched read
+            try:
+                projects_by_id = get_documents(
+                    db, 'Projects',
+                    [task_doc.to_dict().get('project_id') for task_doc in tasks_docs]
+                )
+            except Exception as e:
+                logger.error("Error fetching projects for staff %s: %s", staff_id, e)
+                projects_by_id = {}
             
             # Collect and format tasks
             formatted_tasks = []
@@ -894,15 +886,9 @@ def get_dept_staff_task_timeline(user_id):
                     project_id = task_data.get('project_id', '')
                     project_name = 'Unknown Project'
                     
-                    if project_id:
-                        try:
-                            project_ref = db.collection('Projects').document(project_id)
-                            project_doc = project_ref.get()
-                            if project_doc.exists:
-                                project_data = project_doc.to_dict()
-                                project_name = project_data.get('project_name', 'Unknown Project')
-                        except Exception as e:
-                            print(f"Error fetching project {project_id}: {e}")
+                    if project_id and str(project_id) in projects_by_id:
+                        project_data = projects_by_id[str(project_id)]
+                        project_name = project_data.get('project_name', 'Unknown Project')
                     
                     formatted_tasks.append({
                         'task_id': task_doc.id,
@@ -936,8 +922,7 @@ def get_dept_staff_task_timeline(user_id):
         }), 200
         
     except Exception as e:
-        print(f"Error retrieving tasks timeline: {e}")
-        traceback.print_exc()
+        logger.exception("Error retrieving tasks timeline: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # ========================================== NORMAL STAFF WHOSE ROLE_NUM IN DB = 4 ==========================================
@@ -947,12 +932,12 @@ def get_dept_staff_task_timeline(user_id):
 def get_staff_total_tasks(user_id):
     """Get total number of tasks assigned to a staff member"""
     try:
-        print(f"=== STAFF TOTAL TASKS ENDPOINT ===")
-        print(f"User ID: {user_id}")
+        logger.debug("=== STAFF TOTAL TASKS ENDPOINT ===")
+        logger.debug("User ID: %s", user_id)
         
         # Get staff info
         user_info = get_user_info(user_id)
-        print(f"User info: {user_info}")
+        logger.debug("User info: %s", user_info)
         
         if not user_info:
             return jsonify({'error': 'User not found'}), 404
@@ -961,7 +946,7 @@ def get_staff_total_tasks(user_id):
         role_num = user_info.get('role_num', 999)
         if isinstance(role_num, str):
             role_num = int(role_num)
-        print(f"User role_num: {role_num}")
+        logger.debug("User role_num: %s", role_num)
         
         if role_num != 4:
             return jsonify({'error': f'Unauthorized - Staff access only (your role_num: {role_num})'}), 403
@@ -974,7 +959,7 @@ def get_staff_total_tasks(user_id):
         tasks = list(tasks_query.stream())
         
         total_count = len(tasks)
-        print(f"Total tasks found: {total_count}")
+        logger.debug("Total tasks found: %s", total_count)
         
         return jsonify({
             'total_tasks': total_count,
@@ -982,8 +967,7 @@ def get_staff_total_tasks(user_id):
         }), 200
         
     except Exception as e:
-        print(f"Error getting staff total tasks: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error getting staff total tasks: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # =============== STAFF: COUNT TASKS BY STATUS ===============
@@ -1017,8 +1001,7 @@ def get_staff_tasks_by_status(user_id):
         return jsonify({'tasks_by_status': status_counts}), 200
         
     except Exception as e:
-        print(f"Error getting staff tasks by status: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error getting staff tasks by status: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # =============== STAFF: COUNT TASKS BY PRIORITY ===============
@@ -1071,8 +1054,7 @@ def get_staff_tasks_by_priority(user_id):
         return jsonify({'tasks_by_priority': priority_counts}), 200
         
     except Exception as e:
-        print(f"Error getting staff tasks by priority: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error getting staff tasks by priority: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # =============== STAFF: PENDING TASKS BY AGE ===============
@@ -1095,7 +1077,13 @@ def get_staff_pending_tasks_by_age(user_id):
         tasks_ref = db.collection('Tasks')
         
         tasks_query = tasks_ref.where('assigned_to', 'array_contains', user_id)
-        tasks = tasks_query.stream()
+        tasks = list(tasks_query.stream())
+
+        # Resolve every assignee name with one batched read
+        users_by_id = get_documents(
+            db, 'Users',
+            [uid for task in tasks for uid in (task.to_dict().get('assigned_to') or [])]
+        )
         
         age_categories = {
             'overdue': [], 'due_today': [], 'due_in_1_day': [], 'due_in_3_days': [],
@@ -1116,9 +1104,8 @@ def get_staff_pending_tasks_by_age(user_id):
             assigned_to_names = []
             if task_data.get('assigned_to'):
                 for user_id in task_data.get('assigned_to', []):
-                    user_doc = db.collection('Users').document(user_id).get()
-                    if user_doc.exists:
-                        assigned_to_names.append(user_doc.to_dict().get('name', 'Unknown'))
+                    if str(user_id) in users_by_id:
+                        assigned_to_names.append(users_by_id[str(user_id)].get('name', 'Unknown'))
             
             task_detail = {
                 'task_id': task.id,
@@ -1171,6 +1158,5 @@ def get_staff_pending_tasks_by_age(user_id):
         }), 200
         
     except Exception as e:
-        print(f"Error getting staff pending tasks by age: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error getting staff pending tasks by age: %s", e)
         return jsonify({'error': str(e)}), 500
@@ -1,21 +1,21 @@
 from flask import Blueprint, jsonify, request, send_file
-from firebase_utils import get_firestore_client
+from firebase_utils import get_firestore_client, get_documents
+from services.email_service import email_service  # noqa: F401 (registers the send_email job)
+from services.job_queue import job_queue
+from services.project_directory import project_directory
+from services.user_directory import user_directory
 from firebase_admin import firestore
 from datetime import datetime
-import traceback
-
-from io import BytesIO
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, KeepTogether
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from statistics import mean
-from openpyxl import Workbook, cell
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.chart import PieChart, Reference
+from logging_utils import get_logger
+from http_cache import etag_from
+from query_utils import (
+    get_page_args, fetch_page, slice_page, page_response,
+    get_fields_arg, apply_projection, PROJECT_FIELD_PRESETS, TASK_FIELD_PRESETS,
+    get_stream_format, stream_json_response,
+)
 
 projects_bp = Blueprint('projects', __name__)
+logger = get_logger(__name__)
 
 # =============== HELPER FUNCTION TO CHECK PROJECT COMPLETION ===============
 def is_project_completed(project_id, db):
@@ -58,423 +58,156 @@ def is_project_completed(project_id, db):
         
         return True
     except Exception as e:
-        print(f"Error checking project completion: {str(e)}")
+        logger.error("Error checking project completion: %s", e)
         return False
 
-# =============== CALENDAR GENERATION HELPER FUNCTIONS ===============
-def generate_team_calendar_pdf(tasks, project_name, project_data, users_ref):
-    """Generate team schedule PDF with tasks for each collaborator"""
-    users = {u.id: u.to_dict() for u in users_ref.stream()}
-    styles = getSampleStyleSheet()
-    
-    # Get project collaborators
-    project_collaborator_ids = set(project_data.get('collaborators', []))
-    
-    # Build task list for each collaborator
-    collaborator_tasks = {}
-    
-    for task in tasks:
-        assigned_to = task.get("assigned_to", [])
-        task_name = task.get("task_name", "Unknown Task")
-        priority = task.get("priority_level", 1)
-        
-        # Parse dates
-        start_date = task.get("start_date", "")
-        end_date = task.get("end_date", "")
-        
-        duration = "N/A"
-        start_str = "N/A"
-        end_str = "N/A"
-        
-        if start_date:
-            try:
-                if isinstance(start_date, str):
-                    if "T" in start_date:
-                        dt = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
-                    else:
-                        dt = datetime.fromisoformat(start_date)
-                else:
-                    dt = start_date
-                start_str = dt.strftime("%Y-%m-%d")
-            except:
-                pass
-        
-        if end_date:
-            try:
-                if isinstance(end_date, str):
-                    if "T" in end_date:
-                        dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
-                    else:
-                        dt = datetime.fromisoformat(end_date)
-                else:
-                    dt = end_date
-                end_str = dt.strftime("%Y-%m-%d")
-                
-                # Calculate duration
-                if start_date and end_date:
-                    try:
-                        start_dt = datetime.fromisoformat(start_date.replace("Z", "+00:00")) if isinstance(start_date, str) else start_date
-                        end_dt = datetime.fromisoformat(end_date.replace("Z", "+00:00")) if isinstance(end_date, str) else end_date
-                        if hasattr(start_dt, 'date'):
-                            start_dt = start_dt.date()
-                        if hasattr(end_dt, 'date'):
-                            end_dt = end_dt.date()
-                        delta = end_dt - start_dt
-                        duration = f"{delta.days + 1} days"
-                    except:
-                        duration = "N/A"
-            except:
-                pass
-        
-        # Assign task to each collaborator
-        for user_id in assigned_to:
-            if user_id in project_collaborator_ids:
-                user_name = users.get(user_id, {}).get('name', f'User_{user_id}')
-                
-                if user_name not in collaborator_tasks:
-                    collaborator_tasks[user_name] = []
-                
-                collaborator_tasks[user_name].append({
-                    'name': task_name,
-                    'start': start_str,
-                    'end': end_str,
-                    'duration': duration,
-                    'priority': priority
-                })
-    
-    # Generate PDF elements
-    calendar_elements = []
-    
-    # Add all collaborators (even if they have no tasks)
-    all_collaborators = {}
-    for user_id in project_collaborator_ids:
-        user_name = users.get(user_id, {}).get('name', f'User_{user_id}')
-        all_collaborators[user_name] = collaborator_tasks.get(user_name, [])
-    
-    # Sort collaborators alphabetically
-    sorted_collaborators = sorted(all_collaborators.keys())
-    
-    # Create table for each collaborator
-    for collaborator_name in sorted_collaborators:
-        tasks_list = all_collaborators[collaborator_name]
-        
-        # Collaborator header
-        collaborator_header = Paragraph(f"<b>{collaborator_name}</b>", styles["h2"])
-        calendar_elements.append(collaborator_header)
-        calendar_elements.append(Spacer(1, 8))
-        
-        if not tasks_list:
-            no_tasks_text = Paragraph("<i>No tasks assigned</i>", styles["Normal"])
-            calendar_elements.append(no_tasks_text)
-            calendar_elements.append(Spacer(1, 16))
-            continue
-        
-        # Create table with task details
-        table_data = [["Task Name", "Start Date", "End Date", "Duration", "Priority"]]
-        
-        for task in tasks_list:
-            priority_str = "High" if task['priority'] >= 4 else "Medium" if task['priority'] >= 2 else "Low"
-            table_data.append([
-                task['name'],
-                task['start'],
-                task['end'],
-                task['duration'],
-                priority_str
-            ])
-        
-        task_table = Table(table_data, colWidths=[2.5*inch, 1*inch, 1*inch, 0.8*inch, 0.7*inch])
-        task_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.lightblue),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, -1), 9),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("ALIGN", (0, 0), (0, -1), "LEFT"),
-            ("ALIGN", (1, 0), (-1, -1), "CENTER"),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.beige, colors.white]),
-        ]))
-        
-        calendar_elements.append(task_table)
-        calendar_elements.append(Spacer(1, 20))
-    
-    return calendar_elements
-
-
-def generate_calendar_months(tasks, project_name):
-    """Generate calendar months with tasks for PDF"""
-    from collections import defaultdict
-    import calendar
-    
-    # Group tasks by month
-    tasks_by_month = defaultdict(list)
-    
-    for task in tasks:
-        end_date = task.get("end_date")
-        if end_date:
-            try:
-                if isinstance(end_date, str):
-                    if "T" in end_date:
-                        dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
-                    else:
-                        dt = datetime.fromisoformat(end_date)
-                else:
-                    dt = end_date
-                
-                month_key = (dt.year, dt.month)
-                tasks_by_month[month_key].append(task)
-            except Exception:
-                continue
-    
-    calendar_elements = []
-    
-    # Generate calendar for each month with tasks
-    for (year, month), month_tasks in sorted(tasks_by_month.items()):
-        # Month header
-        month_name = calendar.month_name[month]
-        month_header = Paragraph(f"<b>{month_name} {year}</b>", getSampleStyleSheet()["h2"])
-        
-        # Create calendar grid
-        cal = calendar.monthcalendar(year, month)
-        calendar_data = []
-        
-        # Header row
-        header_row = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-        calendar_data.append(header_row)
-        
-        # Calendar rows
-        for week in cal:
-            week_row = []
-            for day in week:
-                if day == 0:
-                    week_row.append("")
-                else:
-                    # Check if there are tasks on this day
-                    day_tasks = []
-                    for task in month_tasks:
-                        try:
-                            task_date = task.get("end_date")
-                            if isinstance(task_date, str):
-                                if "T" in task_date:
-                                    dt = datetime.fromisoformat(task_date.replace("Z", "+00:00"))
-                                else:
-                                    dt = datetime.fromisoformat(task_date)
-                            else:
-                                dt = task_date
-                            
-                            if dt.day == day:
-                                # Color code by priority
-                                priority = task.get("priority_level", 1)
-                                if priority >= 4:
-                                    color = "red"
-                                elif priority >= 3:
-                                    color = "orange" 
-                                else:
-                                    color = "green"
-                                
-                                task_name = task.get("task_name", "Unknown")[:15]  # Truncate long names
-                                day_tasks.append(f'<font color="{color}">• {task_name}</font>')
-                        except Exception:
-                            continue
-                    
-                    if day_tasks:
-                        day_content = f"{day}<br/>{'<br/>'.join(day_tasks)}"
-                    else:
-                        day_content = str(day)
-                    
-                    week_row.append(day_content)
-            
-            calendar_data.append(week_row)
-        
-        # Create calendar table
-        calendar_table = Table(calendar_data, colWidths=[1.2*inch]*7, rowHeights=[0.4*inch]*len(calendar_data))
-        calendar_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.lightblue),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-            ("VALIGN", (0, 0), (-1, -1), "TOP"),
-            ("FONTSIZE", (0, 1), (-1, -1), 8),
-        ]))
-        
-        calendar_elements.append(KeepTogether([month_header, Spacer(1, 12), calendar_table]))
-    
-    return calendar_elements
 
 # =============== HELPER FUNCTION FOR DEPARTMENT FILTERING ===============
 def get_users_from_same_division(division_name):
     """Get all user IDs from the same division"""
     try:
-        db = get_firestore_client()
-        users_ref = db.collection('Users')
-        users_query = users_ref.where('division_name', '==', division_name)
-        users = users_query.stream()
-        
-        user_ids = []
-        for user in users:
-            user_ids.append(user.id)
+        user_ids = list(user_directory.get_users_by_division(division_name))
         
-        print(f"Found {len(user_ids)} users in {division_name} division")
+        logger.debug("Found %s users in %s division", len(user_ids), division_name)
         return user_ids
     except Exception as e:
-        print(f"Error getting users from division {division_name}: {str(e)}")
+        logger.error("Error getting users from division %s: %s", division_name, e)
         return []
 
 @projects_bp.route('/api/projects/filtered/<division_name>', methods=['GET'])
 def get_filtered_projects_by_division(division_name):
     """Get projects filtered by division - only shows projects where current user is a collaborator"""
+    try:
+        stream_format = get_stream_format(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     try:
         db = get_firestore_client()
         
         # Get current user ID from query parameters
         current_user_id = request.args.get('user_id')
         if not current_user_id:
-            print("No user ID provided in query parameters")
+            logger.debug("No user ID provided in query parameters")
             return jsonify({'error': 'User ID required'}), 400
         
         # Get show_completed parameter (default to False to hide completed projects)
         show_completed = request.args.get('show_completed', 'false').lower() == 'true'
         
-        print(f"Filtering projects for division: {division_name}, user: {current_user_id}, show_completed: {show_completed}")
-        
-        # Get all projects
-        projects_ref = db.collection('Projects')
-        all_projects = projects_ref.stream()
+        logger.debug("Filtering projects for division: %s, user: %s, show_completed: %s", division_name, current_user_id, show_completed)
         
-        filtered_projects = []
+        def iter_projects():
+            # Get all projects
+            projects_ref = db.collection('Projects')
+            all_projects = projects_ref.stream()
         
-        for project in all_projects:
-            project_data = project.to_dict()
-            project_data['id'] = project.id
+            for project in all_projects:
+                project_data = project.to_dict()
+                project_data['id'] = project.id
             
-            # Check if current user is a collaborator of this project
-            collaborators = project_data.get('collaborators', [])
-            is_user_collaborator = current_user_id in collaborators
+                # Check if current user is a collaborator of this project
+                collaborators = project_data.get('collaborators', [])
+                is_user_collaborator = current_user_id in collaborators
             
-            if is_user_collaborator:
-                project_id = project.id
+                if is_user_collaborator:
+                    project_id = project.id
                 
-                # Check if project is completed
-                is_complete = is_project_completed(project_id, db)
+                    # Check if project is completed
+                    is_complete = is_project_completed(project_id, db)
                 
-                # Skip completed projects unless show_completed is True
-                if is_complete and not show_completed:
-                    print(f"Project {project_data.get('proj_name', 'Unknown')} excluded - completed and filter is off")
-                    continue
-                
-                print(f"Project {project_data.get('proj_name', 'Unknown')} included - user is collaborator")
+                    # Skip completed projects unless show_completed is True
+                    if is_complete and not show_completed:
+                        logger.debug("Project %s excluded - completed and filter is off", project_data.get('proj_name', 'Unknown'))
+                        continue
                 
-                # Convert timestamps to ISO format
-                if 'start_date' in project_data and project_data['start_date']:
-                    project_data['start_date'] = project_data['start_date'].isoformat()
-                if 'end_date' in project_data and project_data['end_date']:
-                    project_data['end_date'] = project_data['end_date'].isoformat()
-                if 'createdAt' in project_data and project_data['createdAt']:
-                    project_data['createdAt'] = project_data['createdAt'].isoformat()
-                if 'updatedAt' in project_data and project_data['updatedAt']:
-                    project_data['updatedAt'] = project_data['updatedAt'].isoformat()
+                    logger.debug("Project %s included - user is collaborator", project_data.get('proj_name', 'Unknown'))
                 
-                # Get all tasks for this project (since user is a collaborator)
-                project_doc_id = project.id
-                tasks_ref = db.collection('Tasks')
-                tasks_query = tasks_ref.where('proj_ID', '==', project_doc_id)
-                tasks = tasks_query.stream()
+                    # Get all tasks for this project (since user is a collaborator)
+                    project_doc_id = project.id
+                    tasks_ref = db.collection('Tasks')
+                    tasks_query = tasks_ref.where('proj_ID', '==', project_doc_id)
+                    tasks = tasks_query.stream()
                 
-                task_list = []
-                for task in tasks:
-                    task_data = task.to_dict()
-                    task_data['id'] = task.id
+                    task_list = []
+                    for task in tasks:
+                        task_data = task.to_dict()
+                        task_data['id'] = task.id
 
-                    if task_data.get('is_deleted', False):
-                        continue
-                    
-                    # Convert task timestamps
-                    if 'start_date' in task_data and task_data['start_date']:
-                        task_data['start_date'] = task_data['start_date'].isoformat()
-                    if 'end_date' in task_data and task_data['end_date']:
-                        task_data['end_date'] = task_data['end_date'].isoformat()
-                    if 'createdAt' in task_data and task_data['createdAt']:
-                        task_data['createdAt'] = task_data['createdAt'].isoformat()
-                    if 'updatedAt' in task_data and task_data['updatedAt']:
-                        task_data['updatedAt'] = task_data['updatedAt'].isoformat()
+                        if task_data.get('is_deleted', False):
+                            continue
                     
-                    task_list.append(task_data)
+                        task_list.append(task_data)
                 
-                project_data['tasks'] = task_list
-                project_data['is_completed'] = is_complete
-                filtered_projects.append(project_data)
-            else:
-                print(f"Project {project_data.get('proj_name', 'Unknown')} excluded - user is not collaborator")
+                    project_data['tasks'] = task_list
+                    project_data['is_completed'] = is_complete
+                    yield project_data
+                else:
+                    logger.debug("Project %s excluded - user is not collaborator", project_data.get('proj_name', 'Unknown'))
         
-        print(f"Returning {len(filtered_projects)} filtered projects for user {current_user_id}")
+
+        if stream_format:
+            # ?stream=ndjson|json: send each project as soon as its tasks are loaded
+            return stream_json_response(iter_projects(), stream_format)
+
+        filtered_projects = list(iter_projects())
+        logger.debug("Returning %s filtered projects for user %s", len(filtered_projects), current_user_id)
         return jsonify(filtered_projects), 200
         
     except Exception as e:
-        print(f"Error fetching filtered projects: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error fetching filtered projects: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # =============== GET FILTERED USERS BY DIVISION ===============
 @projects_bp.route('/api/users/filtered/<division_name>', methods=['GET'])
+@etag_from(lambda division_name: user_directory.fingerprint)
 def get_filtered_users_by_division(division_name):
     """Get users filtered by division"""
     try:
-        db = get_firestore_client()
-        
-        print(f"Filtering users for division: {division_name}")
-        
-        users_ref = db.collection('Users')
-        users_query = users_ref.where('division_name', '==', division_name)
-        users = users_query.stream()
+        logger.debug("Filtering users for division: %s", division_name)
         
         user_list = []
-        for user in users:
-            user_data = user.to_dict()
-            user_data['id'] = user.id
-            
-            # Convert timestamps to ISO format for JSON serialization
-            if 'createdAt' in user_data and user_data['createdAt']:
-                user_data['createdAt'] = user_data['createdAt'].isoformat()
-            if 'updatedAt' in user_data and user_data['updatedAt']:
-                user_data['updatedAt'] = user_data['updatedAt'].isoformat()
+        for user_id, user_data in user_directory.get_users_by_division(division_name).items():
+            user_data['id'] = user_id
             
             user_list.append(user_data)
         
-        print(f"Returning {len(user_list)} filtered users for {division_name}")
+        logger.debug("Returning %s filtered users for %s", len(user_list), division_name)
         return jsonify(user_list), 200
         
     except Exception as e:
-        print(f"Error fetching filtered users: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error fetching filtered users: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # =============== GET ALL PROJECTS (EXISTING) ===============
 @projects_bp.route('/api/projects', methods=['GET'])
 def get_all_projects_with_tasks():
+    try:
+        page = get_page_args(request.args)
+        # ?fields= projects the projects, ?task_fields= their nested tasks
+        fields = get_fields_arg(request.args, presets=PROJECT_FIELD_PRESETS)
+        task_fields = get_fields_arg(request.args, name='task_fields', presets=TASK_FIELD_PRESETS,
+                                     required=('is_deleted',))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     try:
         db = get_firestore_client()
         
-        # Get all projects
-        projects_ref = db.collection('Projects')
-        projects = projects_ref.stream()
+        # Get all projects (or one page of them: ?limit=&cursor=)
+        projects_ref = apply_projection(db.collection('Projects'), fields)
+        if page:
+            projects, next_cursor = fetch_page(projects_ref, *page)
+        else:
+            projects = projects_ref.stream()
         
         project_list = []
         for project in projects:
             project_data = project.to_dict()
             project_data['id'] = project.id
             
-            # Convert timestamps to ISO format for JSON serialization
-            if 'start_date' in project_data and project_data['start_date']:
-                project_data['start_date'] = project_data['start_date'].isoformat()
-            if 'end_date' in project_data and project_data['end_date']:
-                project_data['end_date'] = project_data['end_date'].isoformat()
-            if 'createdAt' in project_data and project_data['createdAt']:
-                project_data['createdAt'] = project_data['createdAt'].isoformat()
-            if 'updatedAt' in project_data and project_data['updatedAt']:
-                project_data['updatedAt'] = project_data['updatedAt'].isoformat()
-            
             # Get tasks for this project using document ID
             project_doc_id = project.id
-            tasks_ref = db.collection('Tasks')
+            tasks_ref = apply_projection(db.collection('Tasks'), task_fields)
             tasks_query = tasks_ref.where('proj_ID', '==', project_doc_id)
             tasks = tasks_query.stream()
             
@@ -486,25 +219,16 @@ def get_all_projects_with_tasks():
                 if task_data.get('is_deleted', False):
                     continue
                 
-                # Convert task timestamps
-                if 'start_date' in task_data and task_data['start_date']:
-                    task_data['start_date'] = task_data['start_date'].isoformat()
-                if 'end_date' in task_data and task_data['end_date']:
-                    task_data['end_date'] = task_data['end_date'].isoformat()
-                if 'createdAt' in task_data and task_data['createdAt']:
-                    task_data['createdAt'] = task_data['createdAt'].isoformat()
-                if 'updatedAt' in task_data and task_data['updatedAt']:
-                    task_data['updatedAt'] = task_data['updatedAt'].isoformat()
-                
                 task_list.append(task_data)
             
             project_data['tasks'] = task_list
             project_list.append(project_data)
             
+        if page:
+            return jsonify(page_response(project_list, next_cursor)), 200
         return jsonify(project_list), 200
     except Exception as e:
-        print(f"Error fetching projects: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error fetching projects: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # =============== GET SINGLE PROJECT BY ID ===============
@@ -523,16 +247,6 @@ def get_project_with_tasks(project_id):
         project_data = doc.to_dict()
         project_data['id'] = doc.id
         
-        # Convert timestamps to ISO format
-        if 'start_date' in project_data and project_data['start_date']:
-            project_data['start_date'] = project_data['start_date'].isoformat()
-        if 'end_date' in project_data and project_data['end_date']:
-            project_data['end_date'] = project_data['end_date'].isoformat()
-        if 'createdAt' in project_data and project_data['createdAt']:
-            project_data['createdAt'] = project_data['createdAt'].isoformat()
-        if 'updatedAt' in project_data and project_data['updatedAt']:
-            project_data['updatedAt'] = project_data['updatedAt'].isoformat()
-
         # Get tasks for this project using the document ID
         tasks_ref = db.collection('Tasks')
         tasks_query = tasks_ref.where('proj_ID', '==', project_id)
@@ -546,24 +260,13 @@ def get_project_with_tasks(project_id):
             if task_data.get('is_deleted', False):
                 continue
             
-            # Convert task timestamps
-            if 'start_date' in task_data and task_data['start_date']:
-                task_data['start_date'] = task_data['start_date'].isoformat()
-            if 'end_date' in task_data and task_data['end_date']:
-                task_data['end_date'] = task_data['end_date'].isoformat()
-            if 'createdAt' in task_data and task_data['createdAt']:
-                task_data['createdAt'] = task_data['createdAt'].isoformat()
-            if 'updatedAt' in task_data and task_data['updatedAt']:
-                task_data['updatedAt'] = task_data['updatedAt'].isoformat()
-            
             task_list.append(task_data)
 
         project_data['tasks'] = task_list
         return jsonify(project_data), 200
 
     except Exception as e:
-        print(f"Error fetching project: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error fetching project: %s", e)
         return jsonify({'error': str(e)}), 500
     
 # =============== GET ALL PROJECT BY ID'S COLLABORATORS TASKS SCHEDULE  - VIEW TEAM MEMBER'S SCHEDULE & WORKLOAD ===============
@@ -587,8 +290,8 @@ def get_project_team_schedule(project_id):
                 'project': {
                     'id': project_id,
                     'proj_name': project_data.get('proj_name', 'Unknown'),
-                    'start_date': project_data.get('start_date').isoformat() if project_data.get('start_date') else None,
-                    'end_date': project_data.get('end_date').isoformat() if project_data.get('end_date') else None
+                    'start_date': project_data.get('start_date') or None,
+                    'end_date': project_data.get('end_date') or None
                 },
                 'collaborators': [],
                 'timeline_summary': {
@@ -649,8 +352,8 @@ def get_project_team_schedule(project_id):
                     'firestore_id': task_doc.id,
                     'task_name': task_data.get('task_name', 'Untitled Task'),
                     'task_desc': task_data.get('task_desc', ''),
-                    'start_date': task_data.get('start_date').isoformat() if task_data.get('start_date') else None,
-                    'end_date': task_data.get('end_date').isoformat() if task_data.get('end_date') else None,
+                    'start_date': task_data.get('start_date') or None,
+                    'end_date': task_data.get('end_date') or None,
                     'task_status': status,
                     'priority_level': task_data.get('priority_level', 'Medium'),
                     'completion_percentage': task_data.get('completion_percentage', 0),
@@ -659,16 +362,15 @@ def get_project_team_schedule(project_id):
                 }
                 tasks_by_user[user_id].append(task_info)
         
-        # Get user details and build collaborator list
-        users_ref = db.collection('Users')
+        # Get user details (one batched read) and build collaborator list
+        users_by_id = get_documents(db, 'Users', collaborator_ids)
         collaborators_list = []
         
         for user_id in collaborator_ids:
-            user_doc = users_ref.document(user_id).get()
-            if not user_doc.exists:
+            user_data = users_by_id.get(str(user_id))
+            if user_data is None:
                 continue
                 
-            user_data = user_doc.to_dict()
             user_tasks = tasks_by_user.get(user_id, [])
             
             # Sort tasks by start date (earliest first)
@@ -702,14 +404,14 @@ def get_project_team_schedule(project_id):
                 'id': project_id,
                 'proj_name': project_data.get('proj_name', 'Unknown'),
                 'proj_desc': project_data.get('proj_desc', ''),
-                'start_date': project_data.get('start_date').isoformat() if project_data.get('start_date') else None,
-                'end_date': project_data.get('end_date').isoformat() if project_data.get('end_date') else None,
+                'start_date': project_data.get('start_date') or None,
+                'end_date': project_data.get('end_date') or None,
                 'proj_status': project_data.get('proj_status', 'Active')
             },
             'collaborators': collaborators_list,
             'timeline_summary': {
-                'earliest_task': earliest_date.isoformat() if earliest_date else None,
-                'latest_task': latest_date.isoformat() if latest_date else None,
+                'earliest_task': earliest_date,
+                'latest_task': latest_date,
                 'total_tasks': len(all_tasks),
                 'tasks_by_status': status_counts,
                 'total_collaborators': len(collaborators_list)
@@ -719,9 +421,7 @@ def get_project_team_schedule(project_id):
         return jsonify(response), 200
 
     except Exception as e:
-        print(f"Error fetching team schedule: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error fetching team schedule: %s", e)
         return jsonify({'error': str(e)}), 500
     
 # =============== GET PROJECT WITH TASKS (EXISTING) ===============
@@ -740,16 +440,6 @@ def get_project_tasks(project_id):
         project_data = project_doc.to_dict()
         project_data['id'] = project_doc.id
 
-        # Convert timestamps in project
-        if 'start_date' in project_data and project_data['start_date']:
-            project_data['start_date'] = project_data['start_date'].isoformat()
-        if 'end_date' in project_data and project_data['end_date']:
-            project_data['end_date'] = project_data['end_date'].isoformat()
-        if 'createdAt' in project_data and project_data['createdAt']:
-            project_data['createdAt'] = project_data['createdAt'].isoformat()
-        if 'updatedAt' in project_data and project_data['updatedAt']:
-            project_data['updatedAt'] = project_data['updatedAt'].isoformat()
-
         # Query tasks for this project using document ID
         tasks_ref = db.collection('Tasks')
         tasks_query = tasks_ref.where('proj_ID', '==', project_id).stream()
@@ -765,16 +455,6 @@ def get_project_tasks(project_id):
             if task_data.get('is_deleted', False):
                 continue
             
-            # Convert timestamps in tasks
-            if 'start_date' in task_data and task_data['start_date']:
-                task_data['start_date'] = task_data['start_date'].isoformat()
-            if 'end_date' in task_data and task_data['end_date']:
-                task_data['end_date'] = task_data['end_date'].isoformat()
-            if 'createdAt' in task_data and task_data['createdAt']:
-                task_data['createdAt'] = task_data['createdAt'].isoformat()
-            if 'updatedAt' in task_data and task_data['updatedAt']:
-                task_data['updatedAt'] = task_data['updatedAt'].isoformat()
-
             task_list.append(task_data)
         
         # If no tasks found, let's check if there are ANY tasks in the Tasks collection
@@ -792,7 +472,7 @@ def get_project_tasks(project_id):
         return jsonify(response), 200
         
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Error fetching project tasks: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # =============== GET SPECIFIC TASK IN PROJECT (EXISTING) ===============
@@ -811,16 +491,6 @@ def get_specific_project_task(project_id, task_id):
         project_data = project_doc.to_dict()
         project_data['id'] = project_doc.id
         
-        # Convert project timestamps
-        if 'start_date' in project_data and project_data['start_date']:
-            project_data['start_date'] = project_data['start_date'].isoformat()
-        if 'end_date' in project_data and project_data['end_date']:
-            project_data['end_date'] = project_data['end_date'].isoformat()
-        if 'createdAt' in project_data and project_data['createdAt']:
-            project_data['createdAt'] = project_data['createdAt'].isoformat()
-        if 'updatedAt' in project_data and project_data['updatedAt']:
-            project_data['updatedAt'] = project_data['updatedAt'].isoformat()
-
         # Get the specific task by document ID
         task_doc_ref = db.collection('Tasks').document(task_id)
         task_doc = task_doc_ref.get()
@@ -835,16 +505,6 @@ def get_specific_project_task(project_id, task_id):
         if task_data.get('proj_ID') != project_id:
             return jsonify({'error': 'Task does not belong to this project'}), 404
         
-        # Convert task timestamps
-        if 'start_date' in task_data and task_data['start_date']:
-            task_data['start_date'] = task_data['start_date'].isoformat()
-        if 'end_date' in task_data and task_data['end_date']:
-            task_data['end_date'] = task_data['end_date'].isoformat()
-        if 'createdAt' in task_data and task_data['createdAt']:
-            task_data['createdAt'] = task_data['createdAt'].isoformat()
-        if 'updatedAt' in task_data and task_data['updatedAt']:
-            task_data['updatedAt'] = task_data['updatedAt'].isoformat()
-        
         # Return both project and task data
         return jsonify({
             'project': project_data,
@@ -852,35 +512,36 @@ def get_specific_project_task(project_id, task_id):
         }), 200
 
     except Exception as e:
-        print(f"Error fetching project task: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error fetching project task: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # =============== GET USERS (EXISTING) ===============
 @projects_bp.route('/api/users', methods=['GET'])
+@etag_from(lambda: user_directory.fingerprint)
 def get_all_users():
     try:
-        db = get_firestore_client()
-        users_ref = db.collection('Users')
-        users = users_ref.stream()
-        
+        page = get_page_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        users = user_directory.all_users()
+        if page:
+            user_items, next_cursor = slice_page(users, *page)
+        else:
+            user_items = users.items()
+
         user_list = []
-        for user in users:
-            user_data = user.to_dict()
-            user_data['id'] = user.id
-            
-            # Convert timestamps to ISO format for JSON serialization
-            if 'createdAt' in user_data and user_data['createdAt']:
-                user_data['createdAt'] = user_data['createdAt'].isoformat()
-            if 'updatedAt' in user_data and user_data['updatedAt']:
-                user_data['updatedAt'] = user_data['updatedAt'].isoformat()
+        for user_id, user_data in user_items:
+            user_data['id'] = user_id
             
             user_list.append(user_data)
             
+        if page:
+            return jsonify(page_response(user_list, next_cursor)), 200
         return jsonify(user_list), 200
     except Exception as e:
-        print(f"Error fetching users: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error fetching users: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # =============== CREATE PROJECT ===============
@@ -945,49 +606,41 @@ def create_project():
             'updatedAt': firestore.SERVER_TIMESTAMP
         }
         
-        print(f"Creating project: {firestore_data['proj_name']} with collaborators: {collaborators}")
+        logger.debug("Creating project: %s with collaborators: %s", firestore_data['proj_name'], collaborators)
         
         # Add project to Firestore
         doc_ref = db.collection('Projects').add(firestore_data)
         project_id = doc_ref[1].id
+        project_directory.invalidate()
         
         # Get the created project back with the ID
         created_project = doc_ref[1].get().to_dict()
         created_project['id'] = project_id
         
-        # Convert timestamps back to ISO format for response
-        if 'start_date' in created_project and created_project['start_date']:
-            created_project['start_date'] = created_project['start_date'].isoformat()
-        if 'end_date' in created_project and created_project['end_date']:
-            created_project['end_date'] = created_project['end_date'].isoformat()
-        if 'createdAt' in created_project and created_project['createdAt']:
-            created_project['createdAt'] = created_project['createdAt'].isoformat()
-        if 'updatedAt' in created_project and created_project['updatedAt']:
-            created_project['updatedAt'] = created_project['updatedAt'].isoformat()
-        
-        print(f"Project created successfully with ID: {project_id}")
+        logger.debug("Project created successfully with ID: %s", project_id)
 
         # ================== SEND EMAILS TO COLLABORATORS ==================
         try:
-            from services.email_service import email_service  # import the singleton instance
+            # Fetch creator + collaborators in one batched read
+            users_by_id = get_documents(db, 'Users', [owner_id, *collaborators])
 
             # Get creator's info (for the "Created by" field)
-            creator_doc = db.collection('Users').document(owner_id).get()
-            creator_name = creator_doc.to_dict().get('name', 'Unknown User') if creator_doc.exists else 'Unknown User'
+            creator_name = users_by_id.get(str(owner_id), {}).get('name', 'Unknown User')
 
             # Send emails to each collaborator (except creator)
             for collab_id in collaborators:
                 if collab_id == owner_id:
                     continue
 
-                user_doc = db.collection('Users').document(collab_id).get()
-                if user_doc.exists:
-                    user_data = user_doc.to_dict()
+                user_data = users_by_id.get(str(collab_id))
+                if user_data is not None:
                     to_email = user_data.get('email')
                     user_name = user_data.get('name', 'User')
 
                     if to_email:
-                        email_service.send_project_assignment_email(
+                        job_queue.enqueue(
+                            'send_email',
+                            method='send_project_assignment_email',
                             to_email=to_email,
                             user_name=user_name,
                             project_name=firestore_data['proj_name'],
@@ -997,9 +650,9 @@ def create_project():
                             end_date=str(firestore_data['end_date'].date())
                         )
                     else:
-                        print(f"⚠️ No email found for user {collab_id}")
+                        logger.warning("⚠️ No email found for user %s", collab_id)
         except Exception as e:
-            print(f"❌ Failed to send email notifications: {e}")
+            logger.error("❌ Failed to queue email notifications: %s", e)
         # ================================================================
         
         return jsonify({
@@ -1008,8 +661,7 @@ def create_project():
         }), 201
         
     except Exception as e:
-        print(f"Error creating project: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error creating project: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # =============== EXPORT PROJECT TASKS TO PDF ===============
@@ -1019,11 +671,8 @@ def export_project_tasks(project_id):
         db = get_firestore_client()
 
         # --- Fetch Project Info ---
-        project_doc = db.collection("Projects").document(project_id).get()
-        project_name = "Unnamed Project"
-        if project_doc.exists:
-            project_data = project_doc.to_dict()
-            project_name = project_data.get("proj_name", project_name)
+        project_data = project_directory.get_project(project_id) or {}
+        project_name = project_data.get("proj_name", "Unnamed Project")
 
         # --- Fetch Tasks for Project ---
         tasks_ref = db.collection("Tasks").where("proj_ID", "==", project_id)
@@ -1042,124 +691,15 @@ def export_project_tasks(project_id):
         if not tasks:
             return jsonify({"error": f"No tasks found for project ID: {project_id}"}), 404
 
-        # --- Fetch all users (for name and department lookup) ---
-        users_ref = db.collection("Users")
-        users = {u.id: u.to_dict() for u in users_ref.stream()}
-
-        def get_user_info(uid):
-            user = users.get(uid)
-            if not user:
-                return "Unknown"
-            name = user.get("name", "Unknown")
-            dept = user.get("division_name", "N/A")
-            return f"{name} ({dept})"
-
-        # --- Compute summary ---
-        total_tasks = len(tasks)
-        completed_tasks = sum(1 for t in tasks if t.get("task_status") == "Completed")
-        incomplete_tasks = total_tasks - completed_tasks
-        avg_priority = round(mean([t.get("priority_level", 0) for t in tasks if isinstance(t.get("priority_level"), (int, float))]), 1)
+        # --- All users (for name and department lookup) ---
+        users = user_directory.all_users()
 
         # Get format type from request parameters
         format_type = request.args.get('format', 'table')  # 'table' or 'calendar'
         
-        # --- Create PDF ---
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            leftMargin=40,
-            rightMargin=40,
-            topMargin=40,
-            bottomMargin=40,
-        )
-        styles = getSampleStyleSheet()
-        elements = []
-
-        # --- Calendar Format ---
-        if format_type == 'calendar':
-            # Title
-            elements.append(Paragraph(f"<b>Project Team Calendar: {project_name}</b>", styles["h1"]))
-            elements.append(Spacer(1, 24))
-            
-            # Generate team calendar similar to Excel format
-            team_calendar = generate_team_calendar_pdf(tasks, project_name, project_data, users_ref)
-            for calendar_element in team_calendar:
-                if isinstance(calendar_element, Table):
-                    elements.append(KeepTogether(calendar_element))
-                else:
-                    elements.append(calendar_element)
-        else:
-            # --- Title ---
-            elements.append(Paragraph(f"<b>Project Report: {project_name}</b>", styles["h1"]))
-            # elements.append(Spacer(1, 6))
-            elements.append(Paragraph(f"ID: {project_id}", styles["h3"]))
-            elements.append(Spacer(1, 24))
-
-            # --- Summary Table ---
-            summary_data = [
-                ["Total Tasks", "Completed", "Incomplete", "Average Priority"],
-                [total_tasks, completed_tasks, incomplete_tasks, avg_priority],
-            ]
-            summary_table = Table(summary_data, repeatRows=1)
-            summary_table.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (-1, 0), colors.lightsteelblue),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-            ]))
-            elements.append(summary_table)
-            elements.append(Spacer(1, 20))
-
-            # --- Tasks Table ---
-            task_data = [["Name", "Due Date", "Status", "Priority", "Owner", "Collaborators"]]
-
-            for task in tasks:
-                # name
-                task_name = Paragraph(task.get("task_name", "Unknown Task"), styles['BodyText'])
-
-                # Format date (dd-mm-yyyy)
-                due_date = task.get("end_date", "—")
-                if due_date and isinstance(due_date, str) and "T" not in due_date:
-                    try:
-                        dt = datetime.fromisoformat(due_date.replace("Z", "+00:00"))
-                        due_date = dt.strftime("%d-%m-%Y")
-                    except Exception:
-                        due_date = str(due_date)[:10]
-                elif isinstance(due_date, datetime):
-                    due_date = due_date.strftime("%d-%m-%Y")
-
-                # Owner & collaborators
-                owner_name = get_user_info(task.get("owner"))
-                collaborators_list = task.get("assigned_to", [])
-                collaborators_names = [get_user_info(uid) for uid in collaborators_list]
-                # collaborators_str = ", ".join(collaborators_names) if collaborators_names else "—"
-                collaborators_str = []
-                for name in collaborators_names:
-                    collaborators_str.append(Paragraph(name, styles['Normal'], bulletText='•'))
-
-                task_data.append([
-                    task_name,
-                    due_date,
-                    task.get("task_status", "N/A"),
-                    task.get("priority_level", "—"),
-                    owner_name,
-                    collaborators_str,
-                ])
-
-            task_table = Table(task_data, repeatRows=1, colWidths=[90, 70, 90, 50, 100, 160])
-            task_table.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (-1, 0), colors.lightcoral),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-            ]))
-            elements.append(task_table)
-
-        # --- Build PDF ---
-        doc.build(elements)
-        buffer.seek(0)
+        # PDF rendering (reportlab) is only imported on first export
+        from services.pdf_export import build_project_tasks_pdf
+        buffer = build_project_tasks_pdf(project_id, project_name, project_data, tasks, users, format_type)
         
         if format_type == 'calendar':
             return send_file(
@@ -1183,516 +723,41 @@ def export_project_tasks(project_id):
 @projects_bp.route("/api/projects/<project_id>/export-excel", methods=["GET"])
 def export_project_team_schedule_excel(project_id):
     try:
-        print(f"=== EXCEL EXPORT DEBUG ===")
-        print(f"Project ID: {project_id}")
+        logger.debug("=== EXCEL EXPORT DEBUG ===")
+        logger.debug("Project ID: %s", project_id)
         
         db = get_firestore_client()
-        print("Firestore client obtained")
+        logger.debug("Firestore client obtained")
 
         # --- Fetch Project Info ---
-        project_doc = db.collection("Projects").document(project_id).get()
-        project_name = "Unnamed Project"
-        if project_doc.exists:
-            project_data = project_doc.to_dict()
-            project_name = project_data.get("proj_name", project_name)
-            print(f"Project found: {project_name}")
+        project_data = project_directory.get_project(project_id)
+        if project_data is not None:
+            project_name = project_data.get("proj_name", "Unnamed Project")
+            logger.debug("Project found: %s", project_name)
         else:
-            print(f"Project not found for ID: {project_id}")
+            project_data = {}
+            project_name = "Unnamed Project"
+            logger.debug("Project not found for ID: %s", project_id)
 
         # --- Fetch Tasks for Project ---
         tasks_ref = db.collection("Tasks").where("proj_ID", "==", project_id)
         tasks = [doc.to_dict() for doc in tasks_ref.stream()]
         tasks.sort(key=lambda task: task.get("end_date"))
-        print(f"Found {len(tasks)} tasks")
+        logger.debug("Found %s tasks", len(tasks))
 
         if not tasks:
-            print("No tasks found, returning 404")
+            logger.debug("No tasks found, returning 404")
             return jsonify({"error": f"No tasks found for project ID: {project_id}"}), 404
 
-        # --- Fetch all users (for name and department lookup) ---
-        users_ref = db.collection("Users")
-        users = {u.id: u.to_dict() for u in users_ref.stream()}
-
-        def get_user_info(uid):
-            user = users.get(uid)
-            if not user:
-                return "Unknown"
-            name = user.get("name", "Unknown")
-            dept = user.get("division_name", "N/A")
-            return f"{name} ({dept})"
-
-        # --- Create Excel Workbook ---
-        print("Creating Excel workbook...")
-        wb = Workbook()
-        # Remove the default sheet - we'll create monthly sheets directly
-        wb.remove(wb.active)
-        print("Excel workbook created")
-
-        # --- Define Premium Styles ---
-        # Header styles
-        header_font = Font(bold=True, color="FFFFFF", size=11, name="Arial")
-        header_fill = PatternFill(start_color="1E3A8A", end_color="1E3A8A", fill_type="solid")  # Deep blue
-        month_header_font = Font(bold=True, color="1E3A8A", size=18, name="Arial")
-        
-        # Border styles
-        thick_border = Border(
-            left=Side(style='thick', color="1E3A8A"),
-            right=Side(style='thick', color="1E3A8A"),
-            top=Side(style='thick', color="1E3A8A"),
-            bottom=Side(style='thick', color="1E3A8A")
-        )
-        thin_border = Border(
-            left=Side(style='thin', color="E5E7EB"),
-            right=Side(style='thin', color="E5E7EB"),
-            top=Side(style='thin', color="E5E7EB"),
-            bottom=Side(style='thin', color="E5E7EB")
-        )
-        
-        # Alignment styles
-        center_alignment = Alignment(horizontal="center", vertical="center")
-        left_alignment = Alignment(horizontal="left", vertical="top", wrap_text=True)
-        
-        # Premium priority colors with gradients
-        high_priority_fill = PatternFill(start_color="DC2626", end_color="DC2626", fill_type="solid")  # Red
-        medium_priority_fill = PatternFill(start_color="F59E0B", end_color="F59E0B", fill_type="solid")  # Amber
-        low_priority_fill = PatternFill(start_color="10B981", end_color="10B981", fill_type="solid")  # Emerald
-        completed_fill = PatternFill(start_color="6B7280", end_color="6B7280", fill_type="solid")  # Gray
-        
-        # Collaborator colors - each team member gets a unique color
-        collaborator_colors = [
-            "FF6B6B",  # Red
-            "4ECDC4",  # Teal
-            "45B7D1",  # Blue
-            "96CEB4",  # Green
-            "FFEAA7",  # Yellow
-            "DDA0DD",  # Plum
-            "98D8C8",  # Mint
-            "F7DC6F",  # Light Yellow
-            "BB8FCE",  # Light Purple
-            "85C1E9",  # Light Blue
-            "F8C471",  # Light Orange
-            "82E0AA",  # Light Green
-            "F1948A",  # Light Red
-            "85C1E9",  # Sky Blue
-            "D7BDE2"   # Light Lavender
-        ]
-        
-        # Background colors
-        member_cell_fill = PatternFill(start_color="F8FAFC", end_color="F8FAFC", fill_type="solid")  # Light gray
-        weekend_fill = PatternFill(start_color="FEF3C7", end_color="FEF3C7", fill_type="solid")  # Light yellow
-        today_fill = PatternFill(start_color="DBEAFE", end_color="DBEAFE", fill_type="solid")  # Light blue
-
-
-        # --- Create Monthly Sheets ---
-        print("Creating monthly sheets...")
-        
-        # Import calendar module
-        import calendar as cal_module
-        
-        # Get all unique dates from tasks and group by month
-        dates_by_month = {}
-        for task in tasks:
-            start_date = task.get("start_date", "")
-            end_date = task.get("end_date", "")
-            
-            print(f"Task: {task.get('task_name', '')}")
-            print(f"  Start date: {start_date} (type: {type(start_date)})")
-            print(f"  End date: {end_date} (type: {type(end_date)})")
-            
-            if start_date:
-                try:
-                    if isinstance(start_date, str):
-                        if "T" in start_date:
-                            dt = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
-                        else:
-                            dt = datetime.fromisoformat(start_date)
-                    else:
-                        dt = start_date
-                    
-                    if dt.tzinfo:
-                        dt = dt.replace(tzinfo=None)
-                    
-                    month_key = (dt.year, dt.month)
-                    if month_key not in dates_by_month:
-                        dates_by_month[month_key] = set()
-                    dates_by_month[month_key].add(dt.date())
-                    print(f"  Parsed start date: {dt.date()}")
-                except Exception as e:
-                    print(f"  Error parsing start date: {e}")
-            
-            if end_date:
-                try:
-                    if isinstance(end_date, str):
-                        if "T" in end_date:
-                            dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
-                        else:
-                            dt = datetime.fromisoformat(end_date)
-                    else:
-                        dt = end_date
-                    
-                    if dt.tzinfo:
-                        dt = dt.replace(tzinfo=None)
-                    
-                    month_key = (dt.year, dt.month)
-                    if month_key not in dates_by_month:
-                        dates_by_month[month_key] = set()
-                    dates_by_month[month_key].add(dt.date())
-                    print(f"  Parsed end date: {dt.date()}")
-                except Exception as e:
-                    print(f"  Error parsing end date: {e}")
-        
-        print(f"Found {len(dates_by_month)} months with tasks")
-        
-        if not dates_by_month:
-            print("No dates found, creating empty sheet")
-            # Create a single sheet for when there are no tasks
-            ws = wb.create_sheet("No Tasks")
-            ws['A1'] = f"📊 Project: {project_name}"
-            ws['A1'].font = Font(bold=True, size=16, name="Arial", color="1E3A8A")
-            ws['A8'] = "No tasks with dates found"
-            ws['A8'].font = Font(italic=True, color="666666")
-        else:
-            
-            # Create a separate sheet for each month
-            for (year, month), month_dates in sorted(dates_by_month.items()):
-                print(f"Creating sheet for {cal_module.month_name[month]} {year}")
-                
-                # Create new worksheet for this month
-                month_sheet_name = f"{cal_module.month_name[month][:3]} {year}"
-                if month_sheet_name in wb.sheetnames:
-                    ws = wb[month_sheet_name]
-                else:
-                    ws = wb.create_sheet(title=month_sheet_name)
-                
-                # Add premium header to this sheet
-                ws['A1'] = f"📊 {cal_module.month_name[month]} {year} - {project_name}"
-                ws['A1'].font = Font(bold=True, size=16, name="Arial", color="1E3A8A")
-                ws['A1'].fill = PatternFill(start_color="EFF6FF", end_color="EFF6FF", fill_type="solid")
-                ws['A1'].border = thick_border
-                ws['A1'].alignment = center_alignment
-                
-                ws['A2'] = f"🕒 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                ws['A2'].font = Font(size=11, italic=True, name="Arial", color="6B7280")
-                ws['A2'].alignment = center_alignment
-                
-                # Add legend header
-                ws['A3'] = "👥 Team Members:"
-                ws['A3'].font = Font(bold=True, size=12, name="Arial", color="1E3A8A")
-                
-                # Calculate month days
-                month_days = cal_module.monthrange(year, month)[1]
-                
-                # First, collect all tasks for this month
-                month_tasks = []
-                for task in tasks:
-                    assigned_to = task.get("assigned_to", [])
-                    start_date = task.get("start_date", "")
-                    end_date = task.get("end_date", "")
-                    
-                    task_start = None
-                    task_end = None
-                    
-                    if start_date:
-                        try:
-                            if isinstance(start_date, str):
-                                if "T" in start_date:
-                                    dt = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
-                                else:
-                                    dt = datetime.fromisoformat(start_date)
-                            else:
-                                dt = start_date
-                            
-                            if dt.tzinfo:
-                                dt = dt.replace(tzinfo=None)
-                            task_start = dt.date()
-                        except:
-                            pass
-                    
-                    if end_date:
-                        try:
-                            if isinstance(end_date, str):
-                                if "T" in end_date:
-                                    dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
-                                else:
-                                    dt = datetime.fromisoformat(end_date)
-                            else:
-                                dt = end_date
-                            
-                            if dt.tzinfo:
-                                dt = dt.replace(tzinfo=None)
-                            task_end = dt.date()
-                        except:
-                            pass
-                    
-                    # Check if task overlaps with this month
-                    if task_start and task_end:
-                        month_start = datetime(year, month, 1).date()
-                        month_end = datetime(year, month, cal_module.monthrange(year, month)[1]).date()
-                        
-                        # Task overlaps with this month if it starts before month ends and ends after month starts
-                        if task_start <= month_end and task_end >= month_start:
-                            # Get team members for this task
-                            for user_id in assigned_to:
-                                # Get user name from Firestore
-                                try:
-                                    user_doc = users_ref.document(user_id).get()
-                                    if user_doc.exists:
-                                        member_name = user_doc.to_dict().get('name', f'User_{user_id}')
-                                    else:
-                                        member_name = f'User_{user_id}'
-                                except:
-                                    member_name = f'User_{user_id}'
-                                
-                                month_tasks.append({
-                                    'name': task.get('task_name', ''),
-                                    'member': member_name,
-                                    'member_id': user_id,  # Store user ID for filtering
-                                    'start': task_start,
-                                    'end': task_end,
-                                    'priority': task.get('priority_level', 1)  # Use consistent field name
-                                })
-                
-                # Sort tasks by start date
-                month_tasks.sort(key=lambda x: x['start'])
-                print(f"Found {len(month_tasks)} tasks for {cal_module.month_name[month]} {year}")
-                
-                # Create Gantt chart with date headers
-                current_row = 4  # Start after project header
-                
-                # Add priority color legend first
-                ws[f'A{current_row}'] = "🎯 Priority Legend:"
-                ws[f'A{current_row}'].font = Font(bold=True, size=12, name="Arial", color="1E3A8A")
-                current_row += 1
-                
-                # High priority
-                ws[f'A{current_row}'] = "🔴 High Priority (4-5)"
-                ws[f'A{current_row}'].font = Font(size=10, name="Arial")
-                ws[f'A{current_row}'].fill = PatternFill(start_color="FF6B6B", end_color="FF6B6B", fill_type="solid")
-                ws[f'A{current_row}'].border = thin_border
-                ws[f'A{current_row}'].alignment = center_alignment
-                current_row += 1
-                
-                # Medium priority
-                ws[f'A{current_row}'] = "🟡 Medium Priority (2-3)"
-                ws[f'A{current_row}'].font = Font(size=10, name="Arial")
-                ws[f'A{current_row}'].fill = PatternFill(start_color="FFEAA7", end_color="FFEAA7", fill_type="solid")
-                ws[f'A{current_row}'].border = thin_border
-                ws[f'A{current_row}'].alignment = center_alignment
-                current_row += 1
-                
-                # Low priority
-                ws[f'A{current_row}'] = "🟢 Low Priority (1)"
-                ws[f'A{current_row}'].font = Font(size=10, name="Arial")
-                ws[f'A{current_row}'].fill = PatternFill(start_color="96CEB4", end_color="96CEB4", fill_type="solid")
-                ws[f'A{current_row}'].border = thin_border
-                ws[f'A{current_row}'].alignment = center_alignment
-                current_row += 1
-                
-                ws[f'A{current_row}'] = ""  # Empty row after legend
-                current_row += 1
-                
-                # Create day-of-week headers starting from column B
-                day_names = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-                for i, day_name in enumerate(day_names):
-                    col = i + 2  # Start from column B (column 2)
-                    day_cell = ws.cell(row=current_row, column=col, value=day_name)
-                    day_cell.font = header_font
-                    day_cell.fill = header_fill
-                    day_cell.border = thick_border
-                    day_cell.alignment = center_alignment
-                current_row += 1
-                
-                # Group tasks by team member and filter by project collaborators
-                tasks_by_member = {}
-                
-                # Get project collaborators from project data
-                project_collaborator_ids = set(project_data.get('collaborators', []))
-                print(f"Project collaborators: {project_collaborator_ids}")
-                
-                # Only include tasks from project collaborators (compare by user ID)
-                for task in month_tasks:
-                    # Check if this task's member is a project collaborator
-                    if task['member_id'] in project_collaborator_ids:
-                        member = task['member']
-                        if member not in tasks_by_member:
-                            tasks_by_member[member] = []
-                        tasks_by_member[member].append(task)
-                        print(f"Included task '{task['name']}' for collaborator '{member}' (ID: {task['member_id']})")
-                    else:
-                        print(f"Excluded task '{task['name']}' for non-collaborator '{member}' (ID: {task['member_id']})")
-                
-                
-                # Create calendar grid with Gantt bars
-                cal = cal_module.monthcalendar(year, month)
-                
-                # Create calendar rows (weeks) with day numbers and task bars
-                for week_idx, week in enumerate(cal):
-                    # Create day number row
-                    for day_idx, day_num in enumerate(week):
-                        col = day_idx + 2  # Start from column B (column 2)
-                        
-                        if day_num == 0:  # Empty day (not in this month)
-                            # Empty cell
-                            empty_cell = ws.cell(row=current_row, column=col, value="")
-                            empty_cell.border = thin_border
-                            empty_cell.fill = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
-                        else:
-                            # Day number cell
-                            day_cell = ws.cell(row=current_row, column=col, value=day_num)
-                            day_cell.font = Font(bold=True, size=12, name="Arial")
-                            day_cell.border = thin_border
-                            day_cell.alignment = center_alignment
-                            
-                            # Highlight weekends
-                            date_obj = datetime(year, month, day_num)
-                            if date_obj.weekday() >= 5:  # Saturday = 5, Sunday = 6
-                                day_cell.fill = weekend_fill
-                                day_cell.font = Font(bold=True, color="1E3A8A", size=12, name="Arial")
-                            else:
-                                day_cell.fill = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")
-                    
-                    current_row += 1
-                    
-                    # Create task bars row for this week
-                    # Group tasks by member for this week
-                    week_tasks_by_member = {}
-                    for task in month_tasks:
-                        task_start_day = task['start'].day if task['start'].month == month else 1
-                        task_end_day = task['end'].day if task['end'].month == month else month_days
-                        
-                        # Check if task overlaps with this week
-                        week_days = [day for day in week if day != 0]
-                        if week_days and task_start_day <= max(week_days) and task_end_day >= min(week_days):
-                            member = task['member']
-                            if member not in week_tasks_by_member:
-                                week_tasks_by_member[member] = []
-                            week_tasks_by_member[member].append(task)
-                    
-                    # Create task bars for each member in this week
-                    for member, member_tasks in week_tasks_by_member.items():
-                        # Member name in first column
-                        member_cell = ws.cell(row=current_row, column=1, value=member)
-                        member_cell.font = Font(bold=True, size=10, name="Arial", color="1E3A8A")
-                        member_cell.border = thin_border
-                        member_cell.fill = member_cell_fill
-                        member_cell.alignment = center_alignment
-                        
-                        # Track which columns are already used for this row
-                        used_columns = set()
-                        
-                        # Create task bars across the week
-                        for task in member_tasks:
-                            task_start_day = task['start'].day if task['start'].month == month else 1
-                            task_end_day = task['end'].day if task['end'].month == month else month_days
-                            
-                            # Find start and end columns within this week
-                            start_col = None
-                            end_col = None
-                            
-                            for day_idx, day_num in enumerate(week):
-                                if day_num != 0:  # Only consider days in this month
-                                    if day_num == task_start_day:
-                                        start_col = day_idx + 2  # Start from column B (column 2)
-                                    if day_num == task_end_day:
-                                        end_col = day_idx + 2  # Start from column B (column 2)
-                            
-                            # If task starts before this week, start from first day
-                            if start_col is None and task_start_day < min([d for d in week if d != 0]):
-                                start_col = 2  # Column B
-                            
-                            # If task ends after this week, end at last day
-                            if end_col is None and task_end_day > max([d for d in week if d != 0]):
-                                end_col = 8  # Column H (last day column)
-                            
-                            if start_col and end_col:
-                                # Check for overlaps
-                                task_columns = set(range(start_col, end_col + 1))
-                                if task_columns.intersection(used_columns):
-                                    continue
-                                
-                                # Mark columns as used
-                                used_columns.update(task_columns)
-                                
-                                # Create task bar with priority-based color
-                                priority = task.get('priority', 1)  # This should match the field name used above
-                                
-                                # Convert priority to integer if it's a string
-                                try:
-                                    priority = int(priority)
-                                except (ValueError, TypeError):
-                                    priority = 1  # Default to low priority if conversion fails
-                                
-                                print(f"Task '{task['name']}' has priority: {priority} (type: {type(priority)})")
-                                
-                                # Handle different priority scales (1-3 or 1-5)
-                                if priority >= 4:  # High priority (4-5 scale or 3 scale)
-                                    task_fill = PatternFill(start_color="FF6B6B", end_color="FF6B6B", fill_type="solid")
-                                    print(f"  -> Using HIGH priority color (red)")
-                                elif priority >= 2:  # Medium priority (2-3 scale or 2 scale)
-                                    task_fill = PatternFill(start_color="FFEAA7", end_color="FFEAA7", fill_type="solid")
-                                    print(f"  -> Using MEDIUM priority color (yellow)")
-                                else:  # Low priority (1 or default)
-                                    task_fill = PatternFill(start_color="96CEB4", end_color="96CEB4", fill_type="solid")
-                                    print(f"  -> Using LOW priority color (green)")
-                                
-                                if start_col == end_col:
-                                    # Single day task
-                                    cell = ws.cell(row=current_row, column=start_col, value=task['name'])
-                                    cell.border = thin_border
-                                    cell.alignment = center_alignment
-                                    cell.fill = task_fill
-                                    cell.font = Font(size=8, bold=True, color="FFFFFF", name="Arial")
-                                else:
-                                    # Multi-day task - create horizontal bar
-                                    try:
-                                        start_cell = ws.cell(row=current_row, column=start_col, value=task['name'])
-                                        start_cell.border = thin_border
-                                        start_cell.alignment = center_alignment
-                                        start_cell.fill = task_fill
-                                        start_cell.font = Font(size=8, bold=True, color="FFFFFF", name="Arial")
-                                        
-                                        # Merge cells to create the bar
-                                        ws.merge_cells(start_row=current_row, start_column=start_col, 
-                                                     end_row=current_row, end_column=end_col)
-                                        print(f"Successfully merged cells for task '{task['name']}'")
-                                    except Exception as e:
-                                        print(f"Error creating task bar for '{task['name']}': {e}")
-                                        ws.cell(row=current_row, column=start_col, value=task['name'])
-                        
-                        current_row += 1
-                
-                # Calendar view complete - tasks are now displayed inside each day cell
-                
-                # Set column widths and row heights for this sheet
-                # Calendar columns (Mon-Sun) + team member column
-                ws.column_dimensions['A'].width = 20  # Team member column
-                for col in range(2, 9):  # 7 days of the week (columns B-H)
-                    column_letter = ws.cell(row=1, column=col).column_letter
-                    ws.column_dimensions[column_letter].width = 15  # Calendar day columns
-                
-                # Set row heights
-                for row in range(1, current_row + 5):
-                    if row == 1:  # Project header
-                        ws.row_dimensions[row].height = 35
-                    elif row == 2:  # Timestamp
-                        ws.row_dimensions[row].height = 25
-                    elif row >= 8:  # Calendar rows (after headers and legend)
-                        ws.row_dimensions[row].height = 40  # Height for calendar with task bars
-                    else:
-                        ws.row_dimensions[row].height = 25
-
-        # --- Multi-sheet setup complete ---
-        # Each month now has its own sheet with proper sizing
+        # --- All users (for name and department lookup) ---
+        users = user_directory.all_users()
 
-        # --- Save to BytesIO ---
-        print("Saving Excel to buffer...")
-        buffer = BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
-        print(f"Excel saved, buffer size: {buffer.getbuffer().nbytes} bytes")
+        # Excel rendering (openpyxl) is only imported on first export
+        from services.excel_export import build_team_schedule_workbook
+        buffer = build_team_schedule_workbook(tasks, project_name, project_data, users)
 
         filename = f"{project_name.replace(' ', '_')}_Team_Calendar.xlsx"
-        print(f"Returning file: {filename}")
+        logger.debug("Returning file: %s", filename)
         
         return send_file(
             buffer,
@@ -1702,9 +767,7 @@ def export_project_team_schedule_excel(project_id):
         )
 
     except Exception as e:
-        print(f"❌ EXCEL EXPORT ERROR: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ EXCEL EXPORT ERROR: %s", e)
         return jsonify({"error": str(e)}), 500
     
 # =============== UPDATE PROJECT ===============
@@ -1784,27 +847,18 @@ def update_project(project_id):
             if update_data['proj_status'] in valid_statuses:
                 firestore_update['proj_status'] = update_data['proj_status']
         
-        print(f"Updating project {project_id} with data: {firestore_update}")
+        logger.debug("Updating project %s with data: %s", project_id, firestore_update)
         
         # Update the document in Firestore
         doc_ref.update(firestore_update)
+        project_directory.invalidate()
         
         # Get updated project
         updated_doc = doc_ref.get()
         updated_project = updated_doc.to_dict()
         updated_project['id'] = project_id
         
-        # Convert timestamps for JSON response
-        if 'start_date' in updated_project and updated_project['start_date']:
-            updated_project['start_date'] = updated_project['start_date'].isoformat()
-        if 'end_date' in updated_project and updated_project['end_date']:
-            updated_project['end_date'] = updated_project['end_date'].isoformat()
-        if 'createdAt' in updated_project and updated_project['createdAt']:
-            updated_project['createdAt'] = updated_project['createdAt'].isoformat()
-        if 'updatedAt' in updated_project and updated_project['updatedAt']:
-            updated_project['updatedAt'] = updated_project['updatedAt'].isoformat()
-        
-        print(f"✅ Project {project_id} updated successfully")
+        logger.debug("✅ Project %s updated successfully", project_id)
         
         return jsonify({
             'message': 'Project updated successfully',
@@ -1812,8 +866,7 @@ def update_project(project_id):
         }), 200
         
     except Exception as e:
-        print(f"Error updating project: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error updating project: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # =============== EXPORT PROJECT TASKS TO EXCEL ===============
@@ -1823,11 +876,8 @@ def export_project_tasks_xlsx(project_id):
         db = get_firestore_client()
 
         # --- Fetch project info ---
-        project_doc = db.collection("Projects").document(project_id).get()
-        project_name = "Unnamed Project"
-        if project_doc.exists:
-            project_data = project_doc.to_dict()
-            project_name = project_data.get("proj_name", project_name)
+        project_data = project_directory.get_project(project_id) or {}
+        project_name = project_data.get("proj_name", "Unnamed Project")
 
         # --- Fetch tasks ---
         tasks_ref = db.collection("Tasks").where("proj_ID", "==", project_id)
@@ -1837,153 +887,12 @@ def export_project_tasks_xlsx(project_id):
         if not tasks:
             return jsonify({"error": f"No tasks found for project ID: {project_id}"}), 404
 
-        # --- Fetch user info ---
-        users_ref = db.collection("Users")
-        users = {u.id: u.to_dict() for u in users_ref.stream()}
-
-        def get_user_info(uid):
-            user = users.get(uid)
-            if not user:
-                return "Unknown"
-            name = user.get("name", "Unknown")
-            dept = user.get("division_name", "N/A")
-            return f"{name} ({dept})"
-
-        # --- Summary statistics ---
-        total_tasks = len(tasks)
-        completed_tasks = sum(1 for t in tasks if t.get("task_status") == "Completed")
-        incomplete_tasks = total_tasks - completed_tasks
-        avg_priority = round(mean([t.get("priority_level", 0) for t in tasks if isinstance(t.get("priority_level"), (int, float))]), 1)
-
-        # --- Prepare workbook ---
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Project Tasks"
-
-        # --- Title section ---
-        ws["A1"] = f"Project Report: {project_name}"
-        ws["A1"].font = Font(size=14, bold=True)
-        ws["A2"] = f"Project ID: {project_id}"
-        ws["A2"].font = Font(italic=True)
-
-        # --- Summary section ---
-        ws.append([])
-        summary_headers = ["Total Tasks", "Completed", "Incomplete", "Average Priority"]
-        summary_values = [total_tasks, completed_tasks, incomplete_tasks, avg_priority]
-
-        ws.append(summary_headers)
-        ws.append(summary_values)
-
-        for cell in ws[4]:
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill("solid", fgColor="DDDDDD")
-            cell.alignment = Alignment(horizontal="center")
-
-        for cell in ws[5]:
-            cell.alignment = Alignment(horizontal="center")
-
-        ws.append([])
-
-        # --- Task Table ---
-        headers = ["Name", "Due Date", "Status", "Priority", "Owner", "Collaborators"]
-        ws.append(headers)
-        for cell in ws[7]:
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill("solid", fgColor="DDDDDD")
-            cell.alignment = Alignment(horizontal="center")
-
-        for task in tasks:
-            task_name = task.get("task_name")
-            due_date = task.get("end_date")
-            if isinstance(due_date, str):
-                try:
-                    dt = datetime.fromisoformat(due_date.replace("Z", "+00:00"))
-                    due_date = dt.strftime("%d-%m-%Y")
-                except Exception:
-                    due_date = due_date[:10]
-            elif isinstance(due_date, datetime):
-                due_date = due_date.strftime("%d-%m-%Y")
-
-            owner_name = get_user_info(task.get("owner"))
-            collaborators_list = task.get("assigned_to", [])
-            collaborators_str = ", ".join([get_user_info(uid) for uid in collaborators_list]) if collaborators_list else "—"
-
-            ws.append([
-                task_name,
-                due_date,
-                task.get("task_status", "N/A"),
-                task.get("priority_level", "—"),
-                owner_name,
-                collaborators_str,
-            ])
-
-        # --- Auto column widths ---
-        for col in ws.columns:
-            max_length = max(len(str(cell.value)) if cell.value else 0 for cell in col)
-            ws.column_dimensions[col[0].column_letter].width = max_length + 2
-
-        # --- Add Charts ---
-        ws.append([])
-        ws.append(["Tasks by Status"])
-        last_row_index = ws.max_row
-
-        # for cell in ws[last_row_index]:
-        ws[last_row_index][0].font = Font(bold=True)
-        ws[last_row_index][0].fill = PatternFill("solid", fgColor="DDDDDD")
-        ws[last_row_index][0].alignment = Alignment(horizontal="center")
-        chart_start_row = ws.max_row + 2
-
-        # Count tasks by status and priority
-        from collections import Counter
-        status_counts = Counter(t.get("task_status", "Unknown") for t in tasks)
-        priority_counts = Counter(
-            "High" if t.get("priority_level", 0) >= 7 else
-            "Medium" if t.get("priority_level", 0) >= 4 else
-            "Low"
-            for t in tasks
-        )
-
-        # Insert status data
-        ws.append(["Status", "Count"])
-        for k, v in status_counts.items():
-            ws.append([k, v])
-        status_table_end = ws.max_row
-
-        # Create pie chart for Status
-        pie_status = PieChart()
-        labels = Reference(ws, min_col=1, min_row=status_table_end - len(status_counts) + 1, max_row=status_table_end)
-        data = Reference(ws, min_col=2, min_row=status_table_end - len(status_counts), max_row=status_table_end)
-        pie_status.add_data(data, titles_from_data=True)
-        pie_status.set_categories(labels)
-        pie_status.title = "Tasks by Status"
-        ws.add_chart(pie_status, f"E{chart_start_row}")
-
-        # Insert Priority data
-        ws.append([])
-        ws.append(["Tasks by Priority"])
-        last_row_index = ws.max_row
-        ws[last_row_index][0].font = Font(bold=True)
-        ws[last_row_index][0].fill = PatternFill("solid", fgColor="DDDDDD")
-        ws[last_row_index][0].alignment = Alignment(horizontal="center")
-        ws.append(["Priority Level", "Count"])
-        for k, v in priority_counts.items():
-            ws.append([k, v])
-        priority_table_end = ws.max_row
-
-        # Create pie chart for Priority
-        pie_priority = PieChart()
-        labels = Reference(ws, min_col=1, min_row=priority_table_end - len(priority_counts) + 1, max_row=priority_table_end)
-        data = Reference(ws, min_col=2, min_row=priority_table_end - len(priority_counts), max_row=priority_table_end)
-        pie_priority.add_data(data, titles_from_data=True)
-        pie_priority.set_categories(labels)
-        pie_priority.title = "Tasks by Priority"
-        ws.add_chart(pie_priority, f"E{chart_start_row + 15}")
-
-        # --- Save workbook to memory ---
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
+        # --- User info ---
+        users = user_directory.all_users()
 
+        # Excel rendering (openpyxl) is only imported on first export
+        from services.excel_export import build_project_tasks_workbook
+        output = build_project_tasks_workbook(project_id, project_name, tasks, users)
 
         return send_file(
             output,
@@ -1,8 +1,14 @@
 from flask import Blueprint, request, jsonify
-from firebase_utils import get_firestore_client
+from firebase_utils import get_firestore_client, get_document, get_documents, update_document
 from firebase_admin import firestore
+from services.email_service import email_service  # noqa: F401 (registers the send_email job)
+from services.job_queue import job_queue
+from services.user_directory import user_directory
+from logging_utils import get_logger
+from firestore_accounting import firestore_budget
 
 subtask_bp = Blueprint('subtask', __name__)
+logger = get_logger(__name__)
 
 # ==================== NEW SUBTASK CREATION ====================
 @subtask_bp.route('/api/subtasks', methods=['POST', 'OPTIONS'])  # Add /api/ prefix and OPTIONS
@@ -17,14 +23,14 @@ def create_subtask():
     
     try:
         data = request.get_json()
-        print("BACKEND SUBTASK CREATION DEBUG")
-        print(f"Received subtask data: {data}")
+        logger.debug("BACKEND SUBTASK CREATION DEBUG")
+        logger.debug("Received subtask data: %s", data)
         
         # Validate required fields
         required_fields = ['name', 'start_date', 'end_date', 'status', 'parent_task_id']
         for field in required_fields:
             if field not in data:
-                print(f"Missing required field: {field}")
+                logger.debug("Missing required field: %s", field)
                 return jsonify({'error': f'{field} is required'}), 400
 
         # project_id is optional (can be null for standalone tasks)
@@ -54,12 +60,12 @@ def create_subtask():
             # Validate each invited collaborator
             for collab_id in invited_collaborators:
                 if str(collab_id) not in parent_collaborator_ids:
-                    print(f"Collaborator {collab_id} is not in parent task")
+                    logger.debug("Collaborator %s is not in parent task", collab_id)
                     return jsonify({
                         'error': 'All invited collaborators must be collaborators of the parent task'
                     }), 400
             
-            print("All invited collaborators are valid parent task collaborators")
+            logger.debug("All invited collaborators are valid parent task collaborators")
         
         # Create subtask document with proper structure
         subtask_data = {
@@ -80,12 +86,12 @@ def create_subtask():
             'updatedAt': firestore.SERVER_TIMESTAMP
         }
         
-        print(f"Adding subtask to Firestore: {subtask_data}")
+        logger.debug("Adding subtask to Firestore: %s", subtask_data)
         
         # Use lowercase 'subtasks' collection
         doc_ref = db.collection('subtasks').add(subtask_data)
         
-        print(f"Subtask created successfully with ID: {doc_ref[1].id}")
+        logger.debug("Subtask created successfully with ID: %s", doc_ref[1].id)
         
         # Prepare response data
         response_data = {
@@ -110,21 +116,22 @@ def create_subtask():
         return jsonify(response_data), 201
         
     except Exception as e:
-        print(f"Error creating subtask: {str(e)}")
-        print(f"Error type: {type(e)}")
+        logger.error("Error creating subtask: %s", e)
+        logger.error("Error type: %s", type(e))
         import traceback
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.debug("Traceback: %s", traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
 # ==================== GET ALL SUBTASKS WITHIN TASK ====================
 @subtask_bp.route('/api/tasks/<task_id>/subtasks', methods=['GET'])
+@firestore_budget(reads=100)
 def get_task_subtasks(task_id):
     try:
-        print(f"Fetching subtasks for task_id: {task_id}")
+        logger.debug("Fetching subtasks for task_id: %s", task_id)
         db = get_firestore_client()
         subtasks = db.collection('subtasks').where('parent_task_id', '==', task_id).get()
 
-        print(f"Found {len(subtasks)} total subtasks")
+        logger.debug("Found %s total subtasks", len(subtasks))
         
         subtasks_list = []
         for subtask in subtasks:
@@ -134,15 +141,15 @@ def get_task_subtasks(task_id):
             # FILTER OUT DELETED SUBTASKS (only show active ones)
             if not subtask_data.get('is_deleted', False):
                 subtasks_list.append(subtask_data)
-                print(f"  - Active Subtask: {subtask_data.get('name')} (ID: {subtask.id})")
+                logger.debug("  - Active Subtask: %s (ID: %s)", subtask_data.get('name'), subtask.id)
             else:
-                print(f"  - Skipped Deleted Subtask: {subtask_data.get('name')} (ID: {subtask.id})")
+                logger.debug("  - Skipped Deleted Subtask: %s (ID: %s)", subtask_data.get('name'), subtask.id)
         
-        print(f"Returning {len(subtasks_list)} active subtasks")
+        logger.debug("Returning %s active subtasks", len(subtasks_list))
         return jsonify({'subtasks': subtasks_list}), 200
         
     except Exception as e:
-        print(f"Error fetching subtasks: {str(e)}")
+        logger.error("Error fetching subtasks: %s", e)
         return jsonify({'error': str(e)}), 500
     
 @subtask_bp.route('/api/subtasks/<subtask_id>', methods=['GET','PUT', 'OPTIONS'])
@@ -158,10 +165,10 @@ def get_or_update_subtask(subtask_id):
     # Handle GET request
     if request.method == 'GET':
         try:
-            print(f"📖 Fetching subtask by ID: {subtask_id}")
+            logger.debug("📖 Fetching subtask by ID: %s", subtask_id)
             db = get_firestore_client()
             subtask_ref = db.collection('subtasks').document(subtask_id)
-            subtask_doc = subtask_ref.get()
+            subtask_doc = get_document(subtask_ref)
             
             if not subtask_doc.exists:
                 return jsonify({'error': 'Subtask not found'}), 404
@@ -175,10 +182,12 @@ def get_or_update_subtask(subtask_id):
             collaborator_ids = subtask_data.get('assigned_to', [])
             collaborators_info = []
             
+            # Owner + collaborators in one batched read
+            users_by_id = get_documents(db, 'Users', [*collaborator_ids, subtask_data.get('owner')])
+            
             for collab_id in collaborator_ids:
-                user_doc = db.collection('Users').document(collab_id).get()
-                if user_doc.exists:
-                    user_data = user_doc.to_dict()
+                user_data = users_by_id.get(str(collab_id))
+                if user_data is not None:
                     collaborators_info.append({
                         'id': collab_id,
                         'name': user_data.get('name', 'Unknown User'),
@@ -196,9 +205,8 @@ def get_or_update_subtask(subtask_id):
             owner_id = subtask_data.get('owner')
             owner_info = None
             if owner_id:
-                owner_doc = db.collection('Users').document(owner_id).get()
-                if owner_doc.exists:
-                    owner_data = owner_doc.to_dict()
+                owner_data = users_by_id.get(str(owner_id))
+                if owner_data is not None:
                     owner_info = {
                         'id': owner_id,
                         'name': owner_data.get('name', 'Unknown User'),
@@ -226,26 +234,17 @@ def get_or_update_subtask(subtask_id):
                 'updatedAt': subtask_data.get('updatedAt')
             }
             
-            for field in ['start_date', 'end_date', 'createdAt', 'updatedAt']:
-                if field in response_data and response_data[field]:
-                    try:
-                        if hasattr(response_data[field], 'isoformat'):
-                            response_data[field] = response_data[field].isoformat()
-                    except:
-                        pass
-            
             return jsonify(response_data), 200
             
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error fetching subtask: %s", e)
             return jsonify({'error': str(e)}), 500
     
     try:
         data = request.get_json()
-        print("=== BACKEND SUBTASK UPDATE DEBUG ===")
-        print(f"Updating subtask ID: {subtask_id}")
-        print(f"Received update data: {data}")
+        logger.debug("=== BACKEND SUBTASK UPDATE DEBUG ===")
+        logger.debug("Updating subtask ID: %s", subtask_id)
+        logger.debug("Received update data: %s", data)
 
         # Get user info first, for all updates
         current_user_id = request.headers.get('X-User-Id')
@@ -269,10 +268,10 @@ def get_or_update_subtask(subtask_id):
         
         # Check if subtask exists
         subtask_ref = db.collection('subtasks').document(subtask_id)
-        subtask_doc = subtask_ref.get()
+        subtask_doc = get_document(subtask_ref)
         
         if not subtask_doc.exists:
-            print(f"Subtask not found: {subtask_id}")
+            logger.debug("Subtask not found: %s", subtask_id)
             return jsonify({'error': 'Subtask not found'}), 404
         
         subtask_data = subtask_doc.to_dict()
@@ -282,12 +281,12 @@ def get_or_update_subtask(subtask_id):
         # ==================== AUTHORIZATION CHECK ====================
         # Check if user is involved in the subtask (owner or collaborator)
         if current_user_id not in collaborators and current_user_id != current_owner:
-            print(f"❌ User {current_user_id} not authorized - not a collaborator or owner")
+            logger.error("❌ User %s not authorized - not a collaborator or owner", current_user_id)
             return jsonify({'error': 'You are not authorized to edit this subtask'}), 403
         
         # Determine if current user is the owner
         is_owner = (current_user_id == current_owner)
-        print(f"🔐 User is owner: {is_owner}")
+        logger.debug("🔐 User is owner: %s", is_owner)
         
         # ==================== PERMISSION-BASED FIELD FILTERING ====================
         # Define restricted fields (only owner can edit these)
@@ -295,19 +294,19 @@ def get_or_update_subtask(subtask_id):
         
         # If user is NOT owner, filter out restricted fields
         if not is_owner:
-            print(f"👤 User is collaborator - filtering restricted fields")
+            logger.debug("👤 User is collaborator - filtering restricted fields")
             original_data = data.copy()
             
             # Remove all restricted fields from update
             for field in restricted_fields:
                 if field in data:
-                    print(f"  ❌ Removing restricted field: {field}")
+                    logger.error("  ❌ Removing restricted field: %s", field)
                     data.pop(field)
             
             # Only allow status and description for collaborators
             allowed_fields = ['status', 'description']
             data = {k: v for k, v in data.items() if k in allowed_fields}
-            print(f"✅ Collaborator can only update: {list(data.keys())}")
+            logger.debug("✅ Collaborator can only update: %s", list(data.keys()))
         
         # ==================== VALIDATION ====================
         # Validate required field: name (if owner is trying to update it)
@@ -338,7 +337,7 @@ def get_or_update_subtask(subtask_id):
                     if end_date < start_date:
                         return jsonify({'error': 'End date must be after start date'}), 400
                 except Exception as e:
-                    print(f"Date validation error: {e}")
+                    logger.error("Date validation error: %s", e)
                     return jsonify({'error': 'Invalid date format'}), 400
         
         # ==================== COLLABORATOR VALIDATION (if owner is updating) ====================
@@ -349,7 +348,7 @@ def get_or_update_subtask(subtask_id):
             if new_assigned_to and parent_task_id:
                 # Get parent task collaborators
                 parent_task_ref = db.collection('Tasks').document(parent_task_id)
-                parent_task_doc = parent_task_ref.get()
+                parent_task_doc = get_document(parent_task_ref)
                 
                 if parent_task_doc.exists:
                     parent_task_data = parent_task_doc.to_dict()
@@ -363,7 +362,7 @@ def get_or_update_subtask(subtask_id):
                                 'error': f'Collaborator {collab_id} is not assigned to the parent task'
                             }), 400
                     
-                    print("All updated collaborators are valid")
+                    logger.debug("All updated collaborators are valid")
         
         # ==================== OWNERSHIP TRANSFER VALIDATION ====================
         if 'owner' in data and is_owner:
@@ -382,7 +381,7 @@ def get_or_update_subtask(subtask_id):
             
             if parent_task_id:
                 parent_task_ref = db.collection('Tasks').document(parent_task_id)
-                parent_task_doc = parent_task_ref.get()
+                parent_task_doc = get_document(parent_task_ref)
                 
                 if parent_task_doc.exists:
                     parent_task_data = parent_task_doc.to_dict()
@@ -399,10 +398,10 @@ def get_or_update_subtask(subtask_id):
         
         # ==================== STATUS HISTORY LOGGING ====================
         if 'status' in data and data['status'] != subtask_data.get('status'):
-            print(f"📝 Status change detected: {subtask_data.get('status')} → {data['status']}")
+            logger.debug("📝 Status change detected: %s → %s", subtask_data.get('status'), data['status'])
             
             # Get user info for logging
-            user_doc = db.collection('Users').document(current_user_id).get()
+            user_doc = get_document(db.collection('Users').document(current_user_id))
             user_name = user_doc.to_dict().get('name', 'Unknown User') if user_doc.exists else 'Unknown User'
             
             # Create status history entry
@@ -420,7 +419,7 @@ def get_or_update_subtask(subtask_id):
             status_history.append(status_entry)
             data['status_history'] = status_history
             
-            print(f"✅ Status history entry added: {status_entry}")
+            logger.debug("✅ Status history entry added: %s", status_entry)
         
         # ==================== PREPARE UPDATE DATA ====================
         update_data = {}
@@ -437,16 +436,16 @@ def get_or_update_subtask(subtask_id):
         # Always update the timestamp
         update_data['updatedAt'] = firestore.SERVER_TIMESTAMP
         
-        print(f"Updating subtask with data: {update_data}")
+        logger.debug("Updating subtask with data: %s", update_data)
         
         # Update in Firestore
-        subtask_ref.update(update_data)
+        update_document(subtask_ref, update_data)
         
         # Get updated subtask
-        updated_subtask = subtask_ref.get().to_dict()
+        updated_subtask = get_document(subtask_ref).to_dict()
         updated_subtask['id'] = subtask_id
         
-        print(f"Subtask updated successfully: {subtask_id}")
+        logger.debug("Subtask updated successfully: %s", subtask_id)
         
         # Prepare response data
         response_data = {
@@ -473,67 +472,72 @@ def get_or_update_subtask(subtask_id):
         try:
             new_owner_id = data.get('owner')
             
-            print(f"🔍 EMAIL CHECK - new_owner_id: {new_owner_id}")
-            print(f"🔍 EMAIL CHECK - old_owner_id: {old_owner_id}")
-            print(f"🔍 EMAIL CHECK - Are they different? {old_owner_id != new_owner_id}")
+            logger.debug("🔍 EMAIL CHECK - new_owner_id: %s", new_owner_id)
+            logger.debug("🔍 EMAIL CHECK - old_owner_id: %s", old_owner_id)
+            logger.debug("🔍 EMAIL CHECK - Are they different? %s", old_owner_id != new_owner_id)
             
             # Check if owner has changed
             if new_owner_id and old_owner_id != new_owner_id:
-                print(f"👤 OWNER CHANGE DETECTED: {old_owner_id} → {new_owner_id}")
-                from services.email_service import email_service
+                logger.debug("👤 OWNER CHANGE DETECTED: %s → %s", old_owner_id, new_owner_id)
                 
                 # Get new owner's info
-                print(f"📧 Fetching new owner data for: {new_owner_id}")
-                new_owner_doc = db.collection('Users').document(new_owner_id).get()
+                logger.debug("📧 Fetching new owner data for: %s", new_owner_id)
+                new_owner_doc = get_document(db.collection('Users').document(new_owner_id))
                 
                 if new_owner_doc.exists:
                     new_owner_data = new_owner_doc.to_dict()
                     new_owner_email = new_owner_data.get('email')
                     new_owner_name = new_owner_data.get('name', 'User')
-                    print(f"✅ New owner found: {new_owner_name} ({new_owner_email})")
+                    logger.debug("✅ New owner found: %s (%s)", new_owner_name, new_owner_email)
                     
                     # Get old owner's info (for CC)
                     old_owner_email = None
                     old_owner_name = 'Previous Owner'
                     if old_owner_id:
-                        print(f"📧 Fetching old owner data for: {old_owner_id}")
-                        old_owner_doc = db.collection('Users').document(old_owner_id).get()
+                        logger.debug("📧 Fetching old owner data for: %s", old_owner_id)
+                        old_owner_doc = get_document(db.collection('Users').document(old_owner_id))
                         if old_owner_doc.exists:
                             old_owner_data = old_owner_doc.to_dict()
                             old_owner_email = old_owner_data.get('email')
                             old_owner_name = old_owner_data.get('name', 'Previous Owner')
-                            print(f"✅ Old owner found: {old_owner_name} ({old_owner_email})")
+                            logger.debug("✅ Old owner found: %s (%s)", old_owner_name, old_owner_email)
                     
                     subtask_name = updated_subtask.get('name', 'Untitled Subtask')
-                    print(f"📨 Sending ownership transfer email...")
+                    logger.debug("📨 Queueing ownership transfer email...")
                     
-                    # Send email notification
-                    email_service.send_ownership_transfer_email(
+                    # Send email notification (in the background)
+                    job_queue.enqueue(
+                        'send_email',
+                        method='send_subtask_transfer_ownership_email',
                         new_owner_email=new_owner_email,
                         new_owner_name=new_owner_name,
+                        old_owner_email=old_owner_email or '',
                         old_owner_name=old_owner_name,
                         subtask_name=subtask_name,
-                        cc_email=old_owner_email
+                        subtask_desc=updated_subtask.get('description', ''),
+                        parent_task_name='',
+                        project_name='',
+                        transferred_by_name=old_owner_name,
+                        start_date=str(updated_subtask.get('start_date') or 'Not specified')[:10],
+                        end_date=str(updated_subtask['end_date'])[:10] if updated_subtask.get('end_date') else None
                     )
-                    print(f"✅ Email sent successfully to {new_owner_email}")
+                    logger.debug("✅ Email queued for %s", new_owner_email)
                 else:
-                    print(f"⚠️ New owner user document not found: {new_owner_id}")
+                    logger.warning("⚠️ New owner user document not found: %s", new_owner_id)
             else:
-                print("⏭️  No owner change detected")
+                logger.debug("⏭️  No owner change detected")
         
         except Exception as email_error:
             # Don't fail the entire update if email fails
-            print(f"⚠️  Email notification failed: {str(email_error)}")
-            import traceback
-            traceback.print_exc()
+            logger.warning("⚠️  Email notification failed: %s", str(email_error))
         
         return jsonify(response_data), 200
         
     except Exception as e:
-        print(f"Error updating subtask: {str(e)}")
-        print(f"Error type: {type(e)}")
+        logger.error("Error updating subtask: %s", e)
+        logger.error("Error type: %s", type(e))
         import traceback
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.debug("Traceback: %s", traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
 # ==================== GET SINGLE SUBTASK BY ID ====================
@@ -552,7 +556,7 @@ def get_subtask_by_id(subtask_id):
         return response, 200
     
     try:
-        print(f"📖 Fetching subtask by ID: {subtask_id}")
+        logger.debug("📖 Fetching subtask by ID: %s", subtask_id)
         
         # Get Firestore client
         db = get_firestore_client()
@@ -562,7 +566,7 @@ def get_subtask_by_id(subtask_id):
         subtask_doc = subtask_ref.get()
         
         if not subtask_doc.exists:
-            print(f"❌ Subtask not found: {subtask_id}")
+            logger.error("❌ Subtask not found: %s", subtask_id)
             return jsonify({'error': 'Subtask not found'}), 404
         
         # Get subtask data
@@ -571,17 +575,19 @@ def get_subtask_by_id(subtask_id):
         
         # Check if subtask is deleted
         if subtask_data.get('is_deleted', False):
-            print(f"⚠️ Subtask is deleted: {subtask_id}")
+            logger.warning("⚠️ Subtask is deleted: %s", subtask_id)
             return jsonify({'error': 'Subtask has been deleted'}), 404
         
         # Get collaborator details (expand user info)
         collaborator_ids = subtask_data.get('assigned_to', [])
         collaborators_info = []
         
+        # Owner + collaborators in one batched read
+        users_by_id = get_documents(db, 'Users', [*collaborator_ids, subtask_data.get('owner')])
+        
         for collab_id in collaborator_ids:
-            user_doc = db.collection('Users').document(collab_id).get()
-            if user_doc.exists:
-                user_data = user_doc.to_dict()
+            user_data = users_by_id.get(str(collab_id))
+            if user_data is not None:
                 collaborators_info.append({
                     'id': collab_id,
                     'name': user_data.get('name', 'Unknown User'),
@@ -600,9 +606,8 @@ def get_subtask_by_id(subtask_id):
         owner_id = subtask_data.get('owner')
         owner_info = None
         if owner_id:
-            owner_doc = db.collection('Users').document(owner_id).get()
-            if owner_doc.exists:
-                owner_data = owner_doc.to_dict()
+            owner_data = users_by_id.get(str(owner_id))
+            if owner_data is not None:
                 owner_info = {
                     'id': owner_id,
                     'name': owner_data.get('name', 'Unknown User'),
@@ -631,22 +636,11 @@ def get_subtask_by_id(subtask_id):
             'updatedAt': subtask_data.get('updatedAt')
         }
         
-        # Convert timestamps to ISO format if needed
-        for field in ['start_date', 'end_date', 'createdAt', 'updatedAt']:
-            if field in response_data and response_data[field]:
-                try:
-                    if hasattr(response_data[field], 'isoformat'):
-                        response_data[field] = response_data[field].isoformat()
-                except:
-                    pass
-        
-        print(f"✅ Subtask fetched successfully: {subtask_data.get('name')}")
+        logger.debug("✅ Subtask fetched successfully: %s", subtask_data.get('name'))
         return jsonify(response_data), 200
         
     except Exception as e:
-        print(f"❌ Error fetching subtask: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error fetching subtask: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # ==================== TRANSFER SUBTASK OWNERSHIP ====================
@@ -708,15 +702,14 @@ def transfer_subtask_ownership(subtask_id):
         }), 200
         
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error transferring subtask ownership: %s", e)
         return jsonify({'error': str(e)}), 500
     
 # =============== SOFT DELETE SUBTASK ===============
 @subtask_bp.route('/api/subtasks/<subtask_id>/delete', methods=['PUT'])
 def soft_delete_subtask(subtask_id):
     try:
-        print(f"🗑️ Soft deleting subtask: {subtask_id}")
+        logger.debug("🗑️ Soft deleting subtask: %s", subtask_id)
         
         db = get_firestore_client()
         
@@ -725,7 +718,7 @@ def soft_delete_subtask(subtask_id):
         subtask_doc = subtask_ref.get()
         
         if not subtask_doc.exists:
-            print(f"Subtask {subtask_id} not found")
+            logger.debug("Subtask %s not found", subtask_id)
             return jsonify({'error': 'Subtask not found'}), 404
         
         subtask_data = subtask_doc.to_dict()
@@ -749,7 +742,7 @@ def soft_delete_subtask(subtask_id):
         }
         
         subtask_ref.update(update_data)
-        print(f"Subtask {subtask_id} soft deleted successfully")
+        logger.debug("Subtask %s soft deleted successfully", subtask_id)
         
         return jsonify({
             "message": "Subtask moved to deleted items successfully",
@@ -759,7 +752,7 @@ def soft_delete_subtask(subtask_id):
         }), 200
         
     except Exception as e:
-        print(f"Error soft deleting subtask {subtask_id}: {str(e)}")
+        logger.error("Error soft deleting subtask %s: %s", subtask_id, e)
         return jsonify({"error": str(e)}), 500
 
 @subtask_bp.route('/api/subtasks/test-debug', methods=['GET'])
@@ -769,7 +762,7 @@ def test_debug():
         db = get_firestore_client()
         user_id = request.args.get('userId', 'test')
         
-        print(f"TEST DEBUG: Looking for user {user_id}")
+        logger.debug("TEST DEBUG: Looking for user %s", user_id)
         
         # Get ALL subtasks (no filtering)
         all_subtasks = db.collection('subtasks').get()
@@ -836,7 +829,7 @@ def test_route_works():
 def get_deleted_subtasks_NEW():
     """Get deleted subtasks for a user (only subtasks they directly own)"""
     try:
-        print("DELETED SUBTASKS ROUTE HIT (OWNERSHIP RESTRICTED)!")
+        logger.debug("DELETED SUBTASKS ROUTE HIT (OWNERSHIP RESTRICTED)!")
         
         db = get_firestore_client()
         user_id = request.args.get("userId")
@@ -844,7 +837,7 @@ def get_deleted_subtasks_NEW():
         if not user_id:
             return jsonify({"error": "userId parameter is required"}), 400
         
-        print(f"Looking for deleted subtasks OWNED BY user: {user_id}")
+        logger.debug("Looking for deleted subtasks OWNED BY user: %s", user_id)
         
         # Query ALL deleted subtasks
         all_deleted_query = db.collection("subtasks").where("is_deleted", "==", True)
@@ -859,44 +852,34 @@ def get_deleted_subtasks_NEW():
             # ONLY include subtasks that the user directly owns
             # EXCLUDE cascade deleted subtasks owned by other users
             if subtask.get('owner') == user_id:
-                # Convert timestamps to ISO format
-                for field in ['deleted_at', 'start_date', 'end_date']:
-                    if field in subtask and subtask[field]:
-                        try:
-                            subtask[field] = subtask[field].isoformat()
-                        except:
-                            pass
-                
                 subtasks.append(subtask)
                 
                 # Debug: Show what type of deletion this was
                 if subtask.get('deleted_by_cascade', False):
-                    print(f"INCLUDED CASCADE (user owns subtask): {subtask.get('name', 'Unknown')}")
+                    logger.debug("INCLUDED CASCADE (user owns subtask): %s", subtask.get('name', 'Unknown'))
                 else:
-                    print(f"INCLUDED DIRECT DELETE: {subtask.get('name', 'Unknown')}")
+                    logger.debug("INCLUDED DIRECT DELETE: %s", subtask.get('name', 'Unknown'))
             
             else:
                 # Debug: Show what we're excluding
                 if subtask.get('deleted_by_cascade', False):
                     cascade_parent_id = subtask.get('cascade_parent_id')
-                    print(f"EXCLUDED CASCADE (not subtask owner): {subtask.get('name', 'Unknown')} (subtask owner: {subtask.get('owner')}, task: {cascade_parent_id})")
+                    logger.debug("EXCLUDED CASCADE (not subtask owner): %s (subtask owner: %s, task: %s)", subtask.get('name', 'Unknown'), subtask.get('owner'), cascade_parent_id)
                 else:
-                    print(f"EXCLUDED (not owner): {subtask.get('name', 'Unknown')} (owner: {subtask.get('owner')})")
+                    logger.debug("EXCLUDED (not owner): %s (owner: %s)", subtask.get('name', 'Unknown'), subtask.get('owner'))
         
-        print(f"📊 TOTAL FOUND: {len(subtasks)} deleted subtasks owned by user")
+        logger.debug("📊 TOTAL FOUND: %s deleted subtasks owned by user", len(subtasks))
         return jsonify(subtasks), 200
 
     except Exception as e:
-        print(f"ERROR: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("ERROR: %s", e)
         return jsonify({"error": str(e)}), 500
 
 # =============== RESTORE SUBTASK ===============
 @subtask_bp.route('/api/subtasks/<subtask_id>/restore-new', methods=['PUT'])
 def restore_subtask_NEW(subtask_id):
     try:
-        print(f"Restoring subtask: {subtask_id}")
+        logger.debug("Restoring subtask: %s", subtask_id)
         
         db = get_firestore_client()
         subtask_ref = db.collection('subtasks').document(subtask_id)
@@ -921,7 +904,7 @@ def restore_subtask_NEW(subtask_id):
 @subtask_bp.route('/api/subtasks/<subtask_id>/permanent-new', methods=['DELETE'])
 def permanently_delete_subtask_NEW(subtask_id):
     try:
-        print(f"Permanently deleting subtask: {subtask_id}")
+        logger.debug("Permanently deleting subtask: %s", subtask_id)
         
         db = get_firestore_client()
         subtask_ref = db.collection('subtasks').document(subtask_id)
@@ -944,60 +927,56 @@ def permanently_delete_subtask_NEW(subtask_id):
 def get_team_subtasks(manager_id):
     """Get all subtasks owned by team members under this manager"""
     try:
-        print(f"Getting team subtasks for manager: {manager_id}")
+        logger.debug("Getting team subtasks for manager: %s", manager_id)
         
         db = get_firestore_client()
         
         # Step 1: Get the manager's info
-        manager_doc = db.collection('Users').document(manager_id).get()
+        manager_data = user_directory.get_user(manager_id)
         
-        if not manager_doc.exists:
-            print(f"Manager not found: {manager_id}")
+        if manager_data is None:
+            logger.debug("Manager not found: %s", manager_id)
             return jsonify({'error': 'Manager not found'}), 404
         
-        manager_data = manager_doc.to_dict()
         manager_division = manager_data.get('division_name')
         manager_role = manager_data.get('role_num')
         
-        print(f"DEBUG: manager_role type: {type(manager_role).__name__}, value: {manager_role}")
+        logger.debug("DEBUG: manager_role type: %s, value: %s", type(manager_role).__name__, manager_role)
         
         # Convert role_num to int if it's a string
         if isinstance(manager_role, str):
             manager_role = int(manager_role)
-            print(f"DEBUG: Converted manager_role to int: {manager_role}")
+            logger.debug("DEBUG: Converted manager_role to int: %s", manager_role)
         
-        print(f"Manager: {manager_data.get('name')} | Division: {manager_division} | Role: {manager_role}")
+        logger.debug("Manager: %s | Division: %s | Role: %s", manager_data.get('name'), manager_division, manager_role)
         
         # Validate that user is actually a manager or director
         # role_num: 1=Director, 2=Division Manager, 3=Manager, 4=Staff
-        print(f"DEBUG: Checking if {manager_role} is in [1, 2, 3]")
+        logger.debug("DEBUG: Checking if %s is in [1, 2, 3]", manager_role)
         if manager_role not in [1, 2, 3]:  # 1=Director, 2=Division Manager, 3=Manager
-            print(f"❌ AUTHORIZATION FAILED: User role_num={manager_role}, allowed=[1, 2, 3]")
-            print(f"❌ User details: name={manager_data.get('name')}, role_name={manager_data.get('role_name')}")
+            logger.error("❌ AUTHORIZATION FAILED: User role_num=%s, allowed=[1, 2, 3]", manager_role)
+            logger.error("❌ User details: name=%s, role_name=%s", manager_data.get('name'), manager_data.get('role_name'))
             return jsonify({'error': f'User is not authorized to view team subtasks (role_num: {manager_role})'}), 403
         
         if not manager_division:
-            print(f"Manager has no division")
+            logger.debug("Manager has no division")
             return jsonify({'error': 'Manager has no division assigned'}), 400
         
         # Step 2: Get all staff in the same division (role_num = 4)
-        staff_query = db.collection('Users').where('division_name', '==', manager_division).where('role_num', '==', 4)
-        staff_docs = staff_query.get()
+        staff_users = user_directory.get_users_by_division(manager_division, role_num=4)
         
         # Create a map of user_id -> user_name for quick lookup
         staff_map = {}
         staff_ids = []
         
-        for staff_doc in staff_docs:
-            staff_data = staff_doc.to_dict()
-            staff_id = staff_doc.id
+        for staff_id, staff_data in staff_users.items():
             staff_ids.append(staff_id)
             staff_map[staff_id] = staff_data.get('name', 'Unknown User')
         
-        print(f"Found {len(staff_ids)} staff members in {manager_division} division")
+        logger.debug("Found %s staff members in %s division", len(staff_ids), manager_division)
         
         if not staff_ids:
-            print(f"No staff members found in division")
+            logger.debug("No staff members found in division")
             return jsonify([]), 200
         
         # Step 3: Get all subtasks owned by these staff members
@@ -1007,7 +986,7 @@ def get_team_subtasks(manager_id):
         # Process in batches of 10
         for i in range(0, len(staff_ids), 10):
             batch_ids = staff_ids[i:i+10]
-            print(f"Querying subtasks for batch {i//10 + 1} ({len(batch_ids)} staff)")
+            logger.debug("Querying subtasks for batch %s (%s staff)", i//10 + 1, len(batch_ids))
             
             subtasks_query = db.collection('subtasks').where('owner', 'in', batch_ids).where('is_deleted', '==', False)
             subtasks_docs = subtasks_query.get()
@@ -1033,23 +1012,12 @@ def get_team_subtasks(manager_id):
                     'attachments': subtask_data.get('attachments', [])
                 }
                 
-                # Convert Firestore timestamps to ISO format 
-                for field in ['start_date', 'end_date']:
-                    if field in subtask_response and subtask_response[field]:
-                        try:
-                            if hasattr(subtask_response[field], 'isoformat'):
-                                subtask_response[field] = subtask_response[field].isoformat()
-                        except:
-                            pass
-                
                 all_subtasks.append(subtask_response)
         
-        print(f"Found {len(all_subtasks)} total subtasks for {manager_division} team")
+        logger.debug("Found %s total subtasks for %s team", len(all_subtasks), manager_division)
         
         return jsonify(all_subtasks), 200
         
     except Exception as e:
-        print(f"Error getting team subtasks: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting team subtasks: %s", e)
         return jsonify({'error': str(e)}), 500
@@ -1,5 +1,5 @@
 from flask import Blueprint, jsonify, request
-from firebase_utils import get_firestore_client
+from firebase_utils import get_firestore_client, get_document, get_documents, update_document, invalidate_document
 from firebase_admin import firestore
 from datetime import datetime, timedelta
 import calendar
@@ -10,10 +10,25 @@ import os
 
 # Add parent directory to path for importsx 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from services.notification_service import notification_service
+from services.notification_service import notification_service  # noqa: F401 (registers the notify_* jobs)
+from services.job_queue import job_queue
+from services.project_directory import project_directory
+from services.user_directory import user_directory
+from services.task_field_service import (
+    DEFAULT_TASK_STATUS, TASK_SERVER_FILTERS, known_task_status, canonical_task_status
+)
+from services.user_task_index import apply_updates, user_task_index
+from logging_utils import get_logger
+from http_cache import etag_from
+from firestore_accounting import firestore_budget
+from query_utils import (
+    get_page_args, fetch_page, page_response, get_fields_arg, apply_projection, TASK_FIELD_PRESETS,
+    get_stream_format, stream_json_response, stream_any_of, fetch_page_any_of,
+)
 
 
 tasks_bp = Blueprint('tasks', __name__)
+logger = get_logger(__name__)
 
 def _parse_date_value(value):
     if value is None:
@@ -122,14 +137,38 @@ def _should_stop_recurrence(recurrence_info, next_occurrence_index, next_start_d
     return False
 
 
+# =============== BACKGROUND JOBS ===============
+@job_queue.handler('spawn_next_occurrence')
+def spawn_next_occurrence_job(task_id, task_data):
+    """Job: create the next instance of a recurring task and notify its assignees"""
+    db = get_firestore_client()
+    task_ref = db.collection('Tasks').document(task_id)
+    firestore_task_data = dict(task_data, createdAt=firestore.SERVER_TIMESTAMP, updatedAt=firestore.SERVER_TIMESTAMP)
+    # set() with a fixed ID, so a retried job overwrites instead of duplicating
+    user_task_index.create_task(task_ref, firestore_task_data)
+
+    assigned_users = task_data.get('assigned_to') or []
+    if assigned_users:
+        job_queue.enqueue(
+            'notify_assigned',
+            task_data={
+                'task_name': task_data.get('task_name', 'Unknown Task'),
+                'task_ID': task_data.get('task_ID'),
+                'id': task_id,
+                'proj_ID': task_data.get('proj_ID')
+            },
+            user_ids=assigned_users
+        )
+
+
 # =============== CREATE TASK ===============
 @tasks_bp.route('/api/tasks', methods=['POST'])
 def create_task():
     try:
         task_data = request.get_json()
-        print("BACKEND TASK CREATION DEBUG")
-        print(f"Received task data: {task_data}")
-        print(f"Priority level received: {task_data.get('priority_level')}")  # Changed to priority_level
+        logger.debug("BACKEND TASK CREATION DEBUG")
+        logger.debug("Received task data: %s", task_data)
+        logger.debug("Priority level received: %s", task_data.get('priority_level'))  # Changed to priority_level
 
         # Validate required fields
         required_fields = ['task_name', 'start_date', 'priority_level']  # Changed to priority_level
@@ -256,17 +295,10 @@ def create_task():
         # Get project ID from project name if provided
         proj_id = None
         if task_data.get('proj_name'):
-            projects_ref = db.collection('Projects')
-            projects_query = projects_ref.where('proj_name', '==', task_data.get('proj_name')).limit(1)
-            project_docs = list(projects_query.stream())
-            
-            if project_docs:
-                proj_id = project_docs[0].id
-                print(f"Found project ID: {proj_id} for project name: {task_data.get('proj_name')}")
-                try:
-                    project_doc_data = project_docs[0].to_dict() or {}
-                except Exception:
-                    project_doc_data = {}
+            proj_id, project_doc_data = project_directory.get_project_by_name(task_data.get('proj_name'))
+
+            if proj_id:
+                logger.debug("Found project ID: %s for project name: %s", proj_id, task_data.get('proj_name'))
                 raw_project_end = (
                     project_doc_data.get('end_date')
                     or project_doc_data.get('proj_end_date')
@@ -274,14 +306,9 @@ def create_task():
                 )
                 project_end_limit = _parse_date_value(raw_project_end)
             else:
-                print(f"Warning: Project not found for name: {task_data.get('proj_name')}")
-                all_projects = projects_ref.stream()
-                print("Available projects:")
-                for proj in all_projects:
-                    proj_data = proj.to_dict()
-                    print(f" - ID: {proj.id}, Name: {proj_data.get('proj_name', 'No name')}")
+                logger.warning("Warning: Project not found for name: %s", task_data.get('proj_name'))
         else:
-            print("No project name provided in task data")
+            logger.debug("No project name provided in task data")
 
         if project_end_limit is None:
             fallback_project_end = (
@@ -399,7 +426,7 @@ def create_task():
             'owner': owner_id,
             'assigned_to': task_data.get('assigned_to', []),
             'attachments': task_data.get('attachments', []),
-            'task_status': task_data.get('task_status'),
+            'task_status': canonical_task_status(task_data.get('task_status')),
             'priority_level': priority_level,
             'hasSubtasks': task_data.get('hasSubtasks', False),
             'is_deleted': task_data.get('is_deleted', False), 
@@ -410,19 +437,16 @@ def create_task():
             'updatedAt': firestore.SERVER_TIMESTAMP
         }
 
-        print(f"Adding task to Firestore: {firestore_task_data}")
-        print(f"Creating task '{firestore_task_data['task_name']}' with assigned_to: {task_data.get('assigned_to', [])}")
+        logger.debug("Adding task to Firestore: %s", firestore_task_data)
+        logger.debug("Creating task '%s' with assigned_to: %s", firestore_task_data['task_name'], task_data.get('assigned_to', []))
 
-        # Add document to Firestore
-        doc_ref = db.collection('Tasks').add(firestore_task_data)
-        task_ref = doc_ref[1]
+        # Add document to Firestore (with its per-user index entries, atomically)
+        task_ref = db.collection('Tasks').document()
         task_id = task_ref.id
         if firestore_task_data['recurrence_occurrence']:
-            try:
-                task_ref.update({'recurrence_series_id': task_id})
-            except Exception:
-                pass
-        print(f"Task created successfully with ID: {task_id}")
+            firestore_task_data['recurrence_series_id'] = task_id
+        user_task_index.create_task(task_ref, firestore_task_data)
+        logger.debug("Task created successfully with ID: %s", task_id)
 
         # Prepare response data
         response_data = firestore_task_data.copy()
@@ -439,28 +463,29 @@ def create_task():
 
         # ================== SEND EMAILS TO ASSIGNED USERS ==================
         try:
-            from services.email_service import email_service
+            # Fetch creator + assignees in one batched read
+            assigned_users = task_data.get('assigned_to', []) 
+            users_by_id = get_documents(db, 'Users', [owner_id, *assigned_users])
 
             # Get creator's info (for the "owner" field)
             creator_name = 'Unknown User'
-            if owner_id:
-                creator_doc = db.collection('Users').document(owner_id).get()
-                creator_name = creator_doc.to_dict().get('name', 'Unknown User') if creator_doc.exists else 'Unknown User'
+            if owner_id and owner_id in users_by_id:
+                creator_name = users_by_id[owner_id].get('name', 'Unknown User')
 
             # Send emails to each assigned user (except creator)
-            assigned_users = task_data.get('assigned_to', []) 
             for user_id in assigned_users:
                 if user_id == owner_id:
                     continue
 
-                user_doc = db.collection('Users').document(user_id).get()
-                if user_doc.exists:
-                    user_data = user_doc.to_dict()
+                user_data = users_by_id.get(str(user_id))
+                if user_data is not None:
                     to_email = user_data.get('email')
                     user_name = user_data.get('name', 'User')
 
                     if to_email:
-                        email_service.send_task_assignment_email(
+                        job_queue.enqueue(
+                            'send_email',
+                            method='send_task_assignment_email',
                             to_email=to_email,
                             user_name=user_name,
                             task_name=firestore_task_data['task_name'],
@@ -472,9 +497,9 @@ def create_task():
                             priority_level=firestore_task_data.get('priority_level', '')  
                         )
                     else:
-                        print(f"⚠️ No email found for user {user_id}")
+                        logger.warning("⚠️ No email found for user %s", user_id)
         except Exception as e:
-            print(f"❌ Failed to send email notifications: {e}")
+            logger.error("❌ Failed to queue email notifications: %s", e)
 
         # ================== CREATE NOTIFICATIONS FOR STAFF ==================
         try:
@@ -487,26 +512,40 @@ def create_task():
                     'id': task_id,
                     'proj_ID': proj_id
                 }
-                notification_service.notify_task_assigned(notification_task_data, assigned_users)
-                print(f"✅ Notifications created for {len(assigned_users)} assigned users")
+                job_queue.enqueue('notify_assigned', task_data=notification_task_data, user_ids=assigned_users)
+                logger.debug("✅ Notifications queued for %s assigned users", len(assigned_users))
         except Exception as e:
-            print(f"❌ Failed to create notifications: {e}")
+            logger.error("❌ Failed to create notifications: %s", e)
 
         return jsonify(response_data), 201
 
     except ValueError as e:
         return jsonify({"error": f"Invalid date format. Use YYYY-MM-DD: {str(e)}"}), 400
     except Exception as e:
-        print(f"Error creating task: {str(e)}")
+        logger.error("Error creating task: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @tasks_bp.route("/api/tasks", methods=["GET"])
 def get_tasks():
+    try:
+        page = get_page_args(request.args)
+        # Status filtering below needs these fields even in a projection
+        fields = get_fields_arg(request.args, presets=TASK_FIELD_PRESETS,
+                                required=("is_deleted", "task_status", "status"))
+        stream_format = get_stream_format(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         db = get_firestore_client()
-        print("entered app.py")
+        logger.debug("entered app.py")
         user_id = request.args.get("userId")
-        tasks_ref = db.collection("Tasks")
+        # Summary views of one user's tasks come from the per-user index (one small query)
+        from_index = bool(user_id) and user_task_index.can_serve(fields)
+        if from_index:
+            tasks_ref = apply_projection(user_task_index.items_ref(user_id), fields)
+        else:
+            tasks_ref = apply_projection(db.collection("Tasks"), fields)
 
         # Collect status filters from query params (supports repeated and comma-separated values)
         raw_status_filters = []
@@ -544,6 +583,27 @@ def get_tasks():
 
         allowed_statuses = parse_status_tokens(raw_status_filters)
 
+        def server_status_values(statuses):
+            """Stored task_status values for an `in` filter, or None if not expressible"""
+            if statuses is None:
+                return None
+            values = set()
+            for token in statuses:
+                if token in status_groups:
+                    continue
+                status = known_task_status(token)
+                if status is None:
+                    return None
+                values.add(status)
+            return sorted(values) or None
+
+        if TASK_SERVER_FILTERS:
+            # Only read the documents we return; include_task below stays as a safety net
+            tasks_ref = tasks_ref.where("is_deleted", "==", False)
+            status_values = server_status_values(allowed_statuses)
+            if status_values:
+                tasks_ref = tasks_ref.where("task_status", "in", status_values)
+
         def include_task(task_dict):
             if allowed_statuses is None:
                 return True
@@ -554,57 +614,56 @@ def get_tasks():
             status_value = status_value.strip() or "Unassigned"
             return status_value.lower() in allowed_statuses
 
-        tasks = []
+        # Tasks assigned to OR owned by the user: one OR query (or both queries concurrently)
+        user_filters = [
+            ("assigned_to", "array_contains", user_id),
+            ("owner", "==", user_id),
+        ]
 
-        if user_id:
-            assigned_query = tasks_ref.where("assigned_to", "array_contains", user_id)
-            assigned_results = assigned_query.stream()
+        if page:
+            # Cursor pagination: ?limit=&cursor= -> {items, next_cursor}
+            limit, cursor = page
 
-            owner_query = tasks_ref.where("owner", "==", user_id)
-            owner_results = owner_query.stream()
+            def include_doc(doc):
+                task = doc.to_dict()
+                return not task.get("is_deleted", False) and include_task(task)
 
-            seen_ids = set()
-            for doc in assigned_results:
-                if doc.id not in seen_ids:
-                    task = doc.to_dict()
-                    task["id"] = doc.id
-                    
-                    # Filter out deleted tasks and enforce user filters
-                    if not task.get("is_deleted", False):
-                        if include_task(task):
-                            tasks.append(task)
-                            seen_ids.add(doc.id)
+            if user_id and not from_index:
+                docs, next_cursor = fetch_page_any_of(tasks_ref, user_filters, limit, cursor, include=include_doc)
+            else:
+                docs, next_cursor = fetch_page(tasks_ref, limit, cursor, include=include_doc)
+            items = [dict(doc.to_dict(), id=doc.id) for doc in docs]
+            return jsonify(page_response(items, next_cursor)), 200
 
-            for doc in owner_results:
-                if doc.id not in seen_ids:
-                    task = doc.to_dict()
-                    task["id"] = doc.id
-                    
-                    # Filter out deleted tasks and enforce user filters
-                    if not task.get("is_deleted", False):
-                        if include_task(task):
-                            tasks.append(task)
-                            seen_ids.add(doc.id)
+        def iter_tasks():
+            if user_id and not from_index:
+                results = stream_any_of(tasks_ref, user_filters)
+            else:
+                # Index entries for the user, or all tasks if no user_id provided
+                results = tasks_ref.stream()
 
-        else:
-            # If no user_id provided, return all tasks
-            results = tasks_ref.stream()
             for doc in results:
                 task = doc.to_dict()
                 task["id"] = doc.id
-                
-                if not task.get('is_deleted', False):
+
+                # Filter out deleted tasks and enforce user filters
+                if not task.get("is_deleted", False):
                     if include_task(task):
-                        tasks.append(task)
+                        yield task
 
-        return jsonify(tasks), 200
+        if stream_format:
+            # ?stream=ndjson|json: encode tasks as Firestore yields them
+            return stream_json_response(iter_tasks(), stream_format)
+
+        return jsonify(list(iter_tasks())), 200
 
     except Exception as e:
-        print("Error fetching tasks:", e)
+        logger.error("Error fetching tasks: %s", e)
         return jsonify({"error": str(e)}), 500
 
 # =============== GET SINGLE TASK ===============
 @tasks_bp.route('/api/tasks/<task_id>', methods=['GET'])
+@firestore_budget(reads=2)
 def get_task(task_id):
     try:
         db = get_firestore_client()
@@ -615,16 +674,6 @@ def get_task(task_id):
             task_data = doc.to_dict()
             task_data['id'] = doc.id
             
-            # Convert timestamps to ISO format
-            if 'start_date' in task_data and task_data['start_date']:
-                task_data['start_date'] = task_data['start_date'].isoformat()
-            if 'end_date' in task_data and task_data['end_date']:
-                task_data['end_date'] = task_data['end_date'].isoformat()
-            if 'createdAt' in task_data and task_data['createdAt']:
-                task_data['createdAt'] = task_data['createdAt'].isoformat()
-            if 'updatedAt' in task_data and task_data['updatedAt']:
-                task_data['updatedAt'] = task_data['updatedAt'].isoformat()
-
             return jsonify(task_data), 200
         else:
             return jsonify({'error': 'Task not found'}), 404
@@ -633,6 +682,288 @@ def get_task(task_id):
         return jsonify({'error': str(e)}), 500
 
 # =============== UPDATE TASK ===============
+class TaskUpdateRejected(Exception):
+    """Aborts the update transaction with an HTTP error"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _read_task_for_update(transaction, tasks_col, task_id, proj_id=None):
+    """
+    Read a task inside `transaction` by Firestore document id, falling back to
+    its business task_ID (narrowed by proj_ID if given). Returns the snapshot or None.
+    """
+    snapshot = tasks_col.document(task_id).get(transaction=transaction)
+    if snapshot.exists:
+        return snapshot
+
+    query = tasks_col.where('task_ID', '==', task_id)
+    if proj_id:
+        query = query.where('proj_ID', '==', proj_id)
+    results = list(query.limit(1).stream(transaction=transaction))
+    if not results and proj_id:
+        # fallback: try without proj filter in case payload proj_ID mismatches
+        results = list(tasks_col.where('task_ID', '==', task_id).limit(1).stream(transaction=transaction))
+    return results[0] if results else None
+
+
+def _plan_task_update(old_data, doc_id, update_data, status_log_entries, current_user_id, user_display_name):
+    """
+    Check permissions and build the Firestore update for PUT /api/tasks/<id>
+    from the task as read in the transaction. Pure, so it can be re-run when
+    the transaction retries.
+
+    Raises TaskUpdateRejected when the update is not allowed or invalid.
+    """
+    old_assigned_to = old_data.get('assigned_to', []) or []
+    old_owner_id = old_data.get('owner_id') or old_data.get('owner')
+
+    owner_id_str = str(old_owner_id) if old_owner_id is not None else ''
+
+    collaborator_ids = set()
+    if isinstance(old_assigned_to, list):
+        for entry in old_assigned_to:
+            if entry is None:
+                continue
+            if isinstance(entry, (str, int)):
+                collaborator_ids.add(str(entry))
+            elif isinstance(entry, dict):
+                for key in ('id', 'user_id', 'userId'):
+                    if entry.get(key) is not None:
+                        collaborator_ids.add(str(entry[key]))
+                        break
+
+    is_owner = owner_id_str != '' and owner_id_str == current_user_id
+    is_collaborator = current_user_id in collaborator_ids
+
+    if not is_owner and not is_collaborator:
+        raise TaskUpdateRejected('You do not have permission to update this task', 403)
+
+    allowed_fields_for_collaborators = {'task_desc', 'task_status', 'status_history', 'recurrence'}
+
+    if is_owner:
+        permitted_update = dict(update_data)
+    else:
+        permitted_update = {key: value for key, value in update_data.items() if key in allowed_fields_for_collaborators}
+        logger.debug("🔒 Collaborator update permitted keys: %s", list(permitted_update.keys()))
+
+    project_end_limit = None
+    project_identifier = (
+        old_data.get('proj_ID')
+        or old_data.get('proj_id')
+        or update_data.get('proj_ID')
+        or update_data.get('proj_id')
+    )
+    try:
+        if project_identifier:
+            project_data = project_directory.get_project(project_identifier)
+            if project_data is not None:
+                project_end_limit = _parse_date_value(project_data.get('end_date'))
+    except Exception as resolve_error:
+        logger.warning("⚠️ Failed to resolve project end date for task %s: %s", doc_id, resolve_error)
+
+    if project_end_limit is None:
+        fallback_project_end = (
+            old_data.get('proj_end_date')
+            or old_data.get('project_end_date')
+            or update_data.get('proj_end_date')
+            or update_data.get('project_end_date')
+        )
+        project_end_limit = _parse_date_value(fallback_project_end)
+
+    recurrence_payload = permitted_update.get('recurrence')
+    if recurrence_payload is not None:
+        if not isinstance(recurrence_payload, dict):
+            raise TaskUpdateRejected('Invalid recurrence payload')
+
+        normalized_recurrence = dict(recurrence_payload)
+        normalized_recurrence['enabled'] = bool(normalized_recurrence.get('enabled'))
+
+        if normalized_recurrence['enabled']:
+            if 'end_condition' in normalized_recurrence:
+                normalized_recurrence['endCondition'] = normalized_recurrence.pop('end_condition')
+            if 'end_date' in normalized_recurrence:
+                normalized_recurrence['endDate'] = normalized_recurrence.pop('end_date')
+            if 'weekly_days' in normalized_recurrence and 'weeklyDays' not in normalized_recurrence:
+                normalized_recurrence['weeklyDays'] = normalized_recurrence.pop('weekly_days')
+            if 'monthly_day' in normalized_recurrence and 'monthlyDay' not in normalized_recurrence:
+                normalized_recurrence['monthlyDay'] = normalized_recurrence.pop('monthly_day')
+            if 'custom_unit' in normalized_recurrence and 'customUnit' not in normalized_recurrence:
+                normalized_recurrence['customUnit'] = normalized_recurrence.pop('custom_unit')
+            if 'end_after_occurrences' in normalized_recurrence and 'endAfterOccurrences' not in normalized_recurrence:
+                normalized_recurrence['endAfterOccurrences'] = normalized_recurrence.pop('end_after_occurrences')
+
+            frequency_value = normalized_recurrence.get('frequency')
+            normalized_recurrence['frequency'] = str(frequency_value).lower() if frequency_value else ''
+
+            allowed_frequencies = {'daily', 'weekly', 'monthly', 'custom'}
+            if not normalized_recurrence['frequency']:
+                raise TaskUpdateRejected('Recurrence frequency is required when recurrence is enabled')
+            if normalized_recurrence['frequency'] not in allowed_frequencies:
+                raise TaskUpdateRejected(f"Invalid recurrence frequency: {normalized_recurrence['frequency']}")
+
+            try:
+                normalized_recurrence['interval'] = max(1, int(normalized_recurrence.get('interval') or 1))
+            except (ValueError, TypeError):
+                normalized_recurrence['interval'] = 1
+
+            if normalized_recurrence['frequency'] == 'weekly':
+                weekly_days = normalized_recurrence.get('weeklyDays') or []
+                if isinstance(weekly_days, list):
+                    normalized_recurrence['weeklyDays'] = [str(day) for day in weekly_days if day]
+                else:
+                    normalized_recurrence['weeklyDays'] = []
+            else:
+                normalized_recurrence.pop('weeklyDays', None)
+
+            if normalized_recurrence['frequency'] == 'monthly':
+                monthly_day = normalized_recurrence.get('monthlyDay')
+                if monthly_day in (None, '', 0):
+                    normalized_recurrence['monthlyDay'] = None
+                else:
+                    try:
+                        normalized_recurrence['monthlyDay'] = int(monthly_day)
+                    except (ValueError, TypeError):
+                        raise TaskUpdateRejected('Invalid monthly recurrence configuration')
+            else:
+                normalized_recurrence.pop('monthlyDay', None)
+
+            if normalized_recurrence['frequency'] == 'custom':
+                normalized_recurrence['customUnit'] = normalized_recurrence.get('customUnit', 'days')
+            else:
+                normalized_recurrence.pop('customUnit', None)
+
+            end_condition_value = normalized_recurrence.get('endCondition') or 'never'
+            end_condition_value = str(end_condition_value)
+            if end_condition_value not in {'never', 'after', 'onDate'}:
+                end_condition_value = 'never'
+            normalized_recurrence['endCondition'] = end_condition_value
+
+            if end_condition_value == 'after':
+                try:
+                    occurrences = int(normalized_recurrence.get('endAfterOccurrences') or 0)
+                    if occurrences < 1:
+                        raise ValueError
+                    normalized_recurrence['endAfterOccurrences'] = occurrences
+                except (ValueError, TypeError):
+                    raise TaskUpdateRejected('Recurrence endAfterOccurrences must be a positive number')
+                normalized_recurrence.pop('endDate', None)
+            elif end_condition_value == 'onDate':
+                end_date_value = normalized_recurrence.get('endDate')
+                parsed_end = _parse_date_value(end_date_value)
+                if parsed_end is None:
+                    raise TaskUpdateRejected('Invalid recurrence endDate')
+                if project_end_limit and parsed_end > project_end_limit:
+                    parsed_end = project_end_limit
+                normalized_recurrence['endDate'] = parsed_end.isoformat()
+                normalized_recurrence.pop('endAfterOccurrences', None)
+            else:
+                normalized_recurrence.pop('endDate', None)
+                normalized_recurrence.pop('endAfterOccurrences', None)
+
+            permitted_update['recurrence'] = normalized_recurrence
+        else:
+            permitted_update['recurrence'] = {'enabled': False}
+
+    series_id = old_data.get('recurrence_series_id') or doc_id
+    current_occurrence_index = old_data.get('recurrence_occurrence')
+    if old_data.get('recurrence', {}).get('enabled'):
+        if current_occurrence_index is None:
+            current_occurrence_index = 1
+    else:
+        current_occurrence_index = None
+
+    if recurrence_payload is not None:
+        if permitted_update['recurrence'].get('enabled'):
+            if current_occurrence_index is None:
+                current_occurrence_index = old_data.get('recurrence_occurrence') or 1
+        else:
+            current_occurrence_index = None
+
+    if current_occurrence_index is not None:
+        permitted_update['recurrence_occurrence'] = current_occurrence_index
+    elif 'recurrence_occurrence' not in permitted_update:
+        permitted_update['recurrence_occurrence'] = None
+
+    if series_id:
+        permitted_update['recurrence_series_id'] = series_id
+    if 'recurrence_occurrence' in permitted_update and permitted_update['recurrence_occurrence'] == old_data.get('recurrence_occurrence'):
+        permitted_update.pop('recurrence_occurrence')
+    if 'recurrence_series_id' in permitted_update and permitted_update['recurrence_series_id'] == old_data.get('recurrence_series_id'):
+        permitted_update.pop('recurrence_series_id')
+
+    # Store the canonical spelling the task_status filters and indexes match on
+    if 'task_status' in permitted_update:
+        permitted_update['task_status'] = canonical_task_status(
+            None if permitted_update['task_status'] == 'None' else permitted_update['task_status']
+        )
+
+    # Determine status change
+    def normalize_status(value):
+        if value == 'None':
+            return DEFAULT_TASK_STATUS
+        return canonical_task_status(value)
+
+    old_status_value = old_data.get('task_status')
+    old_status_normalized = normalize_status(old_status_value)
+    new_status_value = permitted_update.get('task_status') if 'task_status' in permitted_update else old_status_value
+    new_status_normalized = normalize_status(new_status_value)
+    status_changed = 'task_status' in permitted_update and new_status_normalized != old_status_normalized
+
+    status_log_entries_to_append = []
+    change_log_entry = None
+
+    if status_log_entries:
+        try:
+            first_entry = status_log_entries[0]
+            change_log_entry = {
+                'timestamp': first_entry.get('timestamp') or datetime.utcnow().replace(tzinfo=pytz.UTC).isoformat(),
+                'old_status': first_entry.get('old_status', old_status_normalized),
+                'new_status': first_entry.get('new_status', new_status_normalized),
+                'staff_name': first_entry.get('staff_name', user_display_name),
+                'changed_by': first_entry.get('changed_by', current_user_id)
+            }
+            status_log_entries_to_append.append(change_log_entry)
+        except Exception:
+            status_log_entries_to_append = []
+            change_log_entry = None
+
+    if status_changed and change_log_entry is None:
+        change_log_entry = {
+            'timestamp': datetime.utcnow().replace(tzinfo=pytz.UTC).isoformat(),
+            'old_status': old_status_normalized,
+            'new_status': new_status_normalized,
+            'staff_name': user_display_name,
+            'changed_by': current_user_id
+        }
+        status_log_entries_to_append.append(change_log_entry)
+
+    if change_log_entry and 'status_history' not in permitted_update:
+        existing_history = old_data.get('status_history')
+        if existing_history is None:
+            existing_history = []
+        permitted_update['status_history'] = [*existing_history, change_log_entry]
+
+    if not permitted_update and not status_log_entries_to_append:
+        raise TaskUpdateRejected('No permitted fields to update')
+
+    permitted_update['updatedAt'] = firestore.SERVER_TIMESTAMP
+    task_update = dict(permitted_update)
+    if status_log_entries_to_append:
+        task_update['status_log'] = firestore.ArrayUnion(status_log_entries_to_append)
+
+    return {
+        'task_update': task_update,
+        'old_owner_id': old_owner_id,
+        'old_assigned_to': old_assigned_to,
+        'status_changed': status_changed,
+        'new_status_normalized': new_status_normalized,
+        'status_log_entries': status_log_entries_to_append,
+    }
+
+
 @tasks_bp.route('/api/tasks/<task_id>', methods=['PUT'])
 def update_task(task_id):
     """
@@ -654,20 +985,22 @@ def update_task(task_id):
       - Dates are converted to Firestore timestamps (end date set to end-of-day)
       - If task_id is not a valid document id, resolves by task_ID (and proj_ID if provided)
       - status_log is appended (ArrayUnion) instead of overwriting
+      - The task is read, validated and written in one transaction; the response
+        is built from that read plus the update, without reading it back
       - Sends email to new owner and CC's old owner when ownership changes
     """
     try:
-        print(f"\n🔧 === UPDATE TASK CALLED === Task ID: {task_id}")
+        logger.debug("🔧 === UPDATE TASK CALLED === Task ID: %s", task_id)
         incoming_data = request.get_json() or {}
         if not isinstance(incoming_data, dict):
             return jsonify({"error": "Invalid payload format"}), 400
 
-        print(f"📦 Update data received: {list(incoming_data.keys())}")
+        logger.debug("📦 Update data received: %s", list(incoming_data.keys()))
 
         current_user_id = str(request.headers.get('X-User-Id', '')).strip()
         current_user_role = request.headers.get('X-User-Role')
         current_user_name = str(request.headers.get('X-User-Name', '') or '').strip()
-        print(f"👤 Update requested by user_id={current_user_id} role={current_user_role}")
+        logger.debug("👤 Update requested by user_id=%s role=%s", current_user_id, current_user_role)
 
         if not current_user_id:
             return jsonify({"error": "Missing user context"}), 400
@@ -692,613 +1025,329 @@ def update_task(task_id):
             status_log_entries = update_data['status_log']
         update_data.pop('status_log', None)
 
-        tasks_col = db.collection('Tasks')
-
-        # Try to resolve by Firestore document id first
-        doc_ref = tasks_col.document(task_id)
-        doc = doc_ref.get()
-
-        # If not found, try to resolve by business task_ID (and proj_ID if provided)
-        if not doc.exists:
-            query = tasks_col.where('task_ID', '==', task_id)
-            # Narrow by proj_ID if available in payload
-            proj_id = update_data.get('proj_ID')
-            if proj_id:
-                query = query.where('proj_ID', '==', proj_id)
-            results = list(query.stream())
-            if not results and proj_id:
-                # fallback: try without proj filter in case payload proj_ID mismatches
-                results = list(tasks_col.where('task_ID', '==', task_id).stream())
-            if not results:
-                return jsonify({'error': 'Task not found'}), 404
-            doc_ref = results[0].reference
-
-        # Get the OLD document data BEFORE updating (for notification comparison and permissions)
-        old_doc = doc_ref.get()
-        old_data = old_doc.to_dict() if old_doc.exists else {}
-        old_assigned_to = old_data.get('assigned_to', []) if old_data else []
-        old_owner_id = (old_data.get('owner_id') or old_data.get('owner')) if old_data else None
-
-        owner_id_str = str(old_owner_id) if old_owner_id is not None else ''
-
-        collaborator_ids = set()
-        if isinstance(old_assigned_to, list):
-            for entry in old_assigned_to:
-                if entry is None:
-                    continue
-                if isinstance(entry, (str, int)):
-                    collaborator_ids.add(str(entry))
-                elif isinstance(entry, dict):
-                    for key in ('id', 'user_id', 'userId'):
-                        if entry.get(key) is not None:
-                            collaborator_ids.add(str(entry[key]))
-                            break
-
-        is_owner = owner_id_str != '' and owner_id_str == current_user_id
-        is_collaborator = current_user_id in collaborator_ids
-
-        if not is_owner and not is_collaborator:
-            return jsonify({'error': 'You do not have permission to update this task'}), 403
-
-        allowed_fields_for_collaborators = {'task_desc', 'task_status', 'status_history', 'recurrence'}
-
-        if is_owner:
-            permitted_update = dict(update_data)
-        else:
-            permitted_update = {key: value for key, value in update_data.items() if key in allowed_fields_for_collaborators}
-            print(f"🔒 Collaborator update permitted keys: {list(permitted_update.keys())}")
-
-        project_end_limit = None
-        project_identifier = (
-            old_data.get('proj_ID')
-            or old_data.get('proj_id')
-            or update_data.get('proj_ID')
-            or update_data.get('proj_id')
-        )
-
-        def parse_date_value(value):
-            if value is None:
-                return None
-            if isinstance(value, datetime):
-                return value.date()
-            if isinstance(value, str):
-                try:
-                    return datetime.fromisoformat(value).date()
-                except ValueError:
-                    try:
-                        return datetime.strptime(value, '%Y-%m-%d').date()
-                    except ValueError:
-                        return None
-            return None
-
-        try:
-            if project_identifier:
-                project_doc = db.collection('Projects').document(project_identifier).get()
-                if project_doc.exists:
-                    project_data = project_doc.to_dict() or {}
-                    project_end_limit = _parse_date_value(project_data.get('end_date'))
-        except Exception as resolve_error:
-            print(f"⚠️ Failed to resolve project end date for task {task_id}: {resolve_error}")
-
-        if project_end_limit is None:
-            fallback_project_end = (
-                old_data.get('proj_end_date')
-                or old_data.get('project_end_date')
-                or update_data.get('proj_end_date')
-                or update_data.get('project_end_date')
-            )
-            project_end_limit = _parse_date_value(fallback_project_end)
-
-        recurrence_payload = permitted_update.get('recurrence')
-        if recurrence_payload is not None:
-            if not isinstance(recurrence_payload, dict):
-                return jsonify({'error': 'Invalid recurrence payload'}), 400
-
-            normalized_recurrence = dict(recurrence_payload)
-            normalized_recurrence['enabled'] = bool(normalized_recurrence.get('enabled'))
-
-            if normalized_recurrence['enabled']:
-                if 'end_condition' in normalized_recurrence:
-                    normalized_recurrence['endCondition'] = normalized_recurrence.pop('end_condition')
-                if 'end_date' in normalized_recurrence:
-                    normalized_recurrence['endDate'] = normalized_recurrence.pop('end_date')
-                if 'weekly_days' in normalized_recurrence and 'weeklyDays' not in normalized_recurrence:
-                    normalized_recurrence['weeklyDays'] = normalized_recurrence.pop('weekly_days')
-                if 'monthly_day' in normalized_recurrence and 'monthlyDay' not in normalized_recurrence:
-                    normalized_recurrence['monthlyDay'] = normalized_recurrence.pop('monthly_day')
-                if 'custom_unit' in normalized_recurrence and 'customUnit' not in normalized_recurrence:
-                    normalized_recurrence['customUnit'] = normalized_recurrence.pop('custom_unit')
-                if 'end_after_occurrences' in normalized_recurrence and 'endAfterOccurrences' not in normalized_recurrence:
-                    normalized_recurrence['endAfterOccurrences'] = normalized_recurrence.pop('end_after_occurrences')
-
-                frequency_value = normalized_recurrence.get('frequency')
-                normalized_recurrence['frequency'] = str(frequency_value).lower() if frequency_value else ''
-
-                allowed_frequencies = {'daily', 'weekly', 'monthly', 'custom'}
-                if not normalized_recurrence['frequency']:
-                    return jsonify({'error': 'Recurrence frequency is required when recurrence is enabled'}), 400
-                if normalized_recurrence['frequency'] not in allowed_frequencies:
-                    return jsonify({'error': f"Invalid recurrence frequency: {normalized_recurrence['frequency']}"}), 400
-
-                try:
-                    normalized_recurrence['interval'] = max(1, int(normalized_recurrence.get('interval') or 1))
-                except (ValueError, TypeError):
-                    normalized_recurrence['interval'] = 1
-
-                if normalized_recurrence['frequency'] == 'weekly':
-                    weekly_days = normalized_recurrence.get('weeklyDays') or []
-                    if isinstance(weekly_days, list):
-                        normalized_recurrence['weeklyDays'] = [str(day) for day in weekly_days if day]
-                    else:
-                        normalized_recurrence['weeklyDays'] = []
-                else:
-                    normalized_recurrence.pop('weeklyDays', None)
-
-                if normalized_recurrence['frequency'] == 'monthly':
-                    monthly_day = normalized_recurrence.get('monthlyDay')
-                    if monthly_day in (None, '', 0):
-                        normalized_recurrence['monthlyDay'] = None
-                    else:
-                        try:
-                            normalized_recurrence['monthlyDay'] = int(monthly_day)
-                        except (ValueError, TypeError):
-                            return jsonify({'error': 'Invalid monthly recurrence configuration'}), 400
-                else:
-                    normalized_recurrence.pop('monthlyDay', None)
-
-                if normalized_recurrence['frequency'] == 'custom':
-                    normalized_recurrence['customUnit'] = normalized_recurrence.get('customUnit', 'days')
-                else:
-                    normalized_recurrence.pop('customUnit', None)
-
-                end_condition_value = normalized_recurrence.get('endCondition') or 'never'
-                end_condition_value = str(end_condition_value)
-                if end_condition_value not in {'never', 'after', 'onDate'}:
-                    end_condition_value = 'never'
-                normalized_recurrence['endCondition'] = end_condition_value
-
-                if end_condition_value == 'after':
-                    try:
-                        occurrences = int(normalized_recurrence.get('endAfterOccurrences') or 0)
-                        if occurrences < 1:
-                            raise ValueError
-                        normalized_recurrence['endAfterOccurrences'] = occurrences
-                    except (ValueError, TypeError):
-                        return jsonify({'error': 'Recurrence endAfterOccurrences must be a positive number'}), 400
-                    normalized_recurrence.pop('endDate', None)
-                elif end_condition_value == 'onDate':
-                    end_date_value = normalized_recurrence.get('endDate')
-                    parsed_end = _parse_date_value(end_date_value)
-                    if parsed_end is None:
-                        return jsonify({'error': 'Invalid recurrence endDate'}), 400
-                    if project_end_limit and parsed_end > project_end_limit:
-                        parsed_end = project_end_limit
-                    normalized_recurrence['endDate'] = parsed_end.isoformat()
-                    normalized_recurrence.pop('endAfterOccurrences', None)
-                else:
-                    normalized_recurrence.pop('endDate', None)
-                    normalized_recurrence.pop('endAfterOccurrences', None)
-
-                permitted_update['recurrence'] = normalized_recurrence
-            else:
-                permitted_update['recurrence'] = {'enabled': False}
-
-        series_id = old_data.get('recurrence_series_id') or (old_doc.id if old_doc and old_doc.exists else None)
-        current_occurrence_index = old_data.get('recurrence_occurrence')
-        if old_data.get('recurrence', {}).get('enabled'):
-            if current_occurrence_index is None:
-                current_occurrence_index = 1
-        else:
-            current_occurrence_index = None
-
-        if recurrence_payload is not None:
-            if permitted_update['recurrence'].get('enabled'):
-                if current_occurrence_index is None:
-                    current_occurrence_index = old_data.get('recurrence_occurrence') or 1
-            else:
-                current_occurrence_index = None
-
-        if current_occurrence_index is not None:
-            permitted_update['recurrence_occurrence'] = current_occurrence_index
-        elif 'recurrence_occurrence' not in permitted_update:
-            permitted_update['recurrence_occurrence'] = None
-
-        if series_id:
-            permitted_update['recurrence_series_id'] = series_id
-        if 'recurrence_occurrence' in permitted_update and permitted_update['recurrence_occurrence'] == old_data.get('recurrence_occurrence'):
-            permitted_update.pop('recurrence_occurrence')
-        if 'recurrence_series_id' in permitted_update and permitted_update['recurrence_series_id'] == old_data.get('recurrence_series_id'):
-            permitted_update.pop('recurrence_series_id')
-
-        # Determine status change
-        def normalize_status(value):
-            if value in (None, '', 'None'):
-                return 'Unassigned'
-            return str(value)
-
-        old_status_value = old_data.get('task_status') if old_data else None
-        old_status_normalized = normalize_status(old_status_value)
-        new_status_value = permitted_update.get('task_status') if 'task_status' in permitted_update else old_status_value
-        new_status_normalized = normalize_status(new_status_value)
-        status_changed = 'task_status' in permitted_update and new_status_normalized != old_status_normalized
-
         # Resolve staff display name
         user_display_name = current_user_name
         if not user_display_name:
-            try:
-                user_doc = db.collection('Users').document(current_user_id).get()
-                if user_doc.exists:
-                    user_display_name = user_doc.to_dict().get('name', '') or ''
-            except Exception:
-                user_display_name = ''
+            user_data = user_directory.get_user(current_user_id) or {}
+            user_display_name = user_data.get('name', '') or ''
         if not user_display_name:
             user_display_name = 'Unknown User'
 
-        status_log_entries_to_append = []
-        change_log_entry = None
-
-        if status_log_entries:
-            try:
-                first_entry = status_log_entries[0]
-                change_log_entry = {
-                    'timestamp': first_entry.get('timestamp') or datetime.utcnow().replace(tzinfo=pytz.UTC).isoformat(),
-                    'old_status': first_entry.get('old_status', old_status_normalized),
-                    'new_status': first_entry.get('new_status', new_status_normalized),
-                    'staff_name': first_entry.get('staff_name', user_display_name),
-                    'changed_by': first_entry.get('changed_by', current_user_id)
-                }
-                status_log_entries_to_append.append(change_log_entry)
-            except Exception:
-                status_log_entries_to_append = []
-                change_log_entry = None
+        tasks_col = db.collection('Tasks')
 
-        if status_changed and change_log_entry is None:
-            change_log_entry = {
-                'timestamp': datetime.utcnow().replace(tzinfo=pytz.UTC).isoformat(),
-                'old_status': old_status_normalized,
-                'new_status': new_status_normalized,
-                'staff_name': user_display_name,
-                'changed_by': current_user_id
-            }
-            status_log_entries_to_append.append(change_log_entry)
+        # Read, validate and write in one transaction (task + per-user index entries):
+        # one read of the task and no lost updates from concurrent writers
+        @firestore.transactional
+        def apply_update(transaction):
+            snapshot = _read_task_for_update(transaction, tasks_col, task_id, update_data.get('proj_ID'))
+            if snapshot is None:
+                raise TaskUpdateRejected('Task not found', 404)
+            old_data = snapshot.to_dict() or {}
+            plan = _plan_task_update(old_data, snapshot.id, update_data, status_log_entries,
+                                     current_user_id, user_display_name)
+            transaction.update(snapshot.reference, plan['task_update'])
+            user_task_index.stage(transaction, snapshot.id, old_data,
+                                  apply_updates(old_data, plan['task_update']))
+            return snapshot.reference, old_data, plan
 
-        if change_log_entry and 'status_history' not in permitted_update:
-            existing_history = old_data.get('status_history') if old_data else []
-            if existing_history is None:
-                existing_history = []
-            permitted_update['status_history'] = [*existing_history, change_log_entry]
-
-        if not permitted_update and not status_log_entries_to_append:
-            return jsonify({'error': 'No permitted fields to update'}), 400
-
-        permitted_update['updatedAt'] = firestore.SERVER_TIMESTAMP
-        status_log_update = firestore.ArrayUnion(status_log_entries_to_append) if status_log_entries_to_append else None
-
-        # Apply the update
-        if permitted_update:
-            doc_ref.update(permitted_update)
-        if status_log_update is not None:
-            doc_ref.update({'status_log': status_log_update})
-
-        # Get updated document for response
-        updated_doc = doc_ref.get()
-        if updated_doc.exists:
-            raw_updated_data = updated_doc.to_dict() or {}
-            response_data = dict(raw_updated_data)
-            response_data['id'] = updated_doc.id
+        try:
+            doc_ref, old_data, plan = apply_update(db.transaction())
+        except TaskUpdateRejected as rejected:
+            return jsonify({'error': str(rejected)}), rejected.status_code
+        invalidate_document(doc_ref)
+
+        old_owner_id = plan['old_owner_id']
+        old_assigned_to = plan['old_assigned_to']
+        status_changed = plan['status_changed']
+        new_status_normalized = plan['new_status_normalized']
+
+        # Response is the merged in-memory state (no re-read after the write)
+        raw_updated_data = apply_updates(old_data, plan['task_update'])
+        raw_updated_data['updatedAt'] = datetime.now(pytz.UTC)
+        if plan['status_log_entries']:
+            existing_log = old_data.get('status_log') or []
+            raw_updated_data['status_log'] = [
+                *existing_log,
+                *(entry for entry in plan['status_log_entries'] if entry not in existing_log)
+            ]
+        response_data = dict(raw_updated_data)
+        response_data['id'] = doc_ref.id
+
+        # ================== SEND EMAILS FOR OWNER CHANGE ==================
+        try:
+            # Check both 'owner_id' and 'owner' fields (depending on your frontend)
+            new_owner_id = update_data.get('owner_id') or update_data.get('owner')
             
-            # Convert timestamps for response
-            if 'start_date' in response_data and response_data['start_date']:
-                response_data['start_date'] = response_data['start_date'].isoformat()
-            if 'end_date' in response_data and response_data['end_date']:
-                response_data['end_date'] = response_data['end_date'].isoformat()
-            if 'updatedAt' in response_data and response_data['updatedAt']:
-                response_data['updatedAt'] = response_data['updatedAt'].isoformat()
-            if 'createdAt' in response_data and response_data['createdAt']:
-                response_data['createdAt'] = response_data['createdAt'].isoformat()
-
-            # ================== SEND EMAILS FOR OWNER CHANGE ==================
-            try:
-                # Check both 'owner_id' and 'owner' fields (depending on your frontend)
-                new_owner_id = update_data.get('owner_id') or update_data.get('owner')
+            logger.debug("🔍 EMAIL CHECK - Raw update_data: %s", update_data)
+            logger.debug("🔍 EMAIL CHECK - update_data.get('owner'): %s", update_data.get('owner'))
+            logger.debug("🔍 EMAIL CHECK - update_data.get('owner_id'): %s", update_data.get('owner_id'))
+            logger.debug("🔍 EMAIL CHECK - new_owner_id (final): %s", new_owner_id)
+            logger.debug("🔍 EMAIL CHECK - old_owner_id from old_data: %s", old_owner_id)
+            logger.debug("🔍 EMAIL CHECK - Are they different? %s", old_owner_id != new_owner_id)
+            logger.debug("🔍 EMAIL CHECK - Is new_owner_id truthy? %s", bool(new_owner_id))
+            
+            # Check if owner has changed
+            if new_owner_id and old_owner_id != new_owner_id:
+                logger.debug("👤 OWNER CHANGE DETECTED: %s → %s", old_owner_id, new_owner_id)
                 
-                print(f"🔍 EMAIL CHECK - Raw update_data: {update_data}")
-                print(f"🔍 EMAIL CHECK - update_data.get('owner'): {update_data.get('owner')}")
-                print(f"🔍 EMAIL CHECK - update_data.get('owner_id'): {update_data.get('owner_id')}")
-                print(f"🔍 EMAIL CHECK - new_owner_id (final): {new_owner_id}")
-                print(f"🔍 EMAIL CHECK - old_owner_id from old_doc: {old_owner_id}")
-                print(f"🔍 EMAIL CHECK - Are they different? {old_owner_id != new_owner_id}")
-                print(f"🔍 EMAIL CHECK - Is new_owner_id truthy? {bool(new_owner_id)}")
+                # Get new owner's info
+                logger.debug("📧 Fetching new owner data for: %s", new_owner_id)
+                new_owner_data = user_directory.get_user(new_owner_id)
                 
-                # Check if owner has changed
-                if new_owner_id and old_owner_id != new_owner_id:
-                    print(f"👤 OWNER CHANGE DETECTED: {old_owner_id} → {new_owner_id}")
-                    from services.email_service import email_service
+                if new_owner_data is not None:
+                    new_owner_email = new_owner_data.get('email')
+                    new_owner_name = new_owner_data.get('name', 'User')
+                    logger.debug("✅ New owner found: %s (%s)", new_owner_name, new_owner_email)
                     
-                    # Get new owner's info
-                    print(f"📧 Fetching new owner data for: {new_owner_id}")
-                    new_owner_doc = db.collection('Users').document(new_owner_id).get()
+                    # Get old owner's info (for CC)
+                    old_owner_email = None
+                    old_owner_name = 'Previous Owner'
+                    if old_owner_id:
+                        logger.debug("📧 Fetching old owner data for: %s", old_owner_id)
+                        old_owner_data = user_directory.get_user(old_owner_id)
+                        if old_owner_data is not None:
+                            old_owner_email = old_owner_data.get('email')
+                            old_owner_name = old_owner_data.get('name', 'Previous Owner')
+                            logger.debug("✅ Old owner found: %s (%s)", old_owner_name, old_owner_email)
                     
-                    if new_owner_doc.exists:
-                        new_owner_data = new_owner_doc.to_dict()
-                        new_owner_email = new_owner_data.get('email')
-                        new_owner_name = new_owner_data.get('name', 'User')
-                        print(f"✅ New owner found: {new_owner_name} ({new_owner_email})")
-                        
-                        # Get old owner's info (for CC)
-                        old_owner_email = None
-                        old_owner_name = 'Previous Owner'
-                        if old_owner_id:
-                            print(f"📧 Fetching old owner data for: {old_owner_id}")
-                            old_owner_doc = db.collection('Users').document(old_owner_id).get()
-                            if old_owner_doc.exists:
-                                old_owner_data = old_owner_doc.to_dict()
-                                old_owner_email = old_owner_data.get('email')
-                                old_owner_name = old_owner_data.get('name', 'Previous Owner')
-                                print(f"✅ Old owner found: {old_owner_name} ({old_owner_email})")
-                        
-                        # Prepare task details for email
-                        task_name = response_data.get('task_name', 'Unknown Task')
-                        task_desc = response_data.get('task_desc', '')
-                        project_name = response_data.get('proj_name', '')
-                        
-                        # Get who made the transfer (from request context or use new owner as fallback)
-                        transferred_by_name = new_owner_name  # You can enhance this with actual user context
-                        
-                        # Format dates safely
-                        start_date_str = 'Not specified'
-                        end_date_str = None
-                        
-                        if 'start_date' in response_data and response_data['start_date']:
-                            try:
-                                start_date_str = datetime.fromisoformat(response_data['start_date']).strftime('%Y-%m-%d')
-                            except:
-                                start_date_str = str(response_data['start_date'])[:10]
-                        
-                        if 'end_date' in response_data and response_data['end_date']:
-                            try:
-                                end_date_str = datetime.fromisoformat(response_data['end_date']).strftime('%Y-%m-%d')
-                            except:
-                                end_date_str = str(response_data['end_date'])[:10]
-                        
-                        print("📧 Preparing to send ownership transfer email...")
-                        print(f"   To: {new_owner_email}")
-                        print(f"   CC: {old_owner_email}")
-                        print(f"   Task: {task_name}")
-                        
-                        # Send email to new owner (with old owner CC'd)
-                        if new_owner_email:
-                            success = email_service.send_task_transfer_ownership_email(
-                                new_owner_email=new_owner_email,
-                                new_owner_name=new_owner_name,
-                                old_owner_email=old_owner_email if old_owner_email else '',
-                                old_owner_name=old_owner_name,
-                                task_name=task_name,
-                                task_desc=task_desc,
-                                project_name=project_name,
-                                transferred_by_name=transferred_by_name,
-                                start_date=start_date_str,
-                                end_date=end_date_str
-                            )
-                            if success:
-                                print(f"✅ OWNERSHIP TRANSFER EMAIL SENT to {new_owner_email} (CC: {old_owner_email})")
-                            else:
-                                print("❌ FAILED to send ownership transfer email")
-                        else:
-                            print(f"⚠️ No email found for new owner {new_owner_id}")
+                    # Prepare task details for email
+                    task_name = response_data.get('task_name', 'Unknown Task')
+                    task_desc = response_data.get('task_desc', '')
+                    project_name = response_data.get('proj_name', '')
+                    
+                    # Get who made the transfer (from request context or use new owner as fallback)
+                    transferred_by_name = new_owner_name  # You can enhance this with actual user context
+                    
+                    # Format dates safely
+                    start_date_str = 'Not specified'
+                    end_date_str = None
+                    
+                    if 'start_date' in response_data and response_data['start_date']:
+                        try:
+                            start_date_str = response_data['start_date'].strftime('%Y-%m-%d')
+                        except:
+                            start_date_str = str(response_data['start_date'])[:10]
+                    
+                    if 'end_date' in response_data and response_data['end_date']:
+                        try:
+                            end_date_str = response_data['end_date'].strftime('%Y-%m-%d')
+                        except:
+                            end_date_str = str(response_data['end_date'])[:10]
+                    
+                    logger.debug("📧 Queueing ownership transfer email...")
+                    logger.debug("   To: %s", new_owner_email)
+                    logger.debug("   CC: %s", old_owner_email)
+                    logger.debug("   Task: %s", task_name)
+                    
+                    # Send email to new owner (with old owner CC'd)
+                    if new_owner_email:
+                        job_queue.enqueue(
+                            'send_email',
+                            method='send_task_transfer_ownership_email',
+                            new_owner_email=new_owner_email,
+                            new_owner_name=new_owner_name,
+                            old_owner_email=old_owner_email if old_owner_email else '',
+                            old_owner_name=old_owner_name,
+                            task_name=task_name,
+                            task_desc=task_desc,
+                            project_name=project_name,
+                            transferred_by_name=transferred_by_name,
+                            start_date=start_date_str,
+                            end_date=end_date_str
+                        )
+                        logger.debug("✅ Ownership transfer email queued for %s (CC: %s)", new_owner_email, old_owner_email)
                     else:
-                        print(f"⚠️ New owner document not found: {new_owner_id}")
+                        logger.warning("⚠️ No email found for new owner %s", new_owner_id)
                 else:
-                    print(f"⏭️  No owner change detected (both are {new_owner_id})")
-                        
-            except Exception as e:
-                print(f"❌ Failed to send owner change email: {e}")
-                import traceback
-                traceback.print_exc()
-
-            # ================== CREATE NOTIFICATIONS FOR TASK UPDATES ==================
-            try:
-                print("🔔 NOTIFICATION BLOCK REACHED")
-                
-                # Get the NEW assigned_to list (after update)
-                # old_assigned_to was captured before the update above
-                new_assigned_to = response_data.get('assigned_to', [])
-                
-                # Determine what ACTUALLY changed by comparing old vs new values
-                # Exclude only true metadata/system fields
-                metadata_fields = ['updatedAt', 'createdAt', 'status_log', 'id', 'task_ID', 'proj_ID']
-                old_values_dict = old_doc.to_dict() if old_doc.exists else {}
-                
-                actually_changed = []
-                for key in update_data.keys():
-                    if key in metadata_fields:
-                        continue
-                    
-                    old_val = old_values_dict.get(key)
-                    new_val = update_data.get(key)
+                    logger.warning("⚠️ New owner document not found: %s", new_owner_id)
+            else:
+                logger.debug("⏭️  No owner change detected (both are %s)", new_owner_id)
                     
-                    # Compare values (handle different types)
-                    if key == 'assigned_to':
-                        # For lists, sort and compare
-                        old_sorted = sorted(old_val) if old_val else []
-                        new_sorted = sorted(new_val) if new_val else []
-                        if old_sorted != new_sorted:
-                            actually_changed.append(key)
-                            print(f"   ✓ {key} changed: {old_sorted} → {new_sorted}")
-                    elif key in ['start_date', 'end_date']:
-                        # For dates, compare the calendar date only (ignore time and timezone)
-                        old_date = old_val.date() if old_val and hasattr(old_val, 'date') else None
-                        new_date = new_val.date() if new_val and hasattr(new_val, 'date') else None
-                        
-                        if old_date != new_date:
-                            actually_changed.append(key)
-                            print(f"   ✓ {key} changed: {old_date} → {new_date}")
-                    elif old_val != new_val:
-                        actually_changed.append(key)
-                        print(f"   ✓ {key} changed: '{old_val}' (type: {type(old_val).__name__}) → '{new_val}' (type: {type(new_val).__name__})")
-                
-                updated_fields = actually_changed
-                assignment_changed = 'assigned_to' in updated_fields
-                other_fields_changed = [f for f in updated_fields if f != 'assigned_to']
-                
-                print(f"   All update_data keys: {list(update_data.keys())}")
-                print(f"   Actually changed fields: {updated_fields}")
-                print(f"   Assignment changed: {assignment_changed}")
-                print(f"   Other fields changed: {other_fields_changed}")
-                print(f"   Old assigned_to: {old_assigned_to}")
-                print(f"   New assigned_to: {new_assigned_to}")
-                
-                notification_task_data = {
-                    'task_name': response_data.get('task_name', 'Unknown Task'),
-                    'task_ID': response_data.get('task_ID'),
-                    'id': updated_doc.id,
-                    'proj_ID': response_data.get('proj_ID')
-                }
+        except Exception as e:
+            logger.exception("❌ Failed to queue owner change email: %s", e)
+
+        # ================== CREATE NOTIFICATIONS FOR TASK UPDATES ==================
+        try:
+            logger.debug("🔔 NOTIFICATION BLOCK REACHED")
+            
+            # Get the NEW assigned_to list (after update)
+            # old_assigned_to was captured before the update above
+            new_assigned_to = response_data.get('assigned_to', [])
+            
+            # Determine what ACTUALLY changed by comparing old vs new values
+            # Exclude only true metadata/system fields
+            metadata_fields = ['updatedAt', 'createdAt', 'status_log', 'id', 'task_ID', 'proj_ID']
+            old_values_dict = old_data
+            
+            actually_changed = []
+            for key in update_data.keys():
+                if key in metadata_fields:
+                    continue
                 
-                # Prepare old and new values for changed fields
-                old_values = old_doc.to_dict() if old_doc.exists else {}
-                new_values = response_data
+                old_val = old_values_dict.get(key)
+                new_val = update_data.get(key)
                 
-                # SCENARIO 1: Assignment changed - notify NEWLY added users about assignment
-                if assignment_changed and new_assigned_to:
-                    newly_assigned = [user for user in new_assigned_to if user not in old_assigned_to]
-                    already_assigned = [user for user in new_assigned_to if user in old_assigned_to]
-                    
-                    # Notify newly assigned users
-                    if newly_assigned:
-                        print(f"🎯 Notifying {len(newly_assigned)} NEWLY assigned users")
-                        notification_service.notify_task_assigned(notification_task_data, newly_assigned)
-                        print(f"✅ Task assignment notifications sent to: {newly_assigned}")
+                # Compare values (handle different types)
+                if key == 'assigned_to':
+                    # For lists, sort and compare
+                    old_sorted = sorted(old_val) if old_val else []
+                    new_sorted = sorted(new_val) if new_val else []
+                    if old_sorted != new_sorted:
+                        actually_changed.append(key)
+                        logger.debug("   ✓ %s changed: %s → %s", key, old_sorted, new_sorted)
+                elif key in ['start_date', 'end_date']:
+                    # For dates, compare the calendar date only (ignore time and timezone)
+                    old_date = old_val.date() if old_val and hasattr(old_val, 'date') else None
+                    new_date = new_val.date() if new_val and hasattr(new_val, 'date') else None
                     
-                    # If other fields also changed, notify already assigned users about updates
-                    if other_fields_changed and already_assigned:
-                        print(f"🎯 Notifying {len(already_assigned)} ALREADY assigned users about updates")
-                        notification_service.notify_task_updated(notification_task_data, already_assigned, other_fields_changed, old_values, new_values)
-                        print(f"✅ Task update notifications sent to: {already_assigned}")
+                    if old_date != new_date:
+                        actually_changed.append(key)
+                        logger.debug("   ✓ %s changed: %s → %s", key, old_date, new_date)
+                elif old_val != new_val:
+                    actually_changed.append(key)
+                    logger.debug("   ✓ %s changed: '%s' (type: %s) → '%s' (type: %s)", key, old_val, type(old_val).__name__, new_val, type(new_val).__name__)
+            
+            updated_fields = actually_changed
+            assignment_changed = 'assigned_to' in updated_fields
+            other_fields_changed = [f for f in updated_fields if f != 'assigned_to']
+            
+            logger.debug("   All update_data keys: %s", list(update_data.keys()))
+            logger.debug("   Actually changed fields: %s", updated_fields)
+            logger.debug("   Assignment changed: %s", assignment_changed)
+            logger.debug("   Other fields changed: %s", other_fields_changed)
+            logger.debug("   Old assigned_to: %s", old_assigned_to)
+            logger.debug("   New assigned_to: %s", new_assigned_to)
+            
+            notification_task_data = {
+                'task_name': response_data.get('task_name', 'Unknown Task'),
+                'task_ID': response_data.get('task_ID'),
+                'id': doc_ref.id,
+                'proj_ID': response_data.get('proj_ID')
+            }
+            
+            # Prepare old and new values for changed fields
+            old_values = old_data
+            new_values = response_data
+            
+            # SCENARIO 1: Assignment changed - notify NEWLY added users about assignment
+            if assignment_changed and new_assigned_to:
+                newly_assigned = [user for user in new_assigned_to if user not in old_assigned_to]
+                already_assigned = [user for user in new_assigned_to if user in old_assigned_to]
                 
-                # SCENARIO 2: Other fields changed WITHOUT assignment change - notify ALL current assignees
-                elif other_fields_changed and new_assigned_to:
-                    print(f"🎯 Notifying {len(new_assigned_to)} users about task details update (no assignment change)")
-                    notification_service.notify_task_updated(notification_task_data, new_assigned_to, other_fields_changed, old_values, new_values)
-                    print("✅ Task update notifications sent")
-                else:
-                    print("⏭️  No notifications needed (no changes or no assignees)")
+                # Notify newly assigned users
+                if newly_assigned:
+                    logger.debug("🎯 Notifying %s NEWLY assigned users", len(newly_assigned))
+                    job_queue.enqueue('notify_assigned', task_data=notification_task_data, user_ids=newly_assigned)
+                    logger.debug("✅ Task assignment notifications queued for: %s", newly_assigned)
                 
-            except Exception as e:
-                print(f"❌ Failed to create update notifications: {e}")
-                import traceback
-                traceback.print_exc()
+                # If other fields also changed, notify already assigned users about updates
+                if other_fields_changed and already_assigned:
+                    logger.debug("🎯 Notifying %s ALREADY assigned users about updates", len(already_assigned))
+                    job_queue.enqueue('notify_updated', task_data=notification_task_data, user_ids=already_assigned,
+                                      updated_fields=other_fields_changed, old_values=old_values, new_values=new_values)
+                    logger.debug("✅ Task update notifications queued for: %s", already_assigned)
+            
+            # SCENARIO 2: Other fields changed WITHOUT assignment change - notify ALL current assignees
+            elif other_fields_changed and new_assigned_to:
+                logger.debug("🎯 Notifying %s users about task details update (no assignment change)", len(new_assigned_to))
+                job_queue.enqueue('notify_updated', task_data=notification_task_data, user_ids=new_assigned_to,
+                                  updated_fields=other_fields_changed, old_values=old_values, new_values=new_values)
+                logger.debug("✅ Task update notifications queued")
+            else:
+                logger.debug("⏭️  No notifications needed (no changes or no assignees)")
+            
+        except Exception as e:
+            logger.exception("❌ Failed to create update notifications: %s", e)
 
-            try:
-                next_instance_payload = None
-                recurrence_info = raw_updated_data.get('recurrence') or {}
-                series_id = raw_updated_data.get('recurrence_series_id') or updated_doc.id
-                current_occurrence_index = raw_updated_data.get('recurrence_occurrence')
-                if recurrence_info.get('enabled'):
-                    if current_occurrence_index is None:
-                        current_occurrence_index = 1
-                else:
-                    current_occurrence_index = None
-
-                if (
-                    status_changed
-                    and new_status_normalized.lower() == 'completed'
-                    and recurrence_info.get('enabled')
-                    and current_occurrence_index is not None
-                ):
-                    current_start_dt = raw_updated_data.get('start_date')
-                    current_end_dt = raw_updated_data.get('end_date')
-                    if isinstance(current_start_dt, str):
-                        try:
-                            current_start_dt = datetime.fromisoformat(current_start_dt)
-                        except Exception:
-                            current_start_dt = None
-                    if isinstance(current_end_dt, str):
-                        try:
-                            current_end_dt = datetime.fromisoformat(current_end_dt)
-                        except Exception:
-                            current_end_dt = None
-
-                    next_start_dt, next_end_dt = _compute_next_occurrence_dates(current_start_dt, current_end_dt, recurrence_info)
-                    if next_start_dt:
-                        next_occurrence_index = (current_occurrence_index or 1) + 1
-                        if not _should_stop_recurrence(recurrence_info, next_occurrence_index, next_start_dt):
-                            recurrence_clone = dict(recurrence_info)
-                            new_task_data = {
-                                'proj_name': raw_updated_data.get('proj_name', ''),
-                                'proj_ID': raw_updated_data.get('proj_ID'),
-                                'task_name': raw_updated_data.get('task_name', ''),
-                                'task_desc': raw_updated_data.get('task_desc', ''),
-                                'start_date': next_start_dt,
-                                'end_date': next_end_dt,
-                                'owner': raw_updated_data.get('owner'),
-                                'assigned_to': raw_updated_data.get('assigned_to', []) or [],
-                                'attachments': raw_updated_data.get('attachments', []),
-                                'task_status': 'Unassigned',
-                                'priority_level': raw_updated_data.get('priority_level'),
-                                'hasSubtasks': raw_updated_data.get('hasSubtasks', False),
-                                'is_deleted': False,
-                                'recurrence': recurrence_clone,
-                                'recurrence_occurrence': next_occurrence_index,
-                                'recurrence_series_id': series_id,
-                                'status_history': [],
-                                'status_log': [],
-                                'createdAt': firestore.SERVER_TIMESTAMP,
-                                'updatedAt': firestore.SERVER_TIMESTAMP
-                            }
-
-                            new_doc_ref = db.collection('Tasks').add(new_task_data)
-                            new_doc = new_doc_ref[1]
-                            new_doc_id = new_doc.id
-                            try:
-                                new_doc.update({'recurrence_series_id': series_id})
-                            except Exception:
-                                pass
+        try:
+            next_instance_payload = None
+            recurrence_info = raw_updated_data.get('recurrence') or {}
+            series_id = raw_updated_data.get('recurrence_series_id') or doc_ref.id
+            current_occurrence_index = raw_updated_data.get('recurrence_occurrence')
+            if recurrence_info.get('enabled'):
+                if current_occurrence_index is None:
+                    current_occurrence_index = 1
+            else:
+                current_occurrence_index = None
 
-                            assigned_users_next = new_task_data.get('assigned_to') or []
-                            if assigned_users_next:
-                                try:
-                                    notification_service.notify_task_assigned(
-                                        {
-                                            'task_name': new_task_data.get('task_name', 'Unknown Task'),
-                                            'task_ID': new_task_data.get('task_ID'),
-                                            'id': new_doc_id,
-                                            'proj_ID': new_task_data.get('proj_ID')
-                                        },
-                                        assigned_users_next
-                                    )
-                                except Exception as notify_error:
-                                    print(f"⚠️ Failed to notify new recurring assignees: {notify_error}")
-
-                            next_instance_payload = dict(new_task_data)
-                            next_instance_payload['id'] = new_doc_id
-                            next_instance_payload['start_date'] = next_start_dt.isoformat()
-                            if next_end_dt:
-                                next_instance_payload['end_date'] = next_end_dt.isoformat()
-                            else:
-                                next_instance_payload['end_date'] = None
-                            next_instance_payload.pop('createdAt', None)
-                            next_instance_payload.pop('updatedAt', None)
-                            next_instance_payload['task_status'] = 'Unassigned'
-                            next_instance_payload['recurrence_occurrence'] = next_occurrence_index
-                            next_instance_payload['recurrence_series_id'] = series_id
-                            response_data['next_instance'] = next_instance_payload
-                            response_data['recurrence_series_id'] = series_id
-
-                            response_data['recurrence_occurrence'] = current_occurrence_index
+            if (
+                status_changed
+                and new_status_normalized.lower() == 'completed'
+                and recurrence_info.get('enabled')
+                and current_occurrence_index is not None
+            ):
+                current_start_dt = raw_updated_data.get('start_date')
+                current_end_dt = raw_updated_data.get('end_date')
+                if isinstance(current_start_dt, str):
+                    try:
+                        current_start_dt = datetime.fromisoformat(current_start_dt)
+                    except Exception:
+                        current_start_dt = None
+                if isinstance(current_end_dt, str):
+                    try:
+                        current_end_dt = datetime.fromisoformat(current_end_dt)
+                    except Exception:
+                        current_end_dt = None
+
+                next_start_dt, next_end_dt = _compute_next_occurrence_dates(current_start_dt, current_end_dt, recurrence_info)
+                if next_start_dt:
+                    next_occurrence_index = (current_occurrence_index or 1) + 1
+                    if not _should_stop_recurrence(recurrence_info, next_occurrence_index, next_start_dt):
+                        recurrence_clone = dict(recurrence_info)
+                        new_task_data = {
+                            'proj_name': raw_updated_data.get('proj_name', ''),
+                            'proj_ID': raw_updated_data.get('proj_ID'),
+                            'task_name': raw_updated_data.get('task_name', ''),
+                            'task_desc': raw_updated_data.get('task_desc', ''),
+                            'start_date': next_start_dt,
+                            'end_date': next_end_dt,
+                            'owner': raw_updated_data.get('owner'),
+                            'assigned_to': raw_updated_data.get('assigned_to', []) or [],
+                            'attachments': raw_updated_data.get('attachments', []),
+                            'task_status': 'Unassigned',
+                            'priority_level': raw_updated_data.get('priority_level'),
+                            'hasSubtasks': raw_updated_data.get('hasSubtasks', False),
+                            'is_deleted': False,
+                            'recurrence': recurrence_clone,
+                            'recurrence_occurrence': next_occurrence_index,
+                            'recurrence_series_id': series_id,
+                            'status_history': [],
+                            'status_log': []
+                        }
+
+                        # The ID is allocated client-side; the write and notifications run as a job
+                        new_doc_id = db.collection('Tasks').document().id
+                        job_queue.enqueue('spawn_next_occurrence', task_id=new_doc_id, task_data=new_task_data)
+
+                        next_instance_payload = dict(new_task_data)
+                        next_instance_payload['id'] = new_doc_id
+                        next_instance_payload['start_date'] = next_start_dt.isoformat()
+                        if next_end_dt:
+                            next_instance_payload['end_date'] = next_end_dt.isoformat()
+                        else:
+                            next_instance_payload['end_date'] = None
+                        next_instance_payload['task_status'] = 'Unassigned'
+                        next_instance_payload['recurrence_occurrence'] = next_occurrence_index
+                        next_instance_payload['recurrence_series_id'] = series_id
+                        response_data['next_instance'] = next_instance_payload
+                        response_data['recurrence_series_id'] = series_id
+
+                        response_data['recurrence_occurrence'] = current_occurrence_index
+                        if (
+                            raw_updated_data.get('recurrence_occurrence') != current_occurrence_index
+                            or raw_updated_data.get('recurrence_series_id') != series_id
+                        ):
                             try:
-                                doc_ref.update({
+                                update_document(doc_ref, {
                                     'recurrence_occurrence': current_occurrence_index,
                                     'recurrence_series_id': series_id
                                 })
                             except Exception:
                                 pass
-            except Exception as recurrence_error:
-                print(f"⚠️ Failed to generate next recurring instance: {recurrence_error}")
+        except Exception as recurrence_error:
+            logger.warning("⚠️ Failed to generate next recurring instance: %s", recurrence_error)
 
-            return jsonify(response_data), 200
-        else:
-            return jsonify({'error': 'Task not found after update'}), 404
+        return jsonify(response_data), 200
 
     except ValueError as e:
         return jsonify({'error': f'Invalid date format. Use YYYY-MM-DD: {str(e)}'}), 400
@@ -1318,7 +1367,7 @@ def delete_task(task_id):
             return jsonify({'error': 'Task not found'}), 404
         
         # Delete document
-        doc_ref.delete()
+        user_task_index.delete_task(doc_ref)
 
         return jsonify({'message': 'Task deleted successfully', 'id': task_id}), 200
 
@@ -1328,9 +1377,14 @@ def delete_task(task_id):
 # =============== GET TASKS BY PROJECT ID ===============
 @tasks_bp.route('/api/projects/<proj_id>/tasks', methods=['GET'])
 def get_tasks_by_project(proj_id):
+    try:
+        fields = get_fields_arg(request.args, presets=TASK_FIELD_PRESETS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     try:
         db = get_firestore_client()
-        tasks_ref = db.collection('Tasks')
+        tasks_ref = apply_projection(db.collection('Tasks'), fields)
         # Query tasks by project ID
         query = tasks_ref.where('proj_ID', '==', proj_id)
         tasks = query.stream()
@@ -1340,16 +1394,6 @@ def get_tasks_by_project(proj_id):
             task_data = task.to_dict()
             task_data['id'] = task.id
             
-            # Convert timestamps to ISO format
-            if 'start_date' in task_data and task_data['start_date']:
-                task_data['start_date'] = task_data['start_date'].isoformat()
-            if 'end_date' in task_data and task_data['end_date']:
-                task_data['end_date'] = task_data['end_date'].isoformat()
-            if 'createdAt' in task_data and task_data['createdAt']:
-                task_data['createdAt'] = task_data['createdAt'].isoformat()
-            if 'updatedAt' in task_data and task_data['updatedAt']:
-                task_data['updatedAt'] = task_data['updatedAt'].isoformat()
-            
             task_list.append(task_data)
             
         return jsonify(task_list), 200
@@ -1358,18 +1402,14 @@ def get_tasks_by_project(proj_id):
 
 # =============== GET ALL USERS FOR DROPDOWN ===============
 @tasks_bp.route('/api/users', methods=['GET'])
+@etag_from(lambda: user_directory.fingerprint)
 def get_users():
     try:
-        db = get_firestore_client()
-        users_ref = db.collection('Users')  # Adjust collection name as needed
-        users = users_ref.stream()
-        
         user_list = []
-        for user in users:
-            user_data = user.to_dict()
+        for user_id, user_data in user_directory.all_users().items():
             # Only return necessary fields for dropdown
             user_info = {
-                'id': user.id,
+                'id': user_id,
                 'name': user_data.get('name', ''),
                 'email': user_data.get('email', '')  # Optional: include email for better identification
             }
@@ -1418,8 +1458,8 @@ def get_all_projects():
         project_list = []
         for project in projects:
             project_data = project.to_dict()
-            print(f"Project document ID: {project.id}")
-            print(f"Project data: {project_data}")
+            logger.debug("Project document ID: %s", project.id)
+            logger.debug("Project data: %s", project_data)
             
             # Be very defensive about field access
             project_info = {
@@ -1429,19 +1469,19 @@ def get_all_projects():
                 'description': project_data.get('description') or ''
             }
             
-            print(f"Processed project_info: {project_info}")
+            logger.debug("Processed project_info: %s", project_info)
             project_list.append(project_info)
         
-        print(f"Final project_list: {project_list}")
+        logger.debug("Final project_list: %s", project_list)
         return jsonify(project_list), 200
     except Exception as e:
-        print(f"Error in get_all_projects: {str(e)}")
+        logger.error("Error in get_all_projects: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @tasks_bp.route('/api/tasks/<task_id>/delete', methods=['PUT'])
 def soft_delete_task(task_id):
     try:
-        print(f"🗑️ CASCADE DELETE for task: {task_id}", flush=True)
+        logger.debug("🗑️ CASCADE DELETE for task: %s", task_id)
         
         db = get_firestore_client()
         deleted_at = firestore.SERVER_TIMESTAMP
@@ -1462,30 +1502,28 @@ def soft_delete_task(task_id):
             
         task_data = task_doc.to_dict()
         
-        # 🔍 DEBUG: Print ALL task fields to find the correct name field
-        print(f"🔍 DEBUG: ALL task fields: {list(task_data.keys())}", flush=True)
-        print(f"🔍 DEBUG: Full task data: {task_data}", flush=True)
+        logger.debug("🔍 DEBUG: Full task data: %s", task_data)
         
-        # 🔍 DEBUG: Test different possible field names
+        # Task name may live under different field names
         taskname_field = task_data.get('taskname')
         task_name_field = task_data.get('task_name') 
         name_field = task_data.get('name')
         title_field = task_data.get('title')
         
-        print(f"🔍 DEBUG: taskname = '{taskname_field}'", flush=True)
-        print(f"🔍 DEBUG: task_name = '{task_name_field}'", flush=True)
-        print(f"🔍 DEBUG: name = '{name_field}'", flush=True)
-        print(f"🔍 DEBUG: title = '{title_field}'", flush=True)
+        logger.debug("🔍 DEBUG: taskname = '%s'", taskname_field)
+        logger.debug("🔍 DEBUG: task_name = '%s'", task_name_field)
+        logger.debug("🔍 DEBUG: name = '%s'", name_field)
+        logger.debug("🔍 DEBUG: title = '%s'", title_field)
         
         if str(task_data.get('owner', '')) != str(user_id):
             return jsonify({'error': 'Only task owner can delete this task'}), 403
         
         # Delete the task
-        task_ref.update({
+        user_task_index.update_task(task_ref, {
             'is_deleted': True,
             'deleted_at': deleted_at
         })
-        print(f"✅ Task {task_id} soft deleted", flush=True)
+        logger.debug("✅ Task %s soft deleted", task_id)
         
         # Find and cascade delete subtasks
         subtasks_ref = db.collection('subtasks')  # LOWERCASE
@@ -1505,9 +1543,9 @@ def soft_delete_task(task_id):
                     'cascade_parent_id': task_id
                 })
                 deleted_count += 1
-                print(f"✅ Subtask {subtask_doc.id} cascade deleted", flush=True)
+                logger.debug("✅ Subtask %s cascade deleted", subtask_doc.id)
         
-        print(f"🎉 CASCADE COMPLETE: {deleted_count} subtasks deleted", flush=True)
+        logger.debug("🎉 CASCADE COMPLETE: %s subtasks deleted", deleted_count)
         
         # Try multiple field names for task name (with proper fallback)
         final_task_name = (
@@ -1518,7 +1556,7 @@ def soft_delete_task(task_id):
             'Unknown Task'
         )
         
-        print(f"🔍 DEBUG: Final task name will be: '{final_task_name}'", flush=True)
+        logger.debug("🔍 DEBUG: Final task name will be: '%s'", final_task_name)
         
         return jsonify({
             'message': f'Task and {deleted_count} subtasks moved to trash',
@@ -1528,9 +1566,7 @@ def soft_delete_task(task_id):
         }), 200
         
     except Exception as e:
-        print(f"💥 CASCADE ERROR: {str(e)}", flush=True)
-        import traceback
-        traceback.print_exc()
+        logger.exception("💥 CASCADE ERROR: %s", e)
         return jsonify({'error': str(e)}), 500
     
 @tasks_bp.route('/api/test/update-subtask/<subtask_id>', methods=['PUT'])
@@ -1538,21 +1574,21 @@ def test_update_subtask(subtask_id):
     try:
         db = get_firestore_client()
         
-        print(f"🧪 TEST: Attempting to update subtask {subtask_id}", flush=True)
+        logger.debug("🧪 TEST: Attempting to update subtask %s", subtask_id)
         
         # Get the subtask first
         subtask_ref = db.collection('subtasks').document(subtask_id)
         subtask_doc = subtask_ref.get()
         
         if not subtask_doc.exists:
-            print(f"❌ TEST: Subtask {subtask_id} not found", flush=True)
+            logger.error("❌ TEST: Subtask %s not found", subtask_id)
             return jsonify({'error': 'Subtask not found'}), 404
         
         current_data = subtask_doc.to_dict()
-        print(f"📋 TEST: Current subtask data: is_deleted = {current_data.get('is_deleted')}", flush=True)
+        logger.debug("📋 TEST: Current subtask data: is_deleted = %s", current_data.get('is_deleted'))
         
         # Try to update it
-        print("🔄 TEST: Updating subtask...", flush=True)
+        logger.debug("🔄 TEST: Updating subtask...")
         subtask_ref.update({
             'is_deleted': True,
             'test_field': 'updated_by_test'
@@ -1562,8 +1598,8 @@ def test_update_subtask(subtask_id):
         updated_doc = subtask_ref.get()
         updated_data = updated_doc.to_dict()
         
-        print(f"✅ TEST: Update result: is_deleted = {updated_data.get('is_deleted')}", flush=True)
-        print(f"✅ TEST: Test field = {updated_data.get('test_field')}", flush=True)
+        logger.debug("✅ TEST: Update result: is_deleted = %s", updated_data.get('is_deleted'))
+        logger.debug("✅ TEST: Test field = %s", updated_data.get('test_field'))
         
         return jsonify({
             'message': 'Test update successful',
@@ -1573,9 +1609,7 @@ def test_update_subtask(subtask_id):
         }), 200
         
     except Exception as e:
-        print(f"💥 TEST ERROR: {str(e)}", flush=True)
-        import traceback
-        traceback.print_exc()
+        logger.exception("💥 TEST ERROR: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @tasks_bp.route('/api/debug/task/<task_id>/subtasks', methods=['GET'])
@@ -1583,7 +1617,7 @@ def debug_subtasks(task_id):
     try:
         db = get_firestore_client()
         
-        print(f"🔍 DEBUG: Looking for ALL subtasks for task {task_id}", flush=True)
+        logger.debug("🔍 DEBUG: Looking for ALL subtasks for task %s", task_id)
         
         # Query ALL subtasks (including deleted ones)
         subtasks_ref = db.collection('subtasks')
@@ -1601,7 +1635,7 @@ def debug_subtasks(task_id):
                 'parent_task_id': data.get('parent_task_id')
             })
             
-            print(f"   📋 Subtask {doc.id}: is_deleted={data.get('is_deleted')}, name={data.get('name')}", flush=True)
+            logger.debug("   📋 Subtask %s: is_deleted=%s, name=%s", doc.id, data.get('is_deleted'), data.get('name'))
         
         return jsonify({
             'task_id': task_id,
@@ -1610,16 +1644,26 @@ def debug_subtasks(task_id):
         }), 200
         
     except Exception as e:
-        print(f"💥 DEBUG ERROR: {str(e)}", flush=True)
+        logger.error("💥 DEBUG ERROR: %s", e)
         return jsonify({'error': str(e)}), 500
 
     
 # =============== GET DELETED TASKS ===============
+def _deleted_task_payload(doc):
+    task_data = doc.to_dict()
+    task_data['id'] = doc.id
+    return task_data
+
 @tasks_bp.route('/api/tasks/deleted', methods=['GET'])
 def get_deleted_tasks():
     """Get all deleted tasks (where is_deleted = True)"""
     try:
-        print("📋 === GET DELETED TASKS ===")
+        page = get_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        logger.debug("📋 === GET DELETED TASKS ===")
         
         db = get_firestore_client()
         user_id = request.args.get('userId')
@@ -1630,6 +1674,15 @@ def get_deleted_tasks():
         # Query for deleted tasks where user is owner or assigned
         tasks_ref = db.collection('Tasks')
         query = tasks_ref.where('is_deleted', '==', True)
+
+        if page:
+            limit, cursor = page
+            queries = [
+                query.where('assignedto', 'array_contains', user_id),
+                query.where('owner', '==', user_id),
+            ]
+            docs, next_cursor = fetch_page(queries, limit, cursor)
+            return jsonify(page_response([_deleted_task_payload(doc) for doc in docs], next_cursor)), 200
         
         tasks = []
         seen_ids = set()
@@ -1639,59 +1692,57 @@ def get_deleted_tasks():
             assigned_query = query.where('assignedto', 'array_contains', user_id)
             for doc in assigned_query.stream():
                 if doc.id not in seen_ids:
-                    task_data = doc.to_dict()
-                    task_data['id'] = doc.id
-                    
-                    # Convert timestamps to ISO format
-                    if 'deleted_at' in task_data and task_data['deleted_at']:
-                        task_data['deleted_at'] = task_data['deleted_at'].isoformat()
-                    if 'startdate' in task_data and task_data['startdate']:
-                        task_data['startdate'] = task_data['startdate'].isoformat()
-                    if 'enddate' in task_data and task_data['enddate']:
-                        task_data['enddate'] = task_data['enddate'].isoformat()
-                    
-                    tasks.append(task_data)
+                    tasks.append(_deleted_task_payload(doc))
                     seen_ids.add(doc.id)
         except Exception as e:
-            print(f"Error querying assigned tasks: {e}")
+            logger.error("Error querying assigned tasks: %s", e)
         
         # Get tasks where user is owner
         try:
             owner_query = query.where('owner', '==', user_id)
             for doc in owner_query.stream():
                 if doc.id not in seen_ids:
-                    task_data = doc.to_dict()
-                    task_data['id'] = doc.id
-                    
-                    # Convert timestamps to ISO format
-                    if 'deleted_at' in task_data and task_data['deleted_at']:
-                        task_data['deleted_at'] = task_data['deleted_at'].isoformat()
-                    if 'startdate' in task_data and task_data['startdate']:
-                        task_data['startdate'] = task_data['startdate'].isoformat()
-                    if 'enddate' in task_data and task_data['enddate']:
-                        task_data['enddate'] = task_data['enddate'].isoformat()
-                    
-                    tasks.append(task_data)
+                    tasks.append(_deleted_task_payload(doc))
                     seen_ids.add(doc.id)
         except Exception as e:
-            print(f"Error querying owned tasks: {e}")
+            logger.error("Error querying owned tasks: %s", e)
         
-        print(f"📊 Found {len(tasks)} deleted tasks for user {user_id}")
+        logger.debug("📊 Found %s deleted tasks for user %s", len(tasks), user_id)
         return jsonify(tasks), 200
         
     except Exception as e:
-        print(f"❌ Error fetching deleted tasks: {str(e)}")
+        logger.error("❌ Error fetching deleted tasks: %s", e)
         return jsonify({"error": str(e)}), 500
 
 # =============== GET DELETED SUBTASKS ===============
+def _deleted_subtask_payload(subtask_id, data):
+    subtask_info = {
+        'id': subtask_id,
+        'name': data.get('name', 'Unknown Subtask'),
+        'subtaskname': data.get('name', 'Unknown Subtask'),
+        'description': data.get('description', ''),
+        'subtaskdescription': data.get('description', ''),
+        'is_deleted': data.get('is_deleted', False),
+        'deleted_at': data.get('deleted_at'),
+        'parent_task_id': data.get('parent_task_id'),
+        'deleted_by_cascade': data.get('deleted_by_cascade', False),
+        'cascade_parent_id': data.get('cascade_parent_id')
+    }
+    return subtask_info
+
 @tasks_bp.route('/api/subtasks/deleted', methods=['GET']) 
 def get_deleted_subtasks():
     try:
-        print("🔍 GET DELETED SUBTASKS API CALLED", flush=True)
+        page = get_page_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        logger.debug("🔍 GET DELETED SUBTASKS API CALLED")
         db = get_firestore_client()
         
         user_id = request.args.get('userId')
-        print(f"   User ID: {user_id}", flush=True)
+        logger.debug("   User ID: %s", user_id)
         
         if not user_id:
             return jsonify({'error': 'userId parameter is required'}), 400
@@ -1699,9 +1750,35 @@ def get_deleted_subtasks():
         # Query ALL deleted subtasks (no owner filter for cascade deleted ones)
         subtasks_ref = db.collection('subtasks')  # LOWERCASE
         query = subtasks_ref.where('is_deleted', '==', True)  # ONLY filter by is_deleted
+
+        if page:
+            limit, cursor = page
+
+            def include_doc(doc):
+                data = doc.to_dict()
+                if data.get('owner') == user_id:
+                    return True
+                cascade_parent_id = data.get('cascade_parent_id')
+                if not data.get('deleted_by_cascade', False) or not cascade_parent_id:
+                    return False
+                # Request-cached: siblings share the same parent task
+                parent_doc = get_document(db.collection('Tasks').document(str(cascade_parent_id)))
+                return parent_doc.exists and str(parent_doc.to_dict().get('owner', '')) == str(user_id)
+
+            docs, next_cursor = fetch_page(query, limit, cursor, include=include_doc)
+            items = [_deleted_subtask_payload(doc.id, doc.to_dict()) for doc in docs]
+            return jsonify(page_response(items, next_cursor)), 200
         
         subtasks = []
-        docs = query.stream()
+        docs = list(query.stream())
+
+        # Batch-fetch the parent tasks of cascade-deleted subtasks
+        cascade_parent_ids = [
+            doc.to_dict().get('cascade_parent_id')
+            for doc in docs
+            if doc.to_dict().get('owner') != user_id and doc.to_dict().get('deleted_by_cascade', False)
+        ]
+        parent_tasks_by_id = get_documents(db, 'Tasks', cascade_parent_ids)
         
         for doc in docs:
             data = doc.to_dict()
@@ -1714,51 +1791,27 @@ def get_deleted_subtasks():
             # Check if user owns the subtask directly
             if data.get('owner') == user_id:
                 include_subtask = True
-                print(f"   Found user-owned deleted subtask: {doc.id}", flush=True)
+                logger.debug("   Found user-owned deleted subtask: %s", doc.id)
             
             # Check if it's cascade deleted from user's task
             elif data.get('deleted_by_cascade', False):
                 cascade_parent_id = data.get('cascade_parent_id')
                 if cascade_parent_id:
                     # Check if the parent task belongs to this user
-                    parent_task_ref = db.collection('Tasks').document(cascade_parent_id)
-                    parent_task = parent_task_ref.get()
-                    if parent_task.exists:
-                        parent_data = parent_task.to_dict()
+                    parent_data = parent_tasks_by_id.get(str(cascade_parent_id))
+                    if parent_data is not None:
                         if str(parent_data.get('owner', '')) == str(user_id):
                             include_subtask = True
-                            print(f"   Found cascade deleted subtask: {doc.id} (from task {cascade_parent_id})", flush=True)
+                            logger.debug("   Found cascade deleted subtask: %s (from task %s)", doc.id, cascade_parent_id)
             
             if include_subtask:
-                subtask_info = {
-                    'id': doc.id,
-                    'name': data.get('name', 'Unknown Subtask'),
-                    'subtaskname': data.get('name', 'Unknown Subtask'),
-                    'description': data.get('description', ''),
-                    'subtaskdescription': data.get('description', ''),
-                    'is_deleted': data.get('is_deleted', False),
-                    'deleted_at': data.get('deleted_at'),
-                    'parent_task_id': data.get('parent_task_id'),
-                    'deleted_by_cascade': data.get('deleted_by_cascade', False),
-                    'cascade_parent_id': data.get('cascade_parent_id')
-                }
-                
-                # Convert timestamp
-                if subtask_info['deleted_at']:
-                    try:
-                        subtask_info['deleted_at'] = subtask_info['deleted_at'].isoformat()
-                    except:
-                        pass
-                
-                subtasks.append(subtask_info)
+                subtasks.append(_deleted_subtask_payload(doc.id, data))
         
-        print(f"📊 Returning {len(subtasks)} deleted subtasks for user", flush=True)
+        logger.debug("📊 Returning %s deleted subtasks for user", len(subtasks))
         return jsonify(subtasks), 200
         
     except Exception as e:
-        print(f"💥 Error getting deleted subtasks: {str(e)}", flush=True)
-        import traceback
-        traceback.print_exc()
+        logger.exception("💥 Error getting deleted subtasks: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # =============== RESTORE TASK ===============
@@ -1768,7 +1821,7 @@ def restore_task(task_id):
     Restore a soft-deleted task by setting is_deleted = False
     """
     try:
-        print(f"🔄 Restoring task: {task_id}")
+        logger.debug("🔄 Restoring task: %s", task_id)
         
         db = get_firestore_client()
         doc_ref = db.collection('Tasks').document(task_id)
@@ -1776,7 +1829,7 @@ def restore_task(task_id):
         # Check if document exists
         doc = doc_ref.get()
         if not doc.exists:
-            print(f"❌ Task {task_id} not found")
+            logger.error("❌ Task %s not found", task_id)
             return jsonify({'error': 'Task not found'}), 404
         
         # Get current task data
@@ -1786,7 +1839,7 @@ def restore_task(task_id):
         if not task_data.get('is_deleted', False):
             return jsonify({'error': 'Task is not deleted'}), 400
         
-        print(f"📝 Restoring task: {task_data.get('taskname', 'Unknown')}")
+        logger.debug("📝 Restoring task: %s", task_data.get('taskname', 'Unknown'))
         
         # RESTORE: Set is_deleted back to False
         update_data = {
@@ -1795,8 +1848,8 @@ def restore_task(task_id):
             'updatedAt': firestore.SERVER_TIMESTAMP
         }
         
-        doc_ref.update(update_data)
-        print(f"✅ Task {task_id} restored successfully")
+        user_task_index.update_task(doc_ref, update_data)
+        logger.debug("✅ Task %s restored successfully", task_id)
         
         return jsonify({
             "message": "Task restored successfully",
@@ -1806,7 +1859,7 @@ def restore_task(task_id):
         }), 200
         
     except Exception as e:
-        print(f"❌ Error restoring task {task_id}: {str(e)}")
+        logger.error("❌ Error restoring task %s: %s", task_id, e)
         return jsonify({"error": str(e)}), 500
 
 # =============== RESTORE SUBTASK ===============
@@ -1816,7 +1869,7 @@ def restore_subtask(subtask_id):
     Restore a soft-deleted subtask by setting is_deleted = False
     """
     try:
-        print(f"🔄 Restoring subtask: {subtask_id}")
+        logger.debug("🔄 Restoring subtask: %s", subtask_id)
         
         db = get_firestore_client()
         doc_ref = db.collection('subtasks').document(subtask_id)
@@ -1824,7 +1877,7 @@ def restore_subtask(subtask_id):
         # Check if document exists
         doc = doc_ref.get()
         if not doc.exists:
-            print(f"❌ Subtask {subtask_id} not found")
+            logger.error("❌ Subtask %s not found", subtask_id)
             return jsonify({'error': 'Subtask not found'}), 404
         
         # Get current subtask data
@@ -1834,7 +1887,7 @@ def restore_subtask(subtask_id):
         if not subtask_data.get('is_deleted', False):
             return jsonify({'error': 'Subtask is not deleted'}), 400
         
-        print(f"📝 Restoring subtask: {subtask_data.get('subtaskname', 'Unknown')}")
+        logger.debug("📝 Restoring subtask: %s", subtask_data.get('subtaskname', 'Unknown'))
         
         # RESTORE: Set is_deleted back to False
         update_data = {
@@ -1844,7 +1897,7 @@ def restore_subtask(subtask_id):
         }
         
         doc_ref.update(update_data)
-        print(f"✅ Subtask {subtask_id} restored successfully")
+        logger.debug("✅ Subtask %s restored successfully", subtask_id)
         
         return jsonify({
             "message": "Subtask restored successfully",
@@ -1854,7 +1907,7 @@ def restore_subtask(subtask_id):
         }), 200
         
     except Exception as e:
-        print(f"❌ Error restoring subtask {subtask_id}: {str(e)}")
+        logger.error("❌ Error restoring subtask %s: %s", subtask_id, e)
         return jsonify({"error": str(e)}), 500
 
 # =============== PERMANENTLY DELETE TASK ===============
@@ -1864,7 +1917,7 @@ def permanently_delete_task(task_id):
     Permanently delete a task (actually remove from database)
     """
     try:
-        print(f"💥 Permanently deleting task: {task_id}")
+        logger.info("💥 Permanently deleting task: %s", task_id)
         
         db = get_firestore_client()
         doc_ref = db.collection('Tasks').document(task_id)
@@ -1872,16 +1925,16 @@ def permanently_delete_task(task_id):
         # Check if document exists
         doc = doc_ref.get()
         if not doc.exists:
-            print(f"❌ Task {task_id} not found")
+            logger.error("❌ Task %s not found", task_id)
             return jsonify({'error': 'Task not found'}), 404
         
         # Get current task data for logging
         task_data = doc.to_dict()
-        print(f"💥 Permanently deleting task: {task_data.get('taskname', 'Unknown')}")
+        logger.info("💥 Permanently deleting task: %s", task_data.get('taskname', 'Unknown'))
         
         # HARD DELETE: Actually remove the document
-        doc_ref.delete()
-        print(f"✅ Task {task_id} permanently deleted")
+        user_task_index.delete_task(doc_ref)
+        logger.debug("✅ Task %s permanently deleted", task_id)
         
         return jsonify({
             "message": "Task permanently deleted",
@@ -1889,7 +1942,7 @@ def permanently_delete_task(task_id):
         }), 200
         
     except Exception as e:
-        print(f"❌ Error permanently deleting task {task_id}: {str(e)}")
+        logger.error("❌ Error permanently deleting task %s: %s", task_id, e)
         return jsonify({"error": str(e)}), 500
 
 # =============== PERMANENTLY DELETE SUBTASK ===============
@@ -1899,7 +1952,7 @@ def permanently_delete_subtask(subtask_id):
     Permanently delete a subtask (actually remove from database)
     """
     try:
-        print(f"💥 Permanently deleting subtask: {subtask_id}")
+        logger.info("💥 Permanently deleting subtask: %s", subtask_id)
         
         db = get_firestore_client()
         doc_ref = db.collection('subtasks').document(subtask_id)
@@ -1907,16 +1960,16 @@ def permanently_delete_subtask(subtask_id):
         # Check if document exists
         doc = doc_ref.get()
         if not doc.exists:
-            print(f"❌ Subtask {subtask_id} not found")
+            logger.error("❌ Subtask %s not found", subtask_id)
             return jsonify({'error': 'Subtask not found'}), 404
         
         # Get current subtask data for logging
         subtask_data = doc.to_dict()
-        print(f"💥 Permanently deleting subtask: {subtask_data.get('subtaskname', 'Unknown')}")
+        logger.info("💥 Permanently deleting subtask: %s", subtask_data.get('subtaskname', 'Unknown'))
         
         # HARD DELETE: Actually remove the document
         doc_ref.delete()
-        print(f"✅ Subtask {subtask_id} permanently deleted")
+        logger.debug("✅ Subtask %s permanently deleted", subtask_id)
         
         return jsonify({
             "message": "Subtask permanently deleted",
@@ -1924,6 +1977,6 @@ def permanently_delete_subtask(subtask_id):
         }), 200
         
     except Exception as e:
-        print(f"❌ Error permanently deleting subtask {subtask_id}: {str(e)}")
+        logger.error("❌ Error permanently deleting subtask %s: %s", subtask_id, e)
         return jsonify({"error": str(e)}), 500
 
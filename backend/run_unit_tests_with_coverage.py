@@ -37,7 +37,30 @@ def run_unit_tests_with_coverage():
             'testing.unit.test_notification_unit',        # Notification features
             'testing.unit.test_recurrence_features',      # Recurrence features
             'testing.unit.test_dashboard_analytics',       # Dashboard utility functions
-            'testing.unit.test_compute_effective_due_date' # Effective due date computation
+            'testing.unit.test_compute_effective_due_date', # Effective due date computation
+            'testing.unit.test_user_lookup_service',      # Login email lookup
+            'testing.unit.test_password_service',         # Password worker pool
+            'testing.unit.test_request_document_cache',   # Per-request document cache
+            'testing.unit.test_batched_document_fetch',   # Batched multi-document reads
+            'testing.unit.test_user_directory',           # In-memory Users directory
+            'testing.unit.test_gunicorn_config',          # Production server config
+            'testing.unit.test_lazy_export_imports',      # Lazy PDF/Excel export modules
+            'testing.unit.test_request_metrics',          # Per-route latency metrics
+            'testing.unit.test_logging_utils',            # Structured background logging
+            'testing.unit.test_firestore_accounting',     # Firestore reads/writes per request
+            'testing.unit.test_profiling',                # Opt-in request profiler
+            'testing.unit.test_query_utils',              # Cursor pagination for list endpoints
+            'testing.unit.test_json_provider',            # orjson provider, ISO 8601 datetimes
+            'testing.unit.test_http_cache',               # ETag / If-None-Match -> 304
+            'testing.unit.test_compression',              # gzip/brotli response compression
+            'testing.unit.test_task_field_service',       # Task status vocabulary + field backfill
+            'testing.unit.test_user_task_index',          # Per-user task index kept in sync on write
+            'testing.unit.test_project_directory',        # Cached project name/ID lookups
+            'testing.unit.test_task_update',              # Single-read transactional task update
+            'testing.unit.test_job_queue',                # SQLite job queue: retries, dead letters, workers
+            'testing.unit.test_email_outbox',             # Pooled SMTP outbox, rate limiting, retries
+            'testing.unit.test_email_digest',             # Per-recipient email digests
+            'testing.unit.test_deadline_scan'             # Range-indexed deadline scan
         ]
         
         # Run coverage
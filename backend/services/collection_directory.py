@@ -0,0 +1,196 @@
+"""
+Collection Directory
+Base class for process-wide in-memory copies of small Firestore collections
+(Users, Projects). A directory is loaded by the first snapshot of an
+on_snapshot listener and kept fresh by it, so a cold start reads the
+collection once. If the listener cannot be started, does not deliver its
+first snapshot within <PREFIX>_LISTENER_WAIT_SECONDS, or dies, the directory
+falls back to stream() reloads after a TTL.
+
+Only a cold start (nothing loaded yet) waits for the first snapshot. While a
+restarted listener syncs, requests are served from the stale directory.
+
+Subclasses set `collection_name` / `env_prefix` and implement _index(), which
+builds their lookup tables from {doc_id: data}.
+
+Configuration (environment, per subclass prefix):
+    <PREFIX>_LISTENER     1 = keep fresh with on_snapshot (default), 0 = TTL only
+    <PREFIX>_TTL_SECONDS  reload interval when no listener is active
+    <PREFIX>_LISTENER_WAIT_SECONDS  how long a load waits for the first snapshot (default 10)
+"""
+import hashlib
+import os
+import sys
+import threading
+import time
+
+# Add parent directory to path to import firebase_utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from firebase_utils import get_firestore_client
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class CollectionDirectory:
+    collection_name = None
+    env_prefix = None
+    label = 'Directory'
+
+    def __init__(self, ttl_seconds=None, use_listener=None, listener_wait_seconds=None):
+        self._db = None
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv(f'{self.env_prefix}_TTL_SECONDS', 300))
+        if use_listener is None:
+            use_listener = os.getenv(f'{self.env_prefix}_LISTENER', '1') != '0'
+        if listener_wait_seconds is None:
+            listener_wait_seconds = float(os.getenv(f'{self.env_prefix}_LISTENER_WAIT_SECONDS', 10))
+        self.ttl_seconds = ttl_seconds
+        self.use_listener = use_listener
+        self.listener_wait_seconds = listener_wait_seconds
+
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self._version = 0
+        self._fingerprint = None
+        self._index({})
+
+        self._watch = None
+        self._listener_synced = False
+        self._listener_started_at = None
+        self._first_snapshot = threading.Event()
+
+    @property
+    def db(self):
+        """Lazy-load Firestore client"""
+        if self._db is None:
+            self._db = get_firestore_client()
+        return self._db
+
+    @property
+    def version(self):
+        """Increments every time the directory contents are replaced"""
+        with self._lock:
+            return self._version
+
+    @property
+    def fingerprint(self):
+        """
+        Hash of the current directory contents (document IDs + update times).
+        Unlike `version` it is the same in every worker holding the same data,
+        so it can back an HTTP ETag.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return self._fingerprint
+
+    def _index(self, documents):
+        """Replace the lookup tables from {doc_id: data} (ordered by ID); called under the lock"""
+        raise NotImplementedError
+
+    # ===================== LOADING =====================
+    def _rebuild(self, snapshots):
+        documents = {}
+        digest = hashlib.blake2b(digest_size=16)
+        for doc in sorted(snapshots, key=lambda d: d.id):
+            data = doc.to_dict() or {}
+            documents[doc.id] = data
+
+            update_time = getattr(doc, 'update_time', None)
+            digest.update(repr((doc.id, update_time or sorted(data.items()))).encode('utf-8'))
+
+        with self._lock:
+            self._index(documents)
+            self._loaded_at = time.monotonic()
+            self._version += 1
+            self._fingerprint = digest.hexdigest()
+
+    def _on_snapshot(self, col_snapshot, changes, read_time):
+        """Listener callback: col_snapshot is the full, current collection"""
+        try:
+            self._rebuild(col_snapshot)
+            self._listener_synced = True
+            self._first_snapshot.set()
+        except Exception as e:
+            logger.warning("⚠️ %s snapshot failed: %s", self.label, e)
+
+    def _listener_active(self):
+        if self._watch is None or not self._listener_synced:
+            return False
+        try:
+            return bool(self._watch.is_active)
+        except Exception:
+            return False
+
+    def _listener_failed(self):
+        """True when the listener should be (re)started: none, dead, or no first snapshot in time"""
+        if self._watch is None:
+            return True
+        if not self._listener_synced:
+            return time.monotonic() - self._listener_started_at >= self.listener_wait_seconds
+        return not self._listener_active()
+
+    def _start_listener(self):
+        self._first_snapshot = threading.Event()
+        self._listener_started_at = time.monotonic()
+        try:
+            self._watch = self.db.collection(self.collection_name).on_snapshot(self._on_snapshot)
+            logger.debug("👂 %s listener started", self.label)
+        except Exception as e:
+            self._watch = None
+            logger.warning("⚠️ %s listener unavailable, using %ss TTL: %s", self.label, self.ttl_seconds, e)
+
+    def _fresh(self):
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    def _ensure_loaded(self):
+        if self._listener_active():
+            return
+
+        first_snapshot = None
+        with self._lock:
+            if self._listener_active() or self._fresh():
+                return
+            if self.use_listener:
+                # A restarted listener that never synced in time: reload directly this once
+                timed_out = self._watch is not None and not self._listener_synced and self._listener_failed()
+                if self._listener_failed():
+                    self.stop()
+                    self._start_listener()
+                if self._watch is not None:
+                    if self._loaded_at is None:
+                        first_snapshot = self._first_snapshot
+                    elif not timed_out:
+                        # Serve the stale directory while the restarted listener syncs
+                        return
+
+        # Cold start: the listener's first snapshot is the full collection, so
+        # wait for it (outside the lock, which the callback needs) instead of
+        # reading twice
+        if first_snapshot is not None and first_snapshot.wait(self.listener_wait_seconds):
+            return
+
+        with self._lock:
+            if self._listener_active() or self._fresh():
+                return
+            if first_snapshot is not None:
+                logger.warning("⚠️ %s listener gave no snapshot in %ss, loading directly",
+                               self.label, self.listener_wait_seconds)
+            self._rebuild(self.db.collection(self.collection_name).stream())
+
+    def invalidate(self):
+        """Force a reload on next access after a write (no-op while the listener is live)"""
+        if self._listener_active():
+            return
+        with self._lock:
+            self._loaded_at = None
+
+    def stop(self):
+        """Stop the snapshot listener (if any)"""
+        watch, self._watch = self._watch, None
+        self._listener_synced = False
+        if watch is not None:
+            try:
+                watch.unsubscribe()
+            except Exception:
+                pass
@@ -0,0 +1,178 @@
+"""
+Email Digest
+Buffers notification emails per recipient and sends them as one message per
+window. The first notification for a recipient opens a window of
+EMAIL_DIGEST_WINDOW_SECONDS; everything that arrives before the window closes
+is rendered into a single HTML digest (a staff member with 15 tasks due
+tomorrow gets one email instead of 15).
+
+Items are stored in SQLite so a restart does not lose them. Flushing is
+two-phase: items are read, the digest is sent, and only then are the sent
+items deleted, so a failed send is retried with nothing dropped.
+
+Configuration (environment):
+    EMAIL_DIGEST                 1 = coalesce notification emails per recipient, 0 = send each one (default)
+    EMAIL_DIGEST_PATH            SQLite file (default backend/email_digest.sqlite3)
+    EMAIL_DIGEST_WINDOW_SECONDS  how long a recipient's notifications are collected (default 600)
+"""
+import os
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS digest_items (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipient   TEXT NOT NULL,
+    name        TEXT,
+    subject     TEXT NOT NULL,
+    body        TEXT NOT NULL,
+    created_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS digest_items_recipient ON digest_items (recipient, id);
+CREATE TABLE IF NOT EXISTS digest_windows (
+    recipient   TEXT PRIMARY KEY,
+    flush_at    REAL NOT NULL
+);
+"""
+
+
+class EmailDigest:
+    # A window this far past its flush time is assumed to have lost its flush job
+    STALE_SECONDS = 3600
+
+    def __init__(self, path=None, window_seconds=None):
+        self.path = path or os.getenv(
+            'EMAIL_DIGEST_PATH',
+            os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'email_digest.sqlite3')
+        )
+        self.window_seconds = float(
+            window_seconds if window_seconds is not None else os.getenv('EMAIL_DIGEST_WINDOW_SECONDS', 600)
+        )
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    # ===================== STORAGE =====================
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        if not self._schema_ready:
+            with self._lock:
+                if not self._schema_ready:
+                    conn.execute('PRAGMA journal_mode=WAL')
+                    conn.executescript(_SCHEMA)
+                    self._schema_ready = True
+        return conn
+
+    # ===================== PUBLIC API =====================
+    def add(self, recipient, subject, body, name=None):
+        """
+        Buffer one notification for `recipient`.
+
+        Returns:
+            True when this item opened a new window (the caller schedules its flush)
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'INSERT INTO digest_items (recipient, name, subject, body, created_at) VALUES (?, ?, ?, ?, ?)',
+                (recipient, name, subject, body, now)
+            )
+            opened = conn.execute(
+                'INSERT OR IGNORE INTO digest_windows (recipient, flush_at) VALUES (?, ?)',
+                (recipient, now + self.window_seconds)
+            ).rowcount == 1
+            if not opened:
+                # A window long past its flush time lost its job (e.g. dead-lettered): reopen it
+                opened = conn.execute(
+                    'UPDATE digest_windows SET flush_at = ? WHERE recipient = ? AND flush_at < ?',
+                    (now + self.window_seconds, recipient, now - self.STALE_SECONDS)
+                ).rowcount == 1
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+        return opened
+
+    def pending(self, recipient):
+        """Buffered items for `recipient`, oldest first"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                'SELECT id, name, subject, body, created_at FROM digest_items WHERE recipient = ? ORDER BY id',
+                (recipient,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+    def discard(self, recipient, item_ids):
+        """
+        Delete items that were sent and close the window.
+
+        Returns:
+            True when newer items arrived meanwhile; their window is reopened
+            and the caller schedules another flush
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany('DELETE FROM digest_items WHERE id = ?', [(item_id,) for item_id in item_ids])
+            remaining = conn.execute(
+                'SELECT COUNT(*) FROM digest_items WHERE recipient = ?', (recipient,)
+            ).fetchone()[0]
+            if remaining:
+                conn.execute(
+                    'UPDATE digest_windows SET flush_at = ? WHERE recipient = ?',
+                    (now + self.window_seconds, recipient)
+                )
+            else:
+                conn.execute('DELETE FROM digest_windows WHERE recipient = ?', (recipient,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+        return remaining > 0
+
+
+# ===================== RENDERING =====================
+def render_digest(items):
+    """Subject and HTML body of one digest email for a list of buffered items"""
+    if len(items) == 1:
+        subject = items[0]['subject']
+    else:
+        subject = f'{len(items)} new notifications: {items[0]["subject"]} and more'
+
+    name = next((item['name'] for item in items if item.get('name')), None)
+    sections = '\n'.join(
+        f"""
+                        <h3 style="color: #2563eb; margin: 24px 0 0 0;">{item['subject']}</h3>
+                        {item['body']}"""
+        for item in items
+    )
+    html = f"""
+            <html>
+                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                        <h2 style="color: #2563eb;">Your Notification Summary</h2>
+                        <p>Hi {name or 'there'},</p>
+                        <p>Here {'is' if len(items) == 1 else 'are'} your {len(items)} latest notification{'' if len(items) == 1 else 's'}:</p>
+                        {sections}
+
+                        <p>Please log in to the system to view full details and take necessary actions.</p>
+
+                        <p style="color: #6b7280; font-size: 12px; margin-top: 30px;">
+                            This is an automated notification digest. Please do not reply to this email.
+                        </p>
+                    </div>
+                </body>
+            </html>
+            """
+    return subject, html
@@ -0,0 +1,229 @@
+"""
+Email Outbox
+Persistent outbox for outgoing email. Messages are queued in SQLite (on a
+dedicated JobQueue) and drained by worker threads that share a pool of
+long-lived SMTP connections: each connection does STARTTLS + login once and
+then sends many messages, instead of one full handshake per email.
+
+Connections are recycled after EMAIL_OUTBOX_MAX_MESSAGES messages or
+EMAIL_OUTBOX_IDLE_SECONDS of idleness, and re-opened (re-authenticated)
+when the server drops them. Sends are rate limited per process; transient
+failures are retried with backoff, rejected recipients are dead-lettered.
+
+Configuration (environment):
+    EMAIL_OUTBOX                1 = queue email through the outbox, 0 = send inline (default)
+    EMAIL_OUTBOX_PATH           SQLite file (default backend/email_outbox.sqlite3)
+    EMAIL_OUTBOX_CONNECTIONS    SMTP connections / sender threads per process (default 2)
+    EMAIL_OUTBOX_RATE           messages per second per process, 0 = unlimited (default 5)
+    EMAIL_OUTBOX_MAX_MESSAGES   messages per connection before it is recycled (default 100)
+    EMAIL_OUTBOX_IDLE_SECONDS   idle connections older than this are reopened (default 60)
+    EMAIL_OUTBOX_MAX_ATTEMPTS   delivery attempts per message (default 5)
+"""
+import email
+import os
+import queue
+import smtplib
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Add parent directory to path to import services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from logging_utils import get_logger
+from services.job_queue import JobQueue, PermanentJobError
+
+logger = get_logger(__name__)
+
+
+def connection_lost(error):
+    """True when `error` means the SMTP connection is unusable (reconnect and retry)"""
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    # SMTPException subclasses OSError; other SMTP errors are replies on a live session
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class RateLimiter:
+    """Token bucket: at most `rate` acquisitions per second, bursts up to `burst`"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class _PooledConnection:
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.smtp.quit()
+        except Exception:
+            try:
+                self.smtp.close()
+            except Exception:
+                pass
+
+
+class SMTPConnectionPool:
+    """Up to `size` authenticated SMTP connections, reused across messages"""
+
+    def __init__(self, host, port, user=None, password=None, size=2, starttls=True,
+                 max_messages=100, idle_seconds=60, timeout=30, smtp_factory=None):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.max_messages = max_messages
+        self.idle_seconds = idle_seconds
+        self.timeout = timeout
+        self.smtp_factory = smtp_factory or smtplib.SMTP
+
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self.opened = 0
+
+        if hasattr(os, 'register_at_fork'):
+            # Sockets inherited from the parent must not be shared; drop them unclosed
+            os.register_at_fork(after_in_child=self._forget)
+
+    def _forget(self):
+        self._idle = queue.LifoQueue()
+
+    def _open(self):
+        smtp = self.smtp_factory(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.user:
+            smtp.login(self.user, self.password)
+        self.opened += 1
+        logger.debug("📮 SMTP connection opened to %s:%s", self.host, self.port)
+        return _PooledConnection(smtp)
+
+    def _usable(self, conn):
+        return conn.sent < self.max_messages and time.monotonic() - conn.last_used < self.idle_seconds
+
+    def _checkout(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+            if self._usable(conn):
+                return conn
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it goes back to the pool unless it failed"""
+        with self._slots:
+            conn = self._checkout()
+            try:
+                yield conn.smtp
+            except BaseException as e:
+                if connection_lost(e):
+                    conn.close()
+                else:
+                    # Protocol errors (e.g. a refused recipient) leave the session usable
+                    conn.last_used = time.monotonic()
+                    self._idle.put(conn)
+                raise
+            conn.sent += 1
+            conn.last_used = time.monotonic()
+            self._idle.put(conn)
+
+    def send(self, msg):
+        """Send one message, reconnecting once if the pooled connection was dropped"""
+        for attempt in (1, 2):
+            try:
+                with self.connection() as smtp:
+                    smtp.send_message(msg)
+                return
+            except Exception as e:
+                if attempt == 2 or not connection_lost(e):
+                    raise
+                logger.debug("🔌 SMTP connection dropped, reconnecting")
+
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class EmailOutbox:
+    def __init__(self, host, port, user=None, password=None, starttls=True, path=None,
+                 connections=None, rate=None, max_messages=None, idle_seconds=None,
+                 max_attempts=None, backoff_seconds=None, smtp_factory=None):
+        connections = int(connections if connections is not None else os.getenv('EMAIL_OUTBOX_CONNECTIONS', 2))
+        self.pool = SMTPConnectionPool(
+            host, port, user=user, password=password, size=connections, starttls=starttls,
+            max_messages=int(max_messages if max_messages is not None else os.getenv('EMAIL_OUTBOX_MAX_MESSAGES', 100)),
+            idle_seconds=float(idle_seconds if idle_seconds is not None else os.getenv('EMAIL_OUTBOX_IDLE_SECONDS', 60)),
+            smtp_factory=smtp_factory,
+        )
+        self.rate_limiter = RateLimiter(rate if rate is not None else float(os.getenv('EMAIL_OUTBOX_RATE', 5)))
+        self.queue = JobQueue(
+            path=path or os.getenv(
+                'EMAIL_OUTBOX_PATH',
+                os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'email_outbox.sqlite3')
+            ),
+            workers=connections,
+            max_attempts=max_attempts if max_attempts is not None else os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5),
+            backoff_seconds=backoff_seconds,
+        )
+        self.queue.handler('deliver')(self._deliver)
+
+    def send(self, msg):
+        """Queue a message for delivery and return its outbox ID"""
+        return self.queue.enqueue('deliver', message=msg.as_string())
+
+    def _deliver(self, message):
+        msg = email.message_from_string(message)
+        self.rate_limiter.acquire()
+        try:
+            self.pool.send(msg)
+        except smtplib.SMTPRecipientsRefused as e:
+            raise PermanentJobError(f'Recipients refused: {list(e.recipients)}') from e
+        except smtplib.SMTPResponseException as e:
+            # 5xx replies are final, except login/connect failures (configuration, outages)
+            permanent_reply = not isinstance(e, (smtplib.SMTPAuthenticationError, smtplib.SMTPConnectError))
+            if permanent_reply and 500 <= e.smtp_code < 600:
+                raise PermanentJobError(f'SMTP {e.smtp_code}: {e.smtp_error!r}') from e
+            raise
+        logger.debug("✅ Outbox email sent to %s", msg.get('To'))
+
+    def start(self):
+        """Start the sender threads (e.g. to flush messages left from a restart)"""
+        self.queue.start()
+
+    def drain(self):
+        """Deliver every due message now, in the calling thread; returns how many were attempted"""
+        return self.queue.run_pending()
+
+    def stop(self):
+        self.queue.stop()
+        self.pool.close()
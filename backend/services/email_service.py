@@ -2,14 +2,61 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
+from logging_utils import get_logger
+from services.email_digest import EmailDigest, render_digest
+from services.email_outbox import EmailOutbox
+from services.job_queue import PermanentJobError, job_queue
+
+logger = get_logger(__name__)
 
 class EmailService:
     def __init__(self):
         # Get credentials from environment variables
         self.smtp_user = os.getenv('GMAIL_USER')  # Your Gmail address
         self.smtp_password = os.getenv('GMAIL_APP_PASSWORD')  # Gmail App Password
-        self.smtp_server = 'smtp.gmail.com'
-        self.smtp_port = 587
+        self.smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
+        self.smtp_port = int(os.getenv('SMTP_PORT', 587))
+        self.smtp_starttls = os.getenv('SMTP_STARTTLS', '1') != '0'
+
+        # Opt-in: queue messages and send them over pooled SMTP connections
+        self.outbox = None
+        if os.getenv('EMAIL_OUTBOX', '0') == '1':
+            self.outbox = EmailOutbox(self.smtp_server, self.smtp_port, user=self.smtp_user,
+                                      password=self.smtp_password, starttls=self.smtp_starttls)
+
+        # Opt-in: coalesce each recipient's notifications into one email per window
+        self.digest = None
+        if os.getenv('EMAIL_DIGEST', '0') == '1':
+            self.digest = EmailDigest()
+
+    def _deliver(self, msg, card=None, names=None):
+        """
+        Send a notification email, or buffer its info card for each recipient's digest.
+
+        Args:
+            msg: The complete message (used when digests are off)
+            card: HTML section describing this notification inside a digest
+            names: {email: display name} of every recipient of `msg`
+        """
+        if self.digest is not None and card is not None:
+            for recipient, name in (names or {}).items():
+                if not recipient:
+                    continue
+                if self.digest.add(recipient, msg['Subject'], card, name=name):
+                    job_queue.schedule('flush_digest', self.digest.window_seconds, recipient=recipient)
+            return
+        self._send(msg)
+
+    def _send(self, msg):
+        """Hand the message to the outbox, or send it now over a new connection"""
+        if self.outbox is not None:
+            self.outbox.send(msg)
+            return
+        with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+            if self.smtp_starttls:
+                server.starttls()
+            server.login(self.smtp_user, self.smtp_password)
+            server.send_message(msg)
     
     # ===================== SEND EMAIL NOTIF TO USER(S) WHEN HE IS BEING ASSIGNED A PROJECT =====================
     def send_project_assignment_email(self, to_email, user_name, project_name, project_desc, creator_name, start_date, end_date):
@@ -21,6 +68,17 @@ class EmailService:
             msg['To'] = to_email
             msg['Subject'] = f'New Project Assignment: {project_name}'
             
+            # Info card (also used as this message's section of a digest)
+            card = f"""
+                        <div style="background-color: #f8fafc; padding: 15px; border-radius: 8px; margin: 20px 0;">
+                            <h3 style="margin-top: 0; color: #1e40af;">{project_name}</h3>
+                            <p style="margin: 10px 0;"><strong>Description:</strong> {project_desc or 'No description provided'}</p>
+                            <p style="margin: 10px 0;"><strong>Created by:</strong> {creator_name}</p>
+                            <p style="margin: 10px 0;"><strong>Start Date:</strong> {start_date}</p>
+                            <p style="margin: 10px 0;"><strong>End Date:</strong> {end_date}</p>
+                        </div>
+            """
+            
             # Email body
             html = f"""
             <html>
@@ -30,13 +88,7 @@ class EmailService:
                         <p>Hi {user_name},</p>
                         <p>You have been assigned as a collaborator to a new project:</p>
                         
-                        <div style="background-color: #f8fafc; padding: 15px; border-radius: 8px; margin: 20px 0;">
-                            <h3 style="margin-top: 0; color: #1e40af;">{project_name}</h3>
-                            <p style="margin: 10px 0;"><strong>Description:</strong> {project_desc or 'No description provided'}</p>
-                            <p style="margin: 10px 0;"><strong>Created by:</strong> {creator_name}</p>
-                            <p style="margin: 10px 0;"><strong>Start Date:</strong> {start_date}</p>
-                            <p style="margin: 10px 0;"><strong>End Date:</strong> {end_date}</p>
-                        </div>
+                        {card}
                         
                         <p>Please log in to the system to view more details and start working on your tasks.</p>
                         
@@ -51,16 +103,13 @@ class EmailService:
             msg.attach(MIMEText(html, 'html'))
             
             # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            self._deliver(msg, card=card, names={to_email: user_name})
             
-            print(f"✅ Email sent successfully to {to_email}")
+            logger.debug("✅ Email sent successfully to %s", to_email)
             return True
             
         except Exception as e:
-            print(f"❌ Failed to send email to {to_email}: {str(e)}")
+            logger.error("❌ Failed to send email to %s: %s", to_email, e)
             return False
         
     # ===================== SEND EMAIL NOTIF TO USER(S) WHEN HE IS BEING ASSIGNED A TASK =====================
@@ -81,6 +130,18 @@ class EmailService:
             # }
             # priority_color = priority_colors.get(priority_level, '#6b7280')
             
+            # Info card (also used as this message's section of a digest)
+            card = f"""
+                        <div style="background-color: #f8fafc; padding: 15px; border-radius: 8px; margin: 20px 0;">
+                            <h3 style="margin-top: 0; color: #1e40af;">{task_name}</h3>
+                            <p style="margin: 10px 0;"><strong>Description:</strong> {task_desc or 'No description provided'}</p>
+                            {f'<p style="margin: 10px 0;"><strong>Project:</strong> {project_name}</p>' if project_name else ''}
+                            <p style="margin: 10px 0;"><strong>Created by:</strong> {creator_name}</p>
+                            <p style="margin: 10px 0;"><strong>Start Date:</strong> {start_date}</p>
+                            {f'<p style="margin: 10px 0;"><strong>End Date:</strong> {end_date}</p>' if end_date else ''}
+                        </div>
+            """
+            
             # Email body
             html = f"""
             <html>
@@ -90,14 +151,7 @@ class EmailService:
                         <p>Hi {user_name},</p>
                         <p>You have been assigned to a new task:</p>
                         
-                        <div style="background-color: #f8fafc; padding: 15px; border-radius: 8px; margin: 20px 0;">
-                            <h3 style="margin-top: 0; color: #1e40af;">{task_name}</h3>
-                            <p style="margin: 10px 0;"><strong>Description:</strong> {task_desc or 'No description provided'}</p>
-                            {f'<p style="margin: 10px 0;"><strong>Project:</strong> {project_name}</p>' if project_name else ''}
-                            <p style="margin: 10px 0;"><strong>Created by:</strong> {creator_name}</p>
-                            <p style="margin: 10px 0;"><strong>Start Date:</strong> {start_date}</p>
-                            {f'<p style="margin: 10px 0;"><strong>End Date:</strong> {end_date}</p>' if end_date else ''}
-                        </div>
+                        {card}
                         
                         <p>Please log in to the system to view more details and start working on this task.</p>
                         
@@ -112,16 +166,13 @@ class EmailService:
             msg.attach(MIMEText(html, 'html'))
             
             # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            self._deliver(msg, card=card, names={to_email: user_name})
             
-            print(f"✅ Email sent successfully to {to_email}")
+            logger.debug("✅ Email sent successfully to %s", to_email)
             return True
             
         except Exception as e:
-            print(f"❌ Failed to send email to {to_email}: {str(e)}")
+            logger.error("❌ Failed to send email to %s: %s", to_email, e)
             return False
         
 # ===================== SEND EMAIL NOTIF TO NEW OWNER WHEN TASK OWNERSHIP IS TRANSFERRED (CC OLD OWNER) =====================
@@ -136,15 +187,8 @@ class EmailService:
             msg['Cc'] = old_owner_email  # CC the previous owner
             msg['Subject'] = f'Task Ownership Transfer: {task_name}'
             
-            # Email body for new owner
-            html = f"""
-            <html>
-                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                        <h2 style="color: #2563eb;">Task Ownership Transferred to You</h2>
-                        <p>Hi {new_owner_name},</p>
-                        <p>You have been assigned as the new owner of the following task:</p>
-                        
+            # Info card (also used as this message's section of a digest)
+            card = f"""
                         <div style="background-color: #f8fafc; padding: 15px; border-radius: 8px; margin: 20px 0;">
                             <h3 style="margin-top: 0; color: #1e40af;">{task_name}</h3>
                             <p style="margin: 10px 0;"><strong>Description:</strong> {task_desc or 'No description provided'}</p>
@@ -154,6 +198,18 @@ class EmailService:
                             <p style="margin: 10px 0;"><strong>Start Date:</strong> {start_date}</p>
                             {f'<p style="margin: 10px 0;"><strong>End Date:</strong> {end_date}</p>' if end_date else ''}
                         </div>
+            """
+            
+            # Email body for new owner
+            html = f"""
+            <html>
+                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                        <h2 style="color: #2563eb;">Task Ownership Transferred to You</h2>
+                        <p>Hi {new_owner_name},</p>
+                        <p>You have been assigned as the new owner of the following task:</p>
+                        
+                        {card}
                         
                         <div style="background-color: #fef3c7; padding: 12px; border-left: 4px solid #f59e0b; border-radius: 4px; margin: 20px 0;">
                             <p style="margin: 0; color: #92400e;">
@@ -174,16 +230,13 @@ class EmailService:
             msg.attach(MIMEText(html, 'html'))
             
             # Send email (both To and CC recipients will receive it)
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            self._deliver(msg, card=card, names={new_owner_email: new_owner_name, old_owner_email: old_owner_name})
             
-            print(f"✅ Ownership transfer email sent to {new_owner_email} (CC: {old_owner_email})")
+            logger.debug("✅ Ownership transfer email sent to %s (CC: %s)", new_owner_email, old_owner_email)
             return True
             
         except Exception as e:
-            print(f"❌ Failed to send ownership transfer email: {str(e)}")
+            logger.error("❌ Failed to send ownership transfer email: %s", e)
             return False
     
     # ===================== SEND EMAIL NOTIF TO NEW OWNER WHEN SUBTASK OWNERSHIP IS TRANSFERRED (CC OLD OWNER) =====================
@@ -199,15 +252,8 @@ class EmailService:
             msg['Cc'] = old_owner_email  # CC the previous owner
             msg['Subject'] = f'Subtask Ownership Transfer: {subtask_name}'
             
-            # Email body for new owner
-            html = f"""
-            <html>
-                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                        <h2 style="color: #2563eb;">Subtask Ownership Transferred to You</h2>
-                        <p>Hi {new_owner_name},</p>
-                        <p>You have been assigned as the new owner of the following subtask:</p>
-                        
+            # Info card (also used as this message's section of a digest)
+            card = f"""
                         <div style="background-color: #f8fafc; padding: 15px; border-radius: 8px; margin: 20px 0;">
                             <h3 style="margin-top: 0; color: #1e40af;">{subtask_name}</h3>
                             <p style="margin: 10px 0;"><strong>Description:</strong> {subtask_desc or 'No description provided'}</p>
@@ -218,6 +264,18 @@ class EmailService:
                             <p style="margin: 10px 0;"><strong>Start Date:</strong> {start_date}</p>
                             {f'<p style="margin: 10px 0;"><strong>End Date:</strong> {end_date}</p>' if end_date else ''}
                         </div>
+            """
+            
+            # Email body for new owner
+            html = f"""
+            <html>
+                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                        <h2 style="color: #2563eb;">Subtask Ownership Transferred to You</h2>
+                        <p>Hi {new_owner_name},</p>
+                        <p>You have been assigned as the new owner of the following subtask:</p>
+                        
+                        {card}
                         
                         <div style="background-color: #fef3c7; padding: 12px; border-left: 4px solid #f59e0b; border-radius: 4px; margin: 20px 0;">
                             <p style="margin: 0; color: #92400e;">
@@ -238,16 +296,13 @@ class EmailService:
             msg.attach(MIMEText(html, 'html'))
             
             # Send email (both To and CC recipients will receive it)
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            self._deliver(msg, card=card, names={new_owner_email: new_owner_name, old_owner_email: old_owner_name})
             
-            print(f"✅ Subtask ownership transfer email sent to {new_owner_email} (CC: {old_owner_email})")
+            logger.debug("✅ Subtask ownership transfer email sent to %s (CC: %s)", new_owner_email, old_owner_email)
             return True
             
         except Exception as e:
-            print(f"❌ Failed to send subtask ownership transfer email: {str(e)}")
+            logger.error("❌ Failed to send subtask ownership transfer email: %s", e)
             return False
         
     # ===================== SEND EMAIL NOTIF FOR UPCOMING DEADLINES =====================
@@ -278,6 +333,18 @@ class EmailService:
                 days = int(hours_until_due / 24)
                 time_remaining = f"{days} day{'s' if days > 1 else ''}"
             
+            # Info card (also used as this message's section of a digest)
+            card = f"""
+                        <div style="background-color: #fef2f2; border: 2px solid #fecaca; padding: 15px; border-radius: 8px; margin: 20px 0;">
+                            <h3 style="margin-top: 0; color: #dc2626;">{task_name}</h3>
+                            <p style="margin: 10px 0;"><strong>Description:</strong> {task_desc or 'No description provided'}</p>
+                            {f'<p style="margin: 10px 0;"><strong>Project:</strong> {project_name}</p>' if project_name else ''}
+                            <p style="margin: 10px 0;"><strong>Due Date:</strong> {due_date}</p>
+                            <p style="margin: 10px 0;"><strong>Time Remaining:</strong> <span style="color: #dc2626; font-weight: bold;">{time_remaining}</span></p>
+                            <p style="margin: 10px 0;"><strong>Priority:</strong> <span style="background-color: {priority_color}; color: white; padding: 2px 8px; border-radius: 4px; font-size: 12px;">{priority_level}</span></p>
+                        </div>
+            """
+            
             # Email body
             html = f"""
             <html>
@@ -287,14 +354,7 @@ class EmailService:
                         <p>Hi {user_name},</p>
                         <p>This is a reminder that you have a task due soon:</p>
                         
-                        <div style="background-color: #fef2f2; border: 2px solid #fecaca; padding: 15px; border-radius: 8px; margin: 20px 0;">
-                            <h3 style="margin-top: 0; color: #dc2626;">{task_name}</h3>
-                            <p style="margin: 10px 0;"><strong>Description:</strong> {task_desc or 'No description provided'}</p>
-                            {f'<p style="margin: 10px 0;"><strong>Project:</strong> {project_name}</p>' if project_name else ''}
-                            <p style="margin: 10px 0;"><strong>Due Date:</strong> {due_date}</p>
-                            <p style="margin: 10px 0;"><strong>Time Remaining:</strong> <span style="color: #dc2626; font-weight: bold;">{time_remaining}</span></p>
-                            <p style="margin: 10px 0;"><strong>Priority:</strong> <span style="background-color: {priority_color}; color: white; padding: 2px 8px; border-radius: 4px; font-size: 12px;">{priority_level}</span></p>
-                        </div>
+                        {card}
                         
                         <div style="background-color: #fef3c7; padding: 12px; border-left: 4px solid #f59e0b; border-radius: 4px; margin: 20px 0;">
                             <p style="margin: 0; color: #92400e;">
@@ -315,17 +375,54 @@ class EmailService:
             msg.attach(MIMEText(html, 'html'))
             
             # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            self._deliver(msg, card=card, names={to_email: user_name})
             
-            print(f"✅ Deadline reminder email sent successfully to {to_email}")
+            logger.debug("✅ Deadline reminder email sent successfully to %s", to_email)
             return True
             
         except Exception as e:
-            print(f"❌ Failed to send deadline reminder email to {to_email}: {str(e)}")
+            logger.error("❌ Failed to send deadline reminder email to %s: %s", to_email, e)
             return False
 
+    # ===================== SEND A RECIPIENT'S BUFFERED NOTIFICATIONS AS ONE DIGEST EMAIL =====================
+    def flush_digest(self, recipient):
+        """Send everything buffered for `recipient` as one email; returns how many notifications it held"""
+        items = self.digest.pending(recipient)
+        if not items:
+            return 0
+
+        subject, html = render_digest(items)
+        msg = MIMEMultipart('alternative')
+        msg['From'] = self.smtp_user
+        msg['To'] = recipient
+        msg['Subject'] = subject
+        msg.attach(MIMEText(html, 'html'))
+
+        # Send first, then drop the items: a failed send leaves them for the retry
+        self._send(msg)
+        if self.digest.discard(recipient, [item['id'] for item in items]):
+            job_queue.schedule('flush_digest', self.digest.window_seconds, recipient=recipient)
+
+        logger.debug("✅ Digest with %s notifications sent to %s", len(items), recipient)
+        return len(items)
+
 # Create singleton instance
-email_service = EmailService()
\ No newline at end of file
+email_service = EmailService()
+
+
+@job_queue.handler('send_email')
+def send_email_job(method, **kwargs):
+    """Job: call email_service.<method>(**kwargs); a False result is retried"""
+    if not method.startswith('send_') or not callable(getattr(email_service, method, None)):
+        raise PermanentJobError(f'Unknown email method: {method}')
+    if not getattr(email_service, method)(**kwargs):
+        raise RuntimeError(f'{method} did not send')
+
+
+@job_queue.handler('flush_digest')
+def flush_digest_job(recipient):
+    """Job: send the digest of `recipient` once its window has closed"""
+    if email_service.digest is None:
+        # Retrying cannot help; the dead letter keeps it for retry_dead() once digests are re-enabled
+        raise PermanentJobError('Email digests are disabled (EMAIL_DIGEST=0)')
+    email_service.flush_digest(recipient)
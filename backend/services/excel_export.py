@@ -0,0 +1,647 @@
+"""
+Excel export rendering for project reports and team schedules.
+Imported lazily by the export endpoints in routes/project.py so openpyxl
+is only loaded by workers that actually serve an export.
+"""
+from datetime import datetime
+from io import BytesIO
+from statistics import mean
+
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.chart import PieChart, Reference
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+# =============== PROJECT TASKS REPORT ===============
+def build_project_tasks_workbook(project_id, project_name, tasks, users):
+    """
+    Render the project tasks report workbook (summary, task table and
+    status/priority pie charts).
+
+    Returns:
+        BytesIO positioned at the start of the .xlsx file
+    """
+    def get_user_info(uid):
+        user = users.get(uid)
+        if not user:
+            return "Unknown"
+        name = user.get("name", "Unknown")
+        dept = user.get("division_name", "N/A")
+        return f"{name} ({dept})"
+
+    # --- Summary statistics ---
+    total_tasks = len(tasks)
+    completed_tasks = sum(1 for t in tasks if t.get("task_status") == "Completed")
+    incomplete_tasks = total_tasks - completed_tasks
+    avg_priority = round(mean([t.get("priority_level", 0) for t in tasks if isinstance(t.get("priority_level"), (int, float))]), 1)
+
+    # --- Prepare workbook ---
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Project Tasks"
+
+    # --- Title section ---
+    ws["A1"] = f"Project Report: {project_name}"
+    ws["A1"].font = Font(size=14, bold=True)
+    ws["A2"] = f"Project ID: {project_id}"
+    ws["A2"].font = Font(italic=True)
+
+    # --- Summary section ---
+    ws.append([])
+    summary_headers = ["Total Tasks", "Completed", "Incomplete", "Average Priority"]
+    summary_values = [total_tasks, completed_tasks, incomplete_tasks, avg_priority]
+
+    ws.append(summary_headers)
+    ws.append(summary_values)
+
+    for cell in ws[4]:
+        cell.font = Font(bold=True)
+        cell.fill = PatternFill("solid", fgColor="DDDDDD")
+        cell.alignment = Alignment(horizontal="center")
+
+    for cell in ws[5]:
+        cell.alignment = Alignment(horizontal="center")
+
+    ws.append([])
+
+    # --- Task Table ---
+    headers = ["Name", "Due Date", "Status", "Priority", "Owner", "Collaborators"]
+    ws.append(headers)
+    for cell in ws[7]:
+        cell.font = Font(bold=True)
+        cell.fill = PatternFill("solid", fgColor="DDDDDD")
+        cell.alignment = Alignment(horizontal="center")
+
+    for task in tasks:
+        task_name = task.get("task_name")
+        due_date = task.get("end_date")
+        if isinstance(due_date, str):
+            try:
+                dt = datetime.fromisoformat(due_date.replace("Z", "+00:00"))
+                due_date = dt.strftime("%d-%m-%Y")
+            except Exception:
+                due_date = due_date[:10]
+        elif isinstance(due_date, datetime):
+            due_date = due_date.strftime("%d-%m-%Y")
+
+        owner_name = get_user_info(task.get("owner"))
+        collaborators_list = task.get("assigned_to", [])
+        collaborators_str = ", ".join([get_user_info(uid) for uid in collaborators_list]) if collaborators_list else "—"
+
+        ws.append([
+            task_name,
+            due_date,
+            task.get("task_status", "N/A"),
+            task.get("priority_level", "—"),
+            owner_name,
+            collaborators_str,
+        ])
+
+    # --- Auto column widths ---
+    for col in ws.columns:
+        max_length = max(len(str(cell.value)) if cell.value else 0 for cell in col)
+        ws.column_dimensions[col[0].column_letter].width = max_length + 2
+
+    # --- Add Charts ---
+    ws.append([])
+    ws.append(["Tasks by Status"])
+    last_row_index = ws.max_row
+
+    # for cell in ws[last_row_index]:
+    ws[last_row_index][0].font = Font(bold=True)
+    ws[last_row_index][0].fill = PatternFill("solid", fgColor="DDDDDD")
+    ws[last_row_index][0].alignment = Alignment(horizontal="center")
+    chart_start_row = ws.max_row + 2
+
+    # Count tasks by status and priority
+    from collections import Counter
+    status_counts = Counter(t.get("task_status", "Unknown") for t in tasks)
+    priority_counts = Counter(
+        "High" if t.get("priority_level", 0) >= 7 else
+        "Medium" if t.get("priority_level", 0) >= 4 else
+        "Low"
+        for t in tasks
+    )
+
+    # Insert status data
+    ws.append(["Status", "Count"])
+    for k, v in status_counts.items():
+        ws.append([k, v])
+    status_table_end = ws.max_row
+
+    # Create pie chart for Status
+    pie_status = PieChart()
+    labels = Reference(ws, min_col=1, min_row=status_table_end - len(status_counts) + 1, max_row=status_table_end)
+    data = Reference(ws, min_col=2, min_row=status_table_end - len(status_counts), max_row=status_table_end)
+    pie_status.add_data(data, titles_from_data=True)
+    pie_status.set_categories(labels)
+    pie_status.title = "Tasks by Status"
+    ws.add_chart(pie_status, f"E{chart_start_row}")
+
+    # Insert Priority data
+    ws.append([])
+    ws.append(["Tasks by Priority"])
+    last_row_index = ws.max_row
+    ws[last_row_index][0].font = Font(bold=True)
+    ws[last_row_index][0].fill = PatternFill("solid", fgColor="DDDDDD")
+    ws[last_row_index][0].alignment = Alignment(horizontal="center")
+    ws.append(["Priority Level", "Count"])
+    for k, v in priority_counts.items():
+        ws.append([k, v])
+    priority_table_end = ws.max_row
+
+    # Create pie chart for Priority
+    pie_priority = PieChart()
+    labels = Reference(ws, min_col=1, min_row=priority_table_end - len(priority_counts) + 1, max_row=priority_table_end)
+    data = Reference(ws, min_col=2, min_row=priority_table_end - len(priority_counts), max_row=priority_table_end)
+    pie_priority.add_data(data, titles_from_data=True)
+    pie_priority.set_categories(labels)
+    pie_priority.title = "Tasks by Priority"
+    ws.add_chart(pie_priority, f"E{chart_start_row + 15}")
+
+    # --- Save workbook to memory ---
+    output = BytesIO()
+    wb.save(output)
+    output.seek(0)
+    return output
+
+
+# =============== TEAM SCHEDULE ===============
+def build_team_schedule_workbook(tasks, project_name, project_data, users):
+    """
+    Render the team schedule workbook: one calendar sheet per month with a
+    bar per task and team member.
+
+    Returns:
+        BytesIO positioned at the start of the .xlsx file
+    """
+    # --- Create Excel Workbook ---
+    logger.debug("Creating Excel workbook...")
+    wb = Workbook()
+    # Remove the default sheet - we'll create monthly sheets directly
+    wb.remove(wb.active)
+    logger.debug("Excel workbook created")
+
+    # --- Define Premium Styles ---
+    # Header styles
+    header_font = Font(bold=True, color="FFFFFF", size=11, name="Arial")
+    header_fill = PatternFill(start_color="1E3A8A", end_color="1E3A8A", fill_type="solid")  # Deep blue
+    month_header_font = Font(bold=True, color="1E3A8A", size=18, name="Arial")
+
+    # Border styles
+    thick_border = Border(
+        left=Side(style='thick', color="1E3A8A"),
+        right=Side(style='thick', color="1E3A8A"),
+        top=Side(style='thick', color="1E3A8A"),
+        bottom=Side(style='thick', color="1E3A8A")
+    )
+    thin_border = Border(
+        left=Side(style='thin', color="E5E7EB"),
+        right=Side(style='thin', color="E5E7EB"),
+        top=Side(style='thin', color="E5E7EB"),
+        bottom=Side(style='thin', color="E5E7EB")
+    )
+
+    # Alignment styles
+    center_alignment = Alignment(horizontal="center", vertical="center")
+    left_alignment = Alignment(horizontal="left", vertical="top", wrap_text=True)
+
+    # Premium priority colors with gradients
+    high_priority_fill = PatternFill(start_color="DC2626", end_color="DC2626", fill_type="solid")  # Red
+    medium_priority_fill = PatternFill(start_color="F59E0B", end_color="F59E0B", fill_type="solid")  # Amber
+    low_priority_fill = PatternFill(start_color="10B981", end_color="10B981", fill_type="solid")  # Emerald
+    completed_fill = PatternFill(start_color="6B7280", end_color="6B7280", fill_type="solid")  # Gray
+
+    # Collaborator colors - each team member gets a unique color
+    collaborator_colors = [
+        "FF6B6B",  # Red
+        "4ECDC4",  # Teal
+        "45B7D1",  # Blue
+        "96CEB4",  # Green
+        "FFEAA7",  # Yellow
+        "DDA0DD",  # Plum
+        "98D8C8",  # Mint
+        "F7DC6F",  # Light Yellow
+        "BB8FCE",  # Light Purple
+        "85C1E9",  # Light Blue
+        "F8C471",  # Light Orange
+        "82E0AA",  # Light Green
+        "F1948A",  # Light Red
+        "85C1E9",  # Sky Blue
+        "D7BDE2"   # Light Lavender
+    ]
+
+    # Background colors
+    member_cell_fill = PatternFill(start_color="F8FAFC", end_color="F8FAFC", fill_type="solid")  # Light gray
+    weekend_fill = PatternFill(start_color="FEF3C7", end_color="FEF3C7", fill_type="solid")  # Light yellow
+    today_fill = PatternFill(start_color="DBEAFE", end_color="DBEAFE", fill_type="solid")  # Light blue
+
+
+    # --- Create Monthly Sheets ---
+    logger.debug("Creating monthly sheets...")
+
+    # Import calendar module
+    import calendar as cal_module
+
+    # Get all unique dates from tasks and group by month
+    dates_by_month = {}
+    for task in tasks:
+        start_date = task.get("start_date", "")
+        end_date = task.get("end_date", "")
+
+        logger.debug("Task: %s", task.get('task_name', ''))
+        logger.debug("  Start date: %s (type: %s)", start_date, type(start_date))
+        logger.debug("  End date: %s (type: %s)", end_date, type(end_date))
+
+        if start_date:
+            try:
+                if isinstance(start_date, str):
+                    if "T" in start_date:
+                        dt = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
+                    else:
+                        dt = datetime.fromisoformat(start_date)
+                else:
+                    dt = start_date
+
+                if dt.tzinfo:
+                    dt = dt.replace(tzinfo=None)
+
+                month_key = (dt.year, dt.month)
+                if month_key not in dates_by_month:
+                    dates_by_month[month_key] = set()
+                dates_by_month[month_key].add(dt.date())
+                logger.debug("  Parsed start date: %s", dt.date())
+            except Exception as e:
+                logger.error("  Error parsing start date: %s", e)
+
+        if end_date:
+            try:
+                if isinstance(end_date, str):
+                    if "T" in end_date:
+                        dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
+                    else:
+                        dt = datetime.fromisoformat(end_date)
+                else:
+                    dt = end_date
+
+                if dt.tzinfo:
+                    dt = dt.replace(tzinfo=None)
+
+                month_key = (dt.year, dt.month)
+                if month_key not in dates_by_month:
+                    dates_by_month[month_key] = set()
+                dates_by_month[month_key].add(dt.date())
+                logger.debug("  Parsed end date: %s", dt.date())
+            except Exception as e:
+                logger.error("  Error parsing end date: %s", e)
+
+    logger.debug("Found %s months with tasks", len(dates_by_month))
+
+    if not dates_by_month:
+        logger.debug("No dates found, creating empty sheet")
+        # Create a single sheet for when there are no tasks
+        ws = wb.create_sheet("No Tasks")
+        ws['A1'] = f"📊 Project: {project_name}"
+        ws['A1'].font = Font(bold=True, size=16, name="Arial", color="1E3A8A")
+        ws['A8'] = "No tasks with dates found"
+        ws['A8'].font = Font(italic=True, color="666666")
+    else:
+
+        # Create a separate sheet for each month
+        for (year, month), month_dates in sorted(dates_by_month.items()):
+            logger.debug("Creating sheet for %s %s", cal_module.month_name[month], year)
+
+            # Create new worksheet for this month
+            month_sheet_name = f"{cal_module.month_name[month][:3]} {year}"
+            if month_sheet_name in wb.sheetnames:
+                ws = wb[month_sheet_name]
+            else:
+                ws = wb.create_sheet(title=month_sheet_name)
+
+            # Add premium header to this sheet
+            ws['A1'] = f"📊 {cal_module.month_name[month]} {year} - {project_name}"
+            ws['A1'].font = Font(bold=True, size=16, name="Arial", color="1E3A8A")
+            ws['A1'].fill = PatternFill(start_color="EFF6FF", end_color="EFF6FF", fill_type="solid")
+            ws['A1'].border = thick_border
+            ws['A1'].alignment = center_alignment
+
+            ws['A2'] = f"🕒 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            ws['A2'].font = Font(size=11, italic=True, name="Arial", color="6B7280")
+            ws['A2'].alignment = center_alignment
+
+            # Add legend header
+            ws['A3'] = "👥 Team Members:"
+            ws['A3'].font = Font(bold=True, size=12, name="Arial", color="1E3A8A")
+
+            # Calculate month days
+            month_days = cal_module.monthrange(year, month)[1]
+
+            # First, collect all tasks for this month
+            month_tasks = []
+            for task in tasks:
+                assigned_to = task.get("assigned_to", [])
+                start_date = task.get("start_date", "")
+                end_date = task.get("end_date", "")
+
+                task_start = None
+                task_end = None
+
+                if start_date:
+                    try:
+                        if isinstance(start_date, str):
+                            if "T" in start_date:
+                                dt = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
+                            else:
+                                dt = datetime.fromisoformat(start_date)
+                        else:
+                            dt = start_date
+
+                        if dt.tzinfo:
+                            dt = dt.replace(tzinfo=None)
+                        task_start = dt.date()
+                    except:
+                        pass
+
+                if end_date:
+                    try:
+                        if isinstance(end_date, str):
+                            if "T" in end_date:
+                                dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
+                            else:
+                                dt = datetime.fromisoformat(end_date)
+                        else:
+                            dt = end_date
+
+                        if dt.tzinfo:
+                            dt = dt.replace(tzinfo=None)
+                        task_end = dt.date()
+                    except:
+                        pass
+
+                # Check if task overlaps with this month
+                if task_start and task_end:
+                    month_start = datetime(year, month, 1).date()
+                    month_end = datetime(year, month, cal_module.monthrange(year, month)[1]).date()
+
+                    # Task overlaps with this month if it starts before month ends and ends after month starts
+                    if task_start <= month_end and task_end >= month_start:
+                        # Get team members for this task
+                        for user_id in assigned_to:
+                            # Get user name from the users already fetched above
+                            user_data = users.get(user_id)
+                            if user_data:
+                                member_name = user_data.get('name', f'User_{user_id}')
+                            else:
+                                member_name = f'User_{user_id}'
+
+                            month_tasks.append({
+                                'name': task.get('task_name', ''),
+                                'member': member_name,
+                                'member_id': user_id,  # Store user ID for filtering
+                                'start': task_start,
+                                'end': task_end,
+                                'priority': task.get('priority_level', 1)  # Use consistent field name
+                            })
+
+            # Sort tasks by start date
+            month_tasks.sort(key=lambda x: x['start'])
+            logger.debug("Found %s tasks for %s %s", len(month_tasks), cal_module.month_name[month], year)
+
+            # Create Gantt chart with date headers
+            current_row = 4  # Start after project header
+
+            # Add priority color legend first
+            ws[f'A{current_row}'] = "🎯 Priority Legend:"
+            ws[f'A{current_row}'].font = Font(bold=True, size=12, name="Arial", color="1E3A8A")
+            current_row += 1
+
+            # High priority
+            ws[f'A{current_row}'] = "🔴 High Priority (4-5)"
+            ws[f'A{current_row}'].font = Font(size=10, name="Arial")
+            ws[f'A{current_row}'].fill = PatternFill(start_color="FF6B6B", end_color="FF6B6B", fill_type="solid")
+            ws[f'A{current_row}'].border = thin_border
+            ws[f'A{current_row}'].alignment = center_alignment
+            current_row += 1
+
+            # Medium priority
+            ws[f'A{current_row}'] = "🟡 Medium Priority (2-3)"
+            ws[f'A{current_row}'].font = Font(size=10, name="Arial")
+            ws[f'A{current_row}'].fill = PatternFill(start_color="FFEAA7", end_color="FFEAA7", fill_type="solid")
+            ws[f'A{current_row}'].border = thin_border
+            ws[f'A{current_row}'].alignment = center_alignment
+            current_row += 1
+
+            # Low priority
+            ws[f'A{current_row}'] = "🟢 Low Priority (1)"
+            ws[f'A{current_row}'].font = Font(size=10, name="Arial")
+            ws[f'A{current_row}'].fill = PatternFill(start_color="96CEB4", end_color="96CEB4", fill_type="solid")
+            ws[f'A{current_row}'].border = thin_border
+            ws[f'A{current_row}'].alignment = center_alignment
+            current_row += 1
+
+            ws[f'A{current_row}'] = ""  # Empty row after legend
+            current_row += 1
+
+            # Create day-of-week headers starting from column B
+            day_names = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+            for i, day_name in enumerate(day_names):
+                col = i + 2  # Start from column B (column 2)
+                day_cell = ws.cell(row=current_row, column=col, value=day_name)
+                day_cell.font = header_font
+                day_cell.fill = header_fill
+                day_cell.border = thick_border
+                day_cell.alignment = center_alignment
+            current_row += 1
+
+            # Group tasks by team member and filter by project collaborators
+            tasks_by_member = {}
+
+            # Get project collaborators from project data
+            project_collaborator_ids = set(project_data.get('collaborators', []))
+            logger.debug("Project collaborators: %s", project_collaborator_ids)
+
+            # Only include tasks from project collaborators (compare by user ID)
+            for task in month_tasks:
+                # Check if this task's member is a project collaborator
+                if task['member_id'] in project_collaborator_ids:
+                    member = task['member']
+                    if member not in tasks_by_member:
+                        tasks_by_member[member] = []
+                    tasks_by_member[member].append(task)
+                    logger.debug("Included task '%s' for collaborator '%s' (ID: %s)", task['name'], member, task['member_id'])
+                else:
+                    logger.debug("Excluded task '%s' for non-collaborator '%s' (ID: %s)", task['name'], member, task['member_id'])
+
+
+            # Create calendar grid with Gantt bars
+            cal = cal_module.monthcalendar(year, month)
+
+            # Create calendar rows (weeks) with day numbers and task bars
+            for week_idx, week in enumerate(cal):
+                # Create day number row
+                for day_idx, day_num in enumerate(week):
+                    col = day_idx + 2  # Start from column B (column 2)
+
+                    if day_num == 0:  # Empty day (not in this month)
+                        # Empty cell
+                        empty_cell = ws.cell(row=current_row, column=col, value="")
+                        empty_cell.border = thin_border
+                        empty_cell.fill = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
+                    else:
+                        # Day number cell
+                        day_cell = ws.cell(row=current_row, column=col, value=day_num)
+                        day_cell.font = Font(bold=True, size=12, name="Arial")
+                        day_cell.border = thin_border
+                        day_cell.alignment = center_alignment
+
+                        # Highlight weekends
+                        date_obj = datetime(year, month, day_num)
+                        if date_obj.weekday() >= 5:  # Saturday = 5, Sunday = 6
+                            day_cell.fill = weekend_fill
+                            day_cell.font = Font(bold=True, color="1E3A8A", size=12, name="Arial")
+                        else:
+                            day_cell.fill = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")
+
+                current_row += 1
+
+                # Create task bars row for this week
+                # Group tasks by member for this week
+                week_tasks_by_member = {}
+                for task in month_tasks:
+                    task_start_day = task['start'].day if task['start'].month == month else 1
+                    task_end_day = task['end'].day if task['end'].month == month else month_days
+
+                    # Check if task overlaps with this week
+                    week_days = [day for day in week if day != 0]
+                    if week_days and task_start_day <= max(week_days) and task_end_day >= min(week_days):
+                        member = task['member']
+                        if member not in week_tasks_by_member:
+                            week_tasks_by_member[member] = []
+                        week_tasks_by_member[member].append(task)
+
+                # Create task bars for each member in this week
+                for member, member_tasks in week_tasks_by_member.items():
+                    # Member name in first column
+                    member_cell = ws.cell(row=current_row, column=1, value=member)
+                    member_cell.font = Font(bold=True, size=10, name="Arial", color="1E3A8A")
+                    member_cell.border = thin_border
+                    member_cell.fill = member_cell_fill
+                    member_cell.alignment = center_alignment
+
+                    # Track which columns are already used for this row
+                    used_columns = set()
+
+                    # Create task bars across the week
+                    for task in member_tasks:
+                        task_start_day = task['start'].day if task['start'].month == month else 1
+                        task_end_day = task['end'].day if task['end'].month == month else month_days
+
+                        # Find start and end columns within this week
+                        start_col = None
+                        end_col = None
+
+                        for day_idx, day_num in enumerate(week):
+                            if day_num != 0:  # Only consider days in this month
+                                if day_num == task_start_day:
+                                    start_col = day_idx + 2  # Start from column B (column 2)
+                                if day_num == task_end_day:
+                                    end_col = day_idx + 2  # Start from column B (column 2)
+
+                        # If task starts before this week, start from first day
+                        if start_col is None and task_start_day < min([d for d in week if d != 0]):
+                            start_col = 2  # Column B
+
+                        # If task ends after this week, end at last day
+                        if end_col is None and task_end_day > max([d for d in week if d != 0]):
+                            end_col = 8  # Column H (last day column)
+
+                        if start_col and end_col:
+                            # Check for overlaps
+                            task_columns = set(range(start_col, end_col + 1))
+                            if task_columns.intersection(used_columns):
+                                continue
+
+                            # Mark columns as used
+                            used_columns.update(task_columns)
+
+                            # Create task bar with priority-based color
+                            priority = task.get('priority', 1)  # This should match the field name used above
+
+                            # Convert priority to integer if it's a string
+                            try:
+                                priority = int(priority)
+                            except (ValueError, TypeError):
+                                priority = 1  # Default to low priority if conversion fails
+
+                            logger.debug("Task '%s' has priority: %s (type: %s)", task['name'], priority, type(priority))
+
+                            # Handle different priority scales (1-3 or 1-5)
+                            if priority >= 4:  # High priority (4-5 scale or 3 scale)
+                                task_fill = PatternFill(start_color="FF6B6B", end_color="FF6B6B", fill_type="solid")
+                                logger.debug("  -> Using HIGH priority color (red)")
+                            elif priority >= 2:  # Medium priority (2-3 scale or 2 scale)
+                                task_fill = PatternFill(start_color="FFEAA7", end_color="FFEAA7", fill_type="solid")
+                                logger.debug("  -> Using MEDIUM priority color (yellow)")
+                            else:  # Low priority (1 or default)
+                                task_fill = PatternFill(start_color="96CEB4", end_color="96CEB4", fill_type="solid")
+                                logger.debug("  -> Using LOW priority color (green)")
+
+                            if start_col == end_col:
+                                # Single day task
+                                cell = ws.cell(row=current_row, column=start_col, value=task['name'])
+                                cell.border = thin_border
+                                cell.alignment = center_alignment
+                                cell.fill = task_fill
+                                cell.font = Font(size=8, bold=True, color="FFFFFF", name="Arial")
+                            else:
+                                # Multi-day task - create horizontal bar
+                                try:
+                                    start_cell = ws.cell(row=current_row, column=start_col, value=task['name'])
+                                    start_cell.border = thin_border
+                                    start_cell.alignment = center_alignment
+                                    start_cell.fill = task_fill
+                                    start_cell.font = Font(size=8, bold=True, color="FFFFFF", name="Arial")
+
+                                    # Merge cells to create the bar
+                                    ws.merge_cells(start_row=current_row, start_column=start_col, 
+                                                 end_row=current_row, end_column=end_col)
+                                    logger.debug("Successfully merged cells for task '%s'", task['name'])
+                                except Exception as e:
+                                    logger.error("Error creating task bar for '%s': %s", task['name'], e)
+                                    ws.cell(row=current_row, column=start_col, value=task['name'])
+
+                    current_row += 1
+
+            # Calendar view complete - tasks are now displayed inside each day cell
+
+            # Set column widths and row heights for this sheet
+            # Calendar columns (Mon-Sun) + team member column
+            ws.column_dimensions['A'].width = 20  # Team member column
+            for col in range(2, 9):  # 7 days of the week (columns B-H)
+                column_letter = ws.cell(row=1, column=col).column_letter
+                ws.column_dimensions[column_letter].width = 15  # Calendar day columns
+
+            # Set row heights
+            for row in range(1, current_row + 5):
+                if row == 1:  # Project header
+                    ws.row_dimensions[row].height = 35
+                elif row == 2:  # Timestamp
+                    ws.row_dimensions[row].height = 25
+                elif row >= 8:  # Calendar rows (after headers and legend)
+                    ws.row_dimensions[row].height = 40  # Height for calendar with task bars
+                else:
+                    ws.row_dimensions[row].height = 25
+
+    # --- Multi-sheet setup complete ---
+    # Each month now has its own sheet with proper sizing
+
+    # --- Save to BytesIO ---
+    logger.debug("Saving Excel to buffer...")
+    buffer = BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    logger.debug("Excel saved, buffer size: %s bytes", buffer.getbuffer().nbytes)
+    return buffer
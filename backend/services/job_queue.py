@@ -0,0 +1,362 @@
+"""
+Job Queue
+Persistent local queue for side effects that should not hold up a request:
+emails, notification fan-out and spawning the next recurring task. Jobs are
+stored in SQLite, run by a pool of worker threads in each process, retried
+with exponential backoff and moved to the dead-letter list once they run out
+of attempts.
+
+Handlers are registered by job type and receive the enqueued keyword args:
+
+    @job_queue.handler('notify_assigned')
+    def notify_assigned(task_data, user_ids): ...
+
+    job_queue.enqueue('notify_assigned', task_data={...}, user_ids=['u1'])
+    job_queue.schedule('flush_digest', 600, recipient='a@example.com')  # due in 10 min
+
+Payloads must be JSON-serializable (datetimes are kept as datetimes). A
+handler raises PermanentJobError for failures that retrying cannot fix; the
+job is dead-lettered at once.
+
+Configuration (environment):
+    JOB_QUEUE_WORKERS          worker threads per process (default 2); 0 = run jobs inline
+    JOB_QUEUE_PATH             SQLite file (default backend/jobs.sqlite3)
+    JOB_QUEUE_MAX_ATTEMPTS     attempts before a job is dead-lettered (default 5)
+    JOB_QUEUE_BACKOFF_SECONDS  delay before the first retry, doubled per attempt (default 5)
+    JOB_QUEUE_LEASE_SECONDS    a running job not finished after this long is retried (default 300)
+"""
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+from datetime import date, datetime
+
+# Add parent directory to path to import logging_utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+PENDING = 'pending'
+RUNNING = 'running'
+DEAD = 'dead'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    type        TEXT NOT NULL,
+    payload     TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    run_at      REAL NOT NULL,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    locked_by   TEXT,
+    last_error  TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status_run_at ON jobs (status, run_at);
+"""
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when the job can never succeed (no retries)"""
+
+
+# ===================== PAYLOAD ENCODING =====================
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'$datetime': value.isoformat()}
+    if isinstance(value, date):
+        return {'$date': value.isoformat()}
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _decode_object(obj):
+    if len(obj) == 1:
+        if '$datetime' in obj:
+            return datetime.fromisoformat(obj['$datetime'])
+        if '$date' in obj:
+            return date.fromisoformat(obj['$date'])
+    return obj
+
+
+def encode_payload(payload):
+    return json.dumps(payload, default=_encode_value)
+
+
+def decode_payload(text):
+    return json.loads(text, object_hook=_decode_object)
+
+
+class JobQueue:
+    def __init__(self, path=None, workers=None, max_attempts=None, backoff_seconds=None,
+                 lease_seconds=None, poll_seconds=1.0):
+        self.path = path or os.getenv(
+            'JOB_QUEUE_PATH', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'jobs.sqlite3')
+        )
+        self.workers = int(workers if workers is not None else os.getenv('JOB_QUEUE_WORKERS', 2))
+        self.max_attempts = int(max_attempts if max_attempts is not None else os.getenv('JOB_QUEUE_MAX_ATTEMPTS', 5))
+        self.backoff_seconds = float(
+            backoff_seconds if backoff_seconds is not None else os.getenv('JOB_QUEUE_BACKOFF_SECONDS', 5)
+        )
+        self.lease_seconds = float(
+            lease_seconds if lease_seconds is not None else os.getenv('JOB_QUEUE_LEASE_SECONDS', 300)
+        )
+        self.poll_seconds = poll_seconds
+
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        self._reset_workers()
+
+        if hasattr(os, 'register_at_fork'):
+            # Worker threads do not survive a fork (gunicorn preload)
+            os.register_at_fork(after_in_child=self._reset_workers)
+
+    def _reset_workers(self):
+        self._threads = []
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+
+    # ===================== HANDLERS =====================
+    def handler(self, job_type):
+        """Decorator registering the function that runs jobs of `job_type`"""
+        def decorator(func):
+            self._handlers[job_type] = func
+            return func
+        return decorator
+
+    # ===================== STORAGE =====================
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        if not self._schema_ready:
+            with self._lock:
+                if not self._schema_ready:
+                    conn.execute('PRAGMA journal_mode=WAL')
+                    conn.executescript(_SCHEMA)
+                    self._schema_ready = True
+        return conn
+
+    def _insert(self, job_type, payload_text, status, attempts=0, last_error=None, delay_seconds=0):
+        now = time.time()
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                'INSERT INTO jobs (type, payload, status, attempts, run_at, created_at, updated_at, last_error) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (job_type, payload_text, status, attempts, now + delay_seconds, now, now, last_error)
+            )
+            return cursor.lastrowid
+        finally:
+            conn.close()
+
+    def _claim(self, worker_id):
+        """Atomically take the next due job (or one whose lease expired)"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT id, type, payload, attempts FROM jobs '
+                'WHERE (status = ? AND run_at <= ?) OR (status = ? AND updated_at < ?) '
+                'ORDER BY run_at, id LIMIT 1',
+                (PENDING, now, RUNNING, now - self.lease_seconds)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    'UPDATE jobs SET status = ?, attempts = attempts + 1, locked_by = ?, updated_at = ? WHERE id = ?',
+                    (RUNNING, worker_id, now, row['id'])
+                )
+            conn.execute('COMMIT')
+            return row
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def _finish(self, job_id):
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+        finally:
+            conn.close()
+
+    def _fail(self, job_id, attempts, error, permanent=False):
+        now = time.time()
+        dead = permanent or attempts >= self.max_attempts
+        run_at = now + self.backoff_seconds * (2 ** (attempts - 1))
+        conn = self._connect()
+        try:
+            conn.execute(
+                'UPDATE jobs SET status = ?, run_at = ?, updated_at = ?, locked_by = NULL, last_error = ? WHERE id = ?',
+                (DEAD if dead else PENDING, run_at, now, error, job_id)
+            )
+        finally:
+            conn.close()
+        return dead
+
+    # ===================== RUNNING =====================
+    def _execute(self, job_type, payload):
+        handler = self._handlers.get(job_type)
+        if handler is None:
+            raise LookupError(f'No handler registered for job type {job_type!r}')
+        handler(**payload)
+
+    def run_job(self, row):
+        """Run a claimed job; deletes it on success, schedules a retry or dead-letters it on failure"""
+        try:
+            self._execute(row['type'], decode_payload(row['payload']))
+        except Exception as e:
+            attempts = row['attempts'] + 1
+            error = ''.join(traceback.format_exception_only(type(e), e)).strip()
+            if self._fail(row['id'], attempts, error, permanent=isinstance(e, PermanentJobError)):
+                logger.error("❌ Job %s (%s) dead-lettered after %s attempts: %s", row['id'], row['type'], attempts, error)
+            else:
+                logger.warning("⚠️ Job %s (%s) failed (attempt %s), will retry: %s", row['id'], row['type'], attempts, error)
+            return False
+        self._finish(row['id'])
+        return True
+
+    def run_pending(self, worker_id=None):
+        """Run due jobs until none are left; returns how many ran (used by workers and tests)"""
+        worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+        count = 0
+        while not self._stopping.is_set():
+            row = self._claim(worker_id)
+            if row is None:
+                break
+            self.run_job(row)
+            count += 1
+        return count
+
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            try:
+                if self.run_pending():
+                    continue
+            except Exception as e:
+                logger.exception("❌ Job worker error: %s", e)
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def start(self):
+        """Start this process's worker threads (idempotent; enqueue() calls it)"""
+        if self.workers <= 0 or self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            for number in range(self.workers):
+                thread = threading.Thread(target=self._worker_loop, name=f'job-worker-{number}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            logger.debug("👷 Started %s job workers (%s)", self.workers, self.path)
+
+    def stop(self, timeout=5):
+        """Stop the worker threads; jobs they were running are retried after the lease expires"""
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    # ===================== PUBLIC API =====================
+    def enqueue(self, job_type, **payload):
+        """
+        Queue a job and return immediately.
+
+        Returns:
+            The job ID, or None when the job ran inline (JOB_QUEUE_WORKERS=0)
+        """
+        return self.schedule(job_type, 0, **payload)
+
+    def schedule(self, job_type, delay_seconds, **payload):
+        """Queue a job that becomes due after `delay_seconds` (inline mode runs it at once)"""
+        if job_type not in self._handlers:
+            raise LookupError(f'No handler registered for job type {job_type!r}')
+        payload_text = encode_payload(payload)
+
+        if self.workers <= 0:
+            try:
+                self._execute(job_type, decode_payload(payload_text))
+            except Exception as e:
+                error = ''.join(traceback.format_exception_only(type(e), e)).strip()
+                logger.error("❌ Inline job %s failed: %s", job_type, error)
+                return self._insert(job_type, payload_text, DEAD, attempts=1, last_error=error)
+            return None
+
+        job_id = self._insert(job_type, payload_text, PENDING, delay_seconds=max(0, float(delay_seconds)))
+        self.start()
+        self._wake.set()
+        return job_id
+
+    def stats(self):
+        """Number of jobs per status"""
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT status, COUNT(*) AS count FROM jobs GROUP BY status').fetchall()
+        finally:
+            conn.close()
+        counts = {PENDING: 0, RUNNING: 0, DEAD: 0}
+        counts.update({row['status']: row['count'] for row in rows})
+        return counts
+
+    def dead_letters(self, limit=50):
+        """Most recent dead-lettered jobs"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                'SELECT id, type, payload, attempts, last_error, created_at, updated_at FROM jobs '
+                'WHERE status = ? ORDER BY updated_at DESC LIMIT ?',
+                (DEAD, limit)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [
+            {
+                'id': row['id'],
+                'type': row['type'],
+                'payload': decode_payload(row['payload']),
+                'attempts': row['attempts'],
+                'last_error': row['last_error'],
+                'created_at': row['created_at'],
+                'updated_at': row['updated_at'],
+            }
+            for row in rows
+        ]
+
+    def retry_dead(self, job_id=None):
+        """Move one (or every) dead-lettered job back to the queue; returns how many moved"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            if job_id is None:
+                cursor = conn.execute(
+                    'UPDATE jobs SET status = ?, attempts = 0, run_at = ?, updated_at = ? WHERE status = ?',
+                    (PENDING, now, now, DEAD)
+                )
+            else:
+                cursor = conn.execute(
+                    'UPDATE jobs SET status = ?, attempts = 0, run_at = ?, updated_at = ? WHERE status = ? AND id = ?',
+                    (PENDING, now, now, DEAD, job_id)
+                )
+            moved = cursor.rowcount
+        finally:
+            conn.close()
+        if moved:
+            self.start()
+            self._wake.set()
+        return moved
+
+
+# Create singleton instance
+job_queue = JobQueue()
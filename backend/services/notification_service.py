@@ -11,8 +11,17 @@ import pytz
 
 # Add parent directory to path to import firebase_utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from firebase_utils import get_firestore_client
+from firebase_utils import get_firestore_client, get_documents
+from query_utils import stream_by_field
 from services.email_service import email_service
+from services.job_queue import job_queue
+from services.task_field_service import TASK_SERVER_FILTERS, canonical_task_status
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Deadline scan: one indexed range query on end_date, read in pages
+DEADLINE_SCAN_PAGE_SIZE = int(os.getenv('DEADLINE_SCAN_PAGE_SIZE', 200))
 
 class NotificationService:
     def __init__(self):
@@ -69,11 +78,11 @@ class NotificationService:
             
             self.notifications_cache[user_id].append(notification_data)
             
-            print(f"✅ In-memory notification created for user {user_id}: {title} (ID: {notification_id})")
+            logger.debug("✅ In-memory notification created for user %s: %s (ID: %s)", user_id, title, notification_id)
             return notification_id
             
         except Exception as e:
-            print(f"❌ Error creating notification: {str(e)}")
+            logger.error("❌ Error creating notification: %s", e)
             return None
     
     def notify_task_assigned(self, task_data, assigned_user_ids):
@@ -85,17 +94,15 @@ class NotificationService:
             assigned_user_ids: List of user IDs assigned to the task
         """
         try:
-            print(f"🔔 notify_task_assigned called for {len(assigned_user_ids)} users")
-            # Get user details to check if they are staff
-            users_ref = self.db.collection('Users')
+            logger.debug("🔔 notify_task_assigned called for %s users", len(assigned_user_ids))
+            # Get user details to check if they are staff (one batched read)
+            users_by_id = get_documents(self.db, 'Users', assigned_user_ids)
             
             for user_id in assigned_user_ids:
-                print(f"🔍 Checking user {user_id}...")
-                # Get user document
-                user_doc = users_ref.document(user_id).get()
+                logger.debug("🔍 Checking user %s...", user_id)
+                user_data = users_by_id.get(str(user_id))
                 
-                if user_doc.exists:
-                    user_data = user_doc.to_dict()
+                if user_data is not None:
                     role_name = user_data.get('role_name', '')
                     role_num = user_data.get('role_num')
                     
@@ -103,11 +110,11 @@ class NotificationService:
                     if isinstance(role_num, str):
                         role_num = int(role_num)
                     
-                    print(f"   User role_name: {role_name}, role_num: {role_num} (type: {type(role_num).__name__})")
+                    logger.debug("   User role_name: %s, role_num: %s (type: %s)", role_name, role_num, type(role_num).__name__)
                     
                     # Only notify staff members (role_num = 4)
                     if role_num == 4 or role_name.lower() == 'staff':
-                        print(f"   ✅ User is staff - creating notification")
+                        logger.debug("   ✅ User is staff - creating notification")
                         title = "New Task Assigned"
                         message = f'You have been assigned to "{task_data.get("task_name", "a task")}"'
                         
@@ -119,39 +126,57 @@ class NotificationService:
                             task_id=task_data.get('task_ID') or task_data.get('id'),
                             project_id=task_data.get('proj_ID')
                         )
-                        print(f"   📬 Notification {notification_id} created for user {user_id}")
+                        logger.debug("   📬 Notification %s created for user %s", notification_id, user_id)
                     else:
-                        print(f"   ⏭️  User is not staff (role_num={role_num}) - skipping")
+                        logger.debug("   ⏭️  User is not staff (role_num=%s) - skipping", role_num)
                 else:
-                    print(f"   ⚠️  User document not found for {user_id}")
+                    logger.warning("   ⚠️  User document not found for %s", user_id)
                         
         except Exception as e:
-            print(f"❌ Error notifying task assignment: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error notifying task assignment: %s", e)
     
+    def _stream_tasks_due(self, start, end):
+        """
+        Tasks with start < end_date <= end, in end_date order.
+
+        Status is not filtered here: tasks with a missing or unknown status
+        still get reminders, and completed ones are skipped by the caller.
+        With TASK_SERVER_FILTERS=1 deleted tasks are excluded server-side,
+        using the (is_deleted, end_date) composite index in firestore.indexes.json.
+        """
+        query = self.db.collection('Tasks')
+        if TASK_SERVER_FILTERS:
+            query = query.where('is_deleted', '==', False)
+        query = query.where('end_date', '>', start).where('end_date', '<=', end)
+        return stream_by_field(query, 'end_date', batch_size=DEADLINE_SCAN_PAGE_SIZE)
+
     def notify_upcoming_deadlines(self):
         """
         Check for tasks due within 24 hours and notify assigned staff members
         This should be run periodically (e.g., every hour via cron job)
         """
         try:
-            print("🔔 Checking for upcoming deadlines...")
-            # Get all tasks from Tasks collection
-            tasks_ref = self.db.collection('Tasks')
-            tasks = tasks_ref.stream()
-            
+            logger.debug("🔔 Checking for upcoming deadlines...")
             # Use Singapore timezone
             sg_tz = pytz.timezone('Asia/Singapore')
             now = datetime.now(sg_tz)
             deadline_threshold = now + timedelta(hours=24)
             
             notification_count = 0
+            due_tasks = []
             
-            for task_doc in tasks:
+            # Only tasks due in the window are read, not the whole task history
+            for task_doc in self._stream_tasks_due(now, deadline_threshold):
                 task_data = task_doc.to_dict()
                 task_id = task_doc.id
                 
+                # Deleted tasks (TASK_SERVER_FILTERS off) and completed tasks are skipped here;
+                # completed ones are few in a 24h window, so status stays out of the query
+                if task_data.get('is_deleted', False):
+                    continue
+                if canonical_task_status(task_data.get('task_status')) == 'Completed':
+                    continue
+                
                 # Parse end_date
                 end_date = task_data.get('end_date')
                 if not end_date:
@@ -168,104 +193,117 @@ class NotificationService:
                     
                     # Check if task is due within 24 hours
                     if now < end_date <= deadline_threshold:
-                        assigned_users = task_data.get('assigned_to', [])
+                        due_tasks.append((task_id, task_data, end_date))
+                
+                except Exception as date_error:
+                    logger.error("❌ Error parsing date for task %s: %s", task_data.get('task_name'), str(date_error))
+                    continue
+            
+            # Batch-fetch assignees and projects of every due task
+            users_by_id = get_documents(
+                self.db, 'Users',
+                [uid for _, task_data, _ in due_tasks for uid in (task_data.get('assigned_to') or [])]
+            )
+            projects_by_id = get_documents(
+                self.db, 'Projects',
+                [task_data.get('proj_ID') for _, task_data, _ in due_tasks]
+            )
+            
+            for task_id, task_data, end_date in due_tasks:
+                try:
+                    assigned_users = task_data.get('assigned_to', [])
+                    
+                    # Notify each assigned staff member
+                    for user_id in assigned_users:
+                        # Check if user is staff
+                        user_data = users_by_id.get(str(user_id))
                         
-                        # Notify each assigned staff member
-                        for user_id in assigned_users:
-                            # Check if user is staff
-                            user_doc = self.db.collection('Users').document(user_id).get()
+                        if user_data is not None:
+                            role_num = user_data.get('role_num')
+                            if isinstance(role_num, str):
+                                role_num = int(role_num)
                             
-                            if user_doc.exists:
-                                user_data = user_doc.to_dict()
-                                role_num = user_data.get('role_num')
-                                if isinstance(role_num, str):
-                                    role_num = int(role_num)
+                            # Only notify staff members
+                            if role_num == 4 or user_data.get('role_name', '').lower() == 'staff':
+                                # Check if we already sent this notification in the last 23 hours
+                                # Using in-memory cache
+                                user_notifications = self.notifications_cache.get(user_id, [])
+                                should_notify = True
+                                
+                                for notif in user_notifications:
+                                    if (notif.get('task_id') == task_id and 
+                                        notif.get('type') == 'deadline'):
+                                        # Check if sent in last 23 hours
+                                        notif_time = datetime.fromisoformat(notif.get('timestamp'))
+                                        if (now - notif_time).total_seconds() < 23 * 3600:
+                                            should_notify = False
+                                            break
                                 
-                                # Only notify staff members
-                                if role_num == 4 or user_data.get('role_name', '').lower() == 'staff':
-                                    # Check if we already sent this notification in the last 23 hours
-                                    # Using in-memory cache
-                                    user_notifications = self.notifications_cache.get(user_id, [])
-                                    should_notify = True
+                                if should_notify:
+                                    hours_remaining = int((end_date - now).total_seconds() / 3600)
+                                    title = "❗ Deadline Approaching!"
+                                    message = f'{task_data.get("task_name", "A task")} is due in {hours_remaining} hours'
                                     
-                                    for notif in user_notifications:
-                                        if (notif.get('task_id') == task_id and 
-                                            notif.get('type') == 'deadline'):
-                                            # Check if sent in last 23 hours
-                                            notif_time = datetime.fromisoformat(notif.get('timestamp'))
-                                            if (now - notif_time).total_seconds() < 23 * 3600:
-                                                should_notify = False
-                                                break
+                                    # Create in-app notification
+                                    self.create_notification(
+                                        user_id=user_id,
+                                        notification_type='deadline',
+                                        title=title,
+                                        message=message,
+                                        task_id=task_id,
+                                        project_id=task_data.get('proj_ID')
+                                    )
                                     
-                                    if should_notify:
-                                        hours_remaining = int((end_date - now).total_seconds() / 3600)
-                                        title = "❗ Deadline Approaching!"
-                                        message = f'{task_data.get("task_name", "A task")} is due in {hours_remaining} hours'
-                                        
-                                        # Create in-app notification
-                                        self.create_notification(
-                                            user_id=user_id,
-                                            notification_type='deadline',
-                                            title=title,
-                                            message=message,
-                                            task_id=task_id,
-                                            project_id=task_data.get('proj_ID')
-                                        )
-                                        
-                                        # Send email notification
-                                        try:
-                                            user_email = user_data.get('email')
-                                            if user_email:
-                                                # Get project name if it's a project task
-                                                project_name = None
-                                                if task_data.get('proj_ID'):
-                                                    project_doc = self.db.collection('Projects').document(task_data['proj_ID']).get()
-                                                    if project_doc.exists:
-                                                        project_name = project_doc.to_dict().get('project_name')
-                                                
-                                                # Determine priority level
-                                                priority_num = task_data.get('priority_level', 1)
-                                                if priority_num >= 4:
-                                                    priority_level = 'High'
-                                                elif priority_num >= 2:
-                                                    priority_level = 'Medium'
-                                                else:
-                                                    priority_level = 'Low'
-                                                
-                                                # Send email
-                                                email_sent = email_service.send_deadline_reminder_email(
-                                                    to_email=user_email,
-                                                    user_name=user_data.get('name', 'User'),
-                                                    task_name=task_data.get('task_name', 'A task'),
-                                                    task_desc=task_data.get('description', ''),
-                                                    project_name=project_name,
-                                                    hours_until_due=hours_remaining,
-                                                    due_date=end_date.strftime('%Y-%m-%d %H:%M'),
-                                                    priority_level=priority_level
-                                                )
-                                                
-                                                if email_sent:
-                                                    print(f"📧 Email sent to {user_email} for deadline reminder")
-                                                else:
-                                                    print(f"❌ Failed to send email to {user_email}")
+                                    # Send email notification
+                                    try:
+                                        user_email = user_data.get('email')
+                                        if user_email:
+                                            # Get project name if it's a project task
+                                            project_name = None
+                                            if task_data.get('proj_ID') and str(task_data['proj_ID']) in projects_by_id:
+                                                project_name = projects_by_id[str(task_data['proj_ID'])].get('project_name')
+                                            
+                                            # Determine priority level
+                                            priority_num = task_data.get('priority_level', 1)
+                                            if priority_num >= 4:
+                                                priority_level = 'High'
+                                            elif priority_num >= 2:
+                                                priority_level = 'Medium'
+                                            else:
+                                                priority_level = 'Low'
+                                            
+                                            # Send email
+                                            email_sent = email_service.send_deadline_reminder_email(
+                                                to_email=user_email,
+                                                user_name=user_data.get('name', 'User'),
+                                                task_name=task_data.get('task_name', 'A task'),
+                                                task_desc=task_data.get('description', ''),
+                                                project_name=project_name,
+                                                hours_until_due=hours_remaining,
+                                                due_date=end_date.strftime('%Y-%m-%d %H:%M'),
+                                                priority_level=priority_level
+                                            )
+                                            
+                                            if email_sent:
+                                                logger.debug("📧 Email sent to %s for deadline reminder", user_email)
                                             else:
-                                                print(f"⚠️ No email address found for user {user_id}")
-                                        except Exception as email_error:
-                                            print(f"❌ Error sending email to {user_id}: {str(email_error)}")
-                                        
-                                        notification_count += 1
+                                                logger.error("❌ Failed to send email to %s", user_email)
+                                        else:
+                                            logger.warning("⚠️ No email address found for user %s", user_id)
+                                    except Exception as email_error:
+                                        logger.error("❌ Error sending email to %s: %s", user_id, str(email_error))
+                                    
+                                    notification_count += 1
                 
-                except Exception as date_error:
-                    print(f"❌ Error parsing date for task {task_data.get('task_name')}: {str(date_error)}")
+                except Exception as task_error:
+                    logger.error("❌ Error notifying deadline for task %s: %s", task_data.get('task_name'), str(task_error))
                     continue
             
-            print(f"✅ Deadline check completed - {notification_count} notifications created")
+            logger.debug("✅ Deadline check completed - %s notifications created", notification_count)
             return notification_count
             
         except Exception as e:
-            print(f"❌ Error checking upcoming deadlines: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error checking upcoming deadlines: %s", e)
             return 0
     
     def notify_task_updated(self, task_data, assigned_user_ids, updated_fields, old_values=None, new_values=None):
@@ -280,18 +318,17 @@ class NotificationService:
             new_values: Dict of new field values (optional)
         """
         try:
-            users_ref = self.db.collection('Users')
             task_name = task_data.get('task_name', 'A task')
             
             # Generate specific, user-friendly message based on what changed
             title, message = self._generate_update_message(task_name, updated_fields, task_data, old_values, new_values)
             
+            users_by_id = get_documents(self.db, 'Users', assigned_user_ids)
+            
             for user_id in assigned_user_ids:
-                # Get user document
-                user_doc = users_ref.document(user_id).get()
+                user_data = users_by_id.get(str(user_id))
                 
-                if user_doc.exists:
-                    user_data = user_doc.to_dict()
+                if user_data is not None:
                     role_num = user_data.get('role_num')
                     if isinstance(role_num, str):
                         role_num = int(role_num)
@@ -308,7 +345,7 @@ class NotificationService:
                         )
                         
         except Exception as e:
-            print(f"Error notifying task update: {str(e)}")
+            logger.error("Error notifying task update: %s", e)
     
     def _generate_update_message(self, task_name, updated_fields, task_data, old_values=None, new_values=None):
         """
@@ -380,11 +417,11 @@ class NotificationService:
             # Apply limit
             limited_notifications = sorted_notifications[:limit]
             
-            print(f"📬 Retrieved {len(limited_notifications)} in-memory notifications for user {user_id}")
+            logger.debug("📬 Retrieved %s in-memory notifications for user %s", len(limited_notifications), user_id)
             return limited_notifications
             
         except Exception as e:
-            print(f"❌ Error getting user notifications: {str(e)}")
+            logger.error("❌ Error getting user notifications: %s", e)
             return []
     
     def mark_as_read(self, notification_id):
@@ -400,14 +437,14 @@ class NotificationService:
                 for notification in notifications:
                     if notification.get('id') == notification_id:
                         notification['read'] = True
-                        print(f"✅ Marked notification {notification_id} as read")
+                        logger.debug("✅ Marked notification %s as read", notification_id)
                         return True
             
-            print(f"⚠️ Notification {notification_id} not found")
+            logger.warning("⚠️ Notification %s not found", notification_id)
             return False
             
         except Exception as e:
-            print(f"❌ Error marking notification as read: {str(e)}")
+            logger.error("❌ Error marking notification as read: %s", e)
             return False
     
     def mark_all_as_read(self, user_id):
@@ -426,11 +463,11 @@ class NotificationService:
                     notification['read'] = True
                     count += 1
             
-            print(f"✅ Marked {count} notifications as read for user {user_id}")
+            logger.debug("✅ Marked %s notifications as read for user %s", count, user_id)
             return count
             
         except Exception as e:
-            print(f"❌ Error marking all notifications as read: {str(e)}")
+            logger.error("❌ Error marking all notifications as read: %s", e)
             return 0
     
     def delete_notification(self, notification_id):
@@ -446,16 +483,27 @@ class NotificationService:
                 for i, notification in enumerate(notifications):
                     if notification.get('id') == notification_id:
                         del notifications[i]
-                        print(f"✅ Deleted notification {notification_id}")
+                        logger.debug("✅ Deleted notification %s", notification_id)
                         return True
             
-            print(f"⚠️ Notification {notification_id} not found for deletion")
+            logger.warning("⚠️ Notification %s not found for deletion", notification_id)
             return False
             
         except Exception as e:
-            print(f"❌ Error deleting notification: {str(e)}")
+            logger.error("❌ Error deleting notification: %s", e)
             return False
 
 # Create singleton instance
 notification_service = NotificationService()
 
+
+@job_queue.handler('notify_assigned')
+def notify_assigned_job(task_data, user_ids):
+    """Job: in-app notifications for newly assigned users"""
+    notification_service.notify_task_assigned(task_data, user_ids)
+
+
+@job_queue.handler('notify_updated')
+def notify_updated_job(task_data, user_ids, updated_fields, old_values=None, new_values=None):
+    """Job: in-app notifications for changes to a task"""
+    notification_service.notify_task_updated(task_data, user_ids, updated_fields, old_values, new_values)
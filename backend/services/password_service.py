@@ -0,0 +1,168 @@
+"""
+Password Service
+Runs PBKDF2 hashing/verification on a bounded process pool so a burst of
+logins cannot tie up every request thread.
+
+Configuration (environment):
+    PASSWORD_POOL_SIZE         worker processes (0 = run inline on the request thread)
+    PASSWORD_POOL_QUEUE_LIMIT  jobs allowed to wait once all workers are busy
+    PASSWORD_POOL_TIMEOUT      seconds to wait for a result before giving up
+    PASSWORD_POOL_RETRY_AFTER  Retry-After (seconds) sent with 503 responses
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import os
+import sys
+import threading
+import time
+
+# Add parent directory to path to import password_utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from password_utils import hash_password, verify_password
+
+
+class PasswordPoolBusyError(Exception):
+    """Raised when the pool is saturated or a job timed out"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PasswordService:
+    def __init__(self, pool_size=None, queue_limit=None, timeout=None, retry_after=None):
+        if pool_size is None:
+            pool_size = int(os.getenv('PASSWORD_POOL_SIZE', min(4, os.cpu_count() or 1)))
+        if queue_limit is None:
+            queue_limit = int(os.getenv('PASSWORD_POOL_QUEUE_LIMIT', 32))
+        if timeout is None:
+            timeout = float(os.getenv('PASSWORD_POOL_TIMEOUT', 10))
+        if retry_after is None:
+            retry_after = int(os.getenv('PASSWORD_POOL_RETRY_AFTER', 2))
+
+        self.pool_size = max(0, pool_size)
+        self.queue_limit = max(0, queue_limit)
+        self.timeout = timeout
+        self.retry_after = retry_after
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+        # Metrics
+        self._latencies = deque(maxlen=1000)
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    # ===================== POOL =====================
+    def _get_executor(self):
+        """Create the process pool lazily (after any fork by the WSGI server)"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.pool_size)
+        return self._executor
+
+    def _reset_executor(self, broken):
+        """Drop a broken pool (a worker died) so the next submit starts a fresh one"""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn, *args):
+        executor = self._get_executor()
+        try:
+            return executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._reset_executor(executor)
+            return self._get_executor().submit(fn, *args)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _acquire_slot(self):
+        capacity = max(1, self.pool_size) + self.queue_limit
+        with self._lock:
+            if self._in_flight >= capacity:
+                self._rejected += 1
+                raise PasswordPoolBusyError("Authentication service is busy, please retry", self.retry_after)
+            self._in_flight += 1
+
+    def _release_slot(self, started_at):
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+            self._latencies.append(elapsed_ms)
+
+    def _run(self, fn, *args):
+        self._acquire_slot()
+        started_at = time.perf_counter()
+        if self.pool_size == 0:
+            try:
+                return fn(*args)
+            finally:
+                self._release_slot(started_at)
+
+        try:
+            future = self._submit(fn, *args)
+        except BaseException:
+            self._release_slot(started_at)
+            raise
+        # The slot stays taken until a worker is really done: a timed-out hash
+        # that is already running cannot be cancelled and still occupies it
+        future.add_done_callback(lambda _: self._release_slot(started_at))
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            with self._lock:
+                self._timed_out += 1
+            raise PasswordPoolBusyError("Authentication timed out, please retry", self.retry_after)
+
+    # ===================== PUBLIC API =====================
+    def hash(self, password):
+        """Hash a password on the pool (raises PasswordPoolBusyError when saturated)"""
+        return self._run(hash_password, password)
+
+    def verify(self, stored_password, provided_password):
+        """Verify a password on the pool (raises PasswordPoolBusyError when saturated)"""
+        return self._run(verify_password, stored_password, provided_password)
+
+    def get_stats(self):
+        """Queue depth and hash latency metrics"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            in_flight = self._in_flight
+            stats = {
+                'pool_size': self.pool_size,
+                'queue_limit': self.queue_limit,
+                'in_flight': in_flight,
+                'queue_depth': max(0, in_flight - max(1, self.pool_size)),
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'timed_out': self._timed_out,
+            }
+
+        if latencies:
+            stats['latency_ms'] = {
+                'avg': round(sum(latencies) / len(latencies), 2),
+                'p50': round(latencies[len(latencies) // 2], 2),
+                'p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+                'max': round(latencies[-1], 2),
+            }
+        else:
+            stats['latency_ms'] = {'avg': 0, 'p50': 0, 'p95': 0, 'max': 0}
+        return stats
+
+
+# Create singleton instance
+password_service = PasswordService()
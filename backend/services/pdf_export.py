@@ -0,0 +1,375 @@
+"""
+PDF export rendering for project reports and team calendars.
+Imported lazily by the export endpoints in routes/project.py so reportlab
+is only loaded by workers that actually serve an export.
+"""
+from datetime import datetime
+from io import BytesIO
+from statistics import mean
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, KeepTogether
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+
+
+# =============== CALENDAR GENERATION HELPER FUNCTIONS ===============
+def generate_team_calendar_pdf(tasks, project_name, project_data, users):
+    """Generate team schedule PDF with tasks for each collaborator (users: {user_id: user_data})"""
+    styles = getSampleStyleSheet()
+    
+    # Get project collaborators
+    project_collaborator_ids = set(project_data.get('collaborators', []))
+    
+    # Build task list for each collaborator
+    collaborator_tasks = {}
+    
+    for task in tasks:
+        assigned_to = task.get("assigned_to", [])
+        task_name = task.get("task_name", "Unknown Task")
+        priority = task.get("priority_level", 1)
+        
+        # Parse dates
+        start_date = task.get("start_date", "")
+        end_date = task.get("end_date", "")
+        
+        duration = "N/A"
+        start_str = "N/A"
+        end_str = "N/A"
+        
+        if start_date:
+            try:
+                if isinstance(start_date, str):
+                    if "T" in start_date:
+                        dt = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
+                    else:
+                        dt = datetime.fromisoformat(start_date)
+                else:
+                    dt = start_date
+                start_str = dt.strftime("%Y-%m-%d")
+            except:
+                pass
+        
+        if end_date:
+            try:
+                if isinstance(end_date, str):
+                    if "T" in end_date:
+                        dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
+                    else:
+                        dt = datetime.fromisoformat(end_date)
+                else:
+                    dt = end_date
+                end_str = dt.strftime("%Y-%m-%d")
+                
+                # Calculate duration
+                if start_date and end_date:
+                    try:
+                        start_dt = datetime.fromisoformat(start_date.replace("Z", "+00:00")) if isinstance(start_date, str) else start_date
+                        end_dt = datetime.fromisoformat(end_date.replace("Z", "+00:00")) if isinstance(end_date, str) else end_date
+                        if hasattr(start_dt, 'date'):
+                            start_dt = start_dt.date()
+                        if hasattr(end_dt, 'date'):
+                            end_dt = end_dt.date()
+                        delta = end_dt - start_dt
+                        duration = f"{delta.days + 1} days"
+                    except:
+                        duration = "N/A"
+            except:
+                pass
+        
+        # Assign task to each collaborator
+        for user_id in assigned_to:
+            if user_id in project_collaborator_ids:
+                user_name = users.get(user_id, {}).get('name', f'User_{user_id}')
+                
+                if user_name not in collaborator_tasks:
+                    collaborator_tasks[user_name] = []
+                
+                collaborator_tasks[user_name].append({
+                    'name': task_name,
+                    'start': start_str,
+                    'end': end_str,
+                    'duration': duration,
+                    'priority': priority
+                })
+    
+    # Generate PDF elements
+    calendar_elements = []
+    
+    # Add all collaborators (even if they have no tasks)
+    all_collaborators = {}
+    for user_id in project_collaborator_ids:
+        user_name = users.get(user_id, {}).get('name', f'User_{user_id}')
+        all_collaborators[user_name] = collaborator_tasks.get(user_name, [])
+    
+    # Sort collaborators alphabetically
+    sorted_collaborators = sorted(all_collaborators.keys())
+    
+    # Create table for each collaborator
+    for collaborator_name in sorted_collaborators:
+        tasks_list = all_collaborators[collaborator_name]
+        
+        # Collaborator header
+        collaborator_header = Paragraph(f"<b>{collaborator_name}</b>", styles["h2"])
+        calendar_elements.append(collaborator_header)
+        calendar_elements.append(Spacer(1, 8))
+        
+        if not tasks_list:
+            no_tasks_text = Paragraph("<i>No tasks assigned</i>", styles["Normal"])
+            calendar_elements.append(no_tasks_text)
+            calendar_elements.append(Spacer(1, 16))
+            continue
+        
+        # Create table with task details
+        table_data = [["Task Name", "Start Date", "End Date", "Duration", "Priority"]]
+        
+        for task in tasks_list:
+            priority_str = "High" if task['priority'] >= 4 else "Medium" if task['priority'] >= 2 else "Low"
+            table_data.append([
+                task['name'],
+                task['start'],
+                task['end'],
+                task['duration'],
+                priority_str
+            ])
+        
+        task_table = Table(table_data, colWidths=[2.5*inch, 1*inch, 1*inch, 0.8*inch, 0.7*inch])
+        task_table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.lightblue),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, -1), 9),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("ALIGN", (0, 0), (0, -1), "LEFT"),
+            ("ALIGN", (1, 0), (-1, -1), "CENTER"),
+            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.beige, colors.white]),
+        ]))
+        
+        calendar_elements.append(task_table)
+        calendar_elements.append(Spacer(1, 20))
+    
+    return calendar_elements
+
+
+def generate_calendar_months(tasks, project_name):
+    """Generate calendar months with tasks for PDF"""
+    from collections import defaultdict
+    import calendar
+    
+    # Group tasks by month
+    tasks_by_month = defaultdict(list)
+    
+    for task in tasks:
+        end_date = task.get("end_date")
+        if end_date:
+            try:
+                if isinstance(end_date, str):
+                    if "T" in end_date:
+                        dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
+                    else:
+                        dt = datetime.fromisoformat(end_date)
+                else:
+                    dt = end_date
+                
+                month_key = (dt.year, dt.month)
+                tasks_by_month[month_key].append(task)
+            except Exception:
+                continue
+    
+    calendar_elements = []
+    
+    # Generate calendar for each month with tasks
+    for (year, month), month_tasks in sorted(tasks_by_month.items()):
+        # Month header
+        month_name = calendar.month_name[month]
+        month_header = Paragraph(f"<b>{month_name} {year}</b>", getSampleStyleSheet()["h2"])
+        
+        # Create calendar grid
+        cal = calendar.monthcalendar(year, month)
+        calendar_data = []
+        
+        # Header row
+        header_row = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+        calendar_data.append(header_row)
+        
+        # Calendar rows
+        for week in cal:
+            week_row = []
+            for day in week:
+                if day == 0:
+                    week_row.append("")
+                else:
+                    # Check if there are tasks on this day
+                    day_tasks = []
+                    for task in month_tasks:
+                        try:
+                            task_date = task.get("end_date")
+                            if isinstance(task_date, str):
+                                if "T" in task_date:
+                                    dt = datetime.fromisoformat(task_date.replace("Z", "+00:00"))
+                                else:
+                                    dt = datetime.fromisoformat(task_date)
+                            else:
+                                dt = task_date
+                            
+                            if dt.day == day:
+                                # Color code by priority
+                                priority = task.get("priority_level", 1)
+                                if priority >= 4:
+                                    color = "red"
+                                elif priority >= 3:
+                                    color = "orange" 
+                                else:
+                                    color = "green"
+                                
+                                task_name = task.get("task_name", "Unknown")[:15]  # Truncate long names
+                                day_tasks.append(f'<font color="{color}">• {task_name}</font>')
+                        except Exception:
+                            continue
+                    
+                    if day_tasks:
+                        day_content = f"{day}<br/>{'<br/>'.join(day_tasks)}"
+                    else:
+                        day_content = str(day)
+                    
+                    week_row.append(day_content)
+            
+            calendar_data.append(week_row)
+        
+        # Create calendar table
+        calendar_table = Table(calendar_data, colWidths=[1.2*inch]*7, rowHeights=[0.4*inch]*len(calendar_data))
+        calendar_table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.lightblue),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("FONTSIZE", (0, 1), (-1, -1), 8),
+        ]))
+        
+        calendar_elements.append(KeepTogether([month_header, Spacer(1, 12), calendar_table]))
+    
+    return calendar_elements
+
+
+# =============== PROJECT EXPORT PDF ===============
+def build_project_tasks_pdf(project_id, project_name, project_data, tasks, users, format_type='table'):
+    """
+    Render the project export PDF ('table' report or team 'calendar').
+
+    Returns:
+        BytesIO positioned at the start of the PDF
+    """
+    def get_user_info(uid):
+        user = users.get(uid)
+        if not user:
+            return "Unknown"
+        name = user.get("name", "Unknown")
+        dept = user.get("division_name", "N/A")
+        return f"{name} ({dept})"
+
+    # --- Compute summary ---
+    total_tasks = len(tasks)
+    completed_tasks = sum(1 for t in tasks if t.get("task_status") == "Completed")
+    incomplete_tasks = total_tasks - completed_tasks
+    avg_priority = round(mean([t.get("priority_level", 0) for t in tasks if isinstance(t.get("priority_level"), (int, float))]), 1)
+
+    # --- Create PDF ---
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        leftMargin=40,
+        rightMargin=40,
+        topMargin=40,
+        bottomMargin=40,
+    )
+    styles = getSampleStyleSheet()
+    elements = []
+
+    # --- Calendar Format ---
+    if format_type == 'calendar':
+        # Title
+        elements.append(Paragraph(f"<b>Project Team Calendar: {project_name}</b>", styles["h1"]))
+        elements.append(Spacer(1, 24))
+
+        # Generate team calendar similar to Excel format
+        team_calendar = generate_team_calendar_pdf(tasks, project_name, project_data, users)
+        for calendar_element in team_calendar:
+            if isinstance(calendar_element, Table):
+                elements.append(KeepTogether(calendar_element))
+            else:
+                elements.append(calendar_element)
+    else:
+        # --- Title ---
+        elements.append(Paragraph(f"<b>Project Report: {project_name}</b>", styles["h1"]))
+        # elements.append(Spacer(1, 6))
+        elements.append(Paragraph(f"ID: {project_id}", styles["h3"]))
+        elements.append(Spacer(1, 24))
+
+        # --- Summary Table ---
+        summary_data = [
+            ["Total Tasks", "Completed", "Incomplete", "Average Priority"],
+            [total_tasks, completed_tasks, incomplete_tasks, avg_priority],
+        ]
+        summary_table = Table(summary_data, repeatRows=1)
+        summary_table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.lightsteelblue),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ]))
+        elements.append(summary_table)
+        elements.append(Spacer(1, 20))
+
+        # --- Tasks Table ---
+        task_data = [["Name", "Due Date", "Status", "Priority", "Owner", "Collaborators"]]
+
+        for task in tasks:
+            # name
+            task_name = Paragraph(task.get("task_name", "Unknown Task"), styles['BodyText'])
+
+            # Format date (dd-mm-yyyy)
+            due_date = task.get("end_date", "—")
+            if due_date and isinstance(due_date, str) and "T" not in due_date:
+                try:
+                    dt = datetime.fromisoformat(due_date.replace("Z", "+00:00"))
+                    due_date = dt.strftime("%d-%m-%Y")
+                except Exception:
+                    due_date = str(due_date)[:10]
+            elif isinstance(due_date, datetime):
+                due_date = due_date.strftime("%d-%m-%Y")
+
+            # Owner & collaborators
+            owner_name = get_user_info(task.get("owner"))
+            collaborators_list = task.get("assigned_to", [])
+            collaborators_names = [get_user_info(uid) for uid in collaborators_list]
+            # collaborators_str = ", ".join(collaborators_names) if collaborators_names else "—"
+            collaborators_str = []
+            for name in collaborators_names:
+                collaborators_str.append(Paragraph(name, styles['Normal'], bulletText='•'))
+
+            task_data.append([
+                task_name,
+                due_date,
+                task.get("task_status", "N/A"),
+                task.get("priority_level", "—"),
+                owner_name,
+                collaborators_str,
+            ])
+
+        task_table = Table(task_data, repeatRows=1, colWidths=[90, 70, 90, 50, 100, 160])
+        task_table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.lightcoral),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ]))
+        elements.append(task_table)
+
+    # --- Build PDF ---
+    doc.build(elements)
+    buffer.seek(0)
+    return buffer
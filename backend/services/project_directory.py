@@ -0,0 +1,71 @@
+"""
+Project Directory
+Process-wide in-memory copy of the Projects collection, indexed by document
+ID and by proj_name, so resolving the project a task belongs to does not need
+a Firestore query. Kept fresh by an on_snapshot listener, with a TTL reload
+as fallback.
+
+Configuration (environment):
+    PROJECT_DIRECTORY_LISTENER     1 = keep fresh with on_snapshot (default), 0 = TTL only
+    PROJECT_DIRECTORY_TTL_SECONDS  reload interval when no listener is active
+"""
+import os
+import sys
+
+# Add parent directory to path to import services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.collection_directory import CollectionDirectory
+
+
+def _name_key(name):
+    return name.strip() if isinstance(name, str) else None
+
+
+class ProjectDirectory(CollectionDirectory):
+    collection_name = 'Projects'
+    env_prefix = 'PROJECT_DIRECTORY'
+    label = 'Project directory'
+
+    def _index(self, documents):
+        by_name = {}
+        for project_id, project_data in documents.items():
+            name = _name_key(project_data.get('proj_name'))
+            # Names are not unique in Firestore; the first (lowest) ID wins, like the old limit(1) query
+            if name and name not in by_name:
+                by_name[name] = project_id
+
+        self._projects = documents    # {project_id: project_data}
+        self._by_name = by_name       # {proj_name: project_id}
+
+    # ===================== LOOKUPS =====================
+    def get_project(self, project_id):
+        """Return a copy of the project's data, or None"""
+        if not project_id:
+            return None
+        self._ensure_loaded()
+        with self._lock:
+            project_data = self._projects.get(str(project_id))
+        return dict(project_data) if project_data is not None else None
+
+    def get_project_by_name(self, proj_name):
+        """Return (project_id, project_data) for a project name, or (None, None)"""
+        name = _name_key(proj_name)
+        if not name:
+            return None, None
+        self._ensure_loaded()
+        with self._lock:
+            project_id = self._by_name.get(name)
+            project_data = self._projects.get(project_id) if project_id else None
+        if project_data is None:
+            return None, None
+        return project_id, dict(project_data)
+
+    def all_projects(self):
+        """Return {project_id: project_data} for every project"""
+        self._ensure_loaded()
+        with self._lock:
+            return {project_id: dict(project_data) for project_id, project_data in self._projects.items()}
+
+
+# Create singleton instance
+project_directory = ProjectDirectory()
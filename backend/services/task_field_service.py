@@ -0,0 +1,107 @@
+"""
+Task Field Service
+Canonical task_status values and backfills for the Tasks fields that
+server-side query filters rely on:
+
+  - is_deleted: `where('is_deleted', '==', False)` does not match documents
+    without the field, so every task needs an explicit boolean
+  - task_status: `where('task_status', 'in', [...])` needs the canonical
+    spelling; empty statuses read as "Unassigned" and legacy `status` values
+    are copied over
+"""
+import os
+import sys
+
+# Add parent directory to path to import firebase_utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from firebase_utils import get_firestore_client
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Push is_deleted / task_status filters into Firestore queries (task list, deadline
+# scan). Opt in (TASK_SERVER_FILTERS=1) only after the composite indexes in
+# firestore.indexes.json are deployed and `backfill.py --is-deleted --task-status`
+# has run: `is_deleted == False` does not match tasks missing the field
+TASK_SERVER_FILTERS = os.getenv('TASK_SERVER_FILTERS', '0') == '1'
+
+TASK_STATUSES = ('Unassigned', 'Ongoing', 'Under Review', 'Completed', 'Not Started', 'In Progress')
+DEFAULT_TASK_STATUS = 'Unassigned'
+
+_CANONICAL_STATUSES = {status.lower(): status for status in TASK_STATUSES}
+
+
+def canonical_task_status(value, default=DEFAULT_TASK_STATUS):
+    """Known statuses in their stored spelling, other values stripped, blanks -> default"""
+    if value is None:
+        return default
+    text = str(value).strip()
+    if not text:
+        return default
+    return _CANONICAL_STATUSES.get(text.lower(), text)
+
+
+def known_task_status(value):
+    """Stored spelling of a known status (any case), or None"""
+    if not isinstance(value, str):
+        return None
+    return _CANONICAL_STATUSES.get(value.strip().lower())
+
+
+class TaskFieldService:
+    def __init__(self):
+        self._db = None
+
+    @property
+    def db(self):
+        """Lazy-load Firestore client"""
+        if self._db is None:
+            self._db = get_firestore_client()
+        return self._db
+
+    def _fixes(self, task_data, is_deleted, task_status):
+        updates = {}
+        if is_deleted and not isinstance(task_data.get('is_deleted'), bool):
+            updates['is_deleted'] = bool(task_data.get('is_deleted', False))
+        if task_status:
+            current = task_data.get('task_status')
+            status = canonical_task_status(current or task_data.get('status'))
+            if current != status:
+                updates['task_status'] = status
+        return updates
+
+    def backfill_task_fields(self, is_deleted=True, task_status=True, batch_size=400):
+        """
+        Write is_deleted / canonical task_status on every Tasks document where
+        it is missing or non-canonical.
+
+        Returns:
+            Number of documents updated
+        """
+        updated = 0
+        batch = self.db.batch()
+        pending = 0
+
+        for doc in self.db.collection('Tasks').stream():
+            updates = self._fixes(doc.to_dict() or {}, is_deleted, task_status)
+            if not updates:
+                continue
+
+            batch.update(doc.reference, updates)
+            pending += 1
+            updated += 1
+
+            if pending >= batch_size:
+                batch.commit()
+                batch = self.db.batch()
+                pending = 0
+
+        if pending:
+            batch.commit()
+
+        logger.debug("✅ Task field backfill completed - %s tasks updated", updated)
+        return updated
+
+
+# Create singleton instance
+task_field_service = TaskFieldService()
@@ -0,0 +1,96 @@
+"""
+User Directory
+Process-wide in-memory copy of the Users collection. Loaded once, then kept
+fresh by a Firestore on_snapshot listener; if the listener cannot be started
+(or dies) the directory falls back to reloading after a TTL.
+
+Configuration (environment):
+    USER_DIRECTORY_LISTENER     1 = keep fresh with on_snapshot (default), 0 = TTL only
+    USER_DIRECTORY_TTL_SECONDS  reload interval when no listener is active
+"""
+import os
+import sys
+
+# Add parent directory to path to import services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.collection_directory import CollectionDirectory
+
+
+def _role_num(value):
+    """role_num is stored as int or numeric string; normalize to int (or None)"""
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    return value
+
+
+class UserDirectory(CollectionDirectory):
+    collection_name = 'Users'
+    env_prefix = 'USER_DIRECTORY'
+    label = 'User directory'
+
+    def _index(self, documents):
+        by_email = {}
+        by_division_role = {}
+        for user_id, user_data in documents.items():
+            email = user_data.get('email')
+            if isinstance(email, str) and email.strip():
+                by_email[email.strip().lower()] = user_id
+
+            key = (user_data.get('division_name'), _role_num(user_data.get('role_num')))
+            by_division_role.setdefault(key, []).append(user_id)
+
+        self._users = documents              # {user_id: user_data}
+        self._by_email = by_email            # {email_lower: user_id}
+        self._by_division_role = by_division_role  # {(division_name, role_num): [user_id]}
+
+    # ===================== LOOKUPS =====================
+    def get_user(self, user_id):
+        """Return a copy of the user's data, or None"""
+        if user_id is None:
+            return None
+        self._ensure_loaded()
+        with self._lock:
+            user_data = self._users.get(str(user_id))
+        return dict(user_data) if user_data is not None else None
+
+    def get_user_by_email(self, email):
+        """Return (user_id, user_data) for an email, or (None, None)"""
+        if not isinstance(email, str):
+            return None, None
+        self._ensure_loaded()
+        with self._lock:
+            user_id = self._by_email.get(email.strip().lower())
+            user_data = self._users.get(user_id) if user_id else None
+        if user_data is None:
+            return None, None
+        return user_id, dict(user_data)
+
+    def get_users_by_division(self, division_name, role_num=None):
+        """
+        Return {user_id: user_data} for a division, optionally limited to one role_num.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            if role_num is not None:
+                ids = list(self._by_division_role.get((division_name, _role_num(role_num)), []))
+            else:
+                ids = sorted(
+                    user_id
+                    for (division, _), user_ids in self._by_division_role.items()
+                    if division == division_name
+                    for user_id in user_ids
+                )
+            return {user_id: dict(self._users[user_id]) for user_id in ids}
+
+    def all_users(self):
+        """Return {user_id: user_data} for every user (ordered by ID)"""
+        self._ensure_loaded()
+        with self._lock:
+            return {user_id: dict(user_data) for user_id, user_data in self._users.items()}
+
+
+# Create singleton instance
+user_directory = UserDirectory()
@@ -0,0 +1,195 @@
+"""
+User Lookup Service
+Resolves users by email with an indexed equality query on the normalized
+email_lower field, backed by a bounded in-process email -> user ID cache.
+
+Legacy records whose email_lower is missing or stale (e.g. mixed-case emails
+written before the field existed) are still found: the first time the indexed
+queries miss, the process runs backfill_email_lower() over the whole Users
+collection and retries the email_lower query. After that pass (or after
+backfill.py --email-lower) misses never scan again.
+"""
+from collections import OrderedDict
+import os
+import sys
+import threading
+
+# Add parent directory to path to import firebase_utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from firebase_utils import get_firestore_client
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+def normalize_email(email):
+    """Normalize an email address for lookups (trimmed + lowercased)"""
+    if not isinstance(email, str):
+        return ''
+    return email.strip().lower()
+
+
+class UserLookupService:
+    def __init__(self, max_entries=None):
+        self._db = None
+        if max_entries is None:
+            max_entries = int(os.getenv('LOGIN_EMAIL_CACHE_SIZE', 10000))
+        self.max_entries = max(1, max_entries)
+        # Bounded LRU cache: {email_lower: user_id}
+        self._email_to_id = OrderedDict()
+        self._lock = threading.Lock()
+        # Cleared once every record's email_lower has been backfilled
+        self._legacy_scan_needed = True
+        # Only one request runs the legacy backfill; the others wait for it
+        self._scan_lock = threading.Lock()
+
+    @property
+    def db(self):
+        """Lazy-load Firestore client"""
+        if self._db is None:
+            self._db = get_firestore_client()
+        return self._db
+
+    # ===================== CACHE HELPERS =====================
+    def _cache_get(self, email_lower):
+        with self._lock:
+            user_id = self._email_to_id.get(email_lower)
+            if user_id is not None:
+                self._email_to_id.move_to_end(email_lower)
+            return user_id
+
+    def _cache_put(self, email_lower, user_id):
+        with self._lock:
+            self._email_to_id[email_lower] = user_id
+            self._email_to_id.move_to_end(email_lower)
+            while len(self._email_to_id) > self.max_entries:
+                self._email_to_id.popitem(last=False)
+
+    def forget(self, email):
+        """Drop a cached email -> user ID mapping"""
+        with self._lock:
+            self._email_to_id.pop(normalize_email(email), None)
+
+    def clear(self):
+        with self._lock:
+            self._email_to_id.clear()
+
+    # ===================== LOOKUPS =====================
+    def find_user_by_email(self, email):
+        """
+        Find the Users document for an email address.
+
+        Cache hit: one document read by ID.
+        Cache miss: one indexed query on email_lower (plus one legacy query on
+        email, and a one-off email_lower backfill of all Users the first time
+        a lookup misses).
+
+        Returns:
+            DocumentSnapshot or None
+        """
+        email_lower = normalize_email(email)
+        if not email_lower:
+            return None
+
+        users_ref = self.db.collection('Users')
+
+        cached_id = self._cache_get(email_lower)
+        if cached_id:
+            doc = users_ref.document(cached_id).get()
+            if doc.exists and normalize_email((doc.to_dict() or {}).get('email')) == email_lower:
+                return doc
+            # Stale mapping (user deleted or email changed)
+            self.forget(email_lower)
+
+        docs = list(users_ref.where('email_lower', '==', email_lower).limit(1).stream())
+
+        if not docs:
+            # Legacy records written before email_lower existed
+            docs = list(users_ref.where('email', '==', email_lower).limit(1).stream())
+            if docs:
+                self._backfill_document(docs[0])
+
+        if not docs:
+            doc = self._scan_for_legacy_email(users_ref, email_lower)
+            if doc is None:
+                return None
+            docs = [doc]
+
+        self._cache_put(email_lower, docs[0].id)
+        return docs[0]
+
+    def remember(self, email, user_id):
+        """Seed the cache after a user is created"""
+        email_lower = normalize_email(email)
+        if email_lower and user_id:
+            self._cache_put(email_lower, user_id)
+
+    # ===================== BACKFILL =====================
+    def _backfill_document(self, doc):
+        try:
+            email_lower = normalize_email((doc.to_dict() or {}).get('email'))
+            if email_lower:
+                doc.reference.update({'email_lower': email_lower})
+                return True
+        except Exception as e:
+            logger.warning("⚠️ Failed to backfill email_lower for user %s: %s", doc.id, e)
+        return False
+
+    def _scan_for_legacy_email(self, users_ref, email_lower):
+        """
+        Backfill email_lower on every stale record in one pass, then retry the
+        indexed query. Runs at most once per process.
+        """
+        if not self._legacy_scan_needed:
+            return None
+
+        with self._scan_lock:
+            if self._legacy_scan_needed:
+                try:
+                    updated = self.backfill_email_lower()
+                except Exception as e:
+                    logger.warning("⚠️ email_lower backfill during lookup failed: %s", e)
+                    return None
+                if updated:
+                    logger.info("🔄 Backfilled email_lower on %s legacy users during lookup", updated)
+
+        docs = list(users_ref.where('email_lower', '==', email_lower).limit(1).stream())
+        return docs[0] if docs else None
+
+    def backfill_email_lower(self, batch_size=400):
+        """
+        Write email_lower on every Users document where it is missing or stale
+        (covers legacy mixed-case records).
+
+        Returns:
+            Number of documents updated
+        """
+        updated = 0
+        batch = self.db.batch()
+        pending = 0
+
+        for doc in self.db.collection('Users').stream():
+            user_data = doc.to_dict() or {}
+            email_lower = normalize_email(user_data.get('email'))
+            if not email_lower or user_data.get('email_lower') == email_lower:
+                continue
+
+            batch.update(doc.reference, {'email_lower': email_lower})
+            pending += 1
+            updated += 1
+
+            if pending >= batch_size:
+                batch.commit()
+                batch = self.db.batch()
+                pending = 0
+
+        if pending:
+            batch.commit()
+
+        self._legacy_scan_needed = False
+        logger.debug("✅ email_lower backfill completed - %s users updated", updated)
+        return updated
+
+
+# Create singleton instance
+user_lookup_service = UserLookupService()
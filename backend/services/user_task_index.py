@@ -0,0 +1,205 @@
+"""
+User Task Index
+Denormalized per-user view of Tasks: UserTasks/{uid}/items/{task_id} holds a
+compact summary of every task the user owns or is assigned to, so "my tasks"
+is one small query instead of array_contains + owner queries over Tasks.
+
+Index entries are written in the same batch / transaction as the task
+itself (create, update, soft delete, restore, permanent delete), so the
+index cannot drift from Tasks. Existing data is indexed with
+`python backfill.py --user-task-index`.
+
+Configuration (environment):
+    USER_TASK_INDEX        1 = maintain the index on writes (default), 0 = off
+    USER_TASK_INDEX_READS  1 = serve summary "my tasks" reads from the index
+                           (enable after the backfill), 0 = query Tasks (default)
+"""
+import os
+import sys
+
+from firebase_admin import firestore
+from google.cloud.firestore_v1 import transforms
+
+# Add parent directory to path to import firebase_utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from firebase_utils import get_firestore_client, invalidate_document
+from logging_utils import get_logger
+from query_utils import TASK_SUMMARY_FIELDS
+
+logger = get_logger(__name__)
+
+INDEX_COLLECTION = 'UserTasks'
+ITEMS_COLLECTION = 'items'
+# Legacy tasks may carry their status in `status`; get_tasks filters on both
+INDEX_FIELDS = TASK_SUMMARY_FIELDS + ('status',)
+
+_TRANSFORMS = (transforms.ArrayUnion, transforms.ArrayRemove, transforms.Increment,
+               transforms.Maximum, transforms.Minimum)
+
+
+def task_members(task_data):
+    """IDs of the users a task belongs to: its owner and assignees"""
+    members = set()
+    if not task_data:
+        return members
+    owner = task_data.get('owner')
+    if owner not in (None, ''):
+        members.add(str(owner))
+    assigned_to = task_data.get('assigned_to')
+    if isinstance(assigned_to, list):
+        for entry in assigned_to:
+            if isinstance(entry, (str, int)) and entry != '':
+                members.add(str(entry))
+            elif isinstance(entry, dict):
+                for key in ('id', 'user_id', 'userId'):
+                    if entry.get(key) is not None:
+                        members.add(str(entry[key]))
+                        break
+    return members
+
+
+def task_summary(task_data):
+    """Index entry for a task: the list-view fields present on the task"""
+    summary = {field: task_data[field] for field in INDEX_FIELDS if field in task_data}
+    summary['is_deleted'] = bool(task_data.get('is_deleted', False))
+    summary['updatedAt'] = firestore.SERVER_TIMESTAMP
+    return summary
+
+
+def apply_updates(task_data, updates):
+    """task_data as it will read after `updates` (transforms are skipped)"""
+    merged = dict(task_data or {})
+    for field, value in updates.items():
+        if value is firestore.DELETE_FIELD:
+            merged.pop(field, None)
+        elif isinstance(value, transforms.Sentinel) or isinstance(value, _TRANSFORMS):
+            continue
+        else:
+            merged[field] = value
+    return merged
+
+
+class UserTaskIndex:
+    def __init__(self, enabled=None, reads_enabled=None):
+        self._db = None
+        if enabled is None:
+            enabled = os.getenv('USER_TASK_INDEX', '1') != '0'
+        if reads_enabled is None:
+            reads_enabled = os.getenv('USER_TASK_INDEX_READS', '0') == '1'
+        self.enabled = enabled
+        self.reads_enabled = enabled and reads_enabled
+
+    @property
+    def db(self):
+        """Lazy-load Firestore client"""
+        if self._db is None:
+            self._db = get_firestore_client()
+        return self._db
+
+    def items_ref(self, user_id):
+        """UserTasks/{user_id}/items collection"""
+        return self.db.collection(INDEX_COLLECTION).document(str(user_id)).collection(ITEMS_COLLECTION)
+
+    def can_serve(self, fields):
+        """True when a projection only needs fields the index stores"""
+        return self.reads_enabled and fields is not None and set(fields) <= set(INDEX_FIELDS)
+
+    # ===================== WRITES =====================
+    def stage(self, writer, task_id, old_data, new_data):
+        """
+        Stage index writes for one task change on a WriteBatch or Transaction.
+        new_data=None means the task is being removed.
+        """
+        if not self.enabled:
+            return
+        old_members = task_members(old_data)
+        new_members = task_members(new_data) if new_data is not None else set()
+        if new_members:
+            summary = task_summary(new_data)
+            for user_id in new_members:
+                writer.set(self.items_ref(user_id).document(task_id), summary)
+        for user_id in old_members - new_members:
+            writer.delete(self.items_ref(user_id).document(task_id))
+
+    def create_task(self, task_ref, data):
+        """Write a new task and its index entries in one batch"""
+        batch = self.db.batch()
+        batch.set(task_ref, data)
+        self.stage(batch, task_ref.id, None, data)
+        batch.commit()
+        invalidate_document(task_ref)
+
+    def update_task(self, task_ref, updates):
+        """
+        Apply `updates` to a task and its index entries in one transaction.
+
+        Returns the task data as read inside the transaction (before the update).
+        """
+        if not self.enabled:
+            task_ref.update(updates)
+            invalidate_document(task_ref)
+            return None
+
+        @firestore.transactional
+        def run(transaction):
+            snapshot = task_ref.get(transaction=transaction)
+            old_data = snapshot.to_dict() or {}
+            transaction.update(task_ref, updates)
+            self.stage(transaction, task_ref.id, old_data, apply_updates(old_data, updates))
+            return old_data
+
+        old_data = run(self.db.transaction())
+        invalidate_document(task_ref)
+        return old_data
+
+    def delete_task(self, task_ref):
+        """Delete a task and its index entries in one transaction"""
+        if not self.enabled:
+            task_ref.delete()
+            invalidate_document(task_ref)
+            return
+
+        @firestore.transactional
+        def run(transaction):
+            snapshot = task_ref.get(transaction=transaction)
+            transaction.delete(task_ref)
+            self.stage(transaction, task_ref.id, snapshot.to_dict() or {}, None)
+
+        run(self.db.transaction())
+        invalidate_document(task_ref)
+
+    # ===================== BACKFILL =====================
+    def rebuild(self, batch_size=400):
+        """
+        (Re)write index entries for every task. Entries of users no longer
+        on a task are not removed; run once before enabling index reads.
+
+        Returns:
+            Number of index entries written
+        """
+        written = 0
+        batch = self.db.batch()
+        pending = 0
+
+        for doc in self.db.collection('Tasks').stream():
+            task_data = doc.to_dict() or {}
+            summary = task_summary(task_data)
+            for user_id in task_members(task_data):
+                batch.set(self.items_ref(user_id).document(doc.id), summary)
+                pending += 1
+                written += 1
+
+                if pending >= batch_size:
+                    batch.commit()
+                    batch = self.db.batch()
+                    pending = 0
+
+        if pending:
+            batch.commit()
+
+        logger.debug("✅ User task index rebuilt - %s entries written", written)
+        return written
+
+
+# Create singleton instance
+user_task_index = UserTaskIndex()
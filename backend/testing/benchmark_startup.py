@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: import time and memory of a fresh `import app`.
+
+Runs the import in a child interpreter with `-X importtime`, reports the
+cumulative import time, the slowest top-level imports and the child's peak
+RSS, and exits non-zero when a budget is exceeded (use it as a CI guard).
+
+    python testing/benchmark_startup.py
+    python testing/benchmark_startup.py --max-import-ms 1500 --max-rss-mb 150 --top 15
+
+Budgets can also be set with STARTUP_MAX_IMPORT_MS / STARTUP_MAX_RSS_MB.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Child prints its own peak RSS once the import has finished
+CHILD_CODE = (
+    "import resource, sys\n"
+    "import {module}\n"
+    "rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+    "rss_kb = rss // 1024 if sys.platform == 'darwin' else rss\n"
+    "print('RSS_KB=%d' % rss_kb)\n"
+)
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+# Modules that must never be loaded at startup (see services/pdf_export.py, services/excel_export.py)
+LAZY_MODULES = ('reportlab', 'openpyxl')
+
+
+def run_import(module):
+    """Import `module` in a fresh interpreter; return (importtime records, rss_kb)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD_CODE.format(module=module)],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    records = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            depth = len(indent) // 2
+            records.append((name, int(self_us), int(cumulative_us), depth))
+
+    rss_match = re.search(r'RSS_KB=(\d+)', result.stdout)
+    rss_kb = int(rss_match.group(1)) if rss_match else 0
+    return records, rss_kb
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure backend startup import time and memory')
+    parser.add_argument('--module', default='app', help='Module to import (default: app)')
+    parser.add_argument('--max-import-ms', type=float,
+                        default=float(os.getenv('STARTUP_MAX_IMPORT_MS', 0)) or None,
+                        help='Fail if cumulative import time exceeds this many ms')
+    parser.add_argument('--max-rss-mb', type=float,
+                        default=float(os.getenv('STARTUP_MAX_RSS_MB', 0)) or None,
+                        help='Fail if peak RSS after import exceeds this many MB')
+    parser.add_argument('--top', type=int, default=10, help='Show the N slowest top-level imports')
+    args = parser.parse_args()
+
+    records, rss_kb = run_import(args.module)
+    target = [r for r in records if r[0] == args.module]
+    total_ms = target[-1][2] / 1000 if target else sum(r[2] for r in records if r[3] == 0) / 1000
+    rss_mb = rss_kb / 1024
+
+    print(f"⏱️  import {args.module}: {total_ms:.0f} ms cumulative")
+    print(f"💾 peak RSS: {rss_mb:.1f} MB")
+
+    print(f"\n🐢 Slowest {args.top} direct imports:")
+    top_level = [r for r in records if r[3] <= 1 and r[0] != args.module]
+    for name, _, cumulative_us, _ in sorted(top_level, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"   {cumulative_us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    loaded = {r[0].split('.')[0] for r in records}
+    for module in LAZY_MODULES:
+        if module in loaded:
+            failures.append(f"{module} is imported at startup (should be lazy)")
+    if args.max_import_ms is not None and total_ms > args.max_import_ms:
+        failures.append(f"import time {total_ms:.0f} ms > budget {args.max_import_ms:.0f} ms")
+    if args.max_rss_mb is not None and rss_mb > args.max_rss_mb:
+        failures.append(f"peak RSS {rss_mb:.1f} MB > budget {args.max_rss_mb:.1f} MB")
+
+    if failures:
+        print()
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+
+    print("\n✅ Startup within budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
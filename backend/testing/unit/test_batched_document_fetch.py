@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Batched Document Fetch
+Tests get_documents in firebase_utils: one get_all RPC per chunk,
+ID de-duplication, missing documents and request cache reuse.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import MagicMock
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from flask import Flask
+from firebase_utils import get_documents, get_document
+
+
+def make_db(existing):
+    """Mock Firestore client whose get_all returns snapshots for `existing` {id: data}"""
+    db = MagicMock()
+
+    def document(collection, doc_id):
+        ref = MagicMock()
+        ref.id = doc_id
+        ref.path = f"{collection}/{doc_id}"
+        return ref
+
+    def collection(name):
+        coll = MagicMock()
+        coll.document.side_effect = lambda doc_id: document(name, doc_id)
+        return coll
+
+    def get_all(refs):
+        snapshots = []
+        for ref in refs:
+            snapshot = MagicMock()
+            snapshot.id = ref.id
+            snapshot.reference = ref
+            snapshot.exists = ref.id in existing
+            snapshot.to_dict.return_value = existing.get(ref.id)
+            snapshots.append(snapshot)
+        return iter(snapshots)
+
+    db.collection.side_effect = collection
+    db.get_all.side_effect = get_all
+    return db
+
+
+class TestGetDocuments(unittest.TestCase):
+    """Unit tests for get_documents"""
+
+    def test_single_rpc_returns_existing_documents(self):
+        """Existing documents are returned by ID, missing ones omitted"""
+        db = make_db({'u1': {'name': 'Alice'}, 'u2': {'name': 'Bob'}})
+
+        result = get_documents(db, 'Users', ['u1', 'u2', 'u3'])
+
+        self.assertEqual(result, {'u1': {'name': 'Alice'}, 'u2': {'name': 'Bob'}})
+        db.get_all.assert_called_once()
+
+    def test_duplicates_and_blanks_ignored(self):
+        """Duplicate, None and empty IDs are not fetched"""
+        db = make_db({'u1': {'name': 'Alice'}})
+
+        get_documents(db, 'Users', ['u1', None, '', 'u1', '  '])
+
+        refs = db.get_all.call_args[0][0]
+        self.assertEqual([ref.id for ref in refs], ['u1'])
+
+    def test_empty_list_makes_no_rpc(self):
+        """No IDs means no Firestore call"""
+        db = make_db({})
+        self.assertEqual(get_documents(db, 'Users', []), {})
+        db.get_all.assert_not_called()
+
+    def test_chunking(self):
+        """Large ID lists are split into chunk_size RPCs"""
+        existing = {f'u{i}': {'n': i} for i in range(25)}
+        db = make_db(existing)
+
+        result = get_documents(db, 'Users', list(existing), chunk_size=10)
+
+        self.assertEqual(len(result), 25)
+        self.assertEqual(db.get_all.call_count, 3)
+
+    def test_request_cache_reused(self):
+        """Documents already read this request are not fetched again"""
+        db = make_db({'u1': {'name': 'Alice'}, 'u2': {'name': 'Bob'}})
+        app = Flask(__name__)
+
+        with app.test_request_context():
+            get_documents(db, 'Users', ['u1'])
+            result = get_documents(db, 'Users', ['u1', 'u2'])
+            cached = get_document(db.collection('Users').document('u2'))
+
+        self.assertEqual(set(result), {'u1', 'u2'})
+        second_refs = db.get_all.call_args_list[1][0][0]
+        self.assertEqual([ref.id for ref in second_refs], ['u2'])
+        self.assertEqual(cached.to_dict(), {'name': 'Bob'})
+        self.assertEqual(db.get_all.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
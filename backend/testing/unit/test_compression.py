@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Response Compression
+Tests Accept-Encoding negotiation, the size threshold, export (send_file)
+compression, streamed responses and the interaction with ETags.
+"""
+
+import unittest
+import sys
+import os
+import gzip
+import io
+import json
+from flask import Flask, jsonify, send_file, Response
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import compression
+import http_cache
+
+PROJECTS = [{'id': f'p{i}', 'proj_name': 'Project', 'tasks': [{'task_status': 'Ongoing'}] * 10} for i in range(50)]
+GZIP = {'Accept-Encoding': 'gzip'}
+
+
+class TestCompression(unittest.TestCase):
+    """Unit tests for compression.init_app"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+
+        @self.app.route('/projects')
+        def projects():
+            return jsonify(PROJECTS), 200
+
+        @self.app.route('/small')
+        def small():
+            return jsonify({'ok': True}), 200
+
+        @self.app.route('/export')
+        def export():
+            return send_file(io.BytesIO(b'%PDF-1.4 ' + b'table row ' * 500), mimetype='application/pdf',
+                             as_attachment=True, download_name='tasks.pdf')
+
+        @self.app.route('/stream')
+        def stream():
+            return Response(iter([json.dumps(p) + '\n' for p in PROJECTS]), mimetype='application/x-ndjson')
+
+        compression.init_app(self.app)
+        http_cache.init_app(self.app)
+        self.client = self.app.test_client()
+
+    def test_gzip_json(self):
+        """Large JSON is gzipped when the client accepts it"""
+        response = self.client.get('/projects', headers=GZIP)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertEqual(int(response.headers['Content-Length']), len(response.data))
+        self.assertEqual(json.loads(gzip.decompress(response.data)), PROJECTS)
+
+    def test_no_accept_encoding(self):
+        """Clients that do not accept gzip get the identity body"""
+        response = self.client.get('/projects')
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.get_json(), PROJECTS)
+
+    def test_min_size(self):
+        """Bodies under COMPRESS_MIN_SIZE are sent as-is"""
+        response = self.client.get('/small', headers=GZIP)
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_level_and_disable(self):
+        """Level is configurable; COMPRESS_RESPONSES=False turns it off"""
+        fast = len(self.client.get('/projects', headers=GZIP).data)
+        self.app.config['COMPRESS_LEVEL'] = 1
+        self.assertGreaterEqual(len(self.client.get('/projects', headers=GZIP).data), fast)
+        self.app.config['COMPRESS_RESPONSES'] = False
+        self.assertNotIn('Content-Encoding', self.client.get('/projects', headers=GZIP).headers)
+
+    def test_export_compressed(self):
+        """send_file exports are compressed and keep their headers"""
+        response = self.client.get('/export', headers=GZIP)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('tasks.pdf', response.headers['Content-Disposition'])
+        self.assertTrue(gzip.decompress(response.data).startswith(b'%PDF'))
+
+    def test_streamed_response_untouched(self):
+        """Generator-backed streams are not buffered"""
+        response = self.client.get('/stream', headers=GZIP)
+        self.assertTrue(response.is_streamed)
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_etag_weak_and_revalidates(self):
+        """Compressed responses carry a weak ETag that still yields 304"""
+        response = self.client.get('/projects', headers=GZIP)
+        etag = response.headers['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        again = self.client.get('/projects', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        self.assertEqual(again.status_code, 304)
+
+    @unittest.skipUnless(compression.brotli, 'brotli not installed')
+    def test_brotli_preferred(self):
+        """br is chosen when installed and accepted"""
+        response = self.client.get('/projects', headers={'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(response.headers['Content-Encoding'], 'br')
+        self.assertEqual(json.loads(compression.brotli.decompress(response.data)), PROJECTS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Deadline Scan
+Tests that notify_upcoming_deadlines reads only tasks due in the next 24 hours
+through one indexed range query on end_date, paged with start_after, and that
+completed or deleted tasks get no reminder.
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import pytz
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from query_utils import stream_by_field
+from services.notification_service import NotificationService
+
+
+class FakeQuery:
+    """Records the query chain and serves pages of pre-sorted documents"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.calls = []
+        self.streams = 0
+        self._start = 0
+        self._limit = len(docs)
+
+    def where(self, *args):
+        self.calls.append(('where',) + args)
+        return self
+
+    def order_by(self, field):
+        self.calls.append(('order_by', field))
+        self._start = 0
+        return self
+
+    def start_after(self, doc):
+        self.calls.append(('start_after', doc.id))
+        self._start = self.docs.index(doc) + 1
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def stream(self):
+        self.streams += 1
+        return iter(self.docs[self._start:self._start + self._limit])
+
+
+def make_doc(doc_id, data):
+    doc = MagicMock()
+    doc.id = doc_id
+    doc.to_dict.return_value = data
+    return doc
+
+
+class TestDeadlineScan(unittest.TestCase):
+    """Unit tests for the range-indexed deadline scan"""
+
+    def setUp(self):
+        self.now = datetime.now(pytz.timezone('Asia/Singapore'))
+        self.db = MagicMock()
+        patcher = patch.object(NotificationService, 'db', new_callable=PropertyMock, return_value=self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = NotificationService()
+
+    def task(self, hours, **fields):
+        data = {'task_name': 'Report', 'assigned_to': ['u1'], 'task_status': 'Ongoing',
+                'is_deleted': False, 'end_date': self.now + timedelta(hours=hours)}
+        data.update(fields)
+        return data
+
+    def test_stream_by_field_pages_with_start_after(self):
+        """Each page starts after the last document of the previous one"""
+        docs = [make_doc(f't{number}', {}) for number in range(5)]
+        query = FakeQuery(docs)
+        self.assertEqual([doc.id for doc in stream_by_field(query, 'end_date', batch_size=2)],
+                         ['t0', 't1', 't2', 't3', 't4'])
+        self.assertEqual(query.streams, 3)
+        self.assertEqual([call for call in query.calls if call[0] == 'start_after'],
+                         [('start_after', 't1'), ('start_after', 't3')])
+
+    @patch('services.notification_service.TASK_SERVER_FILTERS', True)
+    def test_range_query_with_deletion_filter(self):
+        """The scan filters deletion and the end_date window server-side, not status"""
+        query = FakeQuery([])
+        self.db.collection.return_value = query
+        end = self.now + timedelta(hours=24)
+
+        list(self.service._stream_tasks_due(self.now, end))
+
+        self.db.collection.assert_called_once_with('Tasks')
+        self.assertEqual(query.calls, [
+            ('where', 'is_deleted', '==', False),
+            ('where', 'end_date', '>', self.now),
+            ('where', 'end_date', '<=', end),
+            ('order_by', 'end_date'),
+        ])
+
+    @patch('services.notification_service.TASK_SERVER_FILTERS', False)
+    @patch('services.notification_service.email_service')
+    @patch('services.notification_service.get_documents')
+    def test_reminds_only_open_tasks(self, mock_get_documents, mock_email_service):
+        """Completed and deleted tasks are skipped even when only the range is server-side"""
+        self.db.collection.return_value = FakeQuery([
+            make_doc('due', self.task(5)),
+            make_doc('done', self.task(6, task_status='completed')),
+            make_doc('deleted', self.task(7, is_deleted=True)),
+        ])
+        mock_get_documents.side_effect = lambda db, collection, ids: (
+            {'u1': {'role_num': 4, 'email': 'u1@example.com', 'name': 'Sam'}} if collection == 'Users' else {}
+        )
+        mock_email_service.send_deadline_reminder_email.return_value = True
+
+        self.assertEqual(self.service.notify_upcoming_deadlines(), 1)
+        mock_email_service.send_deadline_reminder_email.assert_called_once()
+        self.assertEqual(self.service.get_user_notifications('u1')[0]['task_id'], 'due')
+
+    @patch('services.notification_service.TASK_SERVER_FILTERS', True)
+    @patch('services.notification_service.email_service')
+    @patch('services.notification_service.get_documents')
+    def test_reminds_tasks_without_known_status(self, mock_get_documents, mock_email_service):
+        """Tasks with a missing or unknown status still get a reminder"""
+        missing = self.task(5)
+        del missing['task_status']
+        self.db.collection.return_value = FakeQuery([
+            make_doc('missing', missing),
+            make_doc('custom', self.task(6, task_status='Blocked')),
+        ])
+        mock_get_documents.side_effect = lambda db, collection, ids: (
+            {'u1': {'role_num': 4, 'email': 'u1@example.com', 'name': 'Sam'}} if collection == 'Users' else {}
+        )
+        mock_email_service.send_deadline_reminder_email.return_value = True
+
+        self.assertEqual(self.service.notify_upcoming_deadlines(), 2)
+        self.assertEqual(mock_email_service.send_deadline_reminder_email.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
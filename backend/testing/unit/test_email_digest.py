@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Email Digest
+Tests per-recipient email digesting: notifications buffered over a window,
+one flush job per window, one HTML email per digest, and items kept when
+the digest fails to send.
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import MagicMock, patch
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from services.email_digest import EmailDigest, render_digest
+from services.email_service import EmailService, flush_digest_job
+from services.job_queue import PermanentJobError
+
+
+class TestEmailDigest(unittest.TestCase):
+    """Unit tests for EmailDigest and the EmailService digest mode"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, True)
+
+        env = {
+            'EMAIL_DIGEST': '1',
+            'EMAIL_DIGEST_PATH': os.path.join(self.tmpdir, 'digest.sqlite3'),
+            'EMAIL_DIGEST_WINDOW_SECONDS': '600',
+            'GMAIL_USER': 'bot@example.com',
+        }
+        with patch.dict(os.environ, env):
+            self.service = EmailService()
+        self.sent = []
+        self.service._send = self.sent.append
+
+        patcher = patch('services.email_service.job_queue')
+        self.job_queue = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def send_reminder(self, task_name, to_email='staff@example.com'):
+        return self.service.send_deadline_reminder_email(
+            to_email=to_email, user_name='Sam', task_name=task_name, task_desc='',
+            project_name='Apollo', hours_until_due=5, due_date='2025-01-02 09:00', priority_level='High'
+        )
+
+    def test_reminders_coalesced_into_one_email(self):
+        """15 reminders in one window become one email with 15 sections"""
+        for number in range(15):
+            self.assertTrue(self.send_reminder(f'Task {number}'))
+
+        self.assertEqual(self.sent, [])
+        self.job_queue.schedule.assert_called_once_with('flush_digest', 600.0, recipient='staff@example.com')
+
+        self.assertEqual(self.service.flush_digest('staff@example.com'), 15)
+        self.assertEqual(len(self.sent), 1)
+        msg = self.sent[0]
+        self.assertEqual(msg['To'], 'staff@example.com')
+        self.assertTrue(msg['Subject'].startswith('15 new notifications'))
+        html = msg.get_payload()[0].get_payload(decode=True).decode('utf-8')
+        self.assertIn('Hi Sam', html)
+        for number in range(15):
+            self.assertIn(f'Task {number}</h3>', html)
+
+        # The window is closed: the next reminder opens a new one
+        self.assertEqual(self.service.digest.pending('staff@example.com'), [])
+        self.send_reminder('Task 15')
+        self.assertEqual(self.job_queue.schedule.call_count, 2)
+
+    def test_windows_are_per_recipient(self):
+        """Each recipient gets their own window and digest"""
+        self.send_reminder('Task A', to_email='a@example.com')
+        self.send_reminder('Task B', to_email='b@example.com')
+        self.send_reminder('Task C', to_email='a@example.com')
+
+        self.assertEqual(self.job_queue.schedule.call_count, 2)
+        self.assertEqual(self.service.flush_digest('a@example.com'), 2)
+        self.assertEqual(self.service.flush_digest('b@example.com'), 1)
+        self.assertEqual([msg['To'] for msg in self.sent], ['a@example.com', 'b@example.com'])
+        # A single notification keeps its own subject
+        self.assertEqual(self.sent[1]['Subject'], '⚠️ Deadline Approaching: Task B')
+
+    def test_transfer_buffered_for_new_and_old_owner(self):
+        """An ownership transfer goes into the digest of both owners"""
+        self.service.send_task_transfer_ownership_email(
+            new_owner_email='new@example.com', new_owner_name='New', old_owner_email='old@example.com',
+            old_owner_name='Old', task_name='Report', task_desc='', project_name=None,
+            transferred_by_name='Boss', start_date='2025-01-01', end_date=None
+        )
+        self.assertEqual(len(self.service.digest.pending('new@example.com')), 1)
+        self.assertEqual(self.service.digest.pending('old@example.com')[0]['name'], 'Old')
+
+    def test_failed_send_keeps_items(self):
+        """A digest that fails to send is retried with nothing lost"""
+        self.send_reminder('Task A')
+        self.service._send = MagicMock(side_effect=OSError('SMTP down'))
+
+        with self.assertRaises(OSError):
+            self.service.flush_digest('staff@example.com')
+        self.assertEqual(len(self.service.digest.pending('staff@example.com')), 1)
+
+    def test_items_added_during_flush_reschedule(self):
+        """Items buffered while a digest is being sent get a new window"""
+        digest = EmailDigest(path=os.path.join(self.tmpdir, 'raw.sqlite3'), window_seconds=60)
+        self.assertTrue(digest.add('a@example.com', 'One', '<p>1</p>'))
+        items = digest.pending('a@example.com')
+        self.assertFalse(digest.add('a@example.com', 'Two', '<p>2</p>'))
+
+        self.assertTrue(digest.discard('a@example.com', [item['id'] for item in items]))
+        self.assertEqual([item['subject'] for item in digest.pending('a@example.com')], ['Two'])
+        self.assertFalse(digest.discard('a@example.com', [item['id'] for item in digest.pending('a@example.com')]))
+
+    def test_stale_window_reopens(self):
+        """A window whose flush job was lost is reopened by the next item"""
+        digest = EmailDigest(path=os.path.join(self.tmpdir, 'raw.sqlite3'), window_seconds=60)
+        self.assertTrue(digest.add('a@example.com', 'One', '<p>1</p>'))
+        with patch('services.email_digest.time.time', return_value=time.time() + 60 + EmailDigest.STALE_SECONDS + 1):
+            self.assertTrue(digest.add('a@example.com', 'Two', '<p>2</p>'))
+
+    def test_digest_disabled_sends_immediately(self):
+        """Without EMAIL_DIGEST the message is sent as before"""
+        with patch.dict(os.environ, {'EMAIL_DIGEST': '0'}):
+            service = EmailService()
+        service._send = MagicMock()
+        self.assertTrue(service.send_project_assignment_email(
+            to_email='a@example.com', user_name='A', project_name='Apollo', project_desc='',
+            creator_name='B', start_date='2025-01-01', end_date='2025-01-31'
+        ))
+        service._send.assert_called_once()
+
+    def test_flush_job_with_digest_disabled_is_not_retried(self):
+        """A flush job that runs with EMAIL_DIGEST=0 fails permanently"""
+        with patch('services.email_service.email_service') as service:
+            service.digest = None
+            with self.assertRaises(PermanentJobError):
+                flush_digest_job('a@example.com')
+
+    def test_render_digest(self):
+        """The digest lists every item under its subject"""
+        subject, html = render_digest([
+            {'name': None, 'subject': 'First', 'body': '<div>one</div>'},
+            {'name': 'Sam', 'subject': 'Second', 'body': '<div>two</div>'},
+        ])
+        self.assertEqual(subject, '2 new notifications: First and more')
+        self.assertLess(html.index('First'), html.index('Second'))
+        self.assertIn('Hi Sam', html)
+
+
+if __name__ == '__main__':
+    unittest.main()
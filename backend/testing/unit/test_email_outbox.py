@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Email Outbox
+Tests the persistent email outbox: pooled SMTP connections reused across
+messages, reconnects, rate limiting, retry vs dead-letter decisions, and
+delivery to a local aiosmtpd server when it is installed.
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import smtplib
+import socket
+import tempfile
+import time
+from email.mime.text import MIMEText
+from unittest.mock import patch
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from services.email_outbox import EmailOutbox, RateLimiter, SMTPConnectionPool
+from services.email_service import EmailService
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:  # optional test dependency
+    Controller = None
+
+
+class FakeSMTP:
+    """Records the SMTP conversation of one connection"""
+
+    instances = []
+    fail_next = []
+
+    def __init__(self, host, port, timeout=None):
+        self.host = host
+        self.port = port
+        self.calls = []
+        self.sent = []
+        FakeSMTP.instances.append(self)
+
+    def starttls(self):
+        self.calls.append('starttls')
+
+    def login(self, user, password):
+        self.calls.append('login')
+
+    def send_message(self, msg):
+        if FakeSMTP.fail_next:
+            raise FakeSMTP.fail_next.pop(0)
+        self.sent.append(msg['To'])
+
+    def quit(self):
+        self.calls.append('quit')
+
+
+def make_message(to_email):
+    msg = MIMEText('<p>Hi</p>', 'html')
+    msg['From'] = 'noreply@example.com'
+    msg['To'] = to_email
+    msg['Subject'] = 'Reminder'
+    return msg
+
+
+class TestEmailOutbox(unittest.TestCase):
+    """Unit tests for EmailOutbox and SMTPConnectionPool"""
+
+    def setUp(self):
+        FakeSMTP.instances = []
+        FakeSMTP.fail_next = []
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, True)
+
+    def make_outbox(self, **kwargs):
+        kwargs.setdefault('connections', 1)
+        kwargs.setdefault('rate', 0)
+        kwargs.setdefault('backoff_seconds', 0)
+        outbox = EmailOutbox(
+            'smtp.example.com', 587, user='bot@example.com', password='secret',
+            path=os.path.join(self.tmpdir, 'outbox.sqlite3'), smtp_factory=FakeSMTP, **kwargs
+        )
+        outbox.queue.start = lambda: None  # the tests drain explicitly
+        self.addCleanup(outbox.stop)
+        return outbox
+
+    def test_one_handshake_for_many_messages(self):
+        """Queued messages share one authenticated connection"""
+        outbox = self.make_outbox()
+        for number in range(20):
+            outbox.send(make_message(f'staff{number}@example.com'))
+        self.assertEqual(outbox.drain(), 20)
+
+        self.assertEqual(len(FakeSMTP.instances), 1)
+        connection = FakeSMTP.instances[0]
+        self.assertEqual(connection.calls, ['starttls', 'login'])
+        self.assertEqual(len(connection.sent), 20)
+        self.assertEqual(outbox.queue.stats()['pending'], 0)
+
+    def test_connection_recycled_after_max_messages(self):
+        """A connection is replaced after max_messages sends"""
+        outbox = self.make_outbox(max_messages=5)
+        for number in range(12):
+            outbox.send(make_message(f'staff{number}@example.com'))
+        outbox.drain()
+        self.assertEqual([len(c.sent) for c in FakeSMTP.instances], [5, 5, 2])
+        self.assertIn('quit', FakeSMTP.instances[0].calls)
+
+    def test_reconnects_when_dropped(self):
+        """A dropped connection is reopened and re-authenticated transparently"""
+        outbox = self.make_outbox()
+        FakeSMTP.fail_next = [smtplib.SMTPServerDisconnected('gone')]
+        outbox.send(make_message('a@example.com'))
+        outbox.drain()
+        self.assertEqual(len(FakeSMTP.instances), 2)
+        self.assertEqual(FakeSMTP.instances[1].calls, ['starttls', 'login'])
+        self.assertEqual(FakeSMTP.instances[1].sent, ['a@example.com'])
+
+    def test_temporary_failure_is_retried(self):
+        """4xx replies keep the message queued for a retry"""
+        outbox = self.make_outbox(backoff_seconds=60)
+        FakeSMTP.fail_next = [smtplib.SMTPDataError(451, b'try later')]
+        outbox.send(make_message('a@example.com'))
+        outbox.drain()
+        self.assertEqual(outbox.queue.stats(), {'pending': 1, 'running': 0, 'dead': 0})
+
+    def test_refused_recipient_is_dead_lettered(self):
+        """Rejected recipients are not retried"""
+        outbox = self.make_outbox()
+        FakeSMTP.fail_next = [smtplib.SMTPRecipientsRefused({'bad@example.com': (550, b'no such user')})]
+        outbox.send(make_message('bad@example.com'))
+        outbox.send(make_message('good@example.com'))
+        outbox.drain()
+
+        dead = outbox.queue.dead_letters()
+        self.assertEqual(len(dead), 1)
+        self.assertEqual(dead[0]['attempts'], 1)
+        # The session survived the refusal and sent the next message
+        self.assertEqual(len(FakeSMTP.instances), 1)
+        self.assertEqual(FakeSMTP.instances[0].sent, ['good@example.com'])
+
+    def test_rate_limiter(self):
+        """The token bucket spaces out sends beyond the burst"""
+        limiter = RateLimiter(rate=50, burst=1)
+        started = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.07)
+
+        unlimited = RateLimiter(rate=0)
+        started = time.monotonic()
+        for _ in range(1000):
+            unlimited.acquire()
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    def test_pool_without_auth(self):
+        """No STARTTLS/login for a local relay"""
+        pool = SMTPConnectionPool('localhost', 1025, starttls=False, smtp_factory=FakeSMTP)
+        pool.send(make_message('a@example.com'))
+        self.assertEqual(FakeSMTP.instances[0].calls, [])
+
+    def test_email_service_uses_outbox_when_enabled(self):
+        """EMAIL_OUTBOX=1 queues messages instead of opening an SMTP connection"""
+        env = {
+            'EMAIL_OUTBOX': '1',
+            'EMAIL_OUTBOX_PATH': os.path.join(self.tmpdir, 'service.sqlite3'),
+            'GMAIL_USER': 'bot@example.com',
+            'GMAIL_APP_PASSWORD': 'secret',
+        }
+        with patch.dict(os.environ, env):
+            service = EmailService()
+        self.addCleanup(service.outbox.stop)
+        service.outbox.queue.start = lambda: None
+
+        with patch('smtplib.SMTP') as mock_smtp:
+            result = service.send_project_assignment_email(
+                to_email='a@example.com', user_name='A', project_name='Apollo',
+                project_desc='', creator_name='B', start_date='2025-01-01', end_date='2025-01-31'
+            )
+        self.assertTrue(result)
+        mock_smtp.assert_not_called()
+        self.assertEqual(service.outbox.queue.stats()['pending'], 1)
+
+
+@unittest.skipUnless(Controller is not None, 'aiosmtpd not installed')
+class TestEmailOutboxWithLocalServer(unittest.TestCase):
+    """Delivers through a real SMTP conversation with an aiosmtpd server"""
+
+    def setUp(self):
+        self.received = []
+
+        class Handler:
+            async def handle_DATA(handler, server, session, envelope):
+                self.received.append(envelope.rcpt_tos)
+                return '250 OK'
+
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            self.port = probe.getsockname()[1]
+        self.controller = Controller(Handler(), hostname='127.0.0.1', port=self.port)
+        self.controller.start()
+        self.addCleanup(self.controller.stop)
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, True)
+
+    def test_delivers_over_one_session(self):
+        """Messages reach the server over a single pooled connection"""
+        outbox = EmailOutbox('127.0.0.1', self.port, starttls=False, connections=1, rate=0,
+                             path=os.path.join(self.tmpdir, 'outbox.sqlite3'))
+        outbox.queue.start = lambda: None
+        self.addCleanup(outbox.stop)
+
+        for number in range(3):
+            outbox.send(make_message(f'staff{number}@example.com'))
+        outbox.drain()
+
+        self.assertEqual(len(self.received), 3)
+        self.assertEqual(outbox.pool.opened, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Firestore Accounting
+Tests per-request read/write/RPC counting on an instrumented fake GAPIC
+client, the X-Firestore-Usage header and per-route budgets.
+"""
+
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+from flask import Flask, Response, jsonify, stream_with_context
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import metrics
+import firestore_accounting
+from firestore_accounting import instrument_class, firestore_budget, get_request_usage, USAGE_HEADER
+
+
+class FakeGapicClient:
+    """Stands in for google.cloud.firestore_v1 FirestoreClient"""
+
+    def get_document(self, request=None, **kwargs):
+        return SimpleNamespace(name=request['name'])
+
+    def batch_get_documents(self, request=None, **kwargs):
+        return iter([SimpleNamespace(found=path) for path in request['documents']])
+
+    def run_query(self, request=None, **kwargs):
+        return iter(request['results'])
+
+    def commit(self, request=None, **kwargs):
+        return SimpleNamespace(write_results=request['writes'])
+
+    def rollback(self, request=None, **kwargs):
+        return None
+
+
+instrument_class(FakeGapicClient)
+
+
+class TestFirestoreAccounting(unittest.TestCase):
+    """Unit tests for firestore_accounting"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.api = FakeGapicClient()
+
+    def test_counts_reads_writes_and_rpcs(self):
+        """Each GAPIC call is counted against the current request"""
+        with self.app.test_request_context('/'):
+            self.api.get_document(request={'name': 'Tasks/t1'})
+            list(self.api.batch_get_documents(request={'documents': ['Users/u1', 'Users/u2', 'Users/u3']}))
+            self.api.commit(request={'writes': [1, 2]})
+            self.api.rollback(request={})
+            usage = get_request_usage()
+            self.assertEqual(usage.as_dict(), {'reads': 4, 'writes': 2, 'rpcs': 4})
+
+    def test_query_counts_returned_documents(self):
+        """Query reads are counted per returned document, streaming"""
+        results = [SimpleNamespace(document='d1'), SimpleNamespace(document='d2'), SimpleNamespace(document=None)]
+        with self.app.test_request_context('/'):
+            stream = self.api.run_query(request={'results': results})
+            next(stream)
+            self.assertEqual(get_request_usage().reads, 1)
+            list(stream)
+            self.assertEqual(get_request_usage().as_dict(), {'reads': 2, 'writes': 0, 'rpcs': 1})
+
+    def test_empty_query_billed_as_one_read(self):
+        """A query that returns nothing still costs one read"""
+        with self.app.test_request_context('/'):
+            list(self.api.run_query(request={'results': []}))
+            self.assertEqual(get_request_usage().reads, 1)
+
+    def test_outside_request_not_counted(self):
+        """Calls outside a request context are passed through uncounted"""
+        self.assertEqual(self.api.get_document(request={'name': 'Tasks/t1'}).name, 'Tasks/t1')
+        self.assertIsNone(get_request_usage())
+
+    def test_instrument_is_idempotent(self):
+        """Instrumenting twice does not double count"""
+        instrument_class(FakeGapicClient)
+        with self.app.test_request_context('/'):
+            self.api.get_document(request={'name': 'Tasks/t1'})
+            self.assertEqual(get_request_usage().reads, 1)
+
+
+class TestFirestoreBudgets(unittest.TestCase):
+    """Unit tests for the usage header, budgets and metrics integration"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.metrics = metrics.RequestMetrics()
+        api = FakeGapicClient()
+
+        @self.app.route('/cheap')
+        @firestore_budget(reads=2)
+        def cheap():
+            list(api.batch_get_documents(request={'documents': ['a', 'b', 'c']}))
+            return jsonify({}), 200
+
+        @self.app.route('/default')
+        def default():
+            api.get_document(request={'name': 'Tasks/t1'})
+            return jsonify({}), 200
+
+        @self.app.route('/streamed')
+        @firestore_budget(reads=2)
+        def streamed():
+            def generate():
+                for path in ('a', 'b', 'c'):
+                    api.get_document(request={'name': f'Tasks/{path}'})
+                    yield path + '\n'
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+        metrics.init_app(self.app, self.metrics)
+        firestore_accounting.init_app(self.app)
+        self.client = self.app.test_client()
+
+    def test_usage_header(self):
+        """Responses carry the per-request usage"""
+        response = self.client.get('/default')
+        self.assertEqual(response.headers[USAGE_HEADER], 'reads=1; writes=0; rpcs=1')
+
+    def test_route_budget_exceeded_logged(self):
+        """A route over its budget logs a warning and is counted in metrics"""
+        with self.assertLogs('backend.firestore', level='WARNING') as logs:
+            self.client.get('/cheap')
+        self.assertIn('reads 3 > 2', logs.output[0])
+
+        routes = {r['route']: r for r in self.metrics.snapshot()['routes']}
+        self.assertEqual(routes['/cheap']['firestore_reads'], 3)
+        self.assertEqual(routes['/cheap']['over_budget'], 1)
+
+    def test_streamed_response_checked_on_close(self):
+        """Reads made while a streamed body is sent count toward budget and metrics"""
+        with self.assertLogs('backend.firestore', level='WARNING') as logs:
+            with self.client.get('/streamed') as response:
+                self.assertEqual(response.get_data(as_text=True), 'a\nb\nc\n')
+                self.assertNotIn(USAGE_HEADER, response.headers)
+        self.assertIn('reads 3 > 2', logs.output[0])
+
+        routes = {r['route']: r for r in self.metrics.snapshot()['routes']}
+        self.assertEqual(routes['/streamed']['firestore_reads'], 3)
+        self.assertEqual(routes['/streamed']['over_budget'], 1)
+
+    def test_default_budget_from_environment(self):
+        """Routes without a decorator use FIRESTORE_READ_BUDGET"""
+        os.environ['FIRESTORE_READ_BUDGET'] = '1'
+        try:
+            usage = firestore_accounting.FirestoreUsage()
+            usage.reads = 2
+            self.assertEqual(firestore_accounting.check_budget(None, usage), ['reads 2 > 1'])
+        finally:
+            del os.environ['FIRESTORE_READ_BUDGET']
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Gunicorn Configuration
+Tests that the production server settings are driven by environment variables.
+"""
+
+import unittest
+import sys
+import os
+import runpy
+from unittest.mock import patch
+
+# Add the backend directory to the Python path
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BACKEND_DIR)
+
+CONFIG_PATH = os.path.join(BACKEND_DIR, 'gunicorn.conf.py')
+
+
+def load_config(env):
+    with patch.dict(os.environ, env, clear=False):
+        return runpy.run_path(CONFIG_PATH)
+
+
+class TestGunicornConfig(unittest.TestCase):
+    """Unit tests for gunicorn.conf.py"""
+
+    def test_env_overrides(self):
+        """Workers, threads, port and preload come from the environment"""
+        config = load_config({
+            'PORT': '9001',
+            'GUNICORN_WORKERS': '3',
+            'GUNICORN_THREADS': '8',
+            'GUNICORN_PRELOAD': '0',
+        })
+        self.assertEqual(config['bind'], '0.0.0.0:9001')
+        self.assertEqual(config['workers'], 3)
+        self.assertEqual(config['threads'], 8)
+        self.assertEqual(config['worker_class'], 'gthread')
+        self.assertFalse(config['preload_app'])
+
+    def test_single_thread_uses_sync_worker(self):
+        """One thread per worker falls back to the sync worker"""
+        config = load_config({'GUNICORN_THREADS': '1'})
+        self.assertEqual(config['worker_class'], 'sync')
+
+    def test_preload_enabled_by_default(self):
+        """The app is preloaded unless explicitly disabled"""
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop('GUNICORN_PRELOAD', None)
+            config = runpy.run_path(CONFIG_PATH)
+        self.assertTrue(config['preload_app'])
+        self.assertTrue(callable(config['post_fork']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - HTTP Cache
+Tests body-hash ETags, If-None-Match -> 304 handling and precomputed ETags
+that skip the view entirely.
+"""
+
+import unittest
+import sys
+import os
+from flask import Flask, jsonify, Response
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import http_cache
+from http_cache import etag_from
+
+
+class TestHttpCache(unittest.TestCase):
+    """Unit tests for http_cache.init_app / etag_from"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.data = {'items': [1, 2, 3]}
+        self.version = 'v1'
+        self.view_calls = 0
+
+        @self.app.route('/items', methods=['GET', 'POST'])
+        def items():
+            return jsonify(self.data), 200
+
+        @self.app.route('/missing')
+        def missing():
+            return jsonify({'error': 'not found'}), 404
+
+        @self.app.route('/stream')
+        def stream():
+            return Response(iter(['[', ']']), mimetype='application/json')
+
+        @self.app.route('/versioned')
+        @etag_from(lambda: self.version)
+        def versioned():
+            self.view_calls += 1
+            return jsonify(self.data), 200
+
+        @self.app.route('/broken-version')
+        @etag_from(lambda: 1 / 0)
+        def broken_version():
+            return jsonify(self.data), 200
+
+        http_cache.init_app(self.app)
+        self.client = self.app.test_client()
+
+    def test_etag_and_304(self):
+        """Unchanged bodies are answered with an empty 304"""
+        first = self.client.get('/items')
+        etag = first.headers['ETag']
+        self.assertEqual(first.headers['Cache-Control'], http_cache.CACHE_CONTROL)
+        second = self.client.get('/items', headers={'If-None-Match': etag})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.data, b'')
+        self.assertEqual(second.headers['ETag'], etag)
+
+    def test_changed_body_is_200(self):
+        """A stale ETag gets the new body"""
+        etag = self.client.get('/items').headers['ETag']
+        self.data = {'items': [1, 2, 3, 4]}
+        response = self.client.get('/items', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_skipped_responses(self):
+        """Errors, non-GET and streamed responses get no ETag"""
+        self.assertNotIn('ETag', self.client.get('/missing').headers)
+        self.assertNotIn('ETag', self.client.post('/items').headers)
+        self.assertNotIn('ETag', self.client.get('/stream').headers)
+
+    def test_disabled(self):
+        """HTTP_ETAGS=False turns everything off"""
+        self.app.config['HTTP_ETAGS'] = False
+        self.assertNotIn('ETag', self.client.get('/items').headers)
+
+    def test_precomputed_etag_skips_view(self):
+        """etag_from answers 304 without running the view"""
+        etag = self.client.get('/versioned').headers['ETag']
+        self.assertEqual(self.view_calls, 1)
+        response = self.client.get('/versioned', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.view_calls, 1)
+
+        self.version = 'v2'
+        response = self.client.get('/versioned', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.view_calls, 2)
+
+    def test_precomputed_etag_varies_by_query(self):
+        """Filtered / paged variants have distinct ETags"""
+        plain = self.client.get('/versioned').headers['ETag']
+        paged = self.client.get('/versioned?limit=1').headers['ETag']
+        self.assertNotEqual(plain, paged)
+
+    def test_version_errors_fall_through(self):
+        """If the version cannot be computed the view still runs"""
+        response = self.client.get('/broken-version')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Job Queue
+Tests the SQLite-backed background job queue: persistence, inline mode,
+retries with backoff, dead-lettering, lease recovery and worker threads.
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import pytz
+from unittest.mock import patch
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from services.job_queue import JobQueue, PermanentJobError, decode_payload, encode_payload
+
+
+class TestJobQueue(unittest.TestCase):
+    """Unit tests for JobQueue"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        # Registered first so it runs last, after every queue.stop cleanup
+        self.addCleanup(shutil.rmtree, self.tmpdir, True)
+        self.path = os.path.join(self.tmpdir, 'jobs.sqlite3')
+        self.calls = []
+
+    def make_queue(self, **kwargs):
+        kwargs.setdefault('workers', 1)
+        kwargs.setdefault('max_attempts', 3)
+        kwargs.setdefault('backoff_seconds', 0)
+        queue = JobQueue(path=self.path, **kwargs)
+        self.addCleanup(queue.stop)
+
+        @queue.handler('record')
+        def record(**payload):
+            self.calls.append(payload)
+
+        @queue.handler('fail')
+        def fail(**payload):
+            self.calls.append(payload)
+            raise RuntimeError('SMTP down')
+
+        return queue
+
+    def test_payload_round_trip(self):
+        """Datetimes survive the JSON payload encoding"""
+        when = datetime(2025, 1, 2, 9, 30, tzinfo=pytz.UTC)
+        payload = decode_payload(encode_payload({'when': when, 'ids': ('a', 'b'), 'nested': {'n': 1}}))
+        self.assertEqual(payload, {'when': when, 'ids': ['a', 'b'], 'nested': {'n': 1}})
+
+    def test_enqueue_persists_until_run(self):
+        """Enqueued jobs are stored in SQLite and removed once they succeed"""
+        queue = self.make_queue()
+        queue.start = lambda: None  # keep the test in control of when jobs run
+        queue.enqueue('record', task_id='t1')
+        self.assertEqual(queue.stats()['pending'], 1)
+
+        # A fresh queue on the same file (e.g. after a restart) runs it
+        other = self.make_queue()
+        self.assertEqual(other.run_pending(), 1)
+        self.assertEqual(self.calls, [{'task_id': 't1'}])
+        self.assertEqual(other.stats(), {'pending': 0, 'running': 0, 'dead': 0})
+
+    def test_unknown_job_type(self):
+        """Enqueueing a job nobody handles is a programming error"""
+        with self.assertRaises(LookupError):
+            self.make_queue().enqueue('missing')
+
+    def test_retries_then_dead_letter(self):
+        """Failing jobs are retried max_attempts times, then dead-lettered"""
+        queue = self.make_queue()
+        queue.start = lambda: None
+        queue.enqueue('fail', to='a@x.com')
+
+        for _ in range(3):
+            queue.run_pending()
+        self.assertEqual(len(self.calls), 3)
+
+        dead = queue.dead_letters()
+        self.assertEqual(len(dead), 1)
+        self.assertEqual(dead[0]['attempts'], 3)
+        self.assertEqual(dead[0]['payload'], {'to': 'a@x.com'})
+        self.assertIn('SMTP down', dead[0]['last_error'])
+        self.assertEqual(queue.run_pending(), 0)
+
+        self.assertEqual(queue.retry_dead(dead[0]['id']), 1)
+        self.assertEqual(queue.stats()['pending'], 1)
+
+    def test_backoff_delays_retry(self):
+        """A failed job is not due again until its backoff has passed"""
+        queue = self.make_queue(backoff_seconds=60)
+        queue.start = lambda: None
+        queue.enqueue('fail')
+        self.assertEqual(queue.run_pending(), 1)
+        self.assertEqual(queue.run_pending(), 0)
+        self.assertEqual(queue.stats()['pending'], 1)
+
+    def test_scheduled_job_waits_for_delay(self):
+        """schedule() stores a job that is not due until its delay has passed"""
+        queue = self.make_queue()
+        queue.start = lambda: None
+        queue.schedule('record', 60, n=1)
+        self.assertEqual(queue.run_pending(), 0)
+        with patch('services.job_queue.time.time', return_value=time.time() + 61):
+            self.assertEqual(queue.run_pending(), 1)
+        self.assertEqual(self.calls, [{'n': 1}])
+
+    def test_expired_lease_is_retried(self):
+        """A job left running by a dead worker is picked up after the lease"""
+        queue = self.make_queue(lease_seconds=0)
+        queue.start = lambda: None
+        queue.enqueue('record', n=1)
+        self.assertIsNotNone(queue._claim('crashed-worker'))
+        time.sleep(0.01)
+        self.assertEqual(queue.run_pending(), 1)
+        self.assertEqual(self.calls, [{'n': 1}])
+
+    def test_inline_mode(self):
+        """workers=0 runs jobs in the caller; failures go to the dead-letter list"""
+        queue = self.make_queue(workers=0)
+        self.assertIsNone(queue.enqueue('record', n=1))
+        self.assertEqual(self.calls, [{'n': 1}])
+
+        self.assertIsNotNone(queue.enqueue('fail'))
+        self.assertEqual(len(queue.dead_letters()), 1)
+
+    def test_worker_threads_drain_queue(self):
+        """Worker threads run enqueued jobs in the background"""
+        done = threading.Event()
+        queue = self.make_queue(workers=2, poll_seconds=0.05)
+
+        @queue.handler('signal')
+        def signal():
+            done.set()
+
+        queue.enqueue('signal')
+        self.assertTrue(done.wait(5))
+
+
+
+class TestSendEmailJob(unittest.TestCase):
+    """Unit tests for the send_email job handler"""
+
+    def test_calls_email_method(self):
+        """The job calls the named EmailService method with its payload"""
+        from services.email_service import send_email_job
+        with patch('services.email_service.email_service') as service:
+            service.send_task_assignment_email.return_value = True
+            send_email_job('send_task_assignment_email', to_email='a@x.com')
+        service.send_task_assignment_email.assert_called_once_with(to_email='a@x.com')
+
+    def test_failed_send_raises_for_retry(self):
+        """A False result (SMTP failure) raises so the queue retries the job"""
+        from services.email_service import send_email_job
+        with patch('services.email_service.email_service') as service:
+            service.send_deadline_reminder_email.return_value = False
+            with self.assertRaises(RuntimeError):
+                send_email_job('send_deadline_reminder_email', to_email='a@x.com')
+
+    def test_unknown_method_is_not_retried(self):
+        """A method that is not a send_* email fails permanently"""
+        from services.email_service import send_email_job
+        with patch('services.email_service.email_service'):
+            with self.assertRaises(PermanentJobError):
+                send_email_job('smtp_user')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - JSON Provider
+Tests ISO 8601 encoding of Firestore timestamps and datetimes, the orjson
+provider's Flask compatibility, and the stdlib fallback.
+"""
+
+import unittest
+import sys
+import os
+import json
+from datetime import date, datetime, timezone
+from unittest.mock import patch
+from flask import Flask, jsonify
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+import json_provider
+from json_provider import OrjsonProvider, StdlibJSONProvider
+
+STAMP = DatetimeWithNanoseconds(2025, 3, 4, 5, 6, 7, 890000, tzinfo=timezone.utc)
+PAYLOAD = {
+    'task_name': 'Write report ✅',
+    'start_date': STAMP,
+    'end_date': datetime(2025, 3, 5, 9, 0),
+    'due': date(2025, 3, 6),
+    'tags': {'urgent'},
+    'count': 3,
+}
+
+
+def make_app(provider_class):
+    app = Flask(__name__)
+    app.json_provider_class = provider_class
+    app.json = provider_class(app)
+
+    @app.route('/payload')
+    def payload():
+        return jsonify(PAYLOAD), 200
+
+    return app
+
+
+class TestJSONProvider(unittest.TestCase):
+    """Unit tests for json_provider"""
+
+    def check_payload(self, data):
+        self.assertEqual(data['task_name'], 'Write report ✅')
+        self.assertEqual(data['start_date'], STAMP.isoformat())
+        self.assertEqual(data['end_date'], '2025-03-05T09:00:00')
+        self.assertEqual(data['due'], '2025-03-06')
+        self.assertEqual(data['tags'], ['urgent'])
+
+    @unittest.skipUnless(json_provider.orjson, 'orjson not installed')
+    def test_orjson_response(self):
+        """jsonify encodes Firestore timestamps and datetimes as ISO 8601"""
+        response = make_app(OrjsonProvider).test_client().get('/payload')
+        self.assertEqual(response.mimetype, 'application/json')
+        self.check_payload(response.get_json())
+
+    def test_stdlib_fallback(self):
+        """Without orjson the stdlib provider gives the same output"""
+        response = make_app(StdlibJSONProvider).test_client().get('/payload')
+        self.check_payload(response.get_json())
+
+    @unittest.skipUnless(json_provider.orjson, 'orjson not installed')
+    def test_matches_stdlib_encoding(self):
+        """Both providers produce identical documents"""
+        fast = make_app(OrjsonProvider).json
+        slow = make_app(StdlibJSONProvider).json
+        payload = dict(PAYLOAD, tags=['urgent'], nested=[{'b': 1, 'a': None}], ids={1: 'x'})
+        self.assertEqual(json.loads(fast.dumps(payload)), json.loads(slow.dumps(payload)))
+        self.assertEqual(fast.loads('{"a": [1, 2]}'), {'a': [1, 2]})
+
+    @unittest.skipUnless(json_provider.orjson, 'orjson not installed')
+    def test_sorted_keys_and_debug_indent(self):
+        """Keys are sorted like Flask's default; debug responses are indented"""
+        app = make_app(OrjsonProvider)
+        self.assertEqual(app.json.dumps({'b': 1, 'a': 2}), '{"a":2,"b":1}')
+        app.debug = True
+        body = app.test_client().get('/payload').get_data(as_text=True)
+        self.assertIn('\n  "count": 3', body)
+
+    def test_unsupported_type(self):
+        """Unknown objects still raise TypeError"""
+        for provider_class in (OrjsonProvider, StdlibJSONProvider):
+            if provider_class is OrjsonProvider and not json_provider.orjson:
+                continue
+            with self.assertRaises(TypeError):
+                make_app(provider_class).json.dumps({'x': object()})
+
+    def test_init_app_falls_back_without_orjson(self):
+        """init_app picks the stdlib provider when orjson is unavailable"""
+        with patch.object(json_provider, 'orjson', None):
+            app = Flask(__name__)
+            self.assertIsInstance(json_provider.init_app(app), StdlibJSONProvider)
+            self.assertNotIsInstance(app.json, OrjsonProvider)
+
+
+if __name__ == '__main__':
+    unittest.main()
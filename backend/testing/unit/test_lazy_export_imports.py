@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Lazy Export Imports
+Tests that reportlab/openpyxl are not loaded when the app is imported and
+that the extracted export renderers still produce files.
+"""
+
+import unittest
+import sys
+import os
+import subprocess
+from io import BytesIO
+
+# Add the backend directory to the Python path
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BACKEND_DIR)
+
+
+TASKS = [
+    {
+        'task_name': 'Design', 'task_desc': 'Wireframes', 'task_status': 'Completed',
+        'priority_level': 3, 'assigned_to': ['u1'], 'owner': 'u1',
+        'start_date': '2025-01-02', 'end_date': '2025-01-10',
+    },
+    {
+        'task_name': 'Build', 'task_desc': 'Implementation', 'task_status': 'In Progress',
+        'priority_level': 7, 'assigned_to': ['u1', 'u2'], 'owner': 'u2',
+        'start_date': '2025-01-05', 'end_date': '2025-01-20',
+    },
+]
+
+USERS = {
+    'u1': {'name': 'Alice', 'division_name': 'IT'},
+    'u2': {'name': 'Bob', 'division_name': 'Sales'},
+}
+
+PROJECT = {'proj_name': 'Demo', 'collaborators': ['u1', 'u2']}
+
+
+class TestLazyExportImports(unittest.TestCase):
+    """Unit tests for lazily loaded export modules"""
+
+    def test_app_import_does_not_load_export_stacks(self):
+        """Importing the app must not pull in reportlab or openpyxl"""
+        code = (
+            "import sys\n"
+            "import app\n"
+            "print('LOADED=' + ','.join(m for m in ('reportlab', 'openpyxl') if m in sys.modules))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=BACKEND_DIR, capture_output=True, text=True
+        )
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        self.assertIn('LOADED=\n', result.stdout)
+
+    def test_pdf_table_export(self):
+        """Table PDF renders to a non-empty PDF buffer"""
+        from services.pdf_export import build_project_tasks_pdf
+        buffer = build_project_tasks_pdf('p1', 'Demo', PROJECT, TASKS, USERS)
+        self.assertIsInstance(buffer, BytesIO)
+        self.assertTrue(buffer.getvalue().startswith(b'%PDF'))
+
+    def test_pdf_calendar_export(self):
+        """Calendar PDF renders to a non-empty PDF buffer"""
+        from services.pdf_export import build_project_tasks_pdf
+        buffer = build_project_tasks_pdf('p1', 'Demo', PROJECT, TASKS, USERS, format_type='calendar')
+        self.assertTrue(buffer.getvalue().startswith(b'%PDF'))
+
+    def test_excel_exports(self):
+        """Both workbooks render to .xlsx (zip) buffers"""
+        from services.excel_export import build_project_tasks_workbook, build_team_schedule_workbook
+        report = build_project_tasks_workbook('p1', 'Demo', TASKS, USERS)
+        schedule = build_team_schedule_workbook(TASKS, 'Demo', PROJECT, USERS)
+        self.assertTrue(report.getvalue().startswith(b'PK'))
+        self.assertTrue(schedule.getvalue().startswith(b'PK'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Logging Utilities
+Tests sampling, JSON formatting and the background queue writer.
+"""
+
+import unittest
+import sys
+import os
+import io
+import json
+import logging
+from unittest.mock import patch
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from logging_utils import SamplingFilter, JsonFormatter, configure_logging, flush_logging, get_logger
+
+
+def make_record(level, msg='hello', args=(), **extra):
+    record = logging.LogRecord('backend.test', level, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class TestLoggingUtils(unittest.TestCase):
+    """Unit tests for logging_utils"""
+
+    def test_sampling_never_drops_warnings(self):
+        """Rate 0 drops DEBUG/INFO but keeps WARNING and above"""
+        sampler = SamplingFilter(0.0)
+        self.assertFalse(sampler.filter(make_record(logging.INFO)))
+        self.assertTrue(sampler.filter(make_record(logging.WARNING)))
+        self.assertTrue(sampler.filter(make_record(logging.ERROR)))
+
+    def test_sampling_rate(self):
+        """Records below the sample rate are kept"""
+        sampler = SamplingFilter(0.25)
+        with patch('logging_utils.random.random', return_value=0.1):
+            self.assertTrue(sampler.filter(make_record(logging.DEBUG)))
+        with patch('logging_utils.random.random', return_value=0.9):
+            self.assertFalse(sampler.filter(make_record(logging.DEBUG)))
+
+    def test_json_formatter_includes_extra_fields(self):
+        """Messages are %-formatted and extra= fields become JSON keys"""
+        line = JsonFormatter().format(make_record(logging.INFO, 'took %sms', (12,), route='/api/tasks'))
+        entry = json.loads(line)
+        self.assertEqual(entry['msg'], 'took 12ms')
+        self.assertEqual(entry['level'], 'INFO')
+        self.assertEqual(entry['route'], '/api/tasks')
+
+    def test_get_logger_namespaces_under_backend(self):
+        """Module loggers are children of the 'backend' logger"""
+        self.assertEqual(get_logger('routes.task').name, 'backend.routes.task')
+        self.assertEqual(get_logger('backend.http').name, 'backend.http')
+
+    def test_queue_writer(self):
+        """Records pass through the queue listener to the output stream"""
+        stream = io.StringIO()
+        configure_logging(level='DEBUG', fmt='json', sample_rate=1.0, stream=stream)
+        try:
+            get_logger('test').debug("queued %s", 'record', extra={'task_id': 't1'})
+            flush_logging()
+            entry = json.loads(stream.getvalue().strip().splitlines()[-1])
+            self.assertEqual(entry['msg'], 'queued record')
+            self.assertEqual(entry['task_id'], 't1')
+        finally:
+            configure_logging(level='INFO', stream=sys.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
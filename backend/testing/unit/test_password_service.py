@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Password Service
+Tests the bounded password worker pool: inline mode, process pool mode,
+saturation handling and queue/latency metrics.
+"""
+
+import unittest
+import sys
+import os
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from services.password_service import PasswordService, PasswordPoolBusyError
+from password_utils import hash_password, verify_password
+
+
+class TestPasswordServiceInline(unittest.TestCase):
+    """Unit tests for PasswordService with pool_size=0 (inline)"""
+
+    def setUp(self):
+        self.service = PasswordService(pool_size=0, queue_limit=0, timeout=5, retry_after=3)
+
+    def test_hash_and_verify(self):
+        """Hashes produced by the service verify correctly"""
+        hashed = self.service.hash("Password123!")
+        self.assertTrue(self.service.verify(hashed, "Password123!"))
+        self.assertFalse(self.service.verify(hashed, "WrongPass1!"))
+
+    def test_compatible_with_password_utils(self):
+        """Service hashes are interchangeable with password_utils"""
+        self.assertTrue(verify_password(self.service.hash("Password123!"), "Password123!"))
+        self.assertTrue(self.service.verify(hash_password("Password123!"), "Password123!"))
+
+    def test_saturated_pool_raises_busy(self):
+        """Requests beyond pool + queue capacity are rejected with retry_after"""
+        self.service._in_flight = 1
+        with self.assertRaises(PasswordPoolBusyError) as ctx:
+            self.service.hash("Password123!")
+        self.assertEqual(ctx.exception.retry_after, 3)
+        self.assertEqual(self.service.get_stats()['rejected'], 1)
+
+    def test_stats_track_latency(self):
+        """Completed jobs are reflected in stats"""
+        self.service.hash("Password123!")
+        stats = self.service.get_stats()
+        self.assertEqual(stats['completed'], 1)
+        self.assertEqual(stats['in_flight'], 0)
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertGreater(stats['latency_ms']['max'], 0)
+
+
+class TestPasswordServicePool(unittest.TestCase):
+    """Unit tests for PasswordService running on a process pool"""
+
+    def setUp(self):
+        self.service = PasswordService(pool_size=1, queue_limit=2, timeout=30)
+
+    def tearDown(self):
+        self.service.shutdown()
+
+    def test_hash_and_verify_in_worker(self):
+        """Hashing and verification run in the worker process"""
+        hashed = self.service.hash("Password123!")
+        self.assertEqual(len(hashed), 128)
+        self.assertTrue(self.service.verify(hashed, "Password123!"))
+        # Slots are released by the future's done callback, just after the result
+        deadline = time.monotonic() + 5
+        while self.service.get_stats()['completed'] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.service.get_stats()['completed'], 2)
+
+
+class StuckExecutor:
+    """Executor whose jobs start running and only finish when the test says so"""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_running_or_notify_cancel()
+        self.futures.append(future)
+        return future
+
+
+class TestPasswordServiceTimeout(unittest.TestCase):
+    """A timed-out hash keeps its slot until the worker finishes"""
+
+    def test_slot_held_until_worker_finishes(self):
+        service = PasswordService(pool_size=1, queue_limit=0, timeout=0.01, retry_after=3)
+        executor = StuckExecutor()
+        service._executor = executor
+
+        with self.assertRaises(PasswordPoolBusyError):
+            service.hash("Password123!")
+        self.assertEqual(service.get_stats()['timed_out'], 1)
+        self.assertEqual(service.get_stats()['in_flight'], 1)
+
+        # The running hash still occupies the only slot: the next request is rejected
+        with self.assertRaises(PasswordPoolBusyError):
+            service.hash("Password123!")
+        self.assertEqual(service.get_stats()['rejected'], 1)
+
+        executor.futures[0].set_result('hashed')
+        self.assertEqual(service.get_stats()['in_flight'], 0)
+
+
+class BrokenExecutor:
+    """Executor whose worker died: every submit raises BrokenProcessPool"""
+
+    def __init__(self):
+        self.shut_down = False
+
+    def submit(self, fn, *args):
+        raise BrokenProcessPool('A child process terminated abruptly')
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+class InlineExecutor:
+    """Executor that runs each job immediately on the calling thread"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(fn)
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+class TestPasswordServiceBrokenPool(unittest.TestCase):
+    """A pool broken by a dead worker is replaced instead of failing every login"""
+
+    def test_broken_pool_replaced_and_retried(self):
+        service = PasswordService(pool_size=1, queue_limit=0, timeout=5)
+        broken = BrokenExecutor()
+        service._executor = broken
+        fresh = InlineExecutor()
+
+        with patch('services.password_service.ProcessPoolExecutor', return_value=fresh):
+            hashed = service.hash("Password123!")
+
+        self.assertTrue(verify_password(hashed, "Password123!"))
+        self.assertTrue(broken.shut_down)
+        self.assertIs(service._executor, fresh)
+        self.assertEqual(fresh.submitted, [hash_password])
+        self.assertEqual(service.get_stats()['in_flight'], 0)
+
+    def test_second_failure_releases_slot(self):
+        """The submit is retried once; a pool that breaks again surfaces the error"""
+        service = PasswordService(pool_size=1, queue_limit=0, timeout=5)
+        service._executor = BrokenExecutor()
+
+        with patch('services.password_service.ProcessPoolExecutor', return_value=BrokenExecutor()):
+            with self.assertRaises(BrokenProcessPool):
+                service.hash("Password123!")
+        self.assertEqual(service.get_stats()['in_flight'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Request Profiling
+Tests when requests are profiled, pstats output and the admin endpoints.
+"""
+
+import unittest
+import sys
+import os
+import pstats
+import shutil
+import tempfile
+import time
+from flask import Flask, jsonify
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import profiling
+from profiling import ProfilerConfig
+
+TOKEN = 'secret-token'
+
+
+class TestProfiling(unittest.TestCase):
+    """Unit tests for profiling.init_app"""
+
+    def make_client(self, **config):
+        config.setdefault('enabled', False)
+        config.setdefault('endpoints', [])
+        config.setdefault('admin_token', TOKEN)
+        config = ProfilerConfig(directory=self.directory, **config)
+
+        app = Flask(__name__)
+
+        @app.route('/fast')
+        def fast():
+            return jsonify({}), 200
+
+        @app.route('/slow')
+        def slow():
+            time.sleep(0.03)
+            return jsonify({}), 200
+
+        profiling.init_app(app, config)
+        return app.test_client()
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def saved(self):
+        return [f for f in os.listdir(self.directory) if f.endswith('.pstats')] if os.path.isdir(self.directory) else []
+
+    def test_disabled_by_default(self):
+        """Nothing is profiled without opt-in"""
+        client = self.make_client()
+        response = client.get('/slow')
+        self.assertNotIn(profiling.PROFILE_ID_HEADER, response.headers)
+        self.assertEqual(self.saved(), [])
+
+    def test_slow_threshold(self):
+        """With PROFILE_REQUESTS only requests over the threshold are kept"""
+        client = self.make_client(enabled=True, slow_ms=20)
+        client.get('/fast')
+        self.assertEqual(self.saved(), [])
+        response = client.get('/slow')
+        name = response.headers[profiling.PROFILE_ID_HEADER]
+        self.assertEqual(self.saved(), [name])
+        stats = pstats.Stats(os.path.join(self.directory, name))
+        self.assertGreater(stats.total_calls, 0)
+
+    def test_selected_endpoint_always_kept(self):
+        """Endpoints in PROFILE_ENDPOINTS are kept regardless of latency"""
+        client = self.make_client(endpoints=['fast'])
+        response = client.get('/fast')
+        self.assertIn(profiling.PROFILE_ID_HEADER, response.headers)
+
+    def test_admin_header_requires_token(self):
+        """X-Profile only works with the admin token"""
+        client = self.make_client()
+        client.get('/fast', headers={'X-Profile': '1', 'X-Profile-Token': 'wrong'})
+        self.assertEqual(self.saved(), [])
+        response = client.get('/fast', headers={'X-Profile': '1', 'X-Profile-Token': TOKEN})
+        self.assertIn(profiling.PROFILE_ID_HEADER, response.headers)
+
+    def test_keep_limit(self):
+        """Only the newest PROFILE_KEEP profiles are retained"""
+        client = self.make_client(endpoints=['fast'], keep=2)
+        for _ in range(4):
+            client.get('/fast')
+        self.assertEqual(len(self.saved()), 2)
+
+    def test_list_and_download(self):
+        """Admin endpoints list, download and render profiles"""
+        client = self.make_client(endpoints=['slow'])
+        name = client.get('/slow').headers[profiling.PROFILE_ID_HEADER]
+        headers = {'X-Profile-Token': TOKEN}
+
+        self.assertEqual(client.get('/api/admin/profiles').status_code, 403)
+        listing = client.get('/api/admin/profiles', headers=headers).get_json()['profiles']
+        self.assertEqual(listing[0]['name'], name)
+        self.assertEqual(listing[0]['endpoint'], 'slow')
+        self.assertEqual(listing[0]['method'], 'GET')
+
+        download = client.get(f'/api/admin/profiles/{name}', headers=headers)
+        self.assertEqual(download.status_code, 200)
+        self.assertGreater(len(download.data), 0)
+
+        text = client.get(f'/api/admin/profiles/{name}?format=text', headers=headers)
+        self.assertIn('cumulative', text.get_data(as_text=True))
+
+        self.assertEqual(client.get('/api/admin/profiles/missing.pstats', headers=headers).status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Project Directory
+Tests the in-memory Projects directory used to resolve project names and IDs
+without querying Firestore, with a mocked Firestore client.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import MagicMock
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from services.project_directory import ProjectDirectory
+
+
+def make_doc(doc_id, data):
+    doc = MagicMock()
+    doc.id = doc_id
+    doc.to_dict.return_value = data
+    return doc
+
+
+PROJECTS = [
+    make_doc('p2', {'proj_name': 'Apollo', 'end_date': '2025-12-31'}),
+    make_doc('p1', {'proj_name': ' Apollo ', 'end_date': '2025-06-30'}),
+    make_doc('p3', {'proj_name': 'Gemini'}),
+    make_doc('p4', {}),
+]
+
+
+class TestProjectDirectory(unittest.TestCase):
+    """Unit tests for ProjectDirectory"""
+
+    def setUp(self):
+        self.directory = ProjectDirectory(ttl_seconds=300, use_listener=False)
+        self.mock_db = MagicMock()
+        self.projects_ref = MagicMock()
+        self.projects_ref.stream.return_value = PROJECTS
+        self.mock_db.collection.return_value = self.projects_ref
+        self.directory._db = self.mock_db
+
+    def test_lookup_by_name(self):
+        """Names resolve to (id, data); duplicates resolve to the lowest ID"""
+        project_id, project_data = self.directory.get_project_by_name('Apollo')
+        self.assertEqual(project_id, 'p1')
+        self.assertEqual(project_data['end_date'], '2025-06-30')
+        self.assertEqual(self.directory.get_project_by_name('Gemini')[0], 'p3')
+        self.mock_db.collection.assert_called_with('Projects')
+
+    def test_unknown_name_does_not_scan(self):
+        """A miss returns (None, None) from the cached copy"""
+        self.directory.all_projects()
+        self.assertEqual(self.directory.get_project_by_name('Mercury'), (None, None))
+        self.assertEqual(self.directory.get_project_by_name(''), (None, None))
+        self.assertEqual(self.directory.get_project_by_name(None), (None, None))
+        self.projects_ref.stream.assert_called_once()
+
+    def test_lookup_by_id_returns_copy(self):
+        """get_project returns a copy callers may mutate"""
+        project = self.directory.get_project('p3')
+        project['id'] = 'p3'
+        self.assertNotIn('id', self.directory.get_project('p3'))
+        self.assertIsNone(self.directory.get_project('missing'))
+        self.assertEqual(list(self.directory.all_projects()), ['p1', 'p2', 'p3', 'p4'])
+
+    def test_invalidate_reloads(self):
+        """invalidate() after a project write picks up the new project"""
+        self.assertEqual(self.directory.get_project_by_name('Mercury'), (None, None))
+        self.projects_ref.stream.return_value = PROJECTS + [make_doc('p5', {'proj_name': 'Mercury'})]
+        self.directory.invalidate()
+        self.assertEqual(self.directory.get_project_by_name('Mercury')[0], 'p5')
+        self.assertEqual(self.projects_ref.stream.call_count, 2)
+
+    def test_snapshot_refresh(self):
+        """An on_snapshot callback replaces the directory contents"""
+        self.directory.all_projects()
+        self.directory._on_snapshot([make_doc('p9', {'proj_name': 'Skylab'})], [], None)
+        self.assertEqual(self.directory.get_project_by_name('Skylab')[0], 'p9')
+        self.assertIsNone(self.directory.get_project('p1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
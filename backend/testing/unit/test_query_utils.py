@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Query Utilities
+Tests cursor encoding, page argument parsing, merged cursor pagination over
+an in-memory fake Firestore query, field projection, streamed responses,
+OR / concurrent "any of" queries, and the paginated / projected / streamed
+/api/tasks listing.
+"""
+
+import unittest
+import sys
+import os
+import json
+from unittest.mock import patch, MagicMock
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from flask import Flask, g
+from google.api_core.exceptions import InvalidArgument
+from werkzeug.datastructures import MultiDict
+import query_utils
+from query_utils import (
+    encode_cursor, decode_cursor, get_page_args, fetch_page, slice_page, MAX_PAGE_SIZE,
+    get_fields_arg, apply_projection, TASK_FIELD_PRESETS, TASK_SUMMARY_FIELDS,
+    get_stream_format, stream_any_of, stream_concurrently, fetch_page_any_of,
+)
+
+
+class FakeDoc:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+        self.exists = True
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeQuery:
+    """Minimal Firestore query: equality/array_contains/OR filters, select, ID order, start_after, limit"""
+
+    def __init__(self, docs, filters=(), after=None, limit_count=None, log=None, projection=None,
+                 reject_or=False):
+        self.docs = docs
+        self.filters = list(filters)
+        self.after = after
+        self.limit_count = limit_count
+        self.log = log if log is not None else []
+        self.projection = projection
+        self.reject_or = reject_or
+
+    def _copy(self, **changes):
+        state = dict(docs=self.docs, filters=self.filters, after=self.after,
+                     limit_count=self.limit_count, log=self.log, projection=self.projection,
+                     reject_or=self.reject_or)
+        state.update(changes)
+        return type(self)(**state)
+
+    def where(self, field=None, op=None, value=None, filter=None):
+        if filter is not None:
+            branches = [(f.field_path, f.op_string, f.value) for f in filter.filters]
+            return self._copy(filters=self.filters + [('or', branches, None)])
+        return self._copy(filters=self.filters + [(field, op, value)])
+
+    def order_by(self, field):
+        return self
+
+    def select(self, fields):
+        return self._copy(projection=list(fields))
+
+    def _project(self, data):
+        if self.projection is None:
+            return data
+        return {key: value for key, value in data.items() if key in self.projection}
+
+    def start_after(self, values):
+        return self._copy(after=list(values.values())[0])
+
+    def limit(self, count):
+        return self._copy(limit_count=count)
+
+    @staticmethod
+    def _test(data, field, op, value):
+        if op == '==':
+            return data.get(field) == value
+        if op == 'array_contains':
+            return value in (data.get(field) or [])
+        if op == 'in':
+            return data.get(field) in value
+        raise AssertionError(f'unsupported op {op}')
+
+    def _matches(self, data):
+        for field, op, value in self.filters:
+            if field == 'or':
+                if not any(self._test(data, *branch) for branch in op):
+                    return False
+            elif not self._test(data, field, op, value):
+                return False
+        return True
+
+    def stream(self):
+        if self.reject_or and any(f[0] == 'or' for f in self.filters):
+            raise InvalidArgument('OR queries are not supported')
+        self.log.append(self.limit_count)
+        results = [
+            FakeDoc(doc_id, self._project(data)) for doc_id, data in sorted(self.docs.items())
+            if self._matches(data) and (self.after is None or doc_id > self.after)
+        ]
+        return iter(results[:self.limit_count] if self.limit_count else results)
+
+
+TASKS = {
+    f"t{i:02d}": {
+        'task_name': f"Task {i}",
+        'owner': 'u1' if i % 2 == 0 else 'u2',
+        'assigned_to': ['u1'] if i % 3 == 0 else [],
+        'is_deleted': i == 4,
+        'task_status': 'Completed' if i % 5 == 0 else 'Ongoing',
+        'status_log': [{'status': 'Ongoing'}] * 50,
+    }
+    for i in range(1, 21)
+}
+
+
+class TestCursorsAndArgs(unittest.TestCase):
+    """Unit tests for cursor encoding and page args"""
+
+    def test_cursor_round_trip(self):
+        """Cursors are opaque and decode back to the document ID"""
+        cursor = encode_cursor('abc123')
+        self.assertNotIn('abc123', cursor)
+        self.assertEqual(decode_cursor(cursor), 'abc123')
+
+    def test_invalid_cursor(self):
+        """Malformed cursors raise ValueError"""
+        with self.assertRaises(ValueError):
+            decode_cursor('!!!')
+        with self.assertRaises(ValueError):
+            decode_cursor(encode_cursor('Tasks/t1'))
+
+    def test_page_args(self):
+        """No params = legacy; limit is validated and capped"""
+        self.assertIsNone(get_page_args(MultiDict({'userId': 'u1'})))
+        self.assertEqual(get_page_args(MultiDict({'limit': '10'})), (10, None))
+        self.assertEqual(get_page_args(MultiDict({'limit': '100000'}))[0], MAX_PAGE_SIZE)
+        with self.assertRaises(ValueError):
+            get_page_args(MultiDict({'limit': '0'}))
+        with self.assertRaises(ValueError):
+            get_page_args(MultiDict({'limit': 'ten'}))
+
+
+class TestFieldProjection(unittest.TestCase):
+    """Unit tests for get_fields_arg / apply_projection"""
+
+    def test_no_fields_means_full_documents(self):
+        """Absent or '*' fields keep full documents"""
+        self.assertIsNone(get_fields_arg(MultiDict({})))
+        self.assertIsNone(get_fields_arg(MultiDict({'fields': '*'})))
+        query = FakeQuery(TASKS)
+        self.assertIs(apply_projection(query, None), query)
+
+    def test_field_list_and_required(self):
+        """Explicit fields plus required filter fields, de-duplicated, id ignored"""
+        fields = get_fields_arg(MultiDict({'fields': 'id,task_name, end_date,task_name'}), required=('is_deleted',))
+        self.assertEqual(fields, ['task_name', 'end_date', 'is_deleted'])
+
+    def test_preset(self):
+        """Preset names expand to the default list projection"""
+        fields = get_fields_arg(MultiDict({'fields': 'summary'}), presets=TASK_FIELD_PRESETS)
+        self.assertEqual(fields, list(TASK_SUMMARY_FIELDS))
+
+    def test_invalid_field(self):
+        """Field names are validated"""
+        with self.assertRaises(ValueError):
+            get_fields_arg(MultiDict({'fields': 'task_name,bad field'}))
+
+
+class TestStreamFormat(unittest.TestCase):
+    """Unit tests for get_stream_format"""
+
+    def test_stream_format(self):
+        """Absent/false = buffered; true = ndjson; unknown formats rejected"""
+        self.assertIsNone(get_stream_format(MultiDict({})))
+        self.assertIsNone(get_stream_format(MultiDict({'stream': 'false'})))
+        self.assertEqual(get_stream_format(MultiDict({'stream': '1'})), 'ndjson')
+        self.assertEqual(get_stream_format(MultiDict({'stream': 'JSON'})), 'json')
+        with self.assertRaises(ValueError):
+            get_stream_format(MultiDict({'stream': 'xml'}))
+
+
+class TestFetchPage(unittest.TestCase):
+    """Unit tests for fetch_page / slice_page"""
+
+    def collect(self, queries, limit, include=None):
+        ids, cursor = [], None
+        while True:
+            docs, cursor = fetch_page(queries, limit, cursor, include=include)
+            ids.extend(doc.id for doc in docs)
+            if cursor is None:
+                return ids
+
+    def test_walks_all_pages_in_id_order(self):
+        """Following next_cursor visits every document exactly once"""
+        query = FakeQuery(TASKS)
+        docs, cursor = fetch_page(query, 7)
+        self.assertEqual([d.id for d in docs], [f"t{i:02d}" for i in range(1, 8)])
+        self.assertIsNotNone(cursor)
+        self.assertEqual(self.collect(query, 7), sorted(TASKS))
+
+    def test_fetches_one_page_per_call(self):
+        """Each page reads limit + 1 documents, not the collection"""
+        log = []
+        fetch_page(FakeQuery(TASKS, log=log), 5)
+        self.assertEqual(log, [6])
+
+    def test_merges_queries_without_duplicates(self):
+        """Assigned + owned queries merge in ID order, de-duplicated"""
+        base = FakeQuery(TASKS)
+        queries = [base.where('assigned_to', 'array_contains', 'u1'), base.where('owner', '==', 'u1')]
+        expected = sorted(
+            doc_id for doc_id, data in TASKS.items()
+            if 'u1' in data['assigned_to'] or data['owner'] == 'u1'
+        )
+        self.assertEqual(self.collect(queries, 3), expected)
+
+    def test_include_filter_fills_pages(self):
+        """Client-side filters skip documents but pages stay full"""
+        include = lambda doc: not doc.to_dict()['is_deleted']
+        docs, _ = fetch_page(FakeQuery(TASKS), 5, include=include)
+        self.assertEqual([d.id for d in docs], ['t01', 't02', 't03', 't05', 't06'])
+
+    def test_slice_page(self):
+        """In-memory pages use the same cursor format"""
+        users = {'u3': {}, 'u1': {}, 'u2': {}}
+        page, cursor = slice_page(users, 2)
+        self.assertEqual([uid for uid, _ in page], ['u1', 'u2'])
+        page, cursor = slice_page(users, 2, cursor)
+        self.assertEqual([uid for uid, _ in page], ['u3'])
+        self.assertIsNone(cursor)
+
+
+USER_FILTERS = [('assigned_to', 'array_contains', 'u1'), ('owner', '==', 'u1')]
+U1_TASKS = sorted(
+    doc_id for doc_id, data in TASKS.items()
+    if 'u1' in data['assigned_to'] or data['owner'] == 'u1'
+)
+
+
+class TestAnyOfQueries(unittest.TestCase):
+    """Unit tests for stream_any_of / fetch_page_any_of / stream_concurrently"""
+
+    def setUp(self):
+        patcher = patch.dict(query_utils._or_queries, {'enabled': True})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_single_or_query(self):
+        """One OR query returns each matching document once"""
+        log = []
+        docs = list(stream_any_of(FakeQuery(TASKS, log=log), USER_FILTERS))
+        self.assertEqual([d.id for d in docs], U1_TASKS)
+        self.assertEqual(len(log), 1)
+
+    def test_fallback_to_concurrent_queries(self):
+        """A rejected OR query falls back to concurrent queries and stays off"""
+        log = []
+        query = FakeQuery(TASKS, log=log, reject_or=True)
+        with self.assertLogs('backend.query_utils', level='WARNING'):
+            docs = list(stream_any_of(query, USER_FILTERS))
+        self.assertEqual(sorted(d.id for d in docs), U1_TASKS)
+        self.assertEqual(len(docs), len(U1_TASKS))
+        self.assertEqual(len(log), 2)
+        self.assertFalse(query_utils.or_queries_enabled())
+
+    def test_type_error_propagates(self):
+        """A bad filter is a bug: it raises and leaves OR queries enabled"""
+        class BadQuery(FakeQuery):
+            def where(self, *args, **kwargs):
+                raise TypeError('bad filter value')
+
+        with self.assertRaises(TypeError):
+            list(stream_any_of(BadQuery(TASKS), USER_FILTERS))
+        with self.assertRaises(TypeError):
+            fetch_page_any_of(BadQuery(TASKS), USER_FILTERS, 3)
+        self.assertTrue(query_utils.or_queries_enabled())
+
+    def test_paged_fallback(self):
+        """Paging works with and without OR support"""
+        page, cursor = fetch_page_any_of(FakeQuery(TASKS), USER_FILTERS, 3)
+        self.assertEqual([d.id for d in page], U1_TASKS[:3])
+        with self.assertLogs('backend.query_utils', level='WARNING'):
+            page, _ = fetch_page_any_of(FakeQuery(TASKS, reject_or=True), USER_FILTERS, 3, cursor)
+        self.assertEqual([d.id for d in page], U1_TASKS[3:6])
+
+    def test_concurrent_queries_share_request_context(self):
+        """Worker threads see the request's g (accounting, document cache)"""
+        seen = []
+
+        class ContextQuery(FakeQuery):
+            def stream(self):
+                seen.append(g.marker)
+                return super().stream()
+
+        app = Flask(__name__)
+        with app.test_request_context('/'):
+            g.marker = 'request-1'
+            base = ContextQuery(TASKS)
+            queries = [base.where(*f) for f in USER_FILTERS]
+            docs = list(stream_concurrently(queries))
+        self.assertEqual(seen, ['request-1', 'request-1'])
+        self.assertEqual(sorted(d.id for d in docs), U1_TASKS)
+
+    def test_concurrent_query_errors_propagate(self):
+        """A failing query raises in the consumer"""
+        class BrokenQuery(FakeQuery):
+            def stream(self):
+                raise RuntimeError('boom')
+
+        with self.assertRaises(RuntimeError):
+            list(stream_concurrently([FakeQuery(TASKS), BrokenQuery(TASKS)]))
+
+
+class TestPaginatedTaskListing(unittest.TestCase):
+    """GET /api/tasks with and without pagination parameters"""
+
+    def setUp(self):
+        from routes.task import tasks_bp
+        app = Flask(__name__)
+        app.register_blueprint(tasks_bp)
+        self.client = app.test_client()
+        db = MagicMock()
+        db.collection.return_value = FakeQuery(TASKS)
+        patcher = patch('routes.task.get_firestore_client', return_value=db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_legacy_array_without_params(self):
+        """Without limit/cursor the response is the legacy array"""
+        response = self.client.get('/api/tasks')
+        self.assertIsInstance(response.get_json(), list)
+        self.assertEqual(len(response.get_json()), 19)
+
+    def test_paged_response(self):
+        """limit/cursor return {items, next_cursor} and honour filters"""
+        first = self.client.get('/api/tasks?userId=u1&limit=3').get_json()
+        self.assertEqual([t['id'] for t in first['items']], ['t02', 't03', 't06'])
+        second = self.client.get(f"/api/tasks?userId=u1&limit=3&cursor={first['next_cursor']}").get_json()
+        self.assertEqual([t['id'] for t in second['items']], ['t08', 't09', 't10'])
+
+    def test_projected_response(self):
+        """?fields= drops unrequested fields but keeps filter fields and id"""
+        tasks = self.client.get('/api/tasks?fields=task_name&status=completed').get_json()
+        self.assertEqual([t['id'] for t in tasks], ['t05', 't10', 't15', 't20'])
+        self.assertEqual(set(tasks[0]), {'id', 'task_name', 'is_deleted', 'task_status'})
+
+    def test_filters_pushed_into_query(self):
+        """is_deleted and known status groups become Firestore filters"""
+        streamed = []
+
+        class RecordingQuery(FakeQuery):
+            def stream(self):
+                streamed.append(self.filters)
+                return super().stream()
+
+        db = MagicMock()
+        db.collection.return_value = RecordingQuery(TASKS)
+        with patch('routes.task.get_firestore_client', return_value=db), \
+                patch('routes.task.TASK_SERVER_FILTERS', True):
+            tasks = self.client.get('/api/tasks?status=active').get_json()
+        self.assertEqual(len(tasks), 15)
+        self.assertEqual(streamed, [[
+            ('is_deleted', '==', False),
+            ('task_status', 'in', ['Ongoing', 'Unassigned', 'Under Review']),
+        ]])
+
+    def test_filters_off_by_default(self):
+        """Until TASK_SERVER_FILTERS=1, legacy tasks without is_deleted are still listed"""
+        streamed = []
+
+        class RecordingQuery(FakeQuery):
+            def stream(self):
+                streamed.append(self.filters)
+                return super().stream()
+
+        db = MagicMock()
+        db.collection.return_value = RecordingQuery(TASKS)
+        with patch('routes.task.get_firestore_client', return_value=db):
+            tasks = self.client.get('/api/tasks?status=active').get_json()
+        self.assertEqual(len(tasks), 15)
+        self.assertEqual(streamed, [[]])
+
+    def test_unknown_status_filtered_in_python(self):
+        """Statuses outside the stored vocabulary are still honoured"""
+        tasks = self.client.get('/api/tasks?status=blocked').get_json()
+        self.assertEqual(tasks, [])
+
+    def test_paged_deleted_tasks(self):
+        """/api/tasks/deleted pages the user's deleted tasks"""
+        page = self.client.get('/api/tasks/deleted?userId=u1&limit=5').get_json()
+        self.assertEqual([t['id'] for t in page['items']], ['t04'])
+        self.assertIsNone(page['next_cursor'])
+
+    def test_invalid_limit(self):
+        """Bad pagination params are a 400"""
+        self.assertEqual(self.client.get('/api/tasks?limit=-1').status_code, 400)
+
+    def test_ndjson_stream(self):
+        """?stream=ndjson sends one task per line, same tasks as the array"""
+        response = self.client.get('/api/tasks?userId=u1&stream=ndjson')
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = response.get_data(as_text=True).splitlines()
+        expected = self.client.get('/api/tasks?userId=u1').get_json()
+        self.assertEqual([json.loads(line) for line in lines], expected)
+
+    def test_json_array_stream(self):
+        """?stream=json sends a chunked but valid JSON array"""
+        response = self.client.get('/api/tasks?stream=json&fields=task_name')
+        self.assertTrue(response.is_streamed)
+        tasks = json.loads(response.get_data(as_text=True))
+        self.assertEqual(len(tasks), 19)
+        self.assertIn('task_name', tasks[0])
+
+    def test_invalid_stream(self):
+        """Unknown stream formats are a 400"""
+        self.assertEqual(self.client.get('/api/tasks?stream=xml').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Request-scoped Document Cache
+Tests the flask.g identity map in firebase_utils: one read per document per
+request, invalidation on writes and pass-through outside a request.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import MagicMock
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from flask import Flask
+from firebase_utils import get_document, cache_document, update_document, delete_document
+
+
+def make_ref(path):
+    ref = MagicMock()
+    ref.path = path
+    return ref
+
+
+class TestRequestDocumentCache(unittest.TestCase):
+    """Unit tests for get_document / update_document"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+
+    def test_document_read_once_per_request(self):
+        """Repeated reads of the same path hit Firestore once"""
+        ref = make_ref('Tasks/t1')
+        with self.app.test_request_context():
+            first = get_document(ref)
+            second = get_document(ref)
+        self.assertIs(first, second)
+        ref.get.assert_called_once()
+
+    def test_cache_keyed_by_path(self):
+        """Different references to the same path share the cached snapshot"""
+        ref_a = make_ref('Users/u1')
+        ref_b = make_ref('Users/u1')
+        with self.app.test_request_context():
+            get_document(ref_a)
+            get_document(ref_b)
+        ref_a.get.assert_called_once()
+        ref_b.get.assert_not_called()
+
+    def test_update_invalidates(self):
+        """A write made through update_document forces a fresh read"""
+        ref = make_ref('Tasks/t1')
+        with self.app.test_request_context():
+            get_document(ref)
+            update_document(ref, {'task_status': 'Completed'})
+            get_document(ref)
+        ref.update.assert_called_once_with({'task_status': 'Completed'})
+        self.assertEqual(ref.get.call_count, 2)
+
+    def test_delete_invalidates(self):
+        """delete_document drops the cached snapshot"""
+        ref = make_ref('subtasks/s1')
+        with self.app.test_request_context():
+            get_document(ref)
+            delete_document(ref)
+            get_document(ref)
+        self.assertEqual(ref.get.call_count, 2)
+
+    def test_cache_document_seeds_snapshot(self):
+        """Snapshots from queries can seed the cache"""
+        ref = make_ref('Tasks/t2')
+        snapshot = MagicMock()
+        snapshot.reference = ref
+        with self.app.test_request_context():
+            cache_document(snapshot)
+            self.assertIs(get_document(ref), snapshot)
+        ref.get.assert_not_called()
+
+    def test_cache_is_per_request(self):
+        """A new request starts with an empty cache"""
+        ref = make_ref('Projects/p1')
+        with self.app.test_request_context():
+            get_document(ref)
+        with self.app.test_request_context():
+            get_document(ref)
+        self.assertEqual(ref.get.call_count, 2)
+
+    def test_passthrough_without_app_context(self):
+        """Outside a request every call reads Firestore"""
+        ref = make_ref('Users/u2')
+        get_document(ref)
+        get_document(ref)
+        self.assertEqual(ref.get.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
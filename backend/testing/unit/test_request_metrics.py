@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Request Metrics
+Tests per-route latency histograms, error counting and the /metrics endpoint.
+"""
+
+import unittest
+import sys
+import os
+from flask import Flask, Blueprint, jsonify
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import metrics
+from metrics import RequestMetrics, RouteStats
+
+
+class TestRouteStats(unittest.TestCase):
+    """Unit tests for RouteStats"""
+
+    def test_histogram_and_percentiles(self):
+        """Observations land in buckets and percentiles use bucket bounds"""
+        stats = RouteStats()
+        for duration_ms in (3, 3, 3, 40, 40, 40, 40, 40, 400, 20000):
+            stats.observe(200, duration_ms)
+        summary = stats.summary()
+        self.assertEqual(summary['count'], 10)
+        self.assertEqual(summary['p50_ms'], 50.0)
+        self.assertEqual(summary['p95_ms'], 20000.0)
+        self.assertEqual(summary['max_ms'], 20000.0)
+        self.assertEqual(sum(stats.buckets), 10)
+
+    def test_error_rates(self):
+        """5xx count as errors, 4xx as client errors"""
+        stats = RouteStats()
+        stats.observe(200, 1)
+        stats.observe(404, 1)
+        stats.observe(500, 1)
+        stats.observe(503, 1)
+        summary = stats.summary()
+        self.assertEqual(summary['errors'], 2)
+        self.assertEqual(summary['client_errors'], 1)
+        self.assertEqual(summary['error_rate'], 0.5)
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    """Unit tests for metrics.init_app"""
+
+    def setUp(self):
+        self.metrics = RequestMetrics()
+        self.app = Flask(__name__)
+        items_bp = Blueprint('items', __name__)
+
+        @items_bp.route('/api/items/<item_id>')
+        def get_item(item_id):
+            return jsonify({'id': item_id}), 200
+
+        @items_bp.route('/api/broken')
+        def broken():
+            return jsonify({'error': 'boom'}), 500
+
+        self.app.register_blueprint(items_bp)
+        metrics.init_app(self.app, self.metrics)
+        self.client = self.app.test_client()
+
+    def test_routes_grouped_by_rule(self):
+        """Requests are grouped by URL rule, not by concrete path"""
+        self.client.get('/api/items/1')
+        self.client.get('/api/items/2')
+        self.client.get('/api/broken')
+
+        snapshot = self.client.get('/metrics?format=json').get_json()
+        routes = {r['route']: r for r in snapshot['routes']}
+        self.assertEqual(routes['/api/items/<item_id>']['count'], 2)
+        self.assertEqual(routes['/api/broken']['errors'], 1)
+        self.assertEqual(snapshot['blueprints']['items']['count'], 3)
+
+    def test_unmatched_paths_share_one_series(self):
+        """404s for unknown paths do not create a series per path"""
+        self.client.get('/nope/1')
+        self.client.get('/nope/2')
+        snapshot = self.metrics.snapshot()
+        unmatched = [r for r in snapshot['routes'] if r['route'] == '<unmatched>']
+        self.assertEqual(len(unmatched), 1)
+        self.assertEqual(unmatched[0]['client_errors'], 2)
+
+    def test_prometheus_format(self):
+        """Default /metrics output is Prometheus text"""
+        self.client.get('/api/items/1')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        body = response.get_data(as_text=True)
+        self.assertIn('http_requests_total{blueprint="items",method="GET",route="/api/items/<item_id>",status="2xx"} 1', body)
+        self.assertIn('le="+Inf"', body)
+
+    def test_gauges_published(self):
+        """add_gauges values appear in both formats; nested dicts are flattened"""
+        self.metrics.add_gauges('password_pool', lambda: {'in_flight': 2, 'latency_ms': {'p95': 41.5}})
+
+        snapshot = self.client.get('/metrics?format=json').get_json()
+        self.assertEqual(snapshot['password_pool']['in_flight'], 2)
+        body = self.client.get('/metrics').get_data(as_text=True)
+        self.assertIn('password_pool_in_flight 2', body)
+        self.assertIn('password_pool_latency_ms_p95 41.5', body)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Task Field Service
+Tests task_status canonicalisation and the is_deleted / task_status backfill
+with a mocked Firestore client.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import MagicMock
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from services.task_field_service import TaskFieldService, canonical_task_status, known_task_status
+
+
+def make_doc(doc_id, data):
+    doc = MagicMock()
+    doc.id = doc_id
+    doc.to_dict.return_value = data
+    return doc
+
+
+class TestTaskStatus(unittest.TestCase):
+    """Unit tests for canonical_task_status / known_task_status"""
+
+    def test_canonical_status(self):
+        """Known statuses are re-spelled, blanks default, others kept"""
+        self.assertEqual(canonical_task_status(' under review '), 'Under Review')
+        self.assertEqual(canonical_task_status(''), 'Unassigned')
+        self.assertEqual(canonical_task_status(None), 'Unassigned')
+        self.assertEqual(canonical_task_status('Blocked'), 'Blocked')
+
+    def test_known_status(self):
+        """Only the stored vocabulary is 'known'"""
+        self.assertEqual(known_task_status('ONGOING'), 'Ongoing')
+        self.assertIsNone(known_task_status('blocked'))
+        self.assertIsNone(known_task_status(None))
+
+
+class TestTaskFieldBackfill(unittest.TestCase):
+    """Unit tests for TaskFieldService.backfill_task_fields"""
+
+    def setUp(self):
+        self.service = TaskFieldService()
+        self.mock_db = MagicMock()
+        self.service._db = self.mock_db
+        self.batch = self.mock_db.batch.return_value
+        self.docs = [
+            make_doc('t1', {'is_deleted': False, 'task_status': 'Ongoing'}),
+            make_doc('t2', {'task_status': 'Completed'}),
+            make_doc('t3', {'is_deleted': True, 'task_status': ''}),
+            make_doc('t4', {'is_deleted': False, 'status': 'under review'}),
+        ]
+        self.mock_db.collection.return_value.stream.return_value = self.docs
+
+    def updates(self):
+        return {call.args[0]: call.args[1] for call in self.batch.update.call_args_list}
+
+    def test_backfills_missing_fields(self):
+        """Only documents with missing or non-canonical fields are written"""
+        count = self.service.backfill_task_fields()
+        self.assertEqual(count, 3)
+        self.assertEqual(self.updates(), {
+            self.docs[1].reference: {'is_deleted': False},
+            self.docs[2].reference: {'task_status': 'Unassigned'},
+            self.docs[3].reference: {'task_status': 'Under Review'},
+        })
+        self.batch.commit.assert_called_once()
+
+    def test_is_deleted_only(self):
+        """Each fix can be run on its own"""
+        self.assertEqual(self.service.backfill_task_fields(task_status=False), 1)
+
+    def test_commits_in_batches(self):
+        """Writes are committed every batch_size documents"""
+        self.service.backfill_task_fields(batch_size=2)
+        self.assertEqual(self.batch.commit.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - Task Update
+Tests PUT /api/tasks/<id>: the task is read once inside a transaction,
+permissions and the update are computed from that read, and the response is
+built from the merged state without reading the task back.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import MagicMock, patch
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from firebase_admin import firestore
+from flask import Flask
+from routes.task import TaskUpdateRejected, _plan_task_update, tasks_bp
+
+TASK = {
+    'task_name': 'Report',
+    'task_status': 'Ongoing',
+    'owner': 'u1',
+    'assigned_to': ['u1', 'u2'],
+    'proj_ID': 'p1',
+    'recurrence_series_id': 't1',
+    'status_log': [],
+}
+
+PROJECT = {'proj_name': 'Demo', 'end_date': '2030-12-31'}
+
+
+def make_snapshot(doc_id, data, exists=True):
+    snapshot = MagicMock()
+    snapshot.id = doc_id
+    snapshot.exists = exists
+    snapshot.to_dict.return_value = dict(data) if exists else None
+    snapshot.reference.id = doc_id
+    return snapshot
+
+
+class TestPlanTaskUpdate(unittest.TestCase):
+    """Unit tests for _plan_task_update"""
+
+    def setUp(self):
+        patcher = patch('routes.task.project_directory')
+        patcher.start().get_project.return_value = PROJECT
+        self.addCleanup(patcher.stop)
+
+    def test_owner_update(self):
+        """Owners may change any field; updatedAt is set by the server"""
+        plan = _plan_task_update(TASK, 't1', {'task_name': 'Final report'}, None, 'u1', 'Alice')
+        self.assertEqual(plan['task_update']['task_name'], 'Final report')
+        self.assertIs(plan['task_update']['updatedAt'], firestore.SERVER_TIMESTAMP)
+        self.assertFalse(plan['status_changed'])
+
+    def test_collaborator_fields_filtered(self):
+        """Collaborators only update the allowed fields"""
+        with self.assertRaises(TaskUpdateRejected) as ctx:
+            _plan_task_update(TASK, 't1', {'task_name': 'Nope'}, None, 'u2', 'Bob')
+        self.assertEqual(ctx.exception.status_code, 400)
+
+    def test_non_member_rejected(self):
+        """Users who neither own nor are assigned get 403"""
+        with self.assertRaises(TaskUpdateRejected) as ctx:
+            _plan_task_update(TASK, 't1', {'task_desc': 'x'}, None, 'u9', 'Eve')
+        self.assertEqual(ctx.exception.status_code, 403)
+
+    def test_invalid_recurrence_rejected(self):
+        """Recurrence validation errors abort the update"""
+        with self.assertRaises(TaskUpdateRejected):
+            _plan_task_update(TASK, 't1', {'recurrence': {'enabled': True}}, None, 'u1', 'Alice')
+
+    def test_status_change_logged(self):
+        """A status change is appended to status_log and status_history"""
+        plan = _plan_task_update(TASK, 't1', {'task_status': 'Completed'}, None, 'u2', 'Bob')
+        self.assertTrue(plan['status_changed'])
+        self.assertEqual(plan['status_log_entries'][0]['new_status'], 'Completed')
+        self.assertEqual(plan['task_update']['status_history'][0]['staff_name'], 'Bob')
+        self.assertIn('status_log', plan['task_update'])
+
+    def test_status_stored_in_canonical_spelling(self):
+        """Client casing and blanks are stored as the canonical task_status"""
+        plan = _plan_task_update(TASK, 't1', {'task_status': 'under review'}, None, 'u2', 'Bob')
+        self.assertEqual(plan['task_update']['task_status'], 'Under Review')
+        self.assertEqual(plan['new_status_normalized'], 'Under Review')
+
+        plan = _plan_task_update(TASK, 't1', {'task_status': ''}, None, 'u1', 'Alice')
+        self.assertEqual(plan['task_update']['task_status'], 'Unassigned')
+
+    def test_case_only_status_change_not_logged(self):
+        """Re-sending the current status in another casing is not a status change"""
+        plan = _plan_task_update(TASK, 't1', {'task_status': 'ongoing'}, None, 'u2', 'Bob')
+        self.assertFalse(plan['status_changed'])
+        self.assertEqual(plan['task_update']['task_status'], 'Ongoing')
+
+
+class TestUpdateTaskRoute(unittest.TestCase):
+    """Unit tests for the transactional PUT /api/tasks/<id>"""
+
+    def setUp(self):
+        app = Flask(__name__)
+        app.register_blueprint(tasks_bp)
+        self.client = app.test_client()
+
+        self.db = MagicMock()
+        self.transaction = MagicMock()
+        self.transaction._max_attempts = 1
+        self.transaction._read_only = False
+        self.db.transaction.return_value = self.transaction
+        self.tasks_col = self.db.collection.return_value
+        self.doc_ref = self.tasks_col.document.return_value
+
+        self.index = MagicMock()
+        self.jobs = MagicMock()
+        for target, value in (
+            ('routes.task.get_firestore_client', MagicMock(return_value=self.db)),
+            ('routes.task.user_task_index', self.index),
+            ('routes.task.job_queue', self.jobs),
+            ('routes.task.invalidate_document', MagicMock()),
+            ('routes.task.project_directory', MagicMock(**{'get_project.return_value': PROJECT})),
+        ):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def put(self, payload, user_id='u1', task_id='t1'):
+        return self.client.put(
+            f'/api/tasks/{task_id}', json=payload,
+            headers={'X-User-Id': user_id, 'X-User-Name': 'Alice'},
+        )
+
+    def test_single_read_and_merged_response(self):
+        """The task is read once in the transaction and never read back"""
+        self.doc_ref.get.return_value = make_snapshot('t1', TASK)
+
+        response = self.put({'task_name': 'Final report', 'task_status': 'Completed'})
+
+        self.assertEqual(response.status_code, 200)
+        self.doc_ref.get.assert_called_once_with(transaction=self.transaction)
+        self.transaction.update.assert_called_once()
+        self.transaction._commit.assert_called_once()
+        self.index.stage.assert_called_once()
+        body = response.get_json()
+        self.assertEqual(body['id'], 't1')
+        self.assertEqual(body['task_name'], 'Final report')
+        self.assertEqual(body['status_log'][-1]['new_status'], 'Completed')
+        # Assignee notifications are queued, not sent inline
+        job_type, = self.jobs.enqueue.call_args.args
+        self.assertEqual(job_type, 'notify_updated')
+        self.assertEqual(self.jobs.enqueue.call_args.kwargs['user_ids'], ['u1', 'u2'])
+
+    def test_rejection_rolls_back(self):
+        """Permission errors abort the transaction without writing"""
+        self.doc_ref.get.return_value = make_snapshot('t1', TASK)
+
+        response = self.put({'task_desc': 'x'}, user_id='u9')
+
+        self.assertEqual(response.status_code, 403)
+        self.transaction.update.assert_not_called()
+        self.transaction._commit.assert_not_called()
+
+    def test_task_id_fallback_in_transaction(self):
+        """Unknown document ids resolve by task_ID inside the transaction"""
+        self.doc_ref.get.return_value = make_snapshot('T-1', {}, exists=False)
+        query = self.tasks_col.where.return_value
+        query.limit.return_value.stream.return_value = [make_snapshot('t1', TASK)]
+
+        response = self.put({'task_desc': 'Updated'}, task_id='T-1')
+
+        self.assertEqual(response.status_code, 200)
+        query.limit.return_value.stream.assert_called_with(transaction=self.transaction)
+        self.assertEqual(response.get_json()['id'], 't1')
+
+    def test_missing_task(self):
+        """No document and no task_ID match is a 404"""
+        self.doc_ref.get.return_value = make_snapshot('t1', {}, exists=False)
+        self.tasks_col.where.return_value.limit.return_value.stream.return_value = []
+
+        response = self.put({'task_desc': 'x'})
+
+        self.assertEqual(response.status_code, 404)
+        self.transaction.update.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - User Directory
+Tests the in-memory Users directory: indexed lookups, TTL reloads and
+snapshot-listener driven refreshes with a mocked Firestore client.
+"""
+
+import unittest
+import sys
+import os
+import threading
+import time
+from unittest.mock import MagicMock
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from services.user_directory import UserDirectory
+
+
+def make_doc(doc_id, data):
+    doc = MagicMock()
+    doc.id = doc_id
+    doc.to_dict.return_value = data
+    return doc
+
+
+USERS = [
+    make_doc('u2', {'name': 'Bob', 'email': 'Bob@X.com', 'division_name': 'IT', 'role_num': 4}),
+    make_doc('u1', {'name': 'Alice', 'email': 'alice@x.com', 'division_name': 'IT', 'role_num': 3}),
+    make_doc('u3', {'name': 'Carol', 'email': 'carol@x.com', 'division_name': 'Sales', 'role_num': '4'}),
+]
+
+
+class TestUserDirectory(unittest.TestCase):
+    """Unit tests for UserDirectory"""
+
+    def setUp(self):
+        self.directory = UserDirectory(ttl_seconds=300, use_listener=False)
+        self.mock_db = MagicMock()
+        self.users_ref = MagicMock()
+        self.users_ref.stream.return_value = USERS
+        self.mock_db.collection.return_value = self.users_ref
+        self.directory._db = self.mock_db
+
+    def test_loads_once_within_ttl(self):
+        """Repeated lookups reuse the loaded directory"""
+        self.directory.all_users()
+        self.directory.get_user('u1')
+        self.directory.get_users_by_division('IT')
+        self.users_ref.stream.assert_called_once()
+
+    def test_all_users_ordered_by_id(self):
+        """all_users returns every user ordered by document ID"""
+        self.assertEqual(list(self.directory.all_users()), ['u1', 'u2', 'u3'])
+
+    def test_lookup_by_id_returns_copy(self):
+        """get_user returns a copy callers may mutate"""
+        user = self.directory.get_user('u1')
+        user['id'] = 'u1'
+        self.assertNotIn('id', self.directory.get_user('u1'))
+        self.assertIsNone(self.directory.get_user('missing'))
+
+    def test_lookup_by_email_case_insensitive(self):
+        """Emails are indexed lowercased"""
+        user_id, user_data = self.directory.get_user_by_email(' bob@x.com ')
+        self.assertEqual(user_id, 'u2')
+        self.assertEqual(user_data['name'], 'Bob')
+
+    def test_lookup_by_division_and_role(self):
+        """(division, role_num) index normalizes string role numbers"""
+        self.assertEqual(list(self.directory.get_users_by_division('IT', role_num=4)), ['u2'])
+        self.assertEqual(list(self.directory.get_users_by_division('Sales', role_num=4)), ['u3'])
+        self.assertEqual(list(self.directory.get_users_by_division('IT')), ['u1', 'u2'])
+
+    def test_fingerprint_tracks_contents(self):
+        """Same documents give the same fingerprint in any process; edits change it"""
+        other = UserDirectory(ttl_seconds=300, use_listener=False)
+        other._db = self.mock_db
+        self.assertEqual(self.directory.fingerprint, other.fingerprint)
+
+        edited = make_doc('u1', {'name': 'Alice B', 'email': 'alice@x.com'})
+        edited.update_time = 'later'
+        self.users_ref.stream.return_value = [edited] + USERS[::2]
+        other.invalidate()
+        self.assertNotEqual(self.directory.fingerprint, other.fingerprint)
+
+    def test_invalidate_reloads_without_listener(self):
+        """invalidate forces a reload when no listener is active"""
+        self.directory.all_users()
+        version = self.directory.version
+        self.directory.invalidate()
+        self.directory.all_users()
+        self.assertEqual(self.users_ref.stream.call_count, 2)
+        self.assertGreater(self.directory.version, version)
+
+    def test_ttl_expiry_reloads(self):
+        """An expired TTL triggers a reload"""
+        self.directory.ttl_seconds = 0
+        self.directory.all_users()
+        self.directory.all_users()
+        self.assertEqual(self.users_ref.stream.call_count, 2)
+
+    def test_snapshot_listener_keeps_directory_fresh(self):
+        """The first snapshot loads the directory (no extra stream) and later ones replace it"""
+        self.directory.use_listener = True
+        self.directory.ttl_seconds = 0
+        watch = MagicMock()
+        watch.is_active = True
+
+        def start_watch(callback):
+            # Like a real watch, deliver the initial snapshot from another thread
+            threading.Thread(target=callback, args=(USERS, [], None)).start()
+            return watch
+
+        self.users_ref.on_snapshot.side_effect = start_watch
+
+        self.assertEqual(len(self.directory.all_users()), 3)
+        self.users_ref.stream.assert_not_called()
+
+        callback = self.users_ref.on_snapshot.call_args[0][0]
+        callback([make_doc('u9', {'name': 'Zed', 'division_name': 'IT', 'role_num': 4})], [], None)
+
+        self.assertEqual(list(self.directory.all_users()), ['u9'])
+        self.users_ref.on_snapshot.assert_called_once()
+        self.users_ref.stream.assert_not_called()
+
+    def test_silent_listener_falls_back_to_stream(self):
+        """A listener that sends no snapshot in time does not block loads"""
+        self.directory.use_listener = True
+        self.directory.listener_wait_seconds = 0.05
+        self.users_ref.on_snapshot.return_value = MagicMock()
+
+        self.assertEqual(len(self.directory.all_users()), 3)
+        self.users_ref.stream.assert_called_once()
+
+    def test_listener_restart_serves_stale_directory(self):
+        """A dead listener is restarted without blocking while data is loaded"""
+        self.directory.use_listener = True
+        self.directory.ttl_seconds = 0
+        self.directory.listener_wait_seconds = 60
+        watch = MagicMock()
+        watch.is_active = True
+
+        def start_watch(callback):
+            callback(USERS, [], None)
+            return watch
+
+        self.users_ref.on_snapshot.side_effect = start_watch
+        self.directory.all_users()
+
+        # The listener dies; its replacement has not delivered a snapshot yet
+        watch.is_active = False
+        self.users_ref.on_snapshot.side_effect = None
+        self.users_ref.on_snapshot.return_value = MagicMock()
+
+        started = time.monotonic()
+        self.assertEqual(len(self.directory.all_users()), 3)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(self.users_ref.on_snapshot.call_count, 2)
+        self.users_ref.stream.assert_not_called()
+
+    def test_restarted_listener_that_never_syncs_reloads(self):
+        """Stale data is reloaded directly once the restarted listener times out"""
+        self.directory.use_listener = True
+        self.directory.ttl_seconds = 0
+        self.directory.listener_wait_seconds = 0
+        self.users_ref.on_snapshot.return_value = MagicMock()
+
+        self.directory.all_users()
+        self.assertEqual(self.users_ref.stream.call_count, 1)
+        self.directory.all_users()
+        self.assertEqual(self.users_ref.stream.call_count, 2)
+
+    def test_listener_failure_falls_back_to_ttl(self):
+        """If on_snapshot cannot start, the directory still serves from TTL loads"""
+        self.directory.use_listener = True
+        self.users_ref.on_snapshot.side_effect = Exception("no listener")
+
+        self.assertEqual(len(self.directory.all_users()), 3)
+        self.directory.get_user('u1')
+        self.users_ref.stream.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
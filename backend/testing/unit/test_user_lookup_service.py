@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - User Lookup Service
+Tests indexed email lookup, the bounded email -> user ID cache and the
+email_lower backfill with a mocked Firestore client.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import MagicMock
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from services.user_lookup_service import UserLookupService, normalize_email
+
+
+def make_doc(doc_id, data, exists=True):
+    doc = MagicMock()
+    doc.id = doc_id
+    doc.exists = exists
+    doc.to_dict.return_value = data
+    return doc
+
+
+class TestUserLookupService(unittest.TestCase):
+    """Unit tests for UserLookupService"""
+
+    def setUp(self):
+        self.service = UserLookupService(max_entries=2)
+        self.mock_db = MagicMock()
+        self.users_ref = MagicMock()
+        self.mock_db.collection.return_value = self.users_ref
+        self.service._db = self.mock_db
+
+    def test_normalize_email(self):
+        """Emails are trimmed and lowercased"""
+        self.assertEqual(normalize_email('  John.Doe@Example.COM '), 'john.doe@example.com')
+        self.assertEqual(normalize_email(None), '')
+
+    def test_lookup_uses_email_lower_query(self):
+        """Cache miss runs a single equality query on email_lower"""
+        doc = make_doc('u1', {'email': 'a@x.com', 'email_lower': 'a@x.com'})
+        self.users_ref.where.return_value.limit.return_value.stream.return_value = [doc]
+
+        result = self.service.find_user_by_email('A@X.com')
+
+        self.assertEqual(result.id, 'u1')
+        self.users_ref.where.assert_called_once_with('email_lower', '==', 'a@x.com')
+        self.users_ref.stream.assert_not_called()
+
+    def test_cache_hit_reads_document_by_id(self):
+        """Second lookup reads the cached document instead of querying"""
+        doc = make_doc('u1', {'email': 'a@x.com'})
+        self.users_ref.where.return_value.limit.return_value.stream.return_value = [doc]
+        self.users_ref.document.return_value.get.return_value = doc
+
+        self.service.find_user_by_email('a@x.com')
+        self.users_ref.where.reset_mock()
+        result = self.service.find_user_by_email('a@x.com')
+
+        self.assertEqual(result.id, 'u1')
+        self.users_ref.document.assert_called_with('u1')
+        self.users_ref.where.assert_not_called()
+
+    def test_stale_cache_entry_falls_back_to_query(self):
+        """A cached ID whose document is gone is dropped and re-queried"""
+        self.service.remember('a@x.com', 'old')
+        self.users_ref.document.return_value.get.return_value = make_doc('old', None, exists=False)
+        self.users_ref.where.return_value.limit.return_value.stream.return_value = []
+
+        result = self.service.find_user_by_email('a@x.com')
+
+        self.assertIsNone(result)
+        self.assertIsNone(self.service._cache_get('a@x.com'))
+
+    def test_legacy_record_is_backfilled(self):
+        """Records without email_lower are found by email and backfilled"""
+        legacy = make_doc('u2', {'email': 'b@x.com'})
+        query = self.users_ref.where.return_value.limit.return_value
+        query.stream.side_effect = [[], [legacy]]
+
+        result = self.service.find_user_by_email('b@x.com')
+
+        self.assertEqual(result.id, 'u2')
+        legacy.reference.update.assert_called_once_with({'email_lower': 'b@x.com'})
+
+    def test_mixed_case_legacy_record_found_by_scan(self):
+        """A miss backfills every stale record in one pass and retries the indexed query"""
+        legacy = make_doc('u3', {'email': 'Mixed.Case@X.com'})
+        other = make_doc('u5', {'email': 'Other@X.com'})
+        current = make_doc('u4', {'email': 'c@x.com', 'email_lower': 'c@x.com'})
+        query = self.users_ref.where.return_value.limit.return_value
+        query.stream.side_effect = [[], [], [legacy]]
+        self.users_ref.stream.return_value = [current, legacy, other]
+        batch = self.mock_db.batch.return_value
+
+        result = self.service.find_user_by_email('mixed.case@x.com')
+
+        self.assertEqual(result.id, 'u3')
+        self.assertEqual(batch.update.call_count, 2)
+        batch.update.assert_any_call(legacy.reference, {'email_lower': 'mixed.case@x.com'})
+        batch.update.assert_any_call(other.reference, {'email_lower': 'other@x.com'})
+        self.assertEqual(self.service._cache_get('mixed.case@x.com'), 'u3')
+
+        # Every stale record was backfilled, so an unknown email no longer scans
+        query.stream.side_effect = None
+        query.stream.return_value = []
+        self.users_ref.stream.reset_mock()
+        self.assertIsNone(self.service.find_user_by_email('nobody@x.com'))
+        self.users_ref.stream.assert_not_called()
+
+    def test_failed_backfill_is_retried_on_next_miss(self):
+        """A backfill that fails during lookup leaves the scan enabled"""
+        self.users_ref.where.return_value.limit.return_value.stream.return_value = []
+        self.users_ref.stream.return_value = [make_doc('u5', {'email': 'Other@X.com'})]
+        self.mock_db.batch.return_value.commit.side_effect = [RuntimeError('unavailable'), None]
+
+        self.assertIsNone(self.service.find_user_by_email('nobody@x.com'))
+        self.assertIsNone(self.service.find_user_by_email('nobody@x.com'))
+        self.assertIsNone(self.service.find_user_by_email('nobody@x.com'))
+        self.assertEqual(self.users_ref.stream.call_count, 2)
+
+    def test_cache_is_bounded(self):
+        """Least recently used entries are evicted past max_entries"""
+        self.service.remember('a@x.com', 'u1')
+        self.service.remember('b@x.com', 'u2')
+        self.service.remember('c@x.com', 'u3')
+
+        self.assertIsNone(self.service._cache_get('a@x.com'))
+        self.assertEqual(self.service._cache_get('c@x.com'), 'u3')
+
+    def test_backfill_email_lower(self):
+        """Backfill only updates missing or stale email_lower values"""
+        docs = [
+            make_doc('u1', {'email': 'Mixed@Case.com'}),
+            make_doc('u2', {'email': 'done@x.com', 'email_lower': 'done@x.com'}),
+            make_doc('u3', {'email': 'Stale@x.com', 'email_lower': 'old@x.com'}),
+        ]
+        self.users_ref.stream.return_value = docs
+        batch = self.mock_db.batch.return_value
+
+        updated = self.service.backfill_email_lower()
+
+        self.assertEqual(updated, 2)
+        batch.update.assert_any_call(docs[0].reference, {'email_lower': 'mixed@case.com'})
+        batch.update.assert_any_call(docs[2].reference, {'email_lower': 'stale@x.com'})
+        batch.commit.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
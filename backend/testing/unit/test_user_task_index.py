@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+C1 Unit Tests - User Task Index
+Tests membership and summaries of UserTasks/{uid}/items entries, staged
+index writes for task changes, the transactional update path and serving
+summary "my tasks" reads from the index.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import MagicMock, patch
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from firebase_admin import firestore
+from flask import Flask
+from services.user_task_index import UserTaskIndex, task_members, task_summary, apply_updates
+
+TASK = {
+    'task_name': 'Report',
+    'task_status': 'Ongoing',
+    'owner': 'u1',
+    'assigned_to': ['u2', {'id': 'u3'}],
+    'task_desc': 'long description',
+    'status_log': [{'status': 'Ongoing'}] * 20,
+    'is_deleted': False,
+}
+
+
+class RecordingWriter:
+    """Stands in for a WriteBatch / Transaction"""
+
+    def __init__(self):
+        self.sets = {}
+        self.deletes = []
+
+    def set(self, ref, data):
+        self.sets[ref.path] = data
+
+    def delete(self, ref):
+        self.deletes.append(ref.path)
+
+
+class FakeRef:
+    def __init__(self, path):
+        self.path = path
+
+    def collection(self, name):
+        return FakeRef(f'{self.path}/{name}')
+
+    def document(self, doc_id):
+        return FakeRef(f'{self.path}/{doc_id}')
+
+
+def make_index(**kwargs):
+    index = UserTaskIndex(**kwargs)
+    index._db = MagicMock()
+    index._db.collection.side_effect = FakeRef
+    return index
+
+
+class TestIndexEntries(unittest.TestCase):
+    """Unit tests for task_members / task_summary / apply_updates"""
+
+    def test_members(self):
+        """Owner and assignees (string or dict entries) are members"""
+        self.assertEqual(task_members(TASK), {'u1', 'u2', 'u3'})
+        self.assertEqual(task_members(None), set())
+
+    def test_summary_is_compact(self):
+        """Only list-view fields are copied into the index"""
+        summary = task_summary(TASK)
+        self.assertEqual(summary['task_name'], 'Report')
+        self.assertNotIn('task_desc', summary)
+        self.assertNotIn('status_log', summary)
+        self.assertIs(summary['updatedAt'], firestore.SERVER_TIMESTAMP)
+
+    def test_apply_updates_skips_transforms(self):
+        """Sentinels and array transforms do not leak into summaries"""
+        merged = apply_updates(TASK, {
+            'task_status': 'Completed',
+            'status_log': firestore.ArrayUnion([{'status': 'Completed'}]),
+            'updatedAt': firestore.SERVER_TIMESTAMP,
+            'task_desc': firestore.DELETE_FIELD,
+        })
+        self.assertEqual(merged['task_status'], 'Completed')
+        self.assertEqual(merged['status_log'], TASK['status_log'])
+        self.assertNotIn('updatedAt', merged)
+        self.assertNotIn('task_desc', merged)
+
+
+class TestStagedWrites(unittest.TestCase):
+    """Unit tests for UserTaskIndex.stage / update_task"""
+
+    def test_reassignment(self):
+        """New members get entries, removed members lose theirs"""
+        index = make_index(enabled=True)
+        writer = RecordingWriter()
+        index.stage(writer, 't1', TASK, dict(TASK, assigned_to=['u4']))
+        self.assertEqual(set(writer.sets), {'UserTasks/u1/items/t1', 'UserTasks/u4/items/t1'})
+        self.assertEqual(sorted(writer.deletes), ['UserTasks/u2/items/t1', 'UserTasks/u3/items/t1'])
+
+    def test_soft_delete_keeps_entries(self):
+        """Soft-deleted tasks stay indexed with is_deleted=True"""
+        index = make_index(enabled=True)
+        writer = RecordingWriter()
+        index.stage(writer, 't1', TASK, apply_updates(TASK, {'is_deleted': True}))
+        self.assertTrue(all(entry['is_deleted'] for entry in writer.sets.values()))
+        self.assertEqual(writer.deletes, [])
+
+    def test_permanent_delete(self):
+        """Removing a task removes every entry"""
+        index = make_index(enabled=True)
+        writer = RecordingWriter()
+        index.stage(writer, 't1', TASK, None)
+        self.assertEqual(len(writer.deletes), 3)
+        self.assertEqual(writer.sets, {})
+
+    def test_disabled(self):
+        """USER_TASK_INDEX=0 stages nothing"""
+        writer = RecordingWriter()
+        make_index(enabled=False).stage(writer, 't1', None, TASK)
+        self.assertEqual(writer.sets, {})
+
+    def test_update_runs_in_one_transaction(self):
+        """The task update and its index writes share a transaction"""
+        index = make_index(enabled=True)
+        transaction = MagicMock()
+        transaction._max_attempts = 1
+        transaction._read_only = False
+        index._db.transaction.return_value = transaction
+        task_ref = MagicMock(id='t1', path='Tasks/t1')
+        task_ref.get.return_value.to_dict.return_value = TASK
+
+        old_data = index.update_task(task_ref, {'is_deleted': True})
+
+        self.assertEqual(old_data, TASK)
+        task_ref.get.assert_called_once_with(transaction=transaction)
+        transaction.update.assert_called_once_with(task_ref, {'is_deleted': True})
+        self.assertEqual(transaction.set.call_count, 3)
+        transaction._commit.assert_called_once()
+
+
+class TestIndexReads(unittest.TestCase):
+    """GET /api/tasks?userId=&fields=summary served from the index"""
+
+    def setUp(self):
+        from routes.task import tasks_bp
+        app = Flask(__name__)
+        app.register_blueprint(tasks_bp)
+        self.client = app.test_client()
+        self.db = MagicMock()
+        patcher = patch('routes.task.get_firestore_client', return_value=self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_summary_reads_use_index(self):
+        """Only the user's items collection is queried"""
+        index = make_index(enabled=True, reads_enabled=True)
+        items = MagicMock()
+        items.select.return_value.where.return_value.stream.return_value = []
+        index.items_ref = MagicMock(return_value=items)
+        with patch('routes.task.user_task_index', index):
+            response = self.client.get('/api/tasks?userId=u1&fields=summary')
+        self.assertEqual(response.get_json(), [])
+        index.items_ref.assert_called_once_with('u1')
+        self.db.collection.assert_not_called()
+
+    def test_full_documents_use_tasks(self):
+        """Requests needing non-indexed fields still query Tasks"""
+        index = make_index(enabled=True, reads_enabled=True)
+        self.assertFalse(index.can_serve(None))
+        self.assertFalse(index.can_serve(['task_name', 'task_desc']))
+        self.assertTrue(index.can_serve(['task_name', 'is_deleted']))
+        self.assertFalse(make_index(enabled=True).can_serve(['task_name']))
+
+
+if __name__ == '__main__':
+    unittest.main()
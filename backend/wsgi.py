@@ -0,0 +1,43 @@
+"""
+Production WSGI entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Local development can keep using `py app.py` (Werkzeug dev server).
+"""
+import os
+import sys
+
+# Add current directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from firebase_utils import get_firestore_client
+from logging_utils import get_logger
+from services.email_service import email_service
+from services.job_queue import job_queue
+from services.user_directory import user_directory
+
+app = create_app()
+logger = get_logger('wsgi')
+
+
+def warm_up():
+    """
+    Open the Firestore gRPC channel and prime in-process caches so the first
+    request served by this worker does not pay for them, then start the
+    background job workers (they pick up jobs left over from a restart).
+
+    Must run after the worker has forked: gRPC channels are not fork-safe.
+    """
+    try:
+        db = get_firestore_client()
+        list(db.collection('Projects').limit(1).stream())
+        user_directory.all_users()
+        logger.info("🔥 Worker %s warmed up", os.getpid())
+    except Exception as e:
+        # A cold worker is still a working worker
+        logger.warning("⚠️ Worker %s warm-up failed: %s", os.getpid(), e)
+    job_queue.start()
+    if email_service.outbox is not None:
+        email_service.outbox.start()